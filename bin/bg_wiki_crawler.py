@@ -6,16 +6,21 @@ Python 3 / Requests rewrite of an old script used to pull BLU spell info from BG
 """
 
 import logging
+from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
 from cli_command_parser import Command, ParamGroup, Option, Flag, Counter, main
 from requests_client import RequestsClient
 
+from ds_tools.http.crawler import Crawler, ParsedPage
 from ds_tools.output import Table, SimpleColumn
 from ds_tools.output.constants import PRINTER_FORMATS
 
 log = logging.getLogger(__name__)
 
+BASE_URL = 'https://www.bg-wiki.com'
+CATEGORY_URL = f'{BASE_URL}/index.php?title=Category:Blue_Magic'
+
 
 class BgWikiCrawler(Command, description='BG Wiki Crawler for FFXI'):
     limit = Option('-L', default=5, type=int, help='Limit on the number of links to retrieve')
@@ -24,6 +29,12 @@ class BgWikiCrawler(Command, description='BG Wiki Crawler for FFXI'):
         endpoint = Option('-e', help='BG Wiki page to retrieve')
         list_descriptions = Flag('-d', help='List all BLU spell descriptions')
 
+    with ParamGroup(description='Crawl Options'):
+        state = Option('-s', metavar='PATH', help='DB file in which crawl progress is stored (allows resuming crawls)')
+        workers = Option('-w', type=int, default=4, help='Maximum number of concurrent requests')
+        interval = Option('-i', type=float, default=1.0, help='Minimum number of seconds between requests')
+        refresh = Flag('-r', help='Re-check previously crawled pages (unchanged pages will not be downloaded again)')
+
     with ParamGroup(description='Common Options'):
         verbose = Counter('-v', help='Print more verbose log info (may be specified multiple times)')
         format = Option('-f', choices=PRINTER_FORMATS)
@@ -34,53 +45,69 @@ class BgWikiCrawler(Command, description='BG Wiki Crawler for FFXI'):
         init_logging(self.verbose, log_path=None)
 
     def main(self):
-        crawler = WikiCrawler()
         if self.list_descriptions:
-            links = crawler.get_links('index.php', params={'title': 'Category:Blue_Magic'})
-            # Printer('json-pretty').pprint(links)
-            # return
-            tbl = Table(SimpleColumn('Spell', links), SimpleColumn('Description', 100))
-            for i, (spell, link) in enumerate(links.items()):
-                if i == self.limit:
-                    break
-                row = {'Spell': spell}
-                try:
-                    row['Description'] = crawler.get_blu_spell_description(link)
-                except Exception as e:
-                    log.error(f'Error retrieving {spell} from {link}: {e}')
-                tbl.print_row(row)
+            self.print_descriptions()
         elif self.endpoint:
-            print(crawler.get_soup(self.endpoint))
+            print(WikiCrawler().get_soup(self.endpoint))
+
+    def print_descriptions(self):
+        crawler = Crawler(parse_page, self.state, max_workers=self.workers, min_interval=self.interval, max_depth=1)
+        max_pages = self.limit + 1 if self.limit else None  # +1 for the category page
+        for page in crawler.crawl([CATEGORY_URL], max_pages=max_pages, refresh=self.refresh):
+            log.debug(f'Processed {page.url}')
+
+        results = crawler.store.results()
+        links = results.get(CATEGORY_URL, {})
+        tbl = Table(SimpleColumn('Spell', links), SimpleColumn('Description', 100))
+        for i, (spell, link) in enumerate(links.items()):
+            if i == self.limit:
+                break
+            if (data := results.get(link)) is not None:
+                tbl.print_row({'Spell': spell, 'Description': data})
+
+
+def parse_page(url: str, text: str) -> ParsedPage:
+    soup = BeautifulSoup(text, 'html.parser')
+    if url == CATEGORY_URL:
+        links = {spell: urljoin(BASE_URL, link) for spell, link in get_links(soup).items()}
+        return ParsedPage(links, list(links.values()))
+    return ParsedPage(get_blu_spell_description(soup))
+
+
+def get_links(soup: BeautifulSoup) -> dict[str, str]:
+    anchors = {}
+    for tbl in soup.find_all('table', 'wikitable'):
+        for tr in tbl.find_all('tr'):
+            try:
+                anchor = list(tr.find_all('td'))[1].find('a')
+            except IndexError:
+                pass
+            else:
+                anchors[anchor.string] = anchor.get('href')
+    return anchors
+
+
+def get_blu_spell_description(soup: BeautifulSoup) -> str:
+    try:
+        return soup.find('th', text=' Description\n').find_parent().find('td').get_text().strip()
+    except AttributeError:
+        pass
+    return soup.find('b', text='Description:').find_parent().find_parent().find_all('td')[-1].get_text().strip()
 
 
 class WikiCrawler(RequestsClient):
     def __init__(self):
-        super().__init__('https://www.bg-wiki.com')
+        super().__init__(BASE_URL)
 
     def get_soup(self, endpoint, **kwargs):
         resp = self.get(endpoint, **kwargs)
         return BeautifulSoup(resp.text, 'html.parser')
 
     def get_links(self, endpoint, **kwargs):
-        soup = self.get_soup(endpoint, **kwargs)
-        anchors = {}
-        for tbl in soup.find_all('table', 'wikitable'):
-            for tr in tbl.find_all('tr'):
-                try:
-                    anchor = list(tr.find_all('td'))[1].find('a')
-                except IndexError:
-                    pass
-                else:
-                    anchors[anchor.string] = anchor.get('href')
-        return anchors
+        return get_links(self.get_soup(endpoint, **kwargs))
 
     def get_blu_spell_description(self, endpoint, **kwargs):
-        soup = self.get_soup(endpoint, **kwargs)
-        try:
-            return soup.find('th', text=' Description\n').find_parent().find('td').get_text().strip()
-        except AttributeError:
-            pass
-        return soup.find('b', text='Description:').find_parent().find_parent().find_all('td')[-1].get_text().strip()
+        return get_blu_spell_description(self.get_soup(endpoint, **kwargs))
 
     def get_blu_spell_descriptions(self, category_endpoint, **kwargs):
         links = self.get_links(category_endpoint, **kwargs)
@@ -5,11 +5,15 @@ import logging
 from cli_command_parser import Command, Positional, Option, Flag, Counter, main, inputs
 
 log = logging.getLogger(__name__)
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff'}
 
 
 class ImageComparer(Command, description='Compare images'):
-    path_a = Positional(type=inputs.Path(type='file', exists=True), help='Path to an image file')
-    path_b = Positional(type=inputs.Path(type='file', exists=True), help='Path to an image file')
+    paths = Positional(
+        nargs='+',
+        type=inputs.Path(exists=True),
+        help='Paths to 2 image files to compare in detail, or more image files / directories to find similar images in',
+    )
     gray = Flag('--no-gray', '-G', default=True, help='Do not normalize images to grayscale before comparisons')
     normalize = Flag('--no-normalize', '-N', default=True, help='Do not normalize images for exposure differences before comparisons')
     max_width = Option('-W', type=int, help='Resize images that have a width greater than this value')
@@ -23,11 +27,30 @@ class ImageComparer(Command, description='Compare images'):
         init_logging(self.verbose, log_path=None)
 
     def main(self):
+        from ds_tools.fs.paths import iter_files
+
+        paths = [path for path in iter_files(self.paths) if path.suffix.lower() in IMAGE_EXTS]
+        if len(paths) == 2:
+            self.compare_pair(*paths)
+        else:
+            self.find_similar(paths)
+
+    def find_similar(self, paths):
+        from ds_tools.images.compare import ComparisonMatrix
+
+        matrix = ComparisonMatrix(paths, self.gray, self.normalize, self.max_width, self.max_height)
+        log.info(f'Comparing {len(paths):,d} images at size={matrix.size}')
+        same = set(matrix.find_same()) if self.same else set()
+        for i, j in matrix.find_similar():
+            label = 'same' if (i, j) in same else 'similar'
+            print(f'{label:>7s}: {paths[i].as_posix()}  <->  {paths[j].as_posix()}')
+
+    def compare_pair(self, path_a, path_b):
         from ds_tools.images.compare import ComparableImage
 
         image_args = (self.gray, self.normalize, self.max_width, self.max_height)
-        img_a = ComparableImage(self.path_a, *image_args)
-        img_b = ComparableImage(self.path_b, *image_args)
+        img_a = ComparableImage(path_a, *image_args)
+        img_b = ComparableImage(path_b, *image_args)
         log.log(19, f'Comparing:\n{img_a}\nto\n{img_b}')
 
         methods = {
@@ -6,9 +6,12 @@ Manage DBCache cache files
 """
 
 import logging
+import re
 import sys
+from datetime import datetime, timedelta
 from fnmatch import fnmatch
 from pathlib import Path
+from typing import Iterable
 from urllib.parse import quote as url_quote
 
 from db_cache import DBCache
@@ -16,11 +19,14 @@ from db_cache import DBCache
 sys.path.append(Path(__file__).resolve().parents[1].as_posix())
 from ds_tools.argparsing import ArgParser
 from ds_tools.logging import init_logging
+from ds_tools.output.formatting import readable_bytes
+from ds_tools.output.table import Table
 from ds_tools.output.terminal import uprint
+from ds_tools.utils.sql_patterns import patterns_to_sql, register_functions
+from ds_tools.utils.sqlite3 import Sqlite3Database
 
 log = logging.getLogger('ds_tools.{}'.format(__name__))
 
-
 def parser():
     parser = ArgParser(description='DBCache Manager')
 
@@ -35,6 +41,18 @@ def parser():
     get_parser.add_argument('path', help='Path to a DBCache file')
     get_parser.add_argument('key', help='Key to retrieve')
 
+    stats_parser = parser.add_subparser('action', 'stats', help='Show the number and size of entries for each key prefix')
+    stats_parser.add_argument('path', help='Path to a DBCache file')
+    stats_parser.add_argument('patterns', nargs='*', help='Only include keys that match one or more of these glob/fnmatch patterns')
+    stats_parser.add_argument('--delimiter', '-d', default='/', help='Delimiter that separates key prefix parts (default: %(default)s)')
+    stats_parser.add_argument('--depth', '-n', type=int, default=3, help='Number of delimited key parts to include in each prefix (default: %(default)s; scheme://host for URLs)')
+
+    prune_parser = parser.add_subparser('action', 'prune', help='Delete items that were stored more than the given number of days ago')
+    prune_parser.add_argument('path', help='Path to a DBCache file')
+    prune_parser.add_argument('days', type=float, help='Delete items older than this number of days')
+    prune_parser.add_argument('patterns', nargs='*', help='Only delete keys that match one or more of these glob/fnmatch patterns')
+    prune_parser.add_argument('--time_format', '-f', default='%Y-%m-%d %H:%M:%S', help='Format of text timestamps in the cache; it must sort chronologically (default: %(default)s)')
+
     parser.include_common_args('verbosity', 'dry_run')
     return parser
 
@@ -43,25 +61,39 @@ def main():
     args = parser().parse_args()
     init_logging(args.verbose, log_path=None)
 
-    cache = DBCache(None, db_path=args.path)
-
     if args.action == 'list':
-        for key, orig in normalized_keys(cache):
+        for key, orig in normalized_keys(DBCache(None, db_path=args.path)):
             uprint(key)
     elif args.action == 'delete':
-        prefix = '[DRY RUN] Would delete' if args.dry_run else 'Deleting'
-        for key, orig in normalized_keys(cache):
-            if any(fnmatch(key, pat) for pat in args.patterns):
-                log.info('{}: {}'.format(prefix, key))
-                if not args.dry_run:
-                    del cache[orig]
+        delete_keys(CacheTable(args.path), args.patterns, args.dry_run)
     elif args.action == 'get':
-        entry = cache[args.key]
+        entry = DBCache(None, db_path=args.path)[args.key]
         log.info(entry)
+    elif args.action == 'stats':
+        CacheTable(args.path).print_stats(args.patterns, args.delimiter, args.depth)
+    elif args.action == 'prune':
+        CacheTable(args.path).prune(args.days, args.patterns, args.time_format, args.dry_run)
     else:
         raise ValueError('Unconfigured action: {}'.format(args.action))
 
 
+def delete_keys(table: 'CacheTable', patterns: list[str], dry_run: bool = False):
+    table.delete(patterns, dry_run)
+    if not table.has_non_text_keys():
+        return
+
+    # Keys that are not stored as text (such as (url, query) tuples) can only be matched in their normalized form
+    prefix = '[DRY RUN] Would delete' if dry_run else 'Deleting'
+    cache = DBCache(None, db_path=table.db.db_path)
+    for key, orig in normalized_keys(cache):
+        if isinstance(orig, str):
+            continue
+        if any(fnmatch(key, pat) for pat in patterns):
+            log.info('{}: {}'.format(prefix, key))
+            if not dry_run:
+                del cache[orig]
+
+
 def normalized_keys(cache):
     keys = []
     for key in cache.keys():
@@ -73,8 +105,137 @@ def normalized_keys(cache):
     return sorted(keys)
 
 
+class CacheTable:
+    """
+    Direct SQL access to the table that backs a DBCache file, so that maintenance tasks can be handled by SQLite in a
+    single statement instead of by loading and examining every key in Python.
+
+    DBCache stores all entries in a single table, with a ``key`` primary key column, a ``value`` column, and a column
+    for the time that each entry was stored.  The schema is verified before any queries are run, and a
+    :class:`CacheSchemaError` is raised if it does not match.
+    """
+
+    def __init__(self, path: str):
+        if not Path(path).expanduser().is_file():
+            raise CacheSchemaError(f'Cache file does not exist: {path}')
+        self.db = Sqlite3Database(path)
+        self.name, self.time_col = self._get_schema()
+        self.key_col, self.value_col = _quote('key'), _quote('value')
+        register_functions(self.db.db)
+
+    def _get_schema(self) -> tuple[str, str]:
+        """
+        :return: Tuple of (quoted table name, quoted timestamp column name)
+        """
+        if len(tables := [name for name in self.db.table_names if not name.startswith('sqlite_')]) != 1:
+            raise CacheSchemaError(f'Expected exactly 1 table in {self.db.db_path}, but found {tables=}')
+
+        name = tables[0]
+        columns = {row['name']: row['pk'] for row in self.db.query(f'PRAGMA table_info({_quote(name)})')}
+        if not columns.get('key') or 'value' not in columns or len(others := set(columns) - {'key', 'value'}) != 1:
+            raise CacheSchemaError(
+                f'Unexpected schema for table={name!r} in {self.db.db_path} with columns={list(columns)} - expected'
+                ' a "key" primary key column, a "value" column, and a timestamp column'
+            )
+
+        time_col = others.pop()
+        log.debug(f'Found cache table={name!r} with {time_col=}')
+        return _quote(name), _quote(time_col)
+
+    def has_non_text_keys(self) -> bool:
+        return bool(self.db.query(f"SELECT 1 AS found FROM {self.name} WHERE typeof({self.key_col}) != 'text' LIMIT 1"))
+
+    def _size_expr(self) -> str:
+        # length() returns the number of characters for text values, so they are cast to blobs to count bytes
+        return f'length(CAST({self.key_col} AS BLOB)) + coalesce(length(CAST({self.value_col} AS BLOB)), 0)'
+
+    def delete(self, patterns: Iterable[str], dry_run: bool = False):
+        where, params = patterns_to_sql(patterns, self.key_col)
+        if dry_run:
+            query = f'SELECT {self.key_col} AS key FROM {self.name} WHERE {where} ORDER BY {self.key_col}'
+            for row in self.db.iterquery(query, params):
+                log.info(f'[DRY RUN] Would delete: {row["key"]}')
+        else:
+            deleted = self.db.execute(f'DELETE FROM {self.name} WHERE {where}', params).rowcount
+            log.info(f'Deleted {deleted:,d} entries')
+
+    def print_stats(self, patterns: Iterable[str] = None, delimiter: str = '/', depth: int = 3):
+        where, params = patterns_to_sql(patterns, self.key_col) if patterns else ('1', [])
+        query = (
+            f'SELECT key_prefix({self.key_col}, ?, ?) AS prefix, COUNT(*) AS entries, SUM({self._size_expr()}) AS size,'
+            f' MIN({self.time_col}) AS oldest, MAX({self.time_col}) AS newest'
+            f' FROM {self.name} WHERE {where} GROUP BY prefix ORDER BY prefix'
+        )
+        rows = self.db.query(query, [delimiter, depth, *params])
+        total_count, total_size = sum(row['entries'] for row in rows), sum(row['size'] or 0 for row in rows)
+        for row in rows:
+            row['size'] = readable_bytes(row['size'] or 0)
+        if rows:
+            Table.auto_print_rows(rows)
+        log.info(f'Total: {total_count:,d} entries, {readable_bytes(total_size)}')
+
+    def prune(self, days: float, patterns: Iterable[str] = None, time_format: str = '%Y-%m-%d %H:%M:%S', dry_run=False):
+        where, params = patterns_to_sql(patterns, self.key_col) if patterns else ('1', [])
+        cutoff = datetime.now() - timedelta(days=days)
+        if self._has_numeric_timestamps():
+            cutoff = cutoff.timestamp()
+        else:
+            self._check_time_format(time_format)
+            cutoff = cutoff.strftime(time_format)
+
+        where = f'{self.time_col} < ? AND ({where})'
+        if dry_run:
+            query = f'SELECT COUNT(*) AS entries, SUM({self._size_expr()}) AS size FROM {self.name} WHERE {where}'
+            row = self.db.query(query, [cutoff, *params])[0]
+            size = readable_bytes(row['size'] or 0)
+            log.info(f'[DRY RUN] Would delete {row["entries"]:,d} entries ({size}) from before {cutoff}')
+        else:
+            deleted = self.db.execute(f'DELETE FROM {self.name} WHERE {where}', [cutoff, *params]).rowcount
+            log.info(f'Deleted {deleted:,d} entries from before {cutoff}')
+
+    def _has_numeric_timestamps(self) -> bool:
+        query = f'SELECT DISTINCT typeof({self.time_col}) AS type FROM {self.name} WHERE {self.time_col} IS NOT NULL'
+        if not (types := {row['type'] for row in self.db.query(query)}):
+            return False
+        elif types.issubset(('integer', 'real')):
+            return True
+        elif types == {'text'}:
+            return False
+        raise CacheSchemaError(f'Unable to compare timestamps in column={self.time_col} with mixed {types=}')
+
+    def _check_time_format(self, time_format: str):
+        """
+        Text timestamps are compared as strings, so the format must sort chronologically, and it must match the stored
+        values.  The oldest and newest values are checked, since they are the ones that the comparison depends on.
+        """
+        directives = re.findall(r'%(.)', time_format)
+        if directives != list('YmdHMSf'[:len(directives)]):
+            raise ValueError(f'Invalid {time_format=} - text timestamps must sort chronologically to be compared')
+
+        query = f'SELECT MIN({self.time_col}) AS oldest, MAX({self.time_col}) AS newest FROM {self.name}'
+        for value in self.db.query(query)[0].values():
+            try:
+                datetime.strptime(value, time_format)
+            except TypeError:  # There are no timestamps
+                pass
+            except ValueError as e:
+                message = f'Timestamp {value!r} in column={self.time_col} does not match {time_format=}'
+                raise CacheSchemaError(message) from e
+
+
+class CacheSchemaError(Exception):
+    """Raised when a file does not contain a table with the schema that DBCache uses"""
+
+
+def _quote(name: str) -> str:
+    return '"{}"'.format(name.replace('"', '""'))
+
+
 if __name__ == '__main__':
     try:
         main()
+    except (CacheSchemaError, ValueError) as e:
+        log.error(e)
+        sys.exit(1)
     except KeyboardInterrupt:
         print()
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import re
 from collections import Counter as _Counter
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from contextlib import chdir
@@ -10,21 +11,27 @@ from dataclasses import dataclass
 from functools import cached_property
 from multiprocessing import set_start_method
 from pathlib import Path
+from queue import Queue, Empty
 from subprocess import check_call, check_output
 from tempfile import TemporaryDirectory
-from typing import Sequence
+from typing import Iterable, Iterator, Sequence
 
+import numpy as np
 from cli_command_parser import Command, ParamGroup, Positional, Option, Counter, SubCommand, main
 from cli_command_parser.inputs import Path as IPath, NumRange
 from tqdm import tqdm
 
 from ds_tools.output.formatting import format_duration
+from ds_tools.images.array import ImageArray
 from ds_tools.images.geometry import COMMON_VIDEO_ASPECT_RATIOS, AspectRatio, Box
 from ds_tools.images.info import ImageInfo
+from ds_tools.media.ffmpeg import stream_ffmpeg_frames
+from ds_tools.media.probe import probe
 
 log = logging.getLogger(__name__)
 EXISTING_PATH = IPath(type='file|dir', exists=True)
 THRESHOLD = NumRange(float, min=0, max=1, include_max=True)
+SCENE_THRESHOLD = NumRange(float, min=0, max=1)
 
 
 class AspectRatioChangeFinder(Command, show_group_tree=True):
@@ -47,8 +54,17 @@ class Fix(AspectRatioChangeFinder):
     in_path: Path = Option('-i', type=IPath(type='file', exists=True), required=True, help='A video file to examine')
     output: Path = Option('-o', type=IPath(type='file', exists=False), required=True, help='The output path')
     image_dir: Path = Option('-I', type=IPath(type='dir'), help='Save or load images to/from this location')
-    max_sizes: int = Option('-s', default=2, help='Maximum number of size variations to allow')
-    threshold: float = Option('-t', type=THRESHOLD, default=0.99, help='Letterbox area color match detection threshold')
+
+    with ParamGroup('Video Scan'):
+        max_sizes: int = Option('-s', default=2, help='Maximum number of size variations to allow')
+        threshold: float = Option(
+            '-t', type=THRESHOLD, default=0.99, help='Letterbox area color match detection threshold'
+        )
+        interval: float = Option('-n', type=float, default=1, help='Maximum number of seconds between sampled frames')
+        scene: float = Option(
+            '-S', type=SCENE_THRESHOLD, help='Also sample frames where the scene change score exceeds this threshold'
+        )
+        scan_width: int = Option('-w', type=int, default=320, help='Width to downscale frames to before scanning them')
 
     def main(self):
         log.warning(
@@ -63,20 +79,19 @@ class Fix(AspectRatioChangeFinder):
             self._merge_parts(split_dir)
 
     def _find_ratio_changes(self, tmp_dir: Path) -> list[RatioChange]:
-        if self.image_dir and self.image_dir.exists():
-            image_dir = self.image_dir
+        if not self.image_dir:
+            processor = scan_video(self.in_path, self)
+        elif self.image_dir.exists():
+            processor = AspectRatioProcessor.from_image_dir(self.image_dir, self.max_sizes, self.parallel)
         else:
             image_dir = self._convert_video_to_images(tmp_dir)
+            processor = AspectRatioProcessor.from_image_dir(image_dir, self.max_sizes, self.parallel)
+            self.image_dir.parent.mkdir(parents=True, exist_ok=True)
+            image_dir.rename(self.image_dir)
 
-        processor = AspectRatioProcessor(image_dir, self.max_sizes, self.threshold, self.parallel)
         changes = processor.get_ratio_changes()
         self._max_image_box = processor.max_image_box
         self._src_aspect_ratio = processor.common_box_ratio_map[processor.max_image_box]
-
-        if self.image_dir and not self.image_dir.exists():
-            self.image_dir.parent.mkdir(parents=True, exist_ok=True)
-            image_dir.rename(self.image_dir)
-
         return changes
 
     def _convert_video_to_images(self, tmp_dir: Path) -> Path:
@@ -105,7 +120,7 @@ class Fix(AspectRatioChangeFinder):
         with chdir(split_dir):
             with tqdm(total=len(changes), unit='section', smoothing=0.1, maxinterval=1) as prog_bar:
                 for i, change in enumerate(changes):
-                    cmd = base_cmd + ['-ss', change.time_stamp, '-to', change.end_str, '-c', 'copy']
+                    cmd = base_cmd + ['-ss', str(change.seconds), '-to', str(change.end_seconds), '-c', 'copy']
                     if change.ratio != self._src_aspect_ratio:
                         cmd += ['-aspect', str(change.ratio) if change.ratio.y > 1 else str(change.ratio.x)]
                     cmd.append(f'part_{i:04d}.mkv')  # TODO: Handle mp4, etc
@@ -133,44 +148,143 @@ class Images(AspectRatioChangeFinder):
     threshold: float = Option('-t', type=THRESHOLD, default=0.99, help='Letterbox area color match detection threshold')
 
     def main(self):
-        processor = AspectRatioProcessor(self.image_dir, self.max_sizes, self.threshold, self.parallel)
-        changes = processor.get_ratio_changes()
-        print(f'Found {len(changes)} aspect ratio changes:')
-        for change in changes:
-            print(f'  - {change}')
+        processor = AspectRatioProcessor.from_image_dir(self.image_dir, self.max_sizes, self.parallel)
+        print_changes(processor.get_ratio_changes())
+
+
+class Video(AspectRatioChangeFinder, help='Find aspect ratio changes in a video without extracting images from it'):
+    video: Path = Positional(type=IPath(type='file', exists=True), help='A video file to examine')
+    with ParamGroup('Video Scan'):
+        max_sizes: int = Option('-s', default=2, help='Maximum number of size variations to allow')
+        threshold: float = Option(
+            '-t', type=THRESHOLD, default=0.99, help='Letterbox area color match detection threshold'
+        )
+        interval: float = Option('-n', type=float, default=1, help='Maximum number of seconds between sampled frames')
+        scene: float = Option(
+            '-S', type=SCENE_THRESHOLD, help='Also sample frames where the scene change score exceeds this threshold'
+        )
+        scan_width: int = Option('-w', type=int, default=320, help='Width to downscale frames to before scanning them')
+
+    def main(self):
+        print_changes(scan_video(self.video, self).get_ratio_changes())
+
+
+def print_changes(changes: Sequence[RatioChange]):
+    print(f'Found {len(changes)} aspect ratio changes:')
+    for change in changes:
+        print(f'  - {change}')
+
+
+# region Video Frame Scanning
+
+
+def scan_video(path: Path, cmd: Fix | Video) -> AspectRatioProcessor:
+    frames = iter_video_frames(path, cmd.threshold, cmd.interval, cmd.scene, cmd.scan_width)
+    return AspectRatioProcessor(list(frames), cmd.max_sizes)
+
+
+@dataclass
+class FrameInfo:
+    seconds: float
+    box: Box
+    bbox: Box
+
+    def find_closest_bbox(self, boxes: Iterable[Box]) -> Box:
+        return min(boxes, key=lambda box: abs(box.area - self.bbox.area))
+
+
+def iter_video_frames(
+    path: Path,
+    threshold: float = 0.99,
+    interval: float = 1,
+    scene: float = None,
+    scan_width: int = 320,
+    batch_size: int = 64,
+) -> Iterator[FrameInfo]:
+    """
+    Sample frames from the given video, and find the bounding box of the content in each frame as the video is decoded.
+    ffmpeg downscales each sampled frame and converts it to grayscale, and raw frames are read from its stdout, so no
+    frames are written to disk.  Bounding boxes are found for batches of frames at a time, so at most ``batch_size``
+    downscaled frames are held in memory.
+
+    :param path: The path to a video file
+    :param threshold: The minimum portion of a row/column of pixels that must match the border color for that row /
+      column to be considered part of the letterbox
+    :param interval: The maximum number of seconds between sampled frames
+    :param scene: If specified, frames with a scene change score that exceeds this threshold are also sampled
+    :param scan_width: The width to downscale frames to before scanning them
+    :param batch_size: The number of frames to scan at a time
+    :return: Iterator that yields a :class:`FrameInfo` for each sampled frame
+    """
+    info = probe(path)
+    stream = next(s for s in info['streams'] if s.get('codec_type') == 'video')
+    src_width, src_height = stream['width'], stream['height']
+    width = min(scan_width, src_width)
+    height = max(1, round(src_height * width / src_width))
+    full_box = Box.from_size_and_pos(src_width, src_height)
+    x_scale, y_scale = src_width / width, src_height / height
+
+    select = rf'isnan(prev_selected_t)+gte(t-prev_selected_t\,{interval})'
+    if scene is not None:
+        select += rf'+gt(scene\,{scene})'
+    cmd = [
+        '-hide_banner', '-nostats', '-loglevel', 'info',
+        '-i', path.as_posix(),
+        '-an', '-sn',
+        '-vf', f'select={select},scale={width}:{height}:flags=area,format=gray,showinfo',
+        '-fps_mode', 'vfr',
+        '-f', 'rawvideo', '-pix_fmt', 'gray',
+        'pipe:1',
+    ]
+    timestamps = Queue()
+    pts_time_search = re.compile(rb'\bpts_time:\s*(-?[\d.]+)').search
+
+    def handle_stderr(line: bytes):
+        if m := pts_time_search(line):
+            timestamps.put(float(m.group(1)))
+        elif line.strip() and b'showinfo' not in line:
+            log.debug(f'ffmpeg: {line.decode("utf-8", "replace").rstrip()}')
+
+    duration = float(info.get('format', {}).get('duration') or 0) or None
+    log.info(f'Scanning {path.as_posix()} with frames downscaled from {src_width}x{src_height} to {width}x{height}')
+    batch = np.empty((batch_size, height, width), np.uint8)
+    batch_times = []
+
+    def process_batch() -> Iterator[FrameInfo]:
+        bboxes = ImageArray.find_bboxes(batch[:len(batch_times)], tolerance=16, threshold=threshold)
+        for seconds, (left, top, right, bottom) in zip(batch_times, map(Box.as_bbox, bboxes)):
+            bbox = Box(round(left * x_scale), round(top * y_scale), round(right * x_scale), round(bottom * y_scale))
+            yield FrameInfo(seconds, full_box, bbox)
+        prog_bar.update(round(batch_times[-1]) - prog_bar.n)
+        batch_times.clear()
+
+    with tqdm(total=duration and round(duration), unit='s', smoothing=0.1, maxinterval=1) as prog_bar:
+        for buf in stream_ffmpeg_frames(cmd, width * height, stderr_handler=handle_stderr):
+            try:
+                seconds = round(timestamps.get(timeout=30), 3)
+            except Empty as e:
+                raise RuntimeError(f'Unable to determine the timestamp of a frame from {path.as_posix()}') from e
+            # The buffer is re-used for the next frame, so it needs to be copied
+            batch[len(batch_times)] = np.frombuffer(buf, np.uint8).reshape(height, width)
+            batch_times.append(seconds)
+            if len(batch_times) == batch_size:
+                yield from process_batch()
+
+        if batch_times:
+            yield from process_batch()
+
+
+# endregion
 
 
 class AspectRatioProcessor:
-    def __init__(self, image_dir: Path, max_sizes: int = 2, threshold: float = 0.99, parallel: int = 4):
-        self.image_dir = image_dir
+    def __init__(self, frames: Sequence[ImageInfo | FrameInfo], max_sizes: int = 2):
+        self.all_image_info = frames
         self.max_sizes = max_sizes
-        self.threshold = threshold
-        self.parallel = parallel
 
-    @cached_property
-    def all_image_info(self) -> list[ImageInfo]:
-        paths = sorted(self.image_dir.iterdir())
-        log.info(f'Processing {len(paths)} images using {self.parallel} workers...')
-        results = []
-        with ProcessPoolExecutor(max_workers=self.parallel) as executor:
-            with tqdm(total=len(paths), unit='img', smoothing=0.1, maxinterval=1) as prog_bar:
-                try:
-                    futures = {executor.submit(ImageInfo.for_image, path): path for path in paths}
-                    for future in as_completed(futures):
-                        try:
-                            results.append(future.result())
-                        except Exception as e:
-                            log.error(f'Error opening {futures[future].as_posix()}: {e}')
-                            prog_bar.update()
-                        else:
-                            prog_bar.update()
-                except BaseException as e:
-                    log.warning(f'Shutting down due to {e}')
-                    executor.shutdown(cancel_futures=True)
-                    raise
-
-        results.sort()
-        return results
+    @classmethod
+    def from_image_dir(cls, image_dir: Path, max_sizes: int = 2, parallel: int = 4) -> AspectRatioProcessor:
+        return cls(_load_image_info(image_dir, parallel), max_sizes)
 
     @cached_property
     def common_box_ratio_map(self) -> dict[Box, AspectRatio]:
@@ -198,7 +312,7 @@ class AspectRatioProcessor:
                         continue
 
                 if last_change:
-                    last_change.duration = info.seconds - last_change.seconds
+                    last_change.duration = round(info.seconds - last_change.seconds, 3)
 
                 last_change = RatioChange(info.seconds, box, self.common_box_ratio_map[box])
                 changes.append(last_change)
@@ -206,7 +320,7 @@ class AspectRatioProcessor:
 
         final_info = self.all_image_info[-1]
         if last_change and last_change.seconds != final_info.seconds:
-            last_change.duration = final_info.seconds - last_change.seconds
+            last_change.duration = round(final_info.seconds - last_change.seconds, 3)
 
         return changes
 
@@ -233,6 +347,31 @@ class AspectRatioProcessor:
         return _get_common_ratios(self.max_image_box)
 
 
+def _load_image_info(image_dir: Path, parallel: int = 4) -> list[ImageInfo]:
+    paths = sorted(image_dir.iterdir())
+    log.info(f'Processing {len(paths)} images using {parallel} workers...')
+    results = []
+    with ProcessPoolExecutor(max_workers=parallel) as executor:
+        with tqdm(total=len(paths), unit='img', smoothing=0.1, maxinterval=1) as prog_bar:
+            try:
+                futures = {executor.submit(ImageInfo.for_image, path): path for path in paths}
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        log.error(f'Error opening {futures[future].as_posix()}: {e}')
+                        prog_bar.update()
+                    else:
+                        prog_bar.update()
+            except BaseException as e:
+                log.warning(f'Shutting down due to {e}')
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    results.sort()
+    return results
+
+
 def _get_common_ratios(box: Box) -> dict[AspectRatio, Box]:
     common_ratios = {}
     for ar in COMMON_VIDEO_ASPECT_RATIOS:
@@ -245,10 +384,10 @@ def _get_common_ratios(box: Box) -> dict[AspectRatio, Box]:
 
 @dataclass
 class RatioChange:
-    seconds: int
+    seconds: float
     box: Box
     ratio: AspectRatio
-    duration: int = 0
+    duration: float = 0
 
     def __str__(self) -> str:
         box = self.box
@@ -266,7 +405,7 @@ class RatioChange:
         return format_duration(self.duration)
 
     @property
-    def end_seconds(self) -> int:
+    def end_seconds(self) -> float:
         return self.seconds + self.duration
 
     @property
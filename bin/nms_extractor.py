@@ -9,12 +9,14 @@ from cli_command_parser.inputs import Path as IPath
 
 import logging
 import re
-from subprocess import check_call, check_output
-from tempfile import TemporaryDirectory
-from typing import Any, Iterable, Optional, Union, Collection
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import check_call
+from typing import Any, Iterable, Union, Collection
 
 from ds_tools.__version__ import __author_email__, __version__  # noqa
 from ds_tools.caching.decorators import cached_property
+from ds_tools.fs.paths import get_user_cache_dir
+from ds_tools.fs.psarc import PsarcFile, PsarcIndex
 from ds_tools.output.formatting import readable_bytes
 from ds_tools.output.printer import Printer
 
@@ -33,10 +35,10 @@ class NMSExtractor(Command, description='NMS Extractor'):
         steamapps_dir = Option(default=STEAMAPPS_DIR, type=Path, help='The path to the steamapps directory, containing appmanifest_*.acf files')
         nms_dir = Option(type=Path, help="The directory in which No Man's Sky is installed (default: $steamapps_dir/common/No Man's Sky)")
 
-    with ParamGroup(description='PSARC Options'):
-        psarc = Option('-p', default='~/sbin/psarc.exe', type=IPath(type='file', exists=True), help='Path to the psarc binary to use')
+    with ParamGroup(description='PAK Options'):
         mbin_compiler = Option('-m', default='~/sbin/MBINCompiler.exe', metavar='PATH', help='Path to the MBINCompiler binary to use')
-        debug = Flag('-d', help='Show more psarc output')
+        workers = Option('-w', type=int, default=4, help='Number of PAK files to index / extract in parallel')
+        index_path = Option('-i', type=IPath(type='file'), help='Path to the PAK content index (default: a file in the user cache dir)')
 
     with ParamGroup(description='Output Options'):
         output = Option('-o', default='~/etc/no_mans_sky/extracted/', metavar='PATH', help='Output directory')
@@ -45,11 +47,10 @@ class NMSExtractor(Command, description='NMS Extractor'):
         from ds_tools.logging import init_logging
 
         init_logging(self.verbose, log_path=None)
-        PakFile._psarc_loc = self.psarc.as_posix()
 
     @cached_property
     def nms(self) -> NoMansSky:
-        return NoMansSky(self.psarc, Path(self.output).expanduser(), self.steamapps_dir, self.nms_dir)
+        return NoMansSky(Path(self.output).expanduser(), self.steamapps_dir, self.nms_dir, self.index_path, self.workers)
 
     @cached_property
     def mbc(self) -> MbinCompiler:
@@ -67,14 +68,11 @@ class Find(NMSExtractor, help='Find the PAK file(s) containing the specified MBI
             for name in map(str.upper, self.files)
         }
         results = defaultdict(list)
-        for pak in self.nms.pak_files(debug=self.debug):
-            for name in list(to_find):
-                if mbin_path := pak.get_content_path(name):
-                    results[pak.name].append(mbin_path)
-                    to_find.remove(name)
-                    break
-            if not to_find:
-                break
+        index = self.nms.index
+        for name in sorted(to_find):
+            if entries := index.find_suffix(name):  # Sorted by pak path, then position in the pak
+                results[entries[0].archive.name].append(entries[0].path)
+                to_find.remove(name)
 
         if to_find:
             results['__NOT_FOUND__'] = sorted(to_find)
@@ -86,11 +84,9 @@ class FindAll(NMSExtractor, help='Find the PAK files(s) containing any files wit
     name = Positional(help='The (partial) name of a file to find')
 
     def main(self):
-        to_find = self.name
         results = {}
-        for pak in self.nms.pak_files(debug=self.debug):
-            if pak_results := list(pak.find_paths_containing(to_find)):
-                results[pak.name] = pak_results
+        for entry in self.nms.index.find_containing(self.name):
+            results.setdefault(entry.archive.name, []).append(entry.path)
 
         if results:
             Printer('yaml').pprint(results)
@@ -103,9 +99,9 @@ class Extract(NMSExtractor, help='Extract MBIN files from PAK files'):
 
     def main(self):
         if self.all:
-            self.nms.extract_all_pak_files(self.debug)
+            self.nms.extract_all_pak_files()
         else:
-            self.nms.extract_filtered_pak_files(EXCLUDE, self.debug)
+            self.nms.extract_filtered_pak_files(EXCLUDE)
 
 
 class MbinCompiler:
@@ -137,13 +133,21 @@ class MbinCompiler:
 
 
 class NoMansSky:
-    def __init__(self, psarc_path: Path, output_dir: Path, steamapps_dir: Path, install_dir: Path = None):
-        self.psarc_path = psarc_path
+    def __init__(
+        self,
+        output_dir: Path,
+        steamapps_dir: Path,
+        install_dir: Path = None,
+        index_path: Path = None,
+        workers: int = 4,
+    ):
         self.steamapps_dir = steamapps_dir
         self.install_dir = install_dir or steamapps_dir.joinpath('common', 'No Man\'s Sky')
         self.output_dir = output_dir.joinpath(self.build_id)
         if not self.output_dir.exists():
             self.output_dir.mkdir(parents=True)
+        self.index_path = index_path or get_user_cache_dir('nms_extractor').joinpath('pak_index.db')
+        self.workers = workers
 
     @cached_property
     def manifest(self) -> dict[str, Any]:
@@ -168,52 +172,62 @@ class NoMansSky:
     def pak_dir(self) -> Path:
         return self.install_dir.joinpath('GAMEDATA', 'PCBANKS')
 
-    def pak_files(self, exclude_packed_dirs: Iterable[str] = None, debug: bool = False) -> list['PakFile']:
+    @cached_property
+    def pak_paths(self) -> list[Path]:
+        return sorted(self.pak_dir.glob('*.pak'))
+
+    @cached_property
+    def index(self) -> PsarcIndex:
+        """Index of the content of all PAK files.  Only PAK files that changed since the last run are re-scanned."""
+        index = PsarcIndex(self.index_path)
+        if updated := index.update(self.pak_paths, self.workers):
+            log.info(f'Updated the content index for {updated} / {len(self.pak_paths)} PAK files')
+        return index
+
+    def pak_files(self, exclude_packed_dirs: Iterable[str] = None) -> list[PakFile]:
         exclude_packed_dirs = set(exclude_packed_dirs) if exclude_packed_dirs else None
-        return [PakFile(path, exclude_packed_dirs, debug=debug) for path in sorted(self.pak_dir.glob('*.pak'))]
+        content = {}
+        for entry in self.index.all_entries():
+            content.setdefault(entry.archive, set()).add(entry.path)
+        return [PakFile(path, content.get(path, set()), exclude_packed_dirs) for path in self.pak_paths]
 
-    def extract_all_pak_files(self, debug: bool = False):
+    def extract_all_pak_files(self):
         log.info(f'Extracting {self.pak_dir.as_posix()} -> {self.output_dir.as_posix()}')
-        pak_files = [PakFile(path, debug=debug) for path in sorted(self.pak_dir.glob('*.pak'))]
-        total = len(pak_files)
-        for i, pak in enumerate(pak_files, 1):
-            pak.extract(self.output_dir, i, total)
+        self._extract(self.pak_files())
 
-    def extract_filtered_pak_files(self, exclude_packed_dirs: Iterable[str], debug: bool = False):
-        pak_files = self.pak_files(exclude_packed_dirs, debug)
+    def extract_filtered_pak_files(self, exclude_packed_dirs: Iterable[str]):
+        pak_files = self.pak_files(exclude_packed_dirs)
         to_extract = [pak for pak in pak_files if pak.top_level_filtered]
-        total = len(to_extract)
         log.info(
-            f'Extracting {total} / {len(pak_files)} filtered PAK files from {self.pak_dir.as_posix()} ->'
+            f'Extracting {len(to_extract)} / {len(pak_files)} filtered PAK files from {self.pak_dir.as_posix()} ->'
             f' {self.output_dir.as_posix()}'
         )
-        for i, pak in enumerate(to_extract, 1):
-            pak.extract(self.output_dir, i, total)
+        self._extract(to_extract)
 
+    def _extract(self, pak_files: list[PakFile]):
+        total = len(pak_files)
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            futures = [executor.submit(pak.extract, self.output_dir, i, total) for i, pak in enumerate(pak_files, 1)]
+            for future in futures:
+                future.result()
 
-class PakFile:
-    _psarc_loc: str = None
 
-    def __init__(self, path: Path, exclude_packed_dirs: set[str] = None, debug: bool = False):
+class PakFile:
+    def __init__(self, path: Path, paths: set[str], exclude_packed_dirs: set[str] = None):
         self.path = path
         self.name = path.name
+        self.paths = paths
         self.exclude_packed_dirs = exclude_packed_dirs
-        self.debug = debug
 
     @cached_property
     def top_level_names(self) -> set[str]:
-        command = [self._psarc_loc, 'list', self.path.as_posix(), '-q']
-        return {p.split(maxsplit=1)[0].split('/', 1)[0] for p in check_output(command, encoding='utf-8').splitlines()}
+        return {p.split('/', 1)[0] for p in self.paths}
 
     @cached_property
     def content_paths(self) -> set[str]:
-        command = [self._psarc_loc, 'list', self.path.as_posix(), '-q']
-        exclude_packed_dirs = self.exclude_packed_dirs
-        return {
-            p.split(maxsplit=1)[0]
-            for p in check_output(command, encoding='utf-8').splitlines()
-            if not exclude_packed_dirs or p.split('/', 1)[0] not in exclude_packed_dirs
-        }
+        if exclude_packed_dirs := self.exclude_packed_dirs:
+            return {p for p in self.paths if p.split('/', 1)[0] not in exclude_packed_dirs}
+        return self.paths
 
     @cached_property
     def top_level_filtered(self) -> set[str]:
@@ -223,52 +237,15 @@ class PakFile:
     def __contains__(self, item: str) -> bool:
         return any(p.endswith(item) for p in self.content_paths)
 
-    def find_paths_containing(self, text: str):
-        lc_text = text.lower()
-        for path in self.content_paths:
-            if lc_text in path.lower():
-                yield path
-
-    def get_content_path(self, mbin_name: str) -> Optional[str]:
-        for path in self.content_paths:
-            if path.endswith(mbin_name):
-                return path
-        return None
-
     def extract(self, output_dir: Path, n: int = None, total: int = None):
         suffix = f' ({n} / {total})' if n and total else ''
         names = ','.join(sorted(self.top_level_filtered))
         log.info(f'Extracting from {self.name} [{readable_bytes(self.path.stat().st_size)}]{suffix} content={names}')
+        psarc = PsarcFile(self.path)
         if self.top_level_names != self.top_level_filtered:
-            self._extract_filtered(output_dir)
+            psarc.extract(output_dir, self.content_paths)
         else:
-            self._extract_all(output_dir)
-
-    def _extract_all(self, output_dir: Path):
-        command = [self._psarc_loc, 'extract', f'--input={self.path.as_posix()}', f'--to={output_dir.as_posix()}']
-        if not self.debug:
-            command.append('-q')
-        log.debug(f'Running {command=}')
-        check_call(command)
-
-    def _extract_filtered(self, output_dir: Path):
-        with TemporaryDirectory() as tmp_dir_name:
-            tmp_dir = Path(tmp_dir_name)
-            files = '\n'.join(f'        <file archivepath="{p}" />' for p in self.content_paths)
-            psarc_xml = (
-                f'<psarc>\n'
-                f'    <extract archive="{self.path.as_posix()}" to="{output_dir.as_posix()}">\n'
-                f'{files}'
-                f'    </extract>\n'
-                f'</psarc>\n'
-            )
-            tmp_xml = tmp_dir.joinpath('to_extract.xml')
-            tmp_xml.write_text(psarc_xml)
-            command = [self._psarc_loc, 'extract', f'--xml={tmp_xml.as_posix()}']
-            if not self.debug:
-                command.append('-q')
-            log.debug(f'Running {command=}')
-            check_call(command)
+            psarc.extract(output_dir)
 
 
 def read_acf(path: Path):
@@ -10,11 +10,15 @@ sys.path.insert(0, PROJECT_ROOT.joinpath('bin').as_posix())
 import _venv  # This will activate the venv, if it exists and is not already active
 
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from functools import cached_property
+from multiprocessing import set_start_method
 from typing import Optional, Union, Tuple
 
 from cli_command_parser import Command, Option, Counter, Positional, SubCommand, ParamGroup, Flag, inputs, main
 from PIL.Image import Image as PILImage, Resampling, open as image_open  # noqa
+from tqdm import tqdm
 
 sys.path.append(PROJECT_ROOT.as_posix())
 from ds_tools.__version__ import __author_email__, __version__
@@ -23,6 +27,9 @@ from ds_tools.logging import init_logging
 
 log = logging.getLogger(__name__)
 Size = Union[float, Tuple[int, int]]
+# Images are halved until the next halving would be less than this many times the target size, before the final filter
+# is applied.  This matches the default for `PIL.Image.Image.thumbnail`.
+REDUCING_GAP = 2.0
 
 RESAMPLE_FILTERS = {
     'box': Resampling.BOX,
@@ -40,13 +47,38 @@ class Resizer(Command, description='Resize Images'):
     output: Path = Option(
         '-o', type=inputs.Path(type='dir', resolve=True), required=True, help='Output directory to store modified files'
     )
+    parallel: int = Option('-P', type=int, default=4, help='Maximum number of files to process in parallel')
+    force = Flag('-F', help='Overwrite existing output files even if they are newer than the source file')
     # dry_run = Flag('-D', help='Print the actions that would be taken instead of taking them')
 
     def _init_command_(self):
         init_logging(self.verbose, log_path=None)
+        set_start_method('spawn')
         if not self.output.exists():
             self.output.mkdir(parents=True)
 
+    def process_all(self, paths, variants: list[Variant], rename: bool = False):
+        files = list(iter_files(paths))
+        saved = 0
+        with tqdm(total=len(files), unit='img', smoothing=0.1, maxinterval=1) as prog_bar:
+            if self.parallel > 1:
+                with ProcessPoolExecutor(max_workers=self.parallel) as executor:
+                    args = (variants, rename, self.force)
+                    futures = {executor.submit(process_file, path, *args): path for path in files}
+                    try:
+                        for future in as_completed(futures):
+                            saved += future.result()
+                            prog_bar.update()
+                    except BaseException:
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        raise
+            else:
+                for path in files:
+                    saved += process_file(path, variants, rename, self.force)
+                    prog_bar.update()
+
+        log.info(f'Saved {saved:,d} images from {len(files):,d} source files')
+
 
 class Simple(Resizer):
     paths = Positional(nargs='+', help='The path(s) to the image file(s) that should be resized')
@@ -60,19 +92,18 @@ class Simple(Resizer):
 
     def main(self):
         if self.filter == 'ALL':
-            out_dirs = {(name, f): self.output.joinpath(name) for name, f in RESAMPLE_FILTERS.items()}
-            for out_dir in out_dirs:
+            out_dirs = {name: self.output.joinpath(name) for name in RESAMPLE_FILTERS}
+            for out_dir in out_dirs.values():
                 if not out_dir.exists():
                     out_dir.mkdir(parents=True)
         else:
-            out_dirs = {(self.filter, RESAMPLE_FILTERS[self.filter]): self.output}
+            out_dirs = {self.filter: self.output}
 
         size = self.size or self.multiplier
         log.info(f'Using {size=}')
-        for path in iter_files(self.paths):
-            img = ImageFile(path)
-            for (name, resample_filter), out_dir in out_dirs.items():
-                img.resize(size, resample_filter).save(out_dir, self.rename)
+        # All variants are produced from a single decoded copy of each source image
+        variants = [Variant(((size, RESAMPLE_FILTERS[name]),), out_dir) for name, out_dir in out_dirs.items()]
+        self.process_all(self.paths, variants, self.rename)
 
 
 class Updown(Resizer):
@@ -95,9 +126,33 @@ class Updown(Resizer):
         size_1 = self.size_1 or self.multiplier_1
         size_2 = self.size_2 or self.multiplier_2
 
-        for path in iter_files(self.paths):
-            img = ImageFile(path)
-            img.resize(size_1, filter_1).resize(size_2, filter_2).save(self.output, self.rename)
+        variant = Variant(((size_1, filter_1), (size_2, filter_2)), self.output)
+        self.process_all(self.paths, [variant], self.rename)
+
+
+def process_file(path: Path, variants: list[Variant], rename: bool = False, force: bool = False) -> int:
+    return ImageFile(path).save_variants(variants, rename, force)
+
+
+@dataclass(frozen=True)
+class Variant:
+    steps: tuple[tuple[Size, Resampling], ...]  # (size, filter) pairs that should be applied in order
+    out_dir: Path
+
+    def final_size(self, size: tuple[int, int]) -> tuple[int, int]:
+        for step_size, _ in self.steps:
+            size = calculate_size(size, step_size)
+        return size
+
+
+def calculate_size(old_size: tuple[int, int], size: Size) -> tuple[int, int]:
+    try:
+        new_w, new_h = size
+    except (TypeError, ValueError):
+        old_w, old_h = old_size
+        return int(round(old_w * size)), int(round(old_h * size))
+    else:
+        return new_w, new_h
 
 
 class ImageFile:
@@ -105,9 +160,14 @@ class ImageFile:
         self.path = path
         self.image = image or image_open(path)      # type: PILImage
         self._original = original                   # type: Optional['ImageFile']
+        # The original size is stored separately because JPEGs may be decoded at a reduced scale (see `_draft`)
+        self.size = self.image.size                 # type: tuple[int, int]
+        # The area of self.image that corresponds to the full image, which may be fractional after halving / drafting
+        self._extent = (0, 0, *self.size)           # type: tuple[float, float, float, float]
+        self._halvings = [self.image]               # type: list[PILImage]
 
     def __repr__(self) -> str:
-        w, h = self.image.size
+        w, h = self.size
         return f'<ImageFile({self.rel_path!r})[{w}x{h}]>'
 
     @cached_property
@@ -120,31 +180,98 @@ class ImageFile:
             return self._original.original
         return self
 
-    def resize(self, size: Size, resample=None):
-        old_w, old_h = self.image.size
-        log.debug(f'Resizing from {(old_w, old_h)} to {size=}')
+    def save_variants(self, variants: list[Variant], rename: bool = False, force: bool = False) -> int:
+        """
+        :param variants: The variants of this image that should be saved
+        :param rename: Whether output files that have this image's resolution in their names should be renamed
+        :param force: Whether output files should be overwritten even if they are newer than this image
+        :return: The number of variants that were saved
+        """
+        if not force:
+            src_mtime = self.path.stat().st_mtime
+            variants = [v for v in variants if not self._is_up_to_date(v, rename, src_mtime)]
+            if not variants:
+                log.debug(f'Skipping {self.rel_path} - all outputs are up to date')
+                return 0
+
+        # Only the first step of each variant is applied to the source image, so the largest of them determines how
+        # much the source may be scaled down while decoding it
+        sizes = [calculate_size(self.size, variant.steps[0][0]) for variant in variants]
+        self._draft((max(w for w, _ in sizes), max(h for _, h in sizes)))
+        for variant in variants:
+            img = self
+            for size, resample in variant.steps:
+                img = img.resize(size, resample)
+            img.save(variant.out_dir, rename)
+        return len(variants)
+
+    def _is_up_to_date(self, variant: Variant, rename: bool, src_mtime: float) -> bool:
+        dest_path = variant.out_dir.joinpath(self._dest_name(variant.final_size(self.size), rename))
         try:
-            new_w, new_h = size
-        except (TypeError, ValueError):
-            new_w = int(round(old_w * size))
-            new_h = int(round(old_h * size))
+            return dest_path.stat().st_mtime >= src_mtime
+        except OSError:
+            return False
+
+    def _draft(self, size: tuple[int, int]):
+        """
+        Configure the decoder to decode JPEGs at a reduced scale (1/2, 1/4, or 1/8), as long as the result is still at
+        least REDUCING_GAP times the given size.  Has no effect for other formats.
+        """
+        width, height = size
+        if not (draft := self.image.draft(None, (int(width * REDUCING_GAP), int(height * REDUCING_GAP)))):
+            return
+        self._extent = draft[1]
+        self._halvings = [self.image]
+        log.debug(f'Decoding {self.rel_path} at {self.image.size} instead of {self.size}')
+
+    def _halved_for(self, size: tuple[int, int]) -> tuple[PILImage, tuple[float, float, float, float]]:
+        """
+        Halve this image until another halving would result in an image that is less than REDUCING_GAP times the given
+        size.  Each halving is cached so that it can be re-used for other sizes / filters.
+
+        :return: The reduced image and the area within it that corresponds to the full image
+        """
+        width, height = size
+        image = self._halvings[0]
+        x0, y0, x1, y1 = self._extent
+        level = 0
+        while (x1 - x0) / 2 >= width * REDUCING_GAP and (y1 - y0) / 2 >= height * REDUCING_GAP:
+            level += 1
+            x0, y0, x1, y1 = x0 / 2, y0 / 2, x1 / 2, y1 / 2
+            try:
+                image = self._halvings[level]
+            except IndexError:
+                image = image.reduce(2)
+                self._halvings.append(image)
+        return image, (x0, y0, x1, y1)
 
-        if old_w == new_w and old_h == new_h:
+    def resize(self, size: Size, resample=None):
+        old_w, old_h = self.size
+        log.debug(f'Resizing from {(old_w, old_h)} to {size=}')
+        new_w, new_h = calculate_size(self.size, size)
+        if old_w == new_w and old_h == new_h and self.image.size == self.size:
             log.info(f'Skipping {self.rel_path} - it is already {old_w}x{old_h}')
             return self
         else:
             log.info(f'Resizing {self.rel_path} from {old_w}x{old_h} to {new_w}x{new_h} with {resample=}')
-            resized = self.image.resize((new_w, new_h), resample)
+            # Halving would blend pixels, which would defeat the purpose of these filters / modes
+            if resample == Resampling.NEAREST or self.image.mode in ('1', 'P'):
+                image, box = self.image, self._extent
+            else:
+                image, box = self._halved_for((new_w, new_h))
+            resized = image.resize((new_w, new_h), resample, box)
             return self.__class__(self.path, resized, self)
 
-    def save(self, out_dir: Path, rename=False):
+    def _dest_name(self, size: tuple[int, int], rename: bool = False) -> str:
         dest_name = self.path.name
-        if rename and self.original:
-            old_w, old_h = self.original.image.size
-            new_w, new_h = self.image.size
+        if rename:
+            old_w, old_h = self.original.size
+            new_w, new_h = size
             dest_name = dest_name.replace(f'{old_w}x{old_h}', f'{new_w}x{new_h}')
+        return dest_name
 
-        dest_path = out_dir.joinpath(dest_name)
+    def save(self, out_dir: Path, rename=False):
+        dest_path = out_dir.joinpath(self._dest_name(self.size, rename))
         log.info(f'Saving {self.rel_path} as {relative_path(dest_path)}')
         self.image.save(dest_path)
         self.path = dest_path
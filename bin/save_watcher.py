@@ -2,13 +2,14 @@
 
 import logging
 from pathlib import Path
-from hashlib import sha256
 
-from cli_command_parser import Command, Option, Counter, main, inputs
+from cli_command_parser import Command, ParamGroup, Option, Flag, Counter, main, inputs
+from cli_command_parser.inputs import NumRange
 from watchdog.observers import Observer
 
 from ds_tools.__version__ import __author_email__, __version__  # noqa
-from ds_tools.fs.paths import unique_path
+from ds_tools.fs.snapshots import Debouncer, SnapshotStore
+from ds_tools.output.formatting import readable_bytes
 
 log = logging.getLogger(__name__)
 
@@ -18,6 +19,15 @@ class SaveWatcher(Command, description='Game Save File Watcher'):
     backups = Option('-b', type=inputs.Path(type='dir'), help='Path to the directory in which backups should be saved (default: same dir as save files)')
     verbose = Counter('-v', help='Increase logging verbosity (can specify multiple times)')
 
+    with ParamGroup('Snapshot'):
+        quiet_period = Option('-q', type=float, default=2.0, help='Seconds to wait after the last change to a file before saving a snapshot of it')
+        keep_last = Option('-k', type=NumRange(min=1), default=100, help='Number of most recent snapshots to keep for each file')
+        keep_daily = Option('-d', type=int, default=30, help='Number of days for which the last snapshot from each day should also be kept')
+
+    with ParamGroup('Actions', mutually_exclusive=True):
+        list_snapshots = Flag('-l', help='List stored snapshots instead of watching for changes')
+        restore = Option('-r', type=int, metavar='ID', help='Restore the snapshot with the given ID instead of watching for changes')
+
     def _init_command_(self):
         from ds_tools.logging import init_logging
 
@@ -34,16 +44,38 @@ class SaveWatcher(Command, description='Game Save File Watcher'):
             log.debug(f'Creating backup_dir={backup_dir.as_posix()}')
             backup_dir.mkdir(parents=True)
 
-        FSEventHandler(save_dir, backup_dir).run()
+        store = SnapshotStore(backup_dir.joinpath('snapshots'), self.keep_last, self.keep_daily)
+        if self.list_snapshots:
+            self._list_snapshots(store)
+        elif self.restore is not None:
+            self._restore(store, save_dir)
+        else:
+            FSEventHandler(save_dir, store, self.quiet_period).run()
+
+    def _list_snapshots(self, store: SnapshotStore):
+        for snapshot in store.snapshots():
+            created = snapshot.created_dt.isoformat(' ', 'seconds')
+            print(f'{snapshot.id:>6d}  {created}  {readable_bytes(snapshot.size):>10s}  {snapshot.name}')
+        size, stored_size = store.stored_size()
+        print(f'Unique content: {readable_bytes(size)}; stored (compressed): {readable_bytes(stored_size)}')
+
+    def _restore(self, store: SnapshotStore, save_dir: Path):
+        snapshot = store.get(self.restore)
+        dst_path = save_dir.joinpath(snapshot.name)
+        if dst_path.exists():
+            store.add(dst_path, snapshot.name)  # Ensure the current version can be restored later
+        log.info(f'Restoring snapshot {snapshot.id} from {snapshot.created_dt} to {dst_path.as_posix()}')
+        store.restore(snapshot, dst_path)
 
 
 class FSEventHandler:
-    def __init__(self, save_dir: Path, backup_dir: Path):
+    def __init__(self, save_dir: Path, store: SnapshotStore, quiet_period: float = 2.0):
         self.save_dir = save_dir
-        self.backup_dir = backup_dir
+        self.store = store
+        # Games typically write saves in multiple chunks, so a snapshot is only taken once a file stops changing
+        self.debouncer = Debouncer(self.save_backup, quiet_period, max_delay=max(30.0, quiet_period * 10))
         self.observer = Observer()
         self.observer.schedule(self, save_dir.as_posix())
-        self.last_hash = None
 
     def run(self):
         log.info(f'Watching {self.save_dir.as_posix()} with observer={self.observer}')
@@ -54,35 +86,32 @@ class FSEventHandler:
         except KeyboardInterrupt:
             self.observer.stop()
             self.observer.join()
+        finally:
+            self.debouncer.close()
 
     def dispatch(self, event):
         what = 'directory' if event.is_directory else 'file'
         path = Path(event.src_path).resolve()
-        # path_match = path == self.path
-        # if path_match and event.event_type == 'modified':
-        if event.event_type == 'modified':
-            log.log(11, f'Detected modified event for {path.as_posix()}')
-            self.save_backup(path)
+        if event.is_directory:
+            log.log(10, f'Ignoring {event.event_type} event for {what}: {path.as_posix()}')
+        elif event.event_type in ('modified', 'created'):
+            log.log(11, f'Detected {event.event_type} event for {path.as_posix()}')
+            self.debouncer.trigger(path)
+        elif event.event_type == 'moved':  # Saves are sometimes written to a temp file that then replaces the target
+            dest_path = Path(event.dest_path).resolve()
+            log.log(11, f'Detected moved event for {what}: {path.as_posix()} -> {dest_path.as_posix()}')
+            if dest_path.parent == self.save_dir:
+                self.debouncer.trigger(dest_path)
         else:
-            # verb, level = ('Detected', 11) if path_match else ('Ignoring', 10)
-            verb, level = 'Detected', 11
-            suffix = f' -> {event.dest_path}' if event.event_type == 'moved' else ''
-            log.log(level, f'{verb} {event.event_type} event for {what}: {path.as_posix()}{suffix}')
+            log.log(11, f'Detected {event.event_type} event for {what}: {path.as_posix()}')
 
     def save_backup(self, path: Path):
-        data = path.read_bytes()
-        if not data:
-            log.log(11, 'Skipping backup of empty file')
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            log.log(11, f'Skipping backup of {path.as_posix()} - it no longer exists')
             return
-        data_hash = sha256(data).hexdigest()
-        if data_hash != self.last_hash:
-            log.debug(f'Data changed - old={self.last_hash} new={data_hash}')
-            self.last_hash = data_hash
-            dest_path = unique_path(self.backup_dir, path.stem, path.suffix, add_date=True)
-            log.info(f'Saving backup to {dest_path.as_posix()}')
-            dest_path.write_bytes(data)
-        else:
-            log.log(11, f'There were no changes to {path.as_posix()} - sha256={data_hash}')
+        self.store.add(path, path.relative_to(self.save_dir).as_posix(), stat_result)
 
 
 if __name__ == '__main__':
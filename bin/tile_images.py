@@ -1,14 +1,24 @@
 #!/usr/bin/env python
 
+from __future__ import annotations
+
 import logging
+from math import ceil
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from multiprocessing import set_start_method
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
 from cli_command_parser import Command, Option, Flag, Counter, Positional, ParamGroup, main
 from cli_command_parser.inputs import Path as IPath, NumRange
+from tqdm import tqdm
 
 from ds_tools.__version__ import __author_email__, __version__  # noqa
 from ds_tools.caching.decorators import cached_property
 
+if TYPE_CHECKING:
+    from PIL.Image import Image as PILImage
+
 log = logging.getLogger(__name__)
 
 
@@ -26,14 +36,16 @@ class TileImages(Command, description='Tile Images', option_name_mode='*-'):
 
     verbose = Counter('-v', help='Increase logging verbosity (can specify multiple times)')
     dry_run = Flag('-D', help='Print the actions that would be taken instead of taking them')
+    parallel: int = Option('-P', type=NumRange(min=1), default=4, help='Maximum number of images to decode in parallel')
 
     def _init_command_(self):
         from ds_tools.logging import init_logging
 
         init_logging(self.verbose, log_path=None)
+        set_start_method('spawn')
 
     def main(self):
-        from PIL.Image import new as new_image
+        from ds_tools.images.strips import open_strip_writer
 
         if not self.out_path.parent.exists():
             self.out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -50,14 +62,10 @@ class TileImages(Command, description='Tile Images', option_name_mode='*-'):
         if self.dry_run:
             return
 
-        image = new_image('RGB', (width, height))
-        for tile, box in self.iter_tiles():
-            image.paste(tile, box)
-
-        fmt = 'png' if self.out_path.suffix.lower() == '.png' else 'jpeg'
         log.info(f'Saving {self.out_path.as_posix()}')
-        with self.out_path.open('wb') as f:
-            image.save(f, fmt)
+        with open_strip_writer(self.out_path, (width, height)) as writer:
+            for strip in self.iter_strips():
+                writer.write(strip)
 
     @cached_property
     def _in_paths(self) -> list[Path]:
@@ -94,20 +102,57 @@ class TileImages(Command, description='Tile Images', option_name_mode='*-'):
         cols, rows = self.cols_and_rows
         return self.width // cols, self.height // rows
 
-    def iter_tiles(self):
-        from PIL.Image import open as open_image
+    def iter_strips(self) -> Iterator[PILImage]:
+        """
+        Decoding + resizing images is distributed across a process pool.  The output is assembled one row of tiles (a
+        strip) at a time, and tiles are pasted into the current strip as soon as they are ready.  Tiles are only
+        requested for a limited number of strips ahead of the current one, so memory usage is bounded by a few strips
+        rather than the full output image.
+        """
+        from PIL.Image import new as new_image
 
         cols, rows = self.cols_and_rows
         tile_width, tile_height = tile_size = self.tile_size
+        # Strips are tile_height tall; any remaining rows (when height is not evenly divisible) are left black
+        strip_heights = [tile_height] * rows
+        if remainder := self.height - tile_height * rows:
+            strip_heights.append(remainder)
 
         paths = iter(self._in_paths)
-        for row in range(rows):  # y
-            y = row * tile_height
-            for col in range(cols):  # x
-                in_img = open_image(next(paths))
-                if in_img.format != 'RGB':
-                    in_img = in_img.convert('RGB')
-                yield in_img.resize(tile_size), (col * tile_width, y)
+        prefetch = max(1, ceil(2 * self.parallel / cols))  # Enough strips to keep 2x the number of workers busy
+        with ProcessPoolExecutor(max_workers=self.parallel) as executor:
+            pending: list[dict[Future, int]] = []
+
+            def submit_strip() -> dict[Future, int]:  # Maps futures to the x coordinate for the resulting tile
+                return {executor.submit(load_tile, next(paths), tile_size): col * tile_width for col in range(cols)}
+
+            try:
+                with tqdm(total=cols * rows, unit='img', smoothing=0.1, maxinterval=1) as prog_bar:
+                    for row, strip_height in enumerate(strip_heights):
+                        strip = new_image('RGB', (self.width, strip_height))
+                        if row < rows:
+                            while len(pending) < min(prefetch, rows - row):
+                                pending.append(submit_strip())
+                            futures = pending.pop(0)
+                            for future in as_completed(futures):
+                                strip.paste(future.result(), (futures[future], 0))
+                                prog_bar.update()
+                        yield strip
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+
+def load_tile(path: Path, size: tuple[int, int]) -> PILImage:
+    from PIL.Image import open as open_image
+
+    with open_image(path) as image:
+        # For JPEGs, this configures the decoder to scale the image down by up to 8x while decoding it, as long as the
+        # result is still at least as large as the requested size
+        image.draft('RGB', size)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return image.resize(size)
 
 
 if __name__ == '__main__':
@@ -23,6 +23,18 @@ class Transcoder(Command, description='Transcode videos (requires ffmpeg)'):
     with ParamGroup(description='Encoding Options'):
         encoding = Option('-e', default='av1', choices=sorted(set(ENCODER_CODEC_MAP.values())), help='Output encoding')
         passes = Option('-p', default=1, type=int, choices=(1, 2), help='Number of encoding passes to use')
+        segments = Option(
+            '-S', type=int, help='Split the video into this many segments at keyframes and encode them concurrently'
+        )
+        workers = Option('-w', type=int, help='Maximum number of segments to encode concurrently (default: core count)')
+
+    with ParamGroup(description='Job Options'):
+        jobs = Option('-j', type=int, default=1, help='Number of videos to transcode concurrently')
+        threads = Option('-T', type=int, help='Total number of threads to divide between concurrent transcodes')
+        journal = Option(
+            '-J', metavar='PATH', help='Job journal path - re-running a batch with the same journal will resume it'
+        )
+        status_interval = Option(type=float, default=10, help='Seconds between status table updates')
 
     with ParamGroup(description='General Options'):
         ffmpeg = Option('-F', metavar='PATH', help='Path to the ffmpeg binary to use (default: ffmpeg)')
@@ -33,9 +45,8 @@ class Transcoder(Command, description='Transcode videos (requires ffmpeg)'):
         init_logging(self.verbose, log_path=None)
 
     def main(self):
-        from ds_tools.media.encoders import Encoder
+        from ds_tools.media.encoders import TranscodeQueue
         from ds_tools.media.ffmpeg import load_config
-        from ds_tools.media.videos import Video
         from ds_tools.media.ffmpeg import set_ffmpeg_path
 
         load_config()
@@ -50,10 +61,11 @@ class Transcoder(Command, description='Transcode videos (requires ffmpeg)'):
             'in_hw_accel': self.cuda,
         }
 
-        for video in map(Video, self.in_path):
-            v_stream = video.streams[self.stream] if self.stream else None
-            encoder = Encoder.for_encoding(self.encoding, video, v_stream, options=options)
-            encoder.encode(self.output, self.passes)
+        queue = TranscodeQueue(self.jobs, self.threads, self.journal, self.status_interval, self.workers)
+        for path in self.in_path:
+            queue.add(path, self.encoding, self.output, options, self.passes, self.stream, self.segments)
+        if not queue.run():
+            raise SystemExit(1)
 
 
 if __name__ == '__main__':
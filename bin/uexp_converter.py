@@ -4,14 +4,20 @@ from __future__ import annotations
 
 import logging
 import os
-from concurrent.futures import as_completed, ThreadPoolExecutor
+import re
+from concurrent.futures import as_completed, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import cached_property
+from glob import escape
+from mmap import mmap, ACCESS_READ
+from multiprocessing import set_start_method
 from pathlib import Path
 from struct import Struct
 from subprocess import check_output, CalledProcessError, PIPE
 from tempfile import TemporaryDirectory
+from typing import Iterator
 
-from cli_command_parser import Command, Positional, Option, Counter, main
+from cli_command_parser import Command, Positional, Option, Flag, Counter, main
 from cli_command_parser.inputs import Path as IPath
 from tqdm import tqdm
 
@@ -19,7 +25,8 @@ from ds_tools.fs.paths import iter_sorted_files
 
 log = logging.getLogger(__name__)
 
-HEADER_EXT_MAP = {b'mabf': '.mab', b'sabf': '.sab', b'OggS': '.ogg'}
+HEADER_EXT_MAP = {b'mabf': '.mab', b'sabf': '.sab', b'OggS': '.ogg'}  # In order of priority
+HEADER_PATTERN = re.compile(b'|'.join(map(re.escape, HEADER_EXT_MAP)))
 FILE = IPath(type='file', exists=True)
 SIZE = Struct('<ll')
 
@@ -57,12 +64,17 @@ class UnrealAudioConverter(Command):
         metavar='PATH', type=FILE, help='Path to the vgmstream.exe or vgmstream-cli executable that should be used'
     )
 
+    force = Flag('-F', help='Convert assets even if their output is newer than the asset')
+    parallel = Option('-P', default=1, type=int, help='Maximum number of assets to convert in parallel')
+
     verbose = Counter('-v', help='Increase logging verbosity (can specify multiple times)')
 
     def _init_command_(self):
         from ds_tools.logging import init_logging
 
         init_logging(self.verbose, log_path=None)
+        if self.parallel > 1:
+            set_start_method('spawn')
 
     # region Path Attributes
 
@@ -84,10 +96,28 @@ class UnrealAudioConverter(Command):
     def main(self):
         # TODO: It seems like tqdm leaves terminals in a bad state...
         paths = self._get_target_files()
-        with tqdm(total=len(paths), unit='files', smoothing=0.1, maxinterval=1) as prog_bar:
-            for path in paths:
-                self.convert(path)
-                prog_bar.update()
+        if self.parallel > 1:
+            self._convert_all_mp(paths)
+        else:
+            with tqdm(total=len(paths), unit='files', smoothing=0.1, maxinterval=1) as prog_bar:
+                for path in paths:
+                    self.convert(path)
+                    prog_bar.update()
+
+    def _convert_all_mp(self, paths: list[Path]):
+        with ProcessPoolExecutor(max_workers=self.parallel) as executor:
+            futures = {executor.submit(self.convert, path): path for path in paths}
+            try:
+                with tqdm(total=len(paths), unit='files', smoothing=0.1, maxinterval=1) as prog_bar:
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            log.error(f'Error converting {futures[future].as_posix()}: {e}', extra={'color': 'red'})
+                        prog_bar.update()
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
 
     def _get_target_files(self):
         return [
@@ -100,6 +130,9 @@ class UnrealAudioConverter(Command):
         asset = AudioAsset(path)
         if not asset.extension:
             return
+        elif not self.force and asset.is_up_to_date(self._out_dir):
+            log.debug(f'Skipping {path.as_posix()} - its output is up to date')
+            return
 
         if asset.extension == '.ogg':
             asset.save(self._out_dir)
@@ -129,34 +162,52 @@ class AudioAsset:
         else:
             return None
 
-    def save(self, out_dir: Path = None) -> Path:
-        if out_dir:
-            if self._sound_subdir:
-                out_dir /= self._sound_subdir
-            out_dir.mkdir(parents=True, exist_ok=True)
-            dst_path = out_dir.joinpath(self.path.with_suffix(self.extension).name)
+    def _get_out_dir(self, out_dir: Path = None) -> Path:
+        if not out_dir:
+            return self.path.parent
+        elif self._sound_subdir:
+            return out_dir / self._sound_subdir
+        return out_dir
+
+    def is_up_to_date(self, out_dir: Path = None) -> bool:
+        """
+        :param out_dir: The output directory that would be used for this asset
+        :return: True if all output files from a previous conversion of this asset are newer than the asset itself
+        """
+        out_dir = self._get_out_dir(out_dir)
+        if self.extension == '.ogg':
+            outputs = [out_dir.joinpath(self.path.with_suffix(self.extension).name)]
         else:
-            dst_path = self.path.with_suffix(self.extension)
+            # Converted files are named ``{stem}#{subsong}#{stream name}.flac``; assets with many streams are converted
+            # into a subdirectory
+            pattern = escape(self.path.stem) + '#*.flac'
+            outputs = [*out_dir.glob(pattern), *out_dir.joinpath(self.path.stem).glob(pattern)]
 
+        src_mtime = self.path.stat().st_mtime_ns
+        try:
+            return bool(outputs) and all(path.stat().st_mtime_ns >= src_mtime for path in outputs)
+        except FileNotFoundError:
+            return False
+
+    def save(self, out_dir: Path = None) -> Path:
+        dst_path = self._get_out_dir(out_dir).joinpath(self.path.with_suffix(self.extension).name)
+        dst_path.parent.mkdir(parents=True, exist_ok=True)
         log.log(19, f'Writing {dst_path.as_posix()}')
-        dst_path.write_bytes(self._slice_and_format[0])
+        with _atomic_path(dst_path) as tmp_path:
+            self._write_payload(tmp_path)
         return dst_path
 
     def convert(self, vgmstream_path: str, out_dir: Path = None) -> list[Path]:
-        if not out_dir:
-            out_dir = self.path.parent
-        elif self._sound_subdir:
-            out_dir /= self._sound_subdir
-            out_dir.mkdir(parents=True, exist_ok=True)
+        out_dir = self._get_out_dir(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
 
         with TemporaryDirectory() as tmp:
             tmp_dir = Path(tmp)
             tmp_path = tmp_dir.joinpath(self.path.with_suffix(self.extension).name)
             log.debug(f'Saving intermediate file: {tmp_path.as_posix()}')
-            tmp_path.write_bytes(self._slice_and_format[0])
-
-            os.chdir(tmp_dir)  # The ?n name ends up using the full provided input path, not just the name
+            self._write_payload(tmp_path)
 
+            # The ?n name ends up using the full provided input path, not just the name, so vgmstream runs in tmp_dir
             if self._convert_to_wav(vgmstream_path, tmp_path):
                 wav_paths = sorted(tmp_dir.glob('*.wav'))
                 if len(wav_paths) >= 10:
@@ -174,7 +225,7 @@ class AudioAsset:
 
         cmd += ['-o', f'{xab_path.stem}#?s#?n.wav']
         try:
-            check_output(cmd, encoding='utf-8')
+            check_output(cmd, encoding='utf-8', cwd=xab_path.parent)
         except CalledProcessError as e:
             log.error(f'Error converting {xab_path.as_posix()} to WAV: {e}')
             return False
@@ -196,48 +247,88 @@ class AudioAsset:
     @cached_property
     def extension(self) -> str | None:
         try:
-            return self._slice_and_format[1]
+            return self._payload_range_and_format[2]
         except ValueError as e:
             log.error(f'{e} for {self.path.as_posix()}')
             return None
 
     @cached_property
-    def _slice_and_format(self) -> tuple[bytes, str]:
-        return self._get_slice_and_format()
-
-    def _get_slice_and_format(self) -> tuple[bytes, str]:
-        log.debug(f'Reading {self.path.as_posix()}')
-        data = self.path.read_bytes()
-        for header, ext in HEADER_EXT_MAP.items():
+    def _payload_range_and_format(self) -> tuple[int, int, str]:
+        log.debug(f'Scanning {self.path.as_posix()}')
+        with self._mmap() as data:
+            return _find_payload(data)
+
+    @contextmanager
+    def _mmap(self) -> Iterator[mmap | bytes]:
+        with self.path.open('rb') as f:
             try:
-                start = data.index(header)
-            except ValueError:
-                continue
-
-            size_pos = start - 8
-            size, z_size = SIZE.unpack(data[size_pos:start])
-            if size != z_size:
-                raise ValueError(f'Unexpected {size=} / {z_size=} mismatch')
+                data = mmap(f.fileno(), 0, access=ACCESS_READ)
+            except ValueError:  # Empty files can't be mapped
+                yield b''
+                return
+            with data:
+                yield data
+
+    def _write_payload(self, dst_path: Path):
+        start, end, _ = self._payload_range_and_format
+        with self._mmap() as data, memoryview(data) as view, dst_path.open('wb') as f:
+            f.write(view[start:end])
 
-            end = start + size
-            return data[start:end], ext
+    # endregion
 
-            # The below may have worked for .uexp files, but it doesn't work for .uasset files
-            # if ext == '.ogg':
-            #     return data[start:], ext
-            # else:
-            #     return data[start:-4], ext
 
-        raise ValueError('Audio header not found')
+def _find_payload(data: mmap | bytes) -> tuple[int, int, str]:
+    """
+    Scans the given data once for all known audio headers.  If multiple kinds of headers are present, then the first
+    occurrence of the highest-priority kind is used.
 
-    # endregion
+    :return: Tuple of (start, end, extension) for the embedded audio file
+    """
+    found = {}
+    for m in HEADER_PATTERN.finditer(data):
+        header = m.group()
+        if header not in found:
+            found[header] = m.start()
+            if header == next(iter(HEADER_EXT_MAP)):
+                break  # Nothing can take precedence over the highest-priority header
+
+    for header, ext in HEADER_EXT_MAP.items():
+        if (start := found.get(header)) is None:
+            continue
+        # The payload is preceded by its size and compressed size
+        size, z_size = SIZE.unpack(data[start - 8:start])
+        if size != z_size:
+            raise ValueError(f'Unexpected {size=} / {z_size=} mismatch')
+        return start, start + size, ext
+
+        # The below may have worked for .uexp files, but it doesn't work for .uasset files
+        # if ext == '.ogg':
+        #     return start, len(data), ext
+        # else:
+        #     return start, len(data) - 4, ext
+
+    raise ValueError('Audio header not found')
+
+
+@contextmanager
+def _atomic_path(dst_path: Path) -> Iterator[Path]:
+    """Yields a temporary path in the same directory as the given path, which replaces it if no exception occurred."""
+    tmp_path = dst_path.with_name(f'.{dst_path.name}.tmp')
+    try:
+        yield tmp_path
+        tmp_path.replace(dst_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)  # It would be incomplete
+        raise
 
 
 def _wav_to_flac(src_path: Path, out_dir: Path) -> Path | None:
     out_path = out_dir.joinpath(src_path.with_suffix('.flac').name)
     log.debug(f'Converting to FLAC: {src_path.as_posix()}')
     try:
-        check_output(['ffmpeg', '-i', src_path.as_posix(), out_path.as_posix()], stderr=PIPE)
+        with _atomic_path(out_path) as tmp_path:
+            cmd = ['ffmpeg', '-y', '-i', src_path.as_posix(), '-f', 'flac', tmp_path.as_posix()]
+            check_output(cmd, stderr=PIPE)
     except CalledProcessError as e:
         log.error(f'Error converting {src_path.as_posix()} to FLAC: {e}')
         return None
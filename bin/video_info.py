@@ -26,6 +26,11 @@ class VideoInfo(Command, description='View video metadata (requires ffmpeg)'):
         full = Flag(help='Print full info (default: filtered)')
 
     keyframe_interval = Flag('-ki', help='Calculate and display keyframe interval for video streams')
+    keyframe_samples: int = Option(
+        '-ks', help='Approximate keyframe intervals by only reading this many 30s windows of each video (default: all)'
+    )
+    workers: int = Option('-w', help='Maximum number of ffprobe processes to run concurrently (default: core count)')
+    cache = Flag('-c', help='Use and update cached ffprobe results (default: only if probe_cache_path is configured)')
     stream_types = Option(
         '-t', nargs='+', choices=STREAM_TYPES, help='Only include the specified stream types (default: all)'
     )
@@ -39,11 +44,15 @@ class VideoInfo(Command, description='View video metadata (requires ffmpeg)'):
     def main(self):
         from ds_tools.fs.paths import iter_files
         from ds_tools.media.ffmpeg import load_config
+        from ds_tools.media.constants import PROBE_CACHE_PATH
+        from ds_tools.media.probe import get_probe_cache, set_probe_cache_path
         from ds_tools.media.videos import Video
 
         load_config()
-        for file_path in iter_files(self.path, self.recursive):
-            self._print_info(Video(file_path))
+        if self.cache and get_probe_cache() is None:
+            set_probe_cache_path(PROBE_CACHE_PATH)
+        for video in Video.probe_many(iter_files(self.path, self.recursive), self.workers):
+            self._print_info(video)
 
         # https://github.com/PyAV-Org/PyAV
         # import av
@@ -65,7 +74,7 @@ class VideoInfo(Command, description='View video metadata (requires ffmpeg)'):
         Printer(self.format).pprint(video.info if self.full else video.filtered_info())
 
     def _print_other(self, video: Video):
-        options = {'keyframe_interval': self.keyframe_interval}
+        options = {'keyframe_interval': self.keyframe_interval, 'keyframe_samples': self.keyframe_samples}
         types = self.stream_types or STREAM_TYPES
 
         sections = {'File': video.get_info()}
@@ -32,6 +32,16 @@ class InvalidPassword(Exception):
         return f'Failed to extract {self.archive.path.as_posix()} using {self.password=!r}{pw_info}: {self.e}'
 
 
+class InvalidPsarcFile(ValueError):
+    """Exception to be raised when a PSARC file cannot be read"""
+    def __init__(self, path: 'Path', reason: str):
+        self.path = path
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f'Unable to read PSARC file {self.path.as_posix()}: {self.reason}'
+
+
 class UnknownArchiveType(ValueError):
     """Exception to be raised when a given archive has an unexpected file extension"""
     def __init__(self, ext: str, path: Union[str, 'Path']):
@@ -0,0 +1,348 @@
+"""
+A pure-python reader for PSARC (PlayStation archive) files, and a persistent index of the contents of many of them.
+
+The header, table of contents, and block size table are read directly from each archive, so listing the contents of an
+archive only requires reading the beginning of the file and decompressing its manifest.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from lzma import LZMAError, decompress as lzma_decompress, FORMAT_ALONE
+from pathlib import Path
+from sqlite3 import connect
+from struct import Struct
+from threading import Lock
+from typing import BinaryIO, Collection, Iterable, Iterator, NamedTuple
+
+from .exceptions import InvalidPsarcFile
+
+__all__ = ['PsarcFile', 'PsarcEntry', 'PsarcIndex', 'IndexedEntry']
+log = logging.getLogger(__name__)
+
+HEADER = Struct('>4sHH4sIIIII')
+MAGIC = b'PSAR'
+FLAG_IGNORE_CASE = 1
+FLAG_ABSOLUTE_PATHS = 2
+FLAG_ENCRYPTED_TOC = 4
+
+
+class PsarcEntry(NamedTuple):
+    path: str
+    index: int  # The position of this entry in the table of contents
+    block_index: int  # The position of this entry's first block in the block size table
+    size: int  # Uncompressed size
+    offset: int  # The position of this entry's first block in the archive
+
+
+class PsarcFile:
+    """
+    A PSARC archive.  The table of contents is read when this object is initialized.
+
+    :param path: The path to a .psarc / .pak file
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            self._read_toc(f)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[{self.path.as_posix()}, entries={len(self.entries)}]>'
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[PsarcEntry]:
+        return iter(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._path_entry_map
+
+    # region Table of Contents
+
+    def _read_toc(self, f: BinaryIO):
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise InvalidPsarcFile(self.path, 'invalid header')
+        _, major, minor, compression, toc_size, entry_size, entry_count, block_size, flags = HEADER.unpack(header)
+        self.version = (major, minor)
+        self.compression = compression.decode('ascii', 'replace')
+        self.block_size = block_size
+        self.flags = flags
+        if flags & FLAG_ENCRYPTED_TOC:
+            raise InvalidPsarcFile(self.path, 'encrypted tables of contents are not supported')
+        elif self.compression not in ('zlib', 'lzma'):
+            raise InvalidPsarcFile(self.path, f'unsupported compression={self.compression!r}')
+        elif entry_size < 30 or toc_size < HEADER.size + entry_size * entry_count:
+            raise InvalidPsarcFile(self.path, f'invalid table of contents ({toc_size=}, {entry_size=})')
+
+        toc = f.read(toc_size - HEADER.size)
+        if len(toc) < toc_size - HEADER.size:
+            raise InvalidPsarcFile(self.path, 'truncated table of contents')
+
+        raw_entries = []  # (block index, size, offset) for each entry, including the manifest
+        for pos in range(0, entry_size * entry_count, entry_size):
+            # Each entry: 16 byte md5 of the path, u32 block index, u40 uncompressed size, u40 offset
+            block_index = int.from_bytes(toc[pos + 16:pos + 20], 'big')
+            size = int.from_bytes(toc[pos + 20:pos + 25], 'big')
+            offset = int.from_bytes(toc[pos + 25:pos + 30], 'big')
+            raw_entries.append((block_index, size, offset))
+
+        # Block sizes are stored using the fewest bytes that can represent (block_size - 1)
+        width = 2 if block_size <= 0x10000 else 3 if block_size <= 0x1000000 else 4
+        sizes_start = entry_size * entry_count
+        self._block_sizes = [
+            int.from_bytes(toc[pos:pos + width], 'big') for pos in range(sizes_start, len(toc) - width + 1, width)
+        ]
+
+        if not raw_entries:
+            self.entries: list[PsarcEntry] = []
+            self._path_entry_map: dict[str, PsarcEntry] = {}
+            return
+
+        # The first entry is the manifest, which contains the newline-separated paths of all other entries
+        manifest = PsarcEntry('', 0, *raw_entries[0])
+        paths = self._read(f, manifest).decode('utf-8').splitlines() if manifest.size else []
+        if len(paths) != len(raw_entries) - 1:
+            raise InvalidPsarcFile(self.path, f'manifest contains {len(paths)} paths for {len(raw_entries) - 1} files')
+        if flags & FLAG_ABSOLUTE_PATHS:
+            paths = [path.lstrip('/') for path in paths]
+
+        self.entries = [PsarcEntry(path, i, *raw) for i, (path, raw) in enumerate(zip(paths, raw_entries[1:]), 1)]
+        self._path_entry_map = {entry.path: entry for entry in self.entries}
+
+    @property
+    def paths(self) -> list[str]:
+        return [entry.path for entry in self.entries]
+
+    def get_entry(self, path: str) -> PsarcEntry:
+        try:
+            return self._path_entry_map[path]
+        except KeyError:
+            pass
+        if self.flags & FLAG_IGNORE_CASE:
+            lc_path = path.lower()
+            for entry in self.entries:
+                if entry.path.lower() == lc_path:
+                    return entry
+        raise KeyError(f'{path!r} is not in {self}')
+
+    # endregion
+
+    # region Read / Extract
+
+    def _iter_blocks(self, f: BinaryIO, entry: PsarcEntry) -> Iterator[bytes]:
+        block_size, block_sizes = self.block_size, self._block_sizes
+        decompress = zlib.decompress if self.compression == 'zlib' else _lzma_decompress
+        f.seek(entry.offset)
+        remaining = entry.size
+        index = entry.block_index
+        while remaining > 0:
+            expected = min(block_size, remaining)
+            try:
+                stored_size = block_sizes[index]
+            except IndexError as e:
+                raise InvalidPsarcFile(self.path, f'missing block size for block {index} of {entry.path}') from e
+            # A stored size of 0 indicates a full uncompressed block; blocks that would not shrink are not compressed
+            if stored_size == 0 or stored_size == expected:
+                block = f.read(expected)
+            else:
+                try:
+                    block = decompress(f.read(stored_size))
+                except (zlib.error, LZMAError) as e:
+                    raise InvalidPsarcFile(self.path, f'unable to decompress block {index} of {entry.path}: {e}') from e
+            if len(block) != expected:
+                raise InvalidPsarcFile(
+                    self.path, f'block {index} of {entry.path} contained {len(block)} bytes, expected {expected}'
+                )
+            yield block
+            remaining -= expected
+            index += 1
+
+    def _read(self, f: BinaryIO, entry: PsarcEntry) -> bytes:
+        return b''.join(self._iter_blocks(f, entry))
+
+    def read(self, entry: PsarcEntry | str) -> bytes:
+        """
+        :param entry: A :class:`PsarcEntry` from this archive, or the path of a file in this archive
+        :return: The uncompressed content of the given file
+        """
+        if isinstance(entry, str):
+            entry = self.get_entry(entry)
+        with self.path.open('rb') as f:
+            return self._read(f, entry)
+
+    def extract(self, dst_root: str | Path, entries: Iterable[PsarcEntry | str] = None) -> int:
+        """
+        Extract the specified files (or all files) from this archive.  Files are written in the order that they appear
+        in the archive, so each block is only read once.
+
+        :param dst_root: The directory in which files should be written, using their paths in this archive
+        :param entries: The entries / paths of the files to extract (default: all)
+        :return: The number of bytes that were written
+        """
+        dst_root = Path(dst_root)
+        if entries is None:
+            entries = self.entries
+        entries = sorted((self.get_entry(e) if isinstance(e, str) else e for e in entries), key=lambda e: e.offset)
+
+        created, written = set(), 0
+        with self.path.open('rb') as f:
+            for entry in entries:
+                dst_path = dst_root.joinpath(entry.path)
+                if (parent := dst_path.parent) not in created:
+                    parent.mkdir(parents=True, exist_ok=True)
+                    created.add(parent)
+                with dst_path.open('wb') as out:
+                    for block in self._iter_blocks(f, entry):
+                        out.write(block)
+                written += entry.size
+        return written
+
+    # endregion
+
+
+def _lzma_decompress(data: bytes) -> bytes:
+    return lzma_decompress(data, FORMAT_ALONE)
+
+
+class IndexedEntry(NamedTuple):
+    path: str
+    archive: Path
+    index: int
+    offset: int
+    size: int
+
+
+class PsarcIndex:
+    """
+    Persistent index of the contents of many PSARC archives, stored in a SQLite database.  Each archive's table of
+    contents is only read again if its size or modification time changed since it was last indexed.
+
+    :param path: The path to the SQLite database in which the index should be stored
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._db = connect(self.path.as_posix(), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS archives'
+                ' (archive TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS entries (path TEXT NOT NULL, archive TEXT NOT NULL, idx INTEGER NOT NULL,'
+                ' offset INTEGER NOT NULL, size INTEGER NOT NULL, PRIMARY KEY (archive, idx))'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_path ON entries (path)')
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[{self.path.as_posix()}]>'
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def update(self, archives: Collection[str | Path], workers: int = 4) -> int:
+        """
+        Index the given archives, skipping any that were not modified since they were last indexed.  Any archives in
+        the index that are not in the given collection are removed from the index.
+
+        Archives that cannot be read are logged and skipped, and any entries that were previously indexed for them are
+        removed.
+
+        :param archives: Paths of all PSARC archives that should be in the index
+        :param workers: The number of threads to use to read tables of contents
+        :return: The number of archives that were (re-)indexed
+        """
+        with self._lock:
+            indexed = {row[0]: row[1:] for row in self._db.execute('SELECT archive, size, mtime_ns FROM archives')}
+
+        to_index, keep = [], set()
+        for path in map(Path, archives):
+            key = path.as_posix()
+            keep.add(key)
+            stat_result = path.stat()
+            if indexed.get(key) != (stat_result.st_size, stat_result.st_mtime_ns):
+                to_index.append((path, stat_result))
+
+        if removed := [(key,) for key in indexed if key not in keep]:
+            log.debug(f'Removing {len(removed)} archives from {self}')
+            self._remove(removed)
+
+        if not to_index:
+            return 0
+
+        log.info(f'Indexing {len(to_index)} archive(s)...')
+        indexed_count = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [(executor.submit(PsarcFile, path), path, stat_result) for path, stat_result in to_index]
+            for future, path, stat_result in futures:
+                try:
+                    psarc = future.result()
+                except InvalidPsarcFile as e:
+                    log.error(f'{e} - skipping it')
+                    self._remove([(path.as_posix(),)])
+                else:
+                    self._store(psarc, stat_result)
+                    indexed_count += 1
+        return indexed_count
+
+    def _remove(self, keys: list[tuple[str]]):
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM entries WHERE archive = ?', keys)
+            self._db.executemany('DELETE FROM archives WHERE archive = ?', keys)
+
+    def _store(self, psarc: PsarcFile, stat_result: os.stat_result):
+        key = psarc.path.as_posix()
+        rows = [(e.path, key, e.index, e.offset, e.size) for e in psarc.entries]
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM entries WHERE archive = ?', (key,))
+            self._db.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.execute(
+                'INSERT OR REPLACE INTO archives VALUES (?, ?, ?)', (key, stat_result.st_size, stat_result.st_mtime_ns)
+            )
+
+    def _select(self, where: str = '', params: tuple = ()) -> list[IndexedEntry]:
+        query = f'SELECT path, archive, idx, offset, size FROM entries {where} ORDER BY archive, idx'
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [IndexedEntry(path, Path(archive), idx, offset, size) for path, archive, idx, offset, size in rows]
+
+    def get(self, path: str) -> list[IndexedEntry]:
+        """
+        :param path: The exact path of a file in one or more archives
+        :return: The indexed entries for that path
+        """
+        return self._select('WHERE path = ?', (path,))
+
+    def find_suffix(self, suffix: str) -> list[IndexedEntry]:
+        """
+        :param suffix: The end of a file path
+        :return: The indexed entries for all paths that end with the given suffix
+        """
+        if not suffix:
+            return self.all_entries()
+        return self._select('WHERE substr(path, -?) = ?', (len(suffix), suffix))
+
+    def find_containing(self, text: str) -> list[IndexedEntry]:
+        """
+        :param text: Case-insensitive text to find
+        :return: The indexed entries for all paths that contain the given text
+        """
+        return self._select('WHERE instr(lower(path), ?) > 0', (text.lower(),))
+
+    def archive_entries(self, archive: str | Path) -> list[IndexedEntry]:
+        return self._select('WHERE archive = ?', (Path(archive).as_posix(),))
+
+    def all_entries(self) -> list[IndexedEntry]:
+        return self._select()
@@ -0,0 +1,391 @@
+"""
+Deduplicated, compressed snapshots of files that are frequently rewritten, such as game save files.
+
+Files are split into content-defined chunks using a gear rolling hash, so boundaries depend on the content around them
+rather than on their offsets.  A change to one part of a file only changes the chunks around it, and each unique chunk
+is only stored once (compressed), regardless of how many snapshots contain it.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import zlib
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+from random import Random
+from sqlite3 import connect
+from threading import Condition, Lock, Thread
+from time import monotonic, time
+from typing import Callable, Hashable, Iterator, NamedTuple
+
+__all__ = ['Debouncer', 'SnapshotStore', 'Snapshot', 'iter_chunks']
+log = logging.getLogger(__name__)
+
+MIN_CHUNK_SIZE = 4 * 1024
+AVG_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 64 * 1024
+
+_U64 = (1 << 64) - 1
+
+
+def _gear_table(seed: int = 0x9E3779B9) -> tuple[int, ...]:
+    rand = Random(seed)  # A fixed seed is necessary for chunk boundaries to be stable between runs
+    return tuple(rand.getrandbits(64) for _ in range(256))
+
+
+_GEAR = _gear_table()
+
+
+class Debouncer:
+    """
+    Calls the given callback for each key once no new events have been triggered for that key for the quiet period.
+    Callbacks are called from a single background thread, so they never run concurrently with each other.
+
+    :param callback: The function to call with each key that became quiet
+    :param quiet_period: The number of seconds that must pass without any events for a key before the callback is called
+    :param max_delay: The maximum number of seconds to wait after the first event in a burst for a key, even if new
+      events continue to be triggered for it (default: no limit)
+    """
+
+    def __init__(self, callback: Callable[[Hashable], None], quiet_period: float = 2.0, max_delay: float = None):
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self._pending: dict[Hashable, tuple[float, float]] = {}  # key -> (deadline, time of the first event)
+        self._cond = Condition()
+        self._thread: Thread | None = None
+        self._closed = False
+
+    def trigger(self, key: Hashable):
+        now = monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f'{self.__class__.__name__} is closed')
+            first = self._pending[key][1] if key in self._pending else now
+            deadline = now + self.quiet_period
+            if self.max_delay is not None:
+                deadline = min(deadline, first + self.max_delay)
+            self._pending[key] = (deadline, first)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='debouncer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self, flush: bool = True):
+        """
+        Stop the background thread.
+
+        :param flush: If True, then the callback is called immediately for all pending keys before returning.  If
+          False, then pending keys are discarded.
+        """
+        with self._cond:
+            self._closed = True
+            if flush:
+                self._pending = {key: (0, first) for key, (_, first) in self._pending.items()}
+            else:
+                self._pending.clear()
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while keys := self._wait_for_quiet_keys():
+            for key in keys:
+                try:
+                    self.callback(key)
+                except Exception as e:  # noqa
+                    log.error(f'Error in debounced callback for {key=}: {e}', exc_info=True, extra={'color': 'red'})
+
+    def _wait_for_quiet_keys(self) -> list[Hashable]:
+        with self._cond:
+            while True:
+                now = monotonic()
+                if keys := [key for key, (deadline, _) in self._pending.items() if deadline <= now]:
+                    for key in keys:
+                        del self._pending[key]
+                    return keys
+                elif not self._pending:
+                    if self._closed:
+                        return []
+                    self._cond.wait()
+                else:
+                    self._cond.wait(min(deadline for deadline, _ in self._pending.values()) - now)
+
+
+def iter_chunks(
+    data: bytes | memoryview,
+    min_size: int = MIN_CHUNK_SIZE,
+    avg_size: int = AVG_CHUNK_SIZE,
+    max_size: int = MAX_CHUNK_SIZE,
+) -> Iterator[memoryview]:
+    """
+    Split the given data into content-defined chunks.  A chunk ends after the first byte (after ``min_size`` bytes)
+    where the gear rolling hash of the preceding 64 bytes has all of its top ``log2(avg_size)`` bits cleared, or after
+    ``max_size`` bytes.
+
+    :param data: The data to split
+    :param min_size: The minimum size of each chunk (except the last)
+    :param avg_size: The target average size of chunks (should be a power of 2)
+    :param max_size: The maximum size of each chunk
+    :return: Iterator that yields memoryview slices of the given data
+    """
+    bits = avg_size.bit_length() - 1
+    mask = ((1 << bits) - 1) << (64 - bits)
+    gear = _GEAR
+    view = memoryview(data).cast('B')
+    end = len(view)
+    start = 0
+    while start < end:
+        cut = limit = min(start + max_size, end)
+        h = 0
+        # The hash only depends on the last 64 bytes, so bytes before the minimum cut point don't need to be hashed
+        for i, byte in enumerate(view[start + min_size:limit], start + min_size):
+            h = ((h << 1) + gear[byte]) & _U64
+            if not h & mask:
+                cut = i + 1
+                break
+        yield view[start:cut]
+        start = cut
+
+
+class Snapshot(NamedTuple):
+    id: int
+    name: str
+    created: float
+    size: int
+    mtime_ns: int
+    digest: str
+
+    @property
+    def created_dt(self) -> datetime:
+        return datetime.fromtimestamp(self.created)
+
+
+class SnapshotStore:
+    """
+    Stores snapshots of files in a directory, with an index in a SQLite database and a compressed, deduplicated chunk
+    store.
+
+    :param root: The directory in which snapshots should be stored
+    :param keep_last: The number of most recent snapshots to keep for each name (at least 1; default: no limit)
+    :param keep_daily: The number of days (with snapshots) for which the latest snapshot of each day should be kept for
+      each name, in addition to the ``keep_last`` snapshots.  Only used if ``keep_last`` is specified.
+    :param compression: The zlib compression level to use for chunks
+    """
+
+    def __init__(self, root: str | Path, keep_last: int = None, keep_daily: int = 0, compression: int = 6):
+        if keep_last is not None and keep_last < 1:
+            raise ValueError(f'Invalid {keep_last=} - it must be at least 1, or None to keep every snapshot')
+        self.root = Path(root).expanduser()
+        self.chunk_dir = self.root.joinpath('chunks')
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.compression = compression
+        self._lock = Lock()
+        self._db = connect(self.root.joinpath('snapshots.db').as_posix(), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,'
+                ' created REAL NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS snapshot_chunks (snapshot_id INTEGER NOT NULL, seq INTEGER NOT NULL,'
+                ' chunk TEXT NOT NULL, PRIMARY KEY (snapshot_id, seq))'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS chunks'
+                ' (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, stored_size INTEGER NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS snapshots_name ON snapshots (name, id)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS snapshot_chunks_chunk ON snapshot_chunks (chunk)')
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[{self.root.as_posix()}]>'
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # region Snapshot Info
+
+    def _select(self, where: str = '', params: tuple = ()) -> list[Snapshot]:
+        query = f'SELECT id, name, created, size, mtime_ns, digest FROM snapshots {where}'
+        with self._lock:
+            return [Snapshot(*row) for row in self._db.execute(query, params).fetchall()]
+
+    def snapshots(self, name: str = None) -> list[Snapshot]:
+        """
+        :param name: The name of a file for which snapshots should be returned (default: all files)
+        :return: Snapshots, in the order that they were created
+        """
+        if name is None:
+            return self._select('ORDER BY id')
+        return self._select('WHERE name = ? ORDER BY id', (name,))
+
+    def latest(self, name: str) -> Snapshot | None:
+        return next(iter(self._select('WHERE name = ? ORDER BY id DESC LIMIT 1', (name,))), None)
+
+    def get(self, snapshot_id: int) -> Snapshot:
+        try:
+            return self._select('WHERE id = ?', (snapshot_id,))[0]
+        except IndexError as e:
+            raise KeyError(f'Snapshot {snapshot_id} does not exist in {self}') from e
+
+    def stored_size(self) -> tuple[int, int]:
+        """:return: Tuple of (total uncompressed size of unique chunks, total compressed size of unique chunks)"""
+        with self._lock:
+            size, stored_size = self._db.execute('SELECT sum(size), sum(stored_size) FROM chunks').fetchone()
+        return size or 0, stored_size or 0
+
+    # endregion
+
+    # region Add Snapshots
+
+    def add(self, path: Path, name: str = None, stat_result: os.stat_result = None) -> Snapshot | None:
+        """
+        Store a snapshot of the given file if its content changed since the latest snapshot with the same name.  If the
+        file's size and modification time match the latest snapshot, then it is not read at all.  Empty files are
+        skipped, since they are typically observed when a file is truncated before being rewritten.
+
+        :param path: The path of the file to snapshot
+        :param name: The name to store the snapshot under (default: the file's name)
+        :param stat_result: The result of calling :func:`os.stat` on the given path (to avoid a redundant call)
+        :return: The new snapshot, or None if the file did not change
+        """
+        name = name or path.name
+        if stat_result is None:
+            stat_result = path.stat()
+        latest = self.latest(name)
+        if latest and (latest.size, latest.mtime_ns) == (stat_result.st_size, stat_result.st_mtime_ns):
+            log.log(11, f'Skipping snapshot of {path.as_posix()} - its size and modification time did not change')
+            return None
+
+        data = path.read_bytes()
+        if not data:
+            log.log(11, f'Skipping snapshot of empty file {path.as_posix()}')
+            return None
+
+        digest = sha256(data).hexdigest()
+        if latest and latest.digest == digest:
+            log.log(11, f'There were no changes to {path.as_posix()} - sha256={digest}')
+            with self._lock, self._db:  # Allow the next check to skip reading this file
+                self._db.execute(
+                    'UPDATE snapshots SET size = ?, mtime_ns = ? WHERE id = ?',
+                    (len(data), stat_result.st_mtime_ns, latest.id),
+                )
+            return None
+
+        chunk_digests = [self._store_chunk(chunk) for chunk in iter_chunks(data)]
+        created = time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                'INSERT INTO snapshots (name, created, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)',
+                (name, created, len(data), stat_result.st_mtime_ns, digest),
+            )
+            snapshot_id = cursor.lastrowid
+            self._db.executemany(
+                'INSERT INTO snapshot_chunks VALUES (?, ?, ?)',
+                [(snapshot_id, seq, chunk_digest) for seq, chunk_digest in enumerate(chunk_digests)],
+            )
+
+        snapshot = Snapshot(snapshot_id, name, created, len(data), stat_result.st_mtime_ns, digest)
+        log.info(f'Saved snapshot {snapshot_id} of {path.as_posix()} with {len(chunk_digests)} chunks')
+        if self.keep_last is not None:
+            self.prune(name)
+        return snapshot
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir.joinpath(digest[:2], digest)
+
+    def _store_chunk(self, chunk: memoryview) -> str:
+        digest = sha256(chunk).hexdigest()
+        with self._lock:
+            exists = self._db.execute('SELECT 1 FROM chunks WHERE digest = ?', (digest,)).fetchone()
+        if exists:
+            return digest
+
+        path = self._chunk_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        compressed = zlib.compress(chunk, self.compression)
+        tmp_path = path.with_name(f'.{digest}.tmp')
+        tmp_path.write_bytes(compressed)
+        tmp_path.replace(path)
+        with self._lock, self._db:
+            self._db.execute('INSERT OR IGNORE INTO chunks VALUES (?, ?, ?)', (digest, len(chunk), len(compressed)))
+        return digest
+
+    # endregion
+
+    # region Restore
+
+    def read(self, snapshot: Snapshot | int) -> bytes:
+        if isinstance(snapshot, int):
+            snapshot = self.get(snapshot)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT chunk FROM snapshot_chunks WHERE snapshot_id = ? ORDER BY seq', (snapshot.id,)
+            ).fetchall()
+        data = b''.join(zlib.decompress(self._chunk_path(digest).read_bytes()) for (digest,) in rows)
+        if sha256(data).hexdigest() != snapshot.digest:
+            raise ValueError(f'Snapshot {snapshot.id} is corrupted - its content does not match its digest')
+        return data
+
+    def restore(self, snapshot: Snapshot | int, dst_path: Path):
+        """Write the content of the given snapshot to the given path, replacing it if it already exists."""
+        data = self.read(snapshot)
+        tmp_path = dst_path.with_name(f'.{dst_path.name}.tmp')
+        tmp_path.write_bytes(data)
+        tmp_path.replace(dst_path)
+
+    # endregion
+
+    # region Retention
+
+    def prune(self, name: str = None) -> int:
+        """
+        Remove snapshots that should not be retained based on ``keep_last`` and ``keep_daily``, and remove any chunks
+        that are no longer used by any snapshot.
+
+        :param name: The name of the file for which snapshots should be pruned (default: all files)
+        :return: The number of snapshots that were removed
+        """
+        if self.keep_last is None:
+            return 0
+        names = [name] if name else sorted({snapshot.name for snapshot in self.snapshots()})
+        to_remove = [snapshot.id for name in names for snapshot in self._get_expired(self.snapshots(name))]
+        if to_remove:
+            log.debug(f'Removing {len(to_remove)} expired snapshots')
+            with self._lock, self._db:
+                rows = [(snapshot_id,) for snapshot_id in to_remove]
+                self._db.executemany('DELETE FROM snapshot_chunks WHERE snapshot_id = ?', rows)
+                self._db.executemany('DELETE FROM snapshots WHERE id = ?', rows)
+            self._remove_unused_chunks()
+        return len(to_remove)
+
+    def _get_expired(self, snapshots: list[Snapshot]) -> list[Snapshot]:
+        keep = {snapshot.id for snapshot in snapshots[-self.keep_last:]}
+        if self.keep_daily:
+            days = {}
+            for snapshot in snapshots:  # Later snapshots replace earlier ones from the same day
+                days[snapshot.created_dt.date()] = snapshot.id
+            keep.update(days[day] for day in sorted(days)[-self.keep_daily:])
+        return [snapshot for snapshot in snapshots if snapshot.id not in keep]
+
+    def _remove_unused_chunks(self):
+        with self._lock, self._db:
+            unused = [
+                row[0] for row in self._db.execute(
+                    'SELECT digest FROM chunks WHERE digest NOT IN (SELECT DISTINCT chunk FROM snapshot_chunks)'
+                )
+            ]
+            self._db.executemany('DELETE FROM chunks WHERE digest = ?', [(digest,) for digest in unused])
+        for digest in unused:
+            self._chunk_path(digest).unlink(missing_ok=True)
+
+    # endregion
@@ -0,0 +1,405 @@
+"""
+A resumable crawl engine with concurrent fetching, per-host rate limits, conditional requests against a local response
+cache, and parsing in a worker pool.
+
+The frontier (URLs that still need to be processed), the set of visited URLs, parsed results, and cached responses are
+all stored in a :class:`CrawlStore`.  When a crawl is interrupted, running it again with the same store will resume it
+without re-fetching pages that were already processed.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock, local
+from time import monotonic, sleep, time
+from typing import Any, Callable, Collection, Iterable, Iterator, Mapping
+from urllib.parse import urljoin, urldefrag, urlsplit
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+__all__ = ['Crawler', 'CrawlStore', 'HostRateLimiter', 'ParsedPage', 'CrawledPage']
+log = logging.getLogger(__name__)
+
+PENDING, DONE, FAILED = 'pending', 'done', 'failed'
+
+
+@dataclass
+class ParsedPage:
+    """The value that should be returned by a crawler's parser"""
+
+    data: Any = None  # Must be JSON-serializable, since it is stored in the crawl's :class:`CrawlStore`
+    links: list[str] = field(default_factory=list)  # Links to follow; relative links are resolved against the page URL
+
+
+@dataclass
+class CrawledPage:
+    url: str
+    depth: int
+    data: Any = None
+    status: int | None = None
+    from_cache: bool = False  # True if the server responded 304 Not Modified and the cached response was used
+    error: str | None = None
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+Parser = Callable[[str, str], ParsedPage]
+
+
+class CrawlStore:
+    """
+    Persistent crawl frontier, visited set, results, and response cache.  All methods should be called from the same
+    thread (the :class:`Crawler` only uses its store from the thread that is iterating over :meth:`Crawler.crawl`).
+
+    :param path: Path to an SQLite3 DB file (default: in memory, i.e., not persistent)
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        if path is None:
+            self.path = None
+            self._db = connect(':memory:')
+        else:
+            self.path = Path(path).expanduser()
+            if not self.path.parent.exists():
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = connect(self.path.as_posix())
+
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, depth INTEGER NOT NULL, status TEXT NOT NULL,'
+                ' data TEXT, error TEXT, added REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS pages_status ON pages (status, added)')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses'
+                ' (url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, last_modified TEXT, fetched REAL NOT NULL)'
+            )
+
+    def __repr__(self) -> str:
+        path = self.path.as_posix() if self.path else ':memory:'
+        return f'<{self.__class__.__name__}[{path}]>'
+
+    def close(self):
+        self._db.close()
+
+    # region Frontier
+
+    def add(self, urls: Iterable[str], depth: int) -> int:
+        """
+        :param urls: URLs to add to the frontier.  URLs that were already added (including visited ones) are ignored.
+        :param depth: The depth of the given URLs, relative to the crawl's seed URLs
+        :return: The number of URLs that were added
+        """
+        now = time()
+        with self._db:
+            cursor = self._db.executemany(
+                'INSERT OR IGNORE INTO pages (url, depth, status, added) VALUES (?, ?, ?, ?)',
+                ((url, depth, PENDING, now) for url in urls),
+            )
+        return cursor.rowcount
+
+    def pending(self, limit: int, exclude: Collection[str] = ()) -> list[tuple[str, int]]:
+        """
+        :param limit: The maximum number of URLs to return
+        :param exclude: URLs that should not be returned (i.e., URLs that are currently being processed)
+        :return: List of (url, depth) tuples for URLs in the frontier, in the order they were added (breadth-first)
+        """
+        rows = self._db.execute(
+            'SELECT url, depth FROM pages WHERE status = ? ORDER BY added, rowid LIMIT ?',
+            (PENDING, limit + len(exclude)),
+        )
+        return [row for row in rows if row[0] not in exclude][:limit]
+
+    def mark_done(self, url: str, data: Any):
+        with self._db:
+            self._db.execute(
+                'UPDATE pages SET status = ?, data = ?, error = NULL WHERE url = ?', (DONE, json.dumps(data), url)
+            )
+
+    def mark_failed(self, url: str, error: str):
+        with self._db:
+            self._db.execute('UPDATE pages SET status = ?, error = ? WHERE url = ?', (FAILED, error, url))
+
+    def requeue(self, failed_only: bool = False) -> int:
+        """
+        Return processed URLs to the frontier so they will be processed again.  Cached responses are kept, so unchanged
+        pages will not need to be downloaded again.
+
+        :param failed_only: Only requeue URLs that could not be processed
+        :return: The number of URLs that were requeued
+        """
+        statuses = (FAILED,) if failed_only else (FAILED, DONE)
+        with self._db:
+            cursor = self._db.execute(
+                f'UPDATE pages SET status = ? WHERE status IN ({", ".join("?" * len(statuses))})', (PENDING, *statuses)
+            )
+        return cursor.rowcount
+
+    def seeds(self) -> list[str]:
+        return [row[0] for row in self._db.execute('SELECT url FROM pages WHERE depth = 0 ORDER BY added, rowid')]
+
+    def counts(self) -> dict[str, int]:
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(self._db.execute('SELECT status, COUNT(*) FROM pages GROUP BY status'))
+        return counts
+
+    def results(self) -> dict[str, Any]:
+        """
+        :return: Mapping of {url: parsed data} for all pages that were processed successfully, including those that were
+          processed in previous runs
+        """
+        rows = self._db.execute('SELECT url, data FROM pages WHERE status = ? ORDER BY added, rowid', (DONE,))
+        return {url: json.loads(data) for url, data in rows}
+
+    # endregion
+
+    # region Response Cache
+
+    def get_response(self, url: str) -> CachedResponse | None:
+        row = self._db.execute('SELECT text, etag, last_modified FROM responses WHERE url = ?', (url,)).fetchone()
+        return None if row is None else CachedResponse(*row)
+
+    def save_response(self, url: str, response: CachedResponse):
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (url, response.text, response.etag, response.last_modified, time()),
+            )
+
+    # endregion
+
+
+class HostRateLimiter:
+    """
+    Enforces a minimum interval between the start of requests to each host.  Requests to different hosts do not block
+    each other.
+
+    :param min_interval: The default minimum number of seconds between requests to the same host
+    :param host_intervals: Mapping of {host: min interval} for hosts that should use a different interval
+    """
+
+    def __init__(self, min_interval: float = 1.0, host_intervals: Mapping[str, float] | None = None):
+        self.min_interval = min_interval
+        self.host_intervals = dict(host_intervals or {})
+        self._next_times: dict[str, float] = {}
+        self._lock = Lock()
+
+    def wait(self, url: str):
+        """Block until a request to the given URL's host is allowed"""
+        host = urlsplit(url).netloc
+        interval = self.host_intervals.get(host, self.min_interval)
+        with self._lock:  # Reserve the next slot for this host so concurrent callers are spaced out
+            now = monotonic()
+            start = max(now, self._next_times.get(host, now))
+            self._next_times[host] = start + interval
+        if (delay := start - now) > 0:
+            sleep(delay)
+
+
+class Crawler:
+    """
+    :param parser: A callable that accepts a page's URL and text and returns a :class:`ParsedPage`.  When a process pool
+      is used for parsing (the default), it must be picklable (i.e., a module-level function).
+    :param store: A :class:`CrawlStore` or path to the SQLite3 DB file to use for persistent crawl state (default: in
+      memory, i.e., not resumable)
+    :param max_workers: The maximum number of concurrent requests
+    :param min_interval: The default minimum number of seconds between requests to the same host
+    :param host_intervals: Mapping of {host: min interval} for hosts that should use a different interval
+    :param parse_workers: The number of processes to use for parsing.  If 0, then pages are parsed in the thread that
+      fetched them.  Defaults to the number of CPUs.
+    :param max_depth: The maximum depth (relative to seed URLs) of links to follow (default: no limit)
+    :param allowed_hosts: Only links to these hosts will be followed (default: the hosts of the seed URLs)
+    :param session: The requests Session to use (default: a new Session with a connection pool for each worker)
+    :param timeout: Request timeout in seconds
+    """
+
+    def __init__(
+        self,
+        parser: Parser,
+        store: CrawlStore | str | Path | None = None,
+        *,
+        max_workers: int = 4,
+        min_interval: float = 1.0,
+        host_intervals: Mapping[str, float] | None = None,
+        parse_workers: int | None = None,
+        max_depth: int | None = None,
+        allowed_hosts: Collection[str] | None = None,
+        session: Session | None = None,
+        timeout: float = 30,
+    ):
+        if max_workers < 1:
+            raise ValueError(f'Invalid {max_workers=} - must be a positive integer')
+        self.parser = parser
+        self.store = store if isinstance(store, CrawlStore) else CrawlStore(store)
+        self.max_workers = max_workers
+        self.rate_limiter = HostRateLimiter(min_interval, host_intervals)
+        self.parse_workers = parse_workers
+        self.max_depth = max_depth
+        self.allowed_hosts = set(allowed_hosts) if allowed_hosts else None
+        self.timeout = timeout
+        self._session = session
+        self._local = local()
+        self._follow_hosts = set()
+
+    @property
+    def session(self) -> Session:
+        if self._session is not None:
+            return self._session
+        try:
+            return self._local.session
+        except AttributeError:
+            pass
+        self._local.session = session = Session()
+        session.mount('http://', HTTPAdapter(pool_maxsize=self.max_workers))
+        session.mount('https://', HTTPAdapter(pool_maxsize=self.max_workers))
+        return session
+
+    def crawl(
+        self, seeds: Iterable[str] = (), max_pages: int | None = None, refresh: bool = False
+    ) -> Iterator[CrawledPage]:
+        """
+        Crawl from the given seed URLs, resuming any crawl that was previously interrupted when a persistent store is
+        used.  Results are yielded in the order that pages finish processing.
+
+        :param seeds: The URLs from which the crawl should start
+        :param max_pages: The maximum number of pages to process in this call (default: no limit)
+        :param refresh: Process all pages in the store again.  Conditional requests are used, so pages that did not
+          change will not be downloaded again.
+        :return: Iterator that yields a :class:`CrawledPage` for each page that was processed
+        """
+        self.store.add((urldefrag(url)[0] for url in seeds), 0)
+        if self.allowed_hosts is not None:
+            self._follow_hosts = self.allowed_hosts
+        else:  # Seeds from previous runs are included so that resumed crawls do not need to provide them again
+            self._follow_hosts = {urlsplit(url).netloc for url in self.store.seeds()}
+        if refresh:
+            self.store.requeue()
+
+        if self.parse_workers != 0:  # Forking after fetch threads were started could deadlock, so spawn is used
+            parse_pool = ProcessPoolExecutor(self.parse_workers, mp_context=get_context('spawn'))
+        else:
+            parse_pool = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as fetch_pool:
+                yield from self._crawl(fetch_pool, parse_pool, max_pages)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(cancel_futures=True)
+
+    def _crawl(
+        self, fetch_pool: Executor, parse_pool: Executor | None, max_pages: int | None
+    ) -> Iterator[CrawledPage]:
+        store = self.store
+        in_progress: dict[Future, tuple[str, int]] = {}
+        submitted = 0
+        try:
+            while True:
+                room = self.max_workers * 2 - len(in_progress)
+                if max_pages is not None:
+                    room = min(room, max_pages - submitted)
+                if room > 0:
+                    active = {url for url, _ in in_progress.values()}
+                    for url, depth in store.pending(room, active):
+                        cached = store.get_response(url)
+                        future = fetch_pool.submit(self._fetch, url, cached, parse_pool is None)
+                        in_progress[future] = (url, depth)
+                        submitted += 1
+                if not in_progress:
+                    return
+
+                done, _ = wait(in_progress, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = in_progress.pop(future)
+                    if (page := self._handle_fetched(future, url, depth, parse_pool, in_progress)) is not None:
+                        yield page
+        finally:
+            for future in in_progress:
+                future.cancel()
+
+    def _handle_fetched(
+        self, future: Future, url: str, depth: int, parse_pool: Executor | None, in_progress: dict
+    ) -> CrawledPage | None:
+        try:
+            result = future.result()
+        except Exception as e:
+            log.error(f'Error processing {url}: {e}', extra={'color': 'red'})
+            self.store.mark_failed(url, str(e))
+            return CrawledPage(url, depth, error=str(e))
+
+        if result.response is not None:
+            self.store.save_response(url, result.response)
+        if isinstance(result, _Fetched):  # The page still needs to be parsed in the parse pool
+            parse_future = parse_pool.submit(_parse, self.parser, url, result.text, result.status, result.from_cache)
+            in_progress[parse_future] = (url, depth)
+            return None
+        return self._finish(url, depth, result)
+
+    def _finish(self, url: str, depth: int, page: _Parsed) -> CrawledPage:
+        parsed = page.parsed
+        if self.max_depth is None or depth < self.max_depth:
+            links = (urldefrag(urljoin(url, link))[0] for link in parsed.links)
+            self.store.add((link for link in links if urlsplit(link).netloc in self._follow_hosts), depth + 1)
+        self.store.mark_done(url, parsed.data)
+        return CrawledPage(url, depth, parsed.data, page.status, page.from_cache)
+
+    def _fetch(self, url: str, cached: CachedResponse | None, parse: bool) -> _Fetched | _Parsed:
+        self.rate_limiter.wait(url)
+        headers = cached.headers if cached is not None else {}
+        log.debug(f'GET {url} {headers=}')
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and cached is not None:
+            fetched = _Fetched(cached.text, resp.status_code, True, None)
+        else:
+            resp.raise_for_status()
+            response = CachedResponse(resp.text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+            to_cache = response if response.etag or response.last_modified else None
+            fetched = _Fetched(resp.text, resp.status_code, False, to_cache)
+
+        if not parse:
+            return fetched
+        parsed = _parse(self.parser, url, fetched.text, fetched.status, fetched.from_cache)
+        parsed.response = fetched.response
+        return parsed
+
+
+@dataclass
+class _Fetched:
+    text: str
+    status: int
+    from_cache: bool
+    response: CachedResponse | None  # A new response that should be cached
+
+
+@dataclass
+class _Parsed:
+    parsed: ParsedPage
+    status: int
+    from_cache: bool
+    response: CachedResponse | None = None  # A new response that should be cached
+
+
+def _parse(parser: Parser, url: str, text: str, status: int, from_cache: bool) -> _Parsed:
+    return _Parsed(parser(url, text), status, from_cache)
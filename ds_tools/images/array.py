@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Sequence
 
-from numpy import any as np_any, asarray, array, unique, argmax, argmin
+from numpy import any as np_any, asarray, array, unique, argmax, argmin, broadcast_to, full, int16, ndarray, stack
+from numpy import where
 
 from .colors import normalize_pixel_color
 from .geometry import Box
@@ -20,25 +22,89 @@ class ImageArray:
     __slots__ = ('arr',)
     arr: NP_Image
 
-    def __init__(self, image: PILImage):
-        self.arr = asarray(image)  # shape: (height, width, channels)
+    def __init__(self, image: PILImage | NP_Image):
+        self.arr = asarray(image)  # shape: (height, width, channels), or (height, width) if grayscale
+
+    @property
+    def _pixels(self) -> NP_Image:
+        # Grayscale images are 2D; adding a channels axis (which results in a view, not a copy) allows them to be
+        # handled the same way as RGB(A) images
+        return self.arr if self.arr.ndim == 3 else self.arr[..., None]
 
     def find_bbox(self, border_color: PixelColor | None = None) -> Box:
+        """
+        Find the bounding box of the content in this image, i.e., the area inside any uniform border / letterbox.
+
+        Each edge is scanned inward in progressively larger blocks of rows/columns, stopping at the first row/column
+        that contains a pixel that differs from the border color, so typically only the pixels near the edges of the
+        image need to be examined.
+
+        :param border_color: The color of the border around the content (default: detected based on the corners)
+        :return: The bounding box of the content, or a box that covers the full image if it contains no content
+        """
         if border_color is None:
             border_color = self.find_border_color()
         else:
             border_color = normalize_pixel_color(border_color)
 
-        mask = np_any(self.arr != border_color, axis=-1)  # shape: (H, W), True where content differs
-        rows = np_any(mask, axis=1).nonzero()[0]  # shape: (H,)
-        cols = np_any(mask, axis=0).nonzero()[0]  # shape: (W,)
-        # rows / cols are 1D arrays of the indexes of pixels that differ from the specified/discovered border color.
-        # While this approach correctly identifies the top/left indices, it seems to have an off-by-one error for
-        # bottom/right, so they are increased by 1 below...
-        top, bottom = (int(rows[0]), int(rows[-1]) + 1) if rows.size else (0, self.arr.shape[0])
-        left, right = (int(cols[0]), int(cols[-1]) + 1) if cols.size else (0, self.arr.shape[1])
+        frames = self._pixels[None]  # shape: (1, H, W, C)
+        height, width, channels = frames.shape[1:]
+        colors = broadcast_to(asarray(border_color), (1, 1, 1, channels))
+        scan = partial(_find_first_contents, colors=colors, tolerance=0, threshold=1)
+        if (top := int(scan(frames)[0])) < 0:
+            return Box(0, 0, width, height)
+
+        # Row `top` contains content, so the remaining scans are guaranteed to find it
+        bottom = height - int(scan(frames[:, top:][:, ::-1])[0])
+        columns = frames[:, top:bottom].swapaxes(1, 2)  # shape: (1, W, bottom - top, C); a view of rows that may differ
+        left = int(scan(columns)[0])
+        right = width - int(scan(columns[:, left:][:, ::-1])[0])
         return Box(left, top, right, bottom)
 
+    @classmethod
+    def find_bboxes(
+        cls,
+        frames: NP_Image | Sequence[PILImage | NP_Image],
+        border_color: PixelColor | None = None,
+        *,
+        tolerance: int = 0,
+        threshold: float = 1,
+    ) -> list[Box]:
+        """
+        Find the bounding box of the content in each of the given same-sized frames.  As in :meth:`.find_bbox`, each
+        edge is scanned inward until content is found, but each step examines the same rows/columns in all frames that
+        have not reached content yet with a single vectorized comparison.
+
+        :param frames: A stack of frames with shape (N, height, width, channels), or (N, height, width) if grayscale, or
+          a sequence of same-sized images
+        :param border_color: The color of the border around the content in all frames (default: detected for each
+          frame based on its corners)
+        :param tolerance: The maximum difference from the border color in each channel for a pixel to be considered a
+          match, to account for compression noise
+        :param threshold: The minimum portion of a row/column of pixels that must match the border color for that row /
+          column to be considered part of the border (default: all of them)
+        :return: List containing the bounding box of the content in each frame, in the same order as the frames
+        """
+        frames = asarray(frames) if isinstance(frames, ndarray) else stack([asarray(f) for f in frames])
+        if frames.ndim == 3:
+            frames = frames[..., None]
+
+        count, height, width, channels = frames.shape
+        if border_color is None:
+            corners = frames[:, [0, 0, -1, -1], [0, -1, 0, -1]]  # shape: (N, 4, C)
+            colors = array([_find_border_color(frame_corners) for frame_corners in corners])
+        else:
+            colors = broadcast_to(asarray(normalize_pixel_color(border_color)), (count, channels))
+
+        colors = colors[:, None, None, :]  # shape: (N, 1, 1, C), so it will be broadcast across each frame
+        scan = partial(_find_first_contents, colors=colors, tolerance=tolerance, threshold=threshold)
+        tops, bottoms = scan(frames), scan(frames[:, ::-1])
+        columns = frames.swapaxes(1, 2)  # shape: (N, W, H, C)
+        lefts, rights = scan(columns), scan(columns[:, ::-1])
+        tops, bottoms = where(tops < 0, 0, tops), where(bottoms < 0, height, height - bottoms)
+        lefts, rights = where(lefts < 0, 0, lefts), where(rights < 0, width, width - rights)
+        return [Box(*map(int, box)) for box in zip(lefts, tops, rights, bottoms)]
+
     def find_border_color(self) -> NP_Pixel:
         """
         Examine the pixel from each of this image's four corners to determine which one is most likely to match the
@@ -46,32 +112,82 @@ class ImageArray:
         :returns: A numpy array
         """
         # This indexing syntax results in an array containing cells [0, 0], [0, -1], [-1, 0], and [-1, -1]
-        corners = self.arr[[0, 0, -1, -1], [0, -1, 0, -1]]  # shape: (4, channels[3 or 4; 1 if grayscale])
+        corners = self._pixels[[0, 0, -1, -1], [0, -1, 0, -1]]  # shape: (4, channels[3 or 4; 1 if grayscale])
         # While self.arr is a 3D array where index (y*, x) -> pixel (R, G, B[, A]), corners is a 2D array.
         # In some ways, it is easier to conceptualize self.arr and corners as 2D and 1D arrays of pixels, respectively.
         # Indexing to target the alpha channel for self.arr should target axis=2 (3rd), and axis=1 (2nd) for corners.
         # *: y is the first axis because the shape is (height, width, channels)
+        return _find_border_color(corners)
+
+
+def _find_border_color(corners: NP_Image) -> NP_Pixel:
+    """
+    :param corners: An array with shape (4, channels) containing the pixels from each corner of an image
+    :return: The pixel that is most likely to match the border around the content in that image
+    """
+    if corners.shape[1] == 4:  # It has an alpha channel
+        # Transparent colors around the edges are most likely the ones that should be cropped, so filter to those
+        # if they are present
+        transparent = corners[corners[:, -1] == 0]  # Filters the contents of corners to rows where the last val==0
+        if len(transparent) == 1:
+            return transparent[0]
+        elif transparent.size:
+            corners = transparent
 
-        if self.arr.shape[2] == 4:  # It has an alpha channel
-            # Transparent colors around the edges are most likely the ones that should be cropped, so filter to those
-            # if they are present
-            transparent = corners[corners[:, -1] == 0]  # Filters the contents of corners to rows where the last val==0
-            if transparent.size == 1:
-                return transparent[0]
-            elif transparent.size:
-                corners = transparent
-
-        values, counts = unique(corners, return_counts=True, axis=0)  # Finds unique RGB(A) values
-        # Note: values/counts match such that counts[N] is the count of occurrences of values[N]
-        if values.size == 1:  # All values were the same
-            return values[0]
-        elif counts.size == corners.size:
-            # All values are unique, so in theory, the darkest is most likely to be the border color
-            # Calculate luma (Y') to determine lightness; see: https://en.wikipedia.org/wiki/Rec._709#Luma_coefficients
-            weights = array([0.2126, 0.7152, 0.0722])
-            # The array passed to `argmin` is similar to `[rgb_to_hls(*rgb)[1] for rgb in corners[:,:3] / 255]`
-            return corners[argmin((corners[:,:3] / 255) @ weights)]
+    values, counts = unique(corners, return_counts=True, axis=0)  # Finds unique RGB(A) values
+    # Note: values/counts match such that counts[N] is the count of occurrences of values[N]
+    if len(values) == 1:  # All values were the same
+        return values[0]
+    elif len(values) == len(corners):
+        # All values are unique, so in theory, the darkest is most likely to be the border color
+        if corners.shape[1] < 3:  # Grayscale
+            return corners[argmin(corners[:, 0])]
+        # Calculate luma (Y') to determine lightness; see: https://en.wikipedia.org/wiki/Rec._709#Luma_coefficients
+        weights = array([0.2126, 0.7152, 0.0722])
+        # The array passed to `argmin` is similar to `[rgb_to_hls(*rgb)[1] for rgb in corners[:,:3] / 255]`
+        return corners[argmin((corners[:,:3] / 255) @ weights)]
+    else:
+        # At least one color occurred multiple times - use the one that occurred most frequently
+        # Note: argmin/argmax returns the index of the element that is the min/max within the given array.
+        return values[argmax(counts)]
+
+
+def _find_first_contents(
+    frames: NP_Image, colors: NP_Image, tolerance: int, threshold: float, block_size: int = 8
+) -> ndarray:
+    """
+    :param frames: An array with shape (N, rows, columns, channels) to be scanned along its second axis
+    :param colors: An array with shape (N, 1, 1, channels) containing the border color for each frame
+    :param tolerance: The maximum difference from the border color in each channel for a pixel to be considered a match
+    :param threshold: The minimum portion of a row of pixels that must match the border color for that row to be
+      considered part of the border
+    :param block_size: The number of rows to examine in the first block; it is doubled for each subsequent block
+    :return: An array containing the index of the first row in each frame that contains content, or -1 for frames that
+      do not contain any content
+    """
+    count, end = frames.shape[:2]
+    found = full(count, -1)
+    start = 0
+    while start < end and (pending := (found < 0).nonzero()[0]).size:
+        stop = min(start + block_size, end)
+        if pending.size == count:
+            block, block_colors = frames[:, start:stop], colors
+        else:  # Only frames where content has not been found yet need to be examined
+            block, block_colors = frames[pending, start:stop], colors[pending]
+
+        if tolerance:
+            differs = abs(block.astype(int16) - block_colors) > tolerance
         else:
-            # At least one color occurred multiple times - use the one that occurred most frequently
-            # Note: argmin/argmax returns the index of the element that is the min/max within the given array.
-            return values[argmax(counts)]
+            differs = block != block_colors
+        if threshold >= 1:  # Reducing over both axes at once is significantly faster than reducing them separately
+            rows = np_any(differs, axis=(2, 3))  # shape: (pending, stop - start)
+        else:
+            # shape: (pending, stop - start, columns), True where content differs
+            differs = np_any(differs, axis=-1) if differs.shape[-1] > 1 else differs[..., 0]
+            rows = differs.mean(axis=2) > 1 - threshold
+
+        has_content = np_any(rows, axis=1)
+        found[pending[has_content]] = start + argmax(rows[has_content], axis=1)
+        start = stop
+        block_size *= 2
+    return found
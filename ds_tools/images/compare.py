@@ -8,12 +8,13 @@ from __future__ import annotations
 
 import logging
 from collections import defaultdict
+from contextlib import contextmanager
 from functools import cached_property, partialmethod, wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator
 from weakref import WeakKeyDictionary
 
 import numpy
-from numpy import asarray, float64
+from numpy import asarray, float32, float64, uint8
 from PIL.Image import Image as PILImage, open as open_image
 try:
     from skimage.metrics import structural_similarity
@@ -25,7 +26,7 @@ if TYPE_CHECKING:
     from numpy.typing import ArrayLike, NDArray
     from .typing import Size, NP_Image, NP_Gray
 
-__all__ = ['ComparableImage']
+__all__ = ['ComparableImage', 'ComparisonMatrix']
 log = logging.getLogger(__name__)
 
 
@@ -270,6 +271,197 @@ class ComparableImage:
         return _self, other
 
 
+class ComparisonMatrix:
+    """
+    Compares every pair of images in a group of images.  Each image is normalized once (resized to the same width and
+    then cropped to a common size, as :meth:`ComparableImage.compatible_sizes` does for a single pair), and stored in a
+    shared 2D float32 array with one row per image, so the cheap metrics can be computed for all pairs with vectorized
+    operations.  Mean squared error is calculated for all pairs via matrix multiplication, taxicab distance is only
+    calculated for pairs that pass the MSE threshold, and structural similarity is only calculated for pairs that pass
+    both of the cheap metrics.
+
+    Since all images are compared at the same size, results may differ slightly from comparing pairs of images with
+    different sizes via :class:`ComparableImage`.
+
+    Images that are provided as paths are only opened while their size or pixels are being read, so the number of
+    images that can be compared is not limited by the number of files that may be open at once.
+    """
+
+    def __init__(
+        self,
+        images: Iterable[ComparableImage | PILImage | str | Path],
+        gray: bool = True,
+        normalize: bool = True,
+        max_width: int = None,
+        max_height: int = None,
+    ):
+        self.images: list[PILImage | str | Path] = [
+            img.image if isinstance(img, ComparableImage) else img for img in images
+        ]
+        if len(self.images) < 2:
+            raise ValueError(f'At least 2 images are required for comparison - found {len(self.images)}')
+        self._gray = gray
+        self._normalize = normalize
+        self._max_width = max_width
+        self._max_height = max_height
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[images={len(self.images)}, size={self.size}, gray={self._gray}]>'
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    @cached_property
+    def size(self) -> Size:
+        """The size that all images will be compared at; only image headers need to be read to determine it"""
+        sizes = []
+        for image in self.images:
+            with _opened(image) as img:
+                sizes.append(img.size)
+
+        width = min([w for w, h in sizes] + list(filter(None, (self._max_width,))))
+        heights = [min(h, int(round(width * h / w))) for w, h in sizes]
+        return width, min(heights + list(filter(None, (self._max_height,))))
+
+    @cached_property
+    def pixel_arrays(self) -> NDArray[uint8]:
+        """Array with shape (N, height, width[, 3]) containing the pixels from each image at the common size"""
+        width, height = self.size
+        mode = 'L' if self._gray else 'RGB'
+        arr = numpy.empty((len(self.images), height, width) + (() if self._gray else (3,)), dtype=uint8)
+        for i, image in enumerate(self.images):
+            with _opened(image) as img:
+                img = _crop(_resize(img, width), width, height)
+                arr[i] = asarray(img if img.mode == mode else img.convert(mode))
+        return arr
+
+    @cached_property
+    def float_arrays(self) -> NDArray[float32]:
+        """
+        Array with shape (N, pixel values per image) containing each (optionally normalized) image as a row, with the
+        mean of all images subtracted from every row.  Every metric only depends on the differences between rows, which
+        centering does not affect, and centering significantly reduces the magnitude of the rounding errors in the dot
+        products used by :meth:`._iter_mse_blocks`.  It is done in place so that no additional copy is needed.
+        """
+        arr = self.pixel_arrays.reshape(len(self.images), -1).astype(float32)
+        if self._normalize:  # Compensate for exposure difference, per image
+            img_min = arr.min(axis=1, keepdims=True)
+            img_range = arr.max(axis=1, keepdims=True) - img_min
+            img_range[img_range == 0] = 1
+            arr -= img_min
+            arr *= 255 / img_range
+        arr -= arr.mean(axis=0, dtype=float64).astype(float32)
+        return arr
+
+    # region Metrics
+
+    def _iter_mse_blocks(self, block_size: int = 256) -> Iterator[tuple[int, NDArray[float64]]]:
+        """
+        Uses ``|a - b|^2 = |a|^2 + |b|^2 - 2 a.b``, so the squared errors for a block of rows against all images are
+        calculated via a single matrix multiplication.  The results may be slightly inexact due to float32 rounding.
+
+        :return: Iterator that yields 2-tuples of (start row, array with shape (block rows, N))
+        """
+        arr = self.float_arrays
+        squared_norms = numpy.einsum('ij,ij->i', arr, arr, dtype=float64)
+        for start in range(0, len(arr), block_size):
+            block = arr[start:start + block_size]
+            products = (block @ arr.T).astype(float64)
+            mse = squared_norms[start:start + block_size, None] + squared_norms[None, :] - 2 * products
+            yield start, numpy.maximum(mse, 0, out=mse) / arr.shape[1]
+
+    @cached_property
+    def _approx_mse(self) -> NDArray[float32]:
+        """The approximate MSE for every pair, which is shared by all :meth:`.find_pairs` calls"""
+        result = numpy.empty((len(self.images), len(self.images)), dtype=float32)
+        for start, block in self._iter_mse_blocks():
+            result[start:start + len(block)] = block
+        numpy.fill_diagonal(result, 0)
+        return result
+
+    def mean_squared_errors(self) -> NDArray[float64]:
+        """
+        :return: Array with shape (N, N) containing the mean squared error between each pair of images
+        """
+        return self._approx_mse.astype(float64)
+
+    def taxicab_distances(self, chunk_size: int = 2 ** 24) -> NDArray[float64]:
+        """
+        :param chunk_size: The maximum number of values to process at once, to limit memory usage
+        :return: Array with shape (N, N) containing the per-pixel taxicab distance between each pair of images
+        """
+        arr = self.float_arrays
+        result = numpy.empty((len(arr), len(arr)), dtype=float64)
+        step = max(1, int((chunk_size / arr.shape[1]) ** 0.5))
+        for a in range(0, len(arr), step):
+            for b in range(a, len(arr), step):
+                # shape: (a rows, 1, pixels) - (1, b rows, pixels) -> (a rows, b rows, pixels) -> (a rows, b rows)
+                dist = numpy.abs(arr[a:a + step, None, :] - arr[None, b:b + step, :]).mean(axis=2, dtype=float64)
+                result[a:a + step, b:b + step] = dist
+                result[b:b + step, a:a + step] = dist.T
+        return result
+
+    def _pair_metrics(self, i: NDArray, j: NDArray, chunk_size: int = 2 ** 24) -> tuple[NDArray, NDArray]:
+        """
+        :return: Arrays containing the exact per-pixel taxicab distance and mean squared error for each given pair
+        """
+        arr = self.float_arrays
+        taxi, mse = numpy.empty(len(i), dtype=float64), numpy.empty(len(i), dtype=float64)
+        step = max(1, chunk_size // arr.shape[1])
+        for start in range(0, len(i), step):
+            end = start + step
+            diff = arr[i[start:end]] - arr[j[start:end]]
+            taxi[start:end] = numpy.abs(diff).mean(axis=1, dtype=float64)
+            mse[start:end] = numpy.mean(diff * diff, axis=1, dtype=float64)
+        return taxi, mse
+
+    def mean_structural_similarity(self, i: int, j: int) -> float:
+        if structural_similarity is None:
+            raise RuntimeError('Unable to calculate mean_structural_similarity - missing dependency: scikit-image')
+        a, b = self.pixel_arrays[i], self.pixel_arrays[j]
+        return structural_similarity(a, b, channel_axis=None if self._gray else 2)
+
+    # endregion
+
+    def find_pairs(
+        self, taxi: float = 10, mse: float = 300, mssim: float | None = 0.8
+    ) -> list[tuple[int, int]]:
+        """
+        :param taxi: Maximum threshold for taxicab distance (per pixel)
+        :param mse: Maximum threshold for mean squared error
+        :param mssim: Minimum threshold for mean structural similarity.  If None, then structural similarity is not
+          calculated.
+        :return: List of (i, j) index pairs (where i < j) of images that match within the specified thresholds
+        """
+        # Rounding errors in the MSE calculated via matrix multiplication are absorbed by the margin here, and exact
+        # values are calculated for the candidates below
+        rows, cols = (self._approx_mse <= mse * 1.01 + 1).nonzero()
+        keep = cols > rows
+        i, j = rows[keep], cols[keep]
+        log.debug(f'Found {len(i):,d} candidate pairs based on approximate MSE')
+        if not len(i):
+            return []
+
+        taxi_values, mse_values = self._pair_metrics(i, j)
+        passed = (taxi_values <= taxi) & (mse_values <= mse)
+        pairs = [(int(a), int(b)) for a, b in zip(i[passed], j[passed])]
+        if mssim is None:
+            return pairs
+        return [(a, b) for a, b in pairs if self.mean_structural_similarity(a, b) >= mssim]
+
+    find_same = partialmethod(find_pairs, taxi=2, mse=20, mssim=0.975)
+    find_similar = partialmethod(find_pairs, taxi=10, mse=300, mssim=0.8)
+
+
+@contextmanager
+def _opened(image: PILImage | str | Path) -> Iterator[PILImage]:
+    if isinstance(image, PILImage):
+        yield image
+    else:
+        with open_image(image) as img:
+            yield img
+
+
 def _resize(img: PILImage, new_width: int) -> PILImage:
     if img.width > new_width:
         new_height = int(round(new_width * img.height / img.width))
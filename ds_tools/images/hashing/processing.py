@@ -14,7 +14,9 @@ from typing import Any, Collection, Iterator, Type
 from PIL import UnidentifiedImageError
 from tqdm import tqdm
 
-from ds_tools.logging import init_logging as _init_logging, ENTRY_FMT_DETAILED_PID
+from ds_tools.logging import (
+    init_logging as _init_logging, init_worker_logging, get_process_log_queue, ENTRY_FMT_DETAILED_PID
+)
 from .multi import MultiHash, MULTI_MODES, get_multi_class
 from .single import ImageHashBase, HASH_MODES, get_hash_class
 
@@ -96,7 +98,11 @@ def process_images_mp(
 
     in_queue, out_queue, shutdown, done_feeding = args = Queue(), Queue(), Event(), Event()
     kwargs = {
-        'hash_mode': hash_mode, 'multi_mode': multi_mode, 'init_logging': init_logging, 'verbosity': verbosity
+        'hash_mode': hash_mode,
+        'multi_mode': multi_mode,
+        'init_logging': init_logging,
+        'verbosity': verbosity,
+        'log_queue': get_process_log_queue(),
     }
     processes = [Process(target=_image_processor, args=args, kwargs=kwargs) for _ in range(workers or cpu_count() or 1)]
     for proc in processes:
@@ -199,8 +205,11 @@ def _image_processor(
     multi_mode: str = DEFAULT_MULTI_MODE,
     init_logging: bool = False,
     verbosity: int | None = 0,
+    log_queue=None,
 ):
-    if init_logging:
+    if log_queue is not None:  # The main process was configured to accept logs from worker processes
+        init_worker_logging(log_queue)
+    elif init_logging:
         _init_logging(verbosity, log_path=None, entry_fmt=ENTRY_FMT_DETAILED_PID)
 
     hash_cls = HASH_MODES[hash_mode]  # Note: Key membership is verified in process_images before this is called
@@ -0,0 +1,163 @@
+"""
+Utilities for writing images that are too large to comfortably hold in memory as a sequence of horizontal strips.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from struct import pack
+from tempfile import TemporaryFile
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PILImage
+    from .typing import Size
+
+__all__ = ['StripWriter', 'PngStripWriter', 'MappedStripWriter', 'open_strip_writer']
+log = logging.getLogger(__name__)
+
+
+class StripWriter(ABC):
+    """
+    Writes an RGB image with the given size one strip at a time.  Strips must be written in order from top to bottom,
+    and must span the full width of the image.
+    """
+
+    def __init__(self, path: Path, size: Size):
+        self.path = path
+        self.size = size
+        self.rows_written = 0
+
+    def __enter__(self) -> StripWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(exc_type is None)
+
+    def write(self, strip: PILImage | np.ndarray):
+        """
+        :param strip: An RGB image or an array with shape (height, width, 3) that spans the full width of the image
+        """
+        rows = np.asarray(strip if getattr(strip, 'mode', 'RGB') == 'RGB' else strip.convert('RGB'))
+        width, height = self.size
+        if rows.shape[1:] != (width, 3):
+            raise ValueError(f'Invalid strip with shape={rows.shape} for an image with {width=}')
+        elif self.rows_written + len(rows) > height:
+            raise ValueError(f'Unable to write {len(rows)} rows - only {height - self.rows_written} rows remain')
+        elif not len(rows):
+            return
+        self._write(rows)
+        self.rows_written += len(rows)
+
+    @abstractmethod
+    def _write(self, rows: np.ndarray):
+        raise NotImplementedError
+
+    def close(self, complete: bool = True):
+        """
+        :param complete: Whether all strips were written successfully.  If False, then the partial output is deleted.
+        """
+        if complete and self.rows_written != self.size[1]:
+            log.warning(f'Only {self.rows_written} / {self.size[1]} rows were written to {self.path.as_posix()}')
+            complete = False
+        self._close(complete)
+        if not complete:
+            self.path.unlink(missing_ok=True)
+
+    @abstractmethod
+    def _close(self, complete: bool):
+        raise NotImplementedError
+
+
+class PngStripWriter(StripWriter):
+    """
+    Encodes each strip as it is written, so only the current strip needs to be held in memory.  The ``Up`` filter is
+    applied to every scanline, which compresses photographic content nearly as well as adaptive filtering while being
+    fast to compute for an entire strip at once.
+    """
+
+    def __init__(self, path: Path, size: Size, compress_level: int = 6):
+        super().__init__(path, size)
+        self._f: BinaryIO = path.open('wb')
+        self._compressor = zlib.compressobj(compress_level)
+        self._last_row = np.zeros((size[0], 3), np.uint8)
+        self._f.write(b'\x89PNG\r\n\x1a\n')
+        self._write_chunk(b'IHDR', pack('>IIBBBBB', *size, 8, 2, 0, 0, 0))  # 8 bits per channel, RGB
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        self._f.write(pack('>I', len(data)) + chunk_type)
+        self._f.write(data)
+        self._f.write(pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def _write(self, rows: np.ndarray):
+        height, width = rows.shape[:2]
+        filtered = np.empty((height, width * 3 + 1), np.uint8)
+        filtered[:, 0] = 2  # Filter type: Up
+        # Each byte is stored as the difference from the byte above it (uint8 arithmetic wraps around, as required)
+        filtered[0, 1:] = (rows[0] - self._last_row).reshape(-1)
+        filtered[1:, 1:] = (rows[1:] - rows[:-1]).reshape(height - 1, width * 3)
+        self._last_row = rows[-1].copy()
+        if data := self._compressor.compress(filtered.data):
+            self._write_chunk(b'IDAT', data)
+
+    def _close(self, complete: bool):
+        try:
+            if complete:
+                self._write_chunk(b'IDAT', self._compressor.flush())
+                self._write_chunk(b'IEND', b'')
+        finally:
+            self._f.close()
+
+
+class MappedStripWriter(StripWriter):
+    """
+    For formats that PIL can only encode from a complete image, strips are stored in a disk-backed memory map that the
+    final image shares its memory with, so the OS can page the canvas out instead of it needing to fit in memory.  The
+    format must support saving RGBX images (such as JPEG).
+    """
+
+    def __init__(self, path: Path, size: Size, fmt: str = 'jpeg', **save_kwargs):
+        super().__init__(path, size)
+        self.format = fmt
+        self.save_kwargs = save_kwargs
+        width, height = size
+        self._tmp_file = TemporaryFile(dir=path.parent)
+        self._canvas = np.memmap(self._tmp_file, np.uint8, 'w+', shape=(height, width, 4))  # RGBX
+
+    def _write(self, rows: np.ndarray):
+        self._canvas[self.rows_written:self.rows_written + len(rows), :, :3] = rows
+
+    def _close(self, complete: bool):
+        from PIL.Image import frombuffer
+
+        try:
+            if complete:
+                # Using the RGBX mode allows the image to use the memory map directly instead of copying it
+                image = frombuffer('RGBX', self.size, self._canvas, 'raw', 'RGBX', 0, 1)
+                with self.path.open('wb') as f:
+                    image.save(f, self.format, **self.save_kwargs)
+        finally:
+            del self._canvas
+            self._tmp_file.close()
+
+
+def open_strip_writer(path: Path, size: Size, fmt: str | None = None, **kwargs) -> StripWriter:
+    """
+    :param path: The output path
+    :param size: The (width, height) of the output image
+    :param fmt: The output format (default: based on the file extension; PNG or JPEG)
+    :param kwargs: Keyword arguments to pass to the writer
+    :return: A :class:`PngStripWriter` for PNG output, otherwise a :class:`MappedStripWriter`
+    """
+    if fmt is None:
+        fmt = 'png' if path.suffix.lower() == '.png' else 'jpeg'
+    if fmt.lower() == 'png':
+        return PngStripWriter(path, size, **kwargs)
+    return MappedStripWriter(path, size, fmt, **kwargs)
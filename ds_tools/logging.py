@@ -10,7 +10,9 @@ import logging
 import os
 import sys
 from datetime import datetime
+from functools import lru_cache
 from logging import LogRecord, Logger, StreamHandler, Handler, Filter, Formatter
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from threading import RLock
 from typing import Optional, Union, Collection, Iterable, Callable, Mapping, Any
@@ -22,7 +24,8 @@ from .output.color import colored
 __all__ = [
     'init_logging', 'add_context_filter', 'logger_has_non_null_handlers', 'ENTRY_FMT_DETAILED',
     'ENTRY_FMT_DETAILED_PID', 'ENTRY_FMT_DETAILED_PID_UID', 'ENTRY_FMT_DETAILED_UID', 'DatetimeFormatter',
-    'ColorLogFormatter', 'ColorThreadFormatter', 'get_logger_info', 'stream_config_dict'
+    'ColorLogFormatter', 'ColorThreadFormatter', 'get_logger_info', 'stream_config_dict', 'init_worker_logging',
+    'get_process_log_queue', 'stop_queue_listener',
 ]
 log = logging.getLogger(__name__)
 
@@ -38,9 +41,13 @@ ENTRY_FMT_DETAILED_PID_UID = '%(asctime)s %(levelname)s %(process)d %(threadName
 
 SUPPRESS_WARNINGS = ('InsecureRequestWarning',)
 
+QUEUE_MODES = ('thread', 'process')
+
 _NotSet = object()
 _lock = RLock()
 _stream_refs = set()
+_queue_listener: QueueListener | None = None
+_queue_mode: str | None = None
 
 PathLike = Union[Path, str]
 Verbosity = Union[int, bool, None]
@@ -78,6 +85,8 @@ def init_logging(
     suppress_additional_warnings: Collection[str] = None,
     http_debugging: bool = False,
     set_tz: bool = True,
+    use_queue: bool | str = False,
+    mp_context: str = None,
 ):
     """
     Configures stream handlers for stdout and stderr so that logs with level logging.INFO and below are sent to stdout
@@ -157,8 +166,17 @@ def init_logging(
     :param set_tz: Whether a default value for the ``TZ`` environment variable should be set (defaults to True) to
       prevent unnecessary system calls on Linux (see
       `https://blog.packagecloud.io/set-environment-variable-save-thousands-of-system-calls/`__ for more info).
+    :param use_queue: Route records through a :class:`~logging.handlers.QueueHandler` so that stream / file handlers
+      run in a :class:`~logging.handlers.QueueListener` thread instead of blocking the thread that logged them.  Use
+      ``True`` or ``'thread'`` for a queue that is only used within this process, or ``'process'`` for a
+      multiprocessing-safe queue that worker processes may log to via :func:`init_worker_logging`.
+    :param mp_context: The multiprocessing start method (``'fork'``, ``'spawn'``, or ``'forkserver'``) that will be used
+      to start worker processes when ``use_queue='process'`` (default: the current default start method).  The queue
+      can only be shared with processes that were started via the same method.
     :return: The path to which logs are being written, or None if no file handler was configured.
     """
+    if use_queue and use_queue is not True and use_queue not in QUEUE_MODES:
+        raise ValueError(f'Invalid {use_queue=} - expected a bool or one of: {", ".join(QUEUE_MODES)}')
     if set_tz:
         os.environ.setdefault('TZ', ':/etc/localtime')  # This avoids extra sys calls; see docstring for more info
     if fix_sigpipe:
@@ -201,6 +219,9 @@ def init_logging(
             log_path = Path(log_path).expanduser()
         _add_file_handler(loggers, log_path, date_fmt, file_fmt, file_lvl, file_handler_opts, file_perm)
 
+    if use_queue:
+        _use_queue_handler(loggers, 'thread' if use_queue is True else use_queue, mp_context)
+
     if capture_warnings:
         _capture_warnings(suppress_warnings, suppress_additional_warnings)  # noqa
     if http_debugging:
@@ -414,6 +435,104 @@ def _add_file_handler(
     log.log(19, f'Logging to {log_path}')
 
 
+# region Queue Handling
+
+
+def _use_queue_handler(loggers: Iterable[Logger], mode: str, mp_context: str = None):
+    """
+    Replace the handlers on the given loggers with a single QueueHandler, and move the replaced handlers to a
+    QueueListener that runs in a separate thread.
+    """
+    global _queue_listener, _queue_mode
+
+    loggers = list(loggers)
+    handlers = {}  # A dict is used to de-duplicate handlers while preserving their order
+    for logger in loggers:
+        for handler in logger.handlers:
+            if not isinstance(handler, (logging.NullHandler, QueueHandler)):
+                handlers[handler] = None
+    if not handlers:
+        return
+
+    stop_queue_listener()
+    if mode == 'process':
+        from multiprocessing import get_context
+
+        queue = get_context(mp_context).Queue(-1)
+    else:
+        from queue import SimpleQueue
+
+        queue = SimpleQueue()
+
+    queue_handler = QueueHandler(queue)
+    queue_handler.name = 'queue'
+    # Records that no handler would emit are dropped before they are prepared / enqueued
+    queue_handler.setLevel(min(handler.level for handler in handlers))
+    for logger in loggers:
+        if any(handler in handlers for handler in logger.handlers):
+            logger.handlers = [h for h in logger.handlers if h not in handlers] + [queue_handler]
+
+    with _lock:
+        if _queue_mode is None:
+            import atexit
+
+            atexit.register(stop_queue_listener)
+        _queue_listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        _queue_mode = mode
+        _queue_listener.start()
+
+
+def stop_queue_listener():
+    """
+    Stop the QueueListener that was started by :func:`init_logging` with ``use_queue`` enabled, if any, after all
+    records that were already enqueued have been handled.  This is called automatically at exit.
+    """
+    global _queue_listener
+
+    with _lock:
+        if _queue_listener is not None:
+            listener, _queue_listener = _queue_listener, None
+            listener.stop()
+
+
+def get_process_log_queue():
+    """
+    :return: The multiprocessing queue that was configured by :func:`init_logging` with ``use_queue='process'``, or
+      None if that mode is not active.  The queue may be passed to worker processes for use with
+      :func:`init_worker_logging`.
+    """
+    if _queue_listener is not None and _queue_mode == 'process':
+        return _queue_listener.queue
+    return None
+
+
+def init_worker_logging(
+    log_queue, level: int = logging.NOTSET, names: OptStrs = _NotSet, names_add: OptStrs = _NotSet
+):
+    """
+    Configure logging in a worker process so that records are sent to the parent process's handlers via the given
+    queue.  Any existing handlers on the configured loggers are replaced.
+
+    The root logger's level is lowered as it is by :func:`init_logging` - processes that were started via the spawn or
+    forkserver methods do not inherit the parent's logger configuration, so it would otherwise remain at WARNING and
+    filter out lower level records before they reach the queue.
+
+    :param log_queue: The queue returned by :func:`get_process_log_queue` in the parent process
+    :param level: The minimum log level that should be sent to the parent process
+    :param names: The names of the loggers for which a handler should be configured (see :func:`init_logging`)
+    :param names_add: The names of loggers for which a handler should be configured, in addition to the defaults
+    """
+    handler = QueueHandler(log_queue)
+    handler.name = 'queue'
+    handler.setLevel(level)
+    for logger in _get_loggers(names, 0, names_add, True):
+        logger.addHandler(handler)
+    logging.getLogger().setLevel(logging.NOTSET)            # Default is 30 / WARNING
+
+
+# endregion
+
+
 def _get_logger_names(
     names: OptStrs = _NotSet,
     verbosity: Verbosity = 0,
@@ -526,15 +645,62 @@ def create_filter(filter_fn: Callable[[LogRecord], bool]) -> Filter:
 
 
 class DatetimeFormatter(Formatter):
-    """Enables use of ``%f`` (micro/milliseconds) in datetime formats."""
+    """
+    Enables use of ``%f`` (micro/milliseconds) in datetime formats.
+
+    The portion of the timestamp with second resolution is only formatted once per second - for subsequent records that
+    were created within the same second, only the ``%f`` component is formatted.
+    """
     _local_tz = get_localzone()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._time_cache = (None, None, None, None)  # (datefmt, second, prefix, suffix)
+
     def formatTime(self, record: LogRecord, datefmt: str = None) -> str:
-        dt = datetime.fromtimestamp(record.created, self._local_tz)
-        if datefmt:
-            return dt.strftime(datefmt)
+        if datefmt and _split_datefmt(datefmt) is None:
+            return datetime.fromtimestamp(record.created, self._local_tz).strftime(datefmt)
+
+        created = record.created
+        second = int(created)
+        # This mirrors the rounding that is used by datetime.fromtimestamp
+        micros = round((created - second) * 1e6)
+        if micros >= 1_000_000:
+            second += 1
+            micros -= 1_000_000
+
+        cached_fmt, cached_second, prefix, suffix = self._time_cache
+        if cached_second != second or cached_fmt != datefmt:
+            prefix, suffix = self._format_second(second, datefmt)
+            self._time_cache = (datefmt, second, prefix, suffix)
+
+        if not datefmt:
+            return self.default_msec_format % (prefix, record.msecs)
+        elif suffix is None:  # %f is not used, so no sub-second formatting is necessary
+            return prefix
         else:
-            return self.default_msec_format % (dt.strftime(self.default_time_format), record.msecs)
+            return f'{prefix}{micros:06d}{suffix}'
+
+    def _format_second(self, second: int, datefmt: str | None) -> tuple[str, str | None]:
+        dt = datetime.fromtimestamp(second, self._local_tz)
+        if not datefmt:
+            return dt.strftime(self.default_time_format), None
+        prefix_fmt, suffix_fmt = _split_datefmt(datefmt)
+        return dt.strftime(prefix_fmt), None if suffix_fmt is None else dt.strftime(suffix_fmt)
+
+
+@lru_cache(20)
+def _split_datefmt(datefmt: str) -> tuple[str, str | None] | None:
+    """
+    :param datefmt: A datetime format string
+    :return: A tuple of (prefix, suffix) format strings that surround ``%f``, if present (suffix will be None if it is
+      not present), or None if the format string cannot be split safely.
+    """
+    if '%f' not in datefmt:
+        return datefmt, None
+    elif '%%' in datefmt or datefmt.count('%f') > 1:
+        return None
+    return tuple(datefmt.split('%f', 1))  # noqa
 
 
 class ColorLogFormatter(DatetimeFormatter):
@@ -547,13 +713,9 @@ class ColorLogFormatter(DatetimeFormatter):
     def format(self, record: LogRecord) -> str:
         formatted = super().format(record)
         color = getattr(record, 'color', None)
-        if color:
-            if isinstance(color, (str, int)):
-                formatted = colored(formatted, color)
-            elif isinstance(color, dict):
-                formatted = colored(formatted, **color)
-            else:
-                formatted = colored(formatted, *color)  # noqa
+        if color and formatted:
+            prefix, suffix = _color_affixes(color)
+            formatted = prefix + formatted + suffix
         return formatted
 
 
@@ -567,15 +729,50 @@ class ColorThreadFormatter(ColorLogFormatter):
         except Exception:  # noqa
             pass
         else:
-            color_num = thread_num % 256
-            while color_num in (0, 16, 17, 18, 19, 232, 233, 234, 235, 236, 237):
-                color_num += 51
-                if color_num > 255:
-                    color_num %= 256
-            formatted = colored(formatted, color_num)
+            if formatted:
+                prefix, suffix = _color_affixes(_thread_color_num(thread_num))
+                formatted = prefix + formatted + suffix
         return formatted
 
 
+_COLOR_AFFIX_CACHE: dict[Any, tuple[str, str]] = {}
+
+
+def _color_affixes(color) -> tuple[str, str]:
+    """
+    :param color: A color value, as supported by the ``color`` extra attribute for :class:`ColorLogFormatter`
+    :return: Tuple of (prefix, suffix) ANSI escape codes that should surround text to apply the given color
+    """
+    key = tuple(sorted(color.items())) if isinstance(color, dict) else color
+    try:
+        return _COLOR_AFFIX_CACHE[key]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        key = None
+
+    if isinstance(color, (str, int)):
+        prefix, suffix = colored('\x00', color).split('\x00')
+    elif isinstance(color, dict):
+        prefix, suffix = colored('\x00', **color).split('\x00')
+    else:
+        prefix, suffix = colored('\x00', *color).split('\x00')  # noqa
+
+    if key is not None:
+        _COLOR_AFFIX_CACHE[key] = (prefix, suffix)
+    return prefix, suffix
+
+
+@lru_cache(256)
+def _thread_color_num(thread_num: int) -> int:
+    color_num = thread_num % 256
+    while color_num in (0, 16, 17, 18, 19, 232, 233, 234, 235, 236, 237):
+        color_num += 51
+        if color_num > 255:
+            color_num %= 256
+    return color_num
+
+
 def prep_log_dir(log_path: PathLike, perm_change_prefix: str = '/var/tmp/', new_dir_permissions: int | None = 0o1777):
     """
     Creates any necessary intermediate directories in order for the given log path to be valid.  Log directory's
@@ -10,6 +10,7 @@ Notes:
 # fmt: off
 
 FFMPEG_CONFIG_PATH = '~/.config/ds_tools/ffmpeg.json'
+PROBE_CACHE_PATH = '~/.cache/ds_tools/ffprobe.db'
 
 NAME_RESOLUTION_MAP = {'720p': (1280, 720), '1080p': (1920, 1080), '1440p': (2560, 1440), '2160p': (3840, 2160)}
 
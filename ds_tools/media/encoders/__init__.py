@@ -1,3 +1,5 @@
 from .base import Encoder
 from .av1 import Av1Encoder
 from .vp9 import Vp9Encoder
+from .segments import SegmentedEncoding, SegmentProgress
+from .jobs import TranscodeJob, TranscodeQueue
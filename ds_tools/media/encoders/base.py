@@ -4,22 +4,25 @@
 
 import logging
 from abc import ABC
+from copy import copy
 from functools import cached_property
 from pathlib import Path
-from typing import Any, Union, TypeVar
+from typing import Any, Callable, IO, Union, TypeVar
 
 from ...fs.paths import unique_path
 from ..constants import (
     NAME_RESOLUTION_MAP, ENCODER_CODEC_MAP, CODEC_DEFAULT_EXT_MAP, ENCODER_PIXEL_FORMATS, PIXEL_FORMATS_8_BIT
 )
 from ..exceptions import FfmpegError
-from ..ffmpeg import run_ffmpeg_cmd, get_decoders
+from ..ffmpeg import run_ffmpeg_cmd, stream_ffmpeg_cmd, get_decoders
+from ..progress import FfmpegProgress, iter_progress, PROGRESS_ARGS
 from ..videos import Video, VideoStream
 
 __all__ = ['Encoder']
 log = logging.getLogger(__name__)
 
 EncoderType = TypeVar('EncoderType', bound='Encoder')
+ProgressCallback = Callable[[FfmpegProgress], Any] | None
 
 
 class Encoder(ABC):
@@ -39,6 +42,7 @@ class Encoder(ABC):
 
     def __init__(self, video: Video, v_stream: VideoStream = None, options: dict[str, Any] = None, encoder: str = None):
         self.video = video
+        self.input_path = video.path
         self.options = options or {}
         self.encoder = encoder or self.default_encoder
         try:
@@ -67,6 +71,15 @@ class Encoder(ABC):
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__}[{self.codec}:{self.encoder}]{self.options}>'
 
+    def for_input(self: EncoderType, path: Path) -> EncoderType:
+        """
+        :param path: A file containing a portion of this encoder's video stream
+        :return: A copy of this encoder that will read from the given path, using the same settings as this encoder
+        """
+        clone = copy(self)
+        clone.input_path = path
+        return clone
+
     @cached_property
     def pixel_formats(self) -> set[str]:
         return ENCODER_PIXEL_FORMATS[self.encoder]
@@ -145,7 +158,7 @@ class Encoder(ABC):
             args += ['-c:v', in_codec]
         if in_hw_accel_out_fmt := self.options.get('in_hw_accel_out_fmt'):
             args += ['-hwaccel_output_format', in_hw_accel_out_fmt]
-        args += ['-i', self.video.path.as_posix()]
+        args += ['-i', self.input_path.as_posix()]
         return args
 
     def get_args(self, audio: str = None, pass_num: int = None) -> list[str]:
@@ -158,6 +171,8 @@ class Encoder(ABC):
             args += ['-vf', 'scale={}x{}'.format(*self.new_resolution)]
         if self.new_fps != self.v_stream.fps:
             args += ['-vf', f'fps={self.new_fps}']
+        if threads := self.options.get('threads'):
+            args += ['-threads', str(threads)]
         args += self.get_pix_fmt_args()
         return args
 
@@ -176,26 +191,61 @@ class Encoder(ABC):
 
         return unique_path(out_dir, stem, '.' + ext)
 
-    def encode(self, out_path: Union[str, Path] = None, passes: int = 1):
+    def encode(
+        self,
+        out_path: Union[str, Path] = None,
+        passes: int = 1,
+        segments: int = None,
+        workers: int = None,
+        retries: int = 2,
+        *,
+        progress: ProgressCallback = None,
+        stderr: IO | int | None = None,
+        pass_log_prefix: Union[str, Path] = None,
+    ):
+        """
+        :param out_path: The output path (default: a unique path next to the source file)
+        :param passes: The number of encoding passes to use
+        :param segments: If specified, split the video stream at keyframes into (up to) this many segments, and encode
+          them concurrently.  Interrupted segmented encodes will be resumed if the same encode is run again.
+        :param workers: The maximum number of segments to encode concurrently (default: core count)
+        :param retries: The number of times to retry a segment that failed to encode (only used with segments)
+        :param progress: A callback that should be called with each progress update reported by ffmpeg.  For segmented
+          encodes, updates combine the progress of all segments (see :class:`.SegmentProgress`).
+        :param stderr: Where ffmpeg's stderr should be sent when a progress callback is provided (default: inherited)
+        :param pass_log_prefix: The prefix to use for ffmpeg's 2-pass log files (default: ffmpeg's default, which is
+          relative to the current directory and should not be shared by concurrent 2-pass encodes)
+        """
         if passes not in (1, 2):
             raise ValueError(f'Invalid {passes=} value - must be 1 or 2')
 
         out_path = self.pick_out_path(out_path)
+        if segments:
+            from .segments import SegmentedEncoding
+
+            SegmentedEncoding(
+                self, out_path, segments, workers, passes, retries, progress=progress, stderr=stderr
+            ).run()
+            return
+
         if passes == 1:
-            try:
-                run_ffmpeg_cmd(self.get_args(audio='copy'), out_path, log_level=logging.INFO)
-            except FfmpegError:
-                if out_path.exists() and out_path.stat().st_size == 0:
-                    out_path.unlink()
-                raise
+            commands = [(self.get_args(audio='copy'), out_path)]
         else:
             null_path = '/dev/null' if Path('/dev/null').exists() else 'NUL'  # assume Windows if no /dev/null
-            pass_1 = self.get_args(pass_num=1) + ['-pass', '1', '-an', '-f', 'null']
-            pass_2 = self.get_args(pass_num=2) + ['-pass', '2', '-c:a', 'copy']
-            run_ffmpeg_cmd(pass_1, null_path, log_level=logging.INFO)
+            pass_log_args = ['-passlogfile', Path(pass_log_prefix).as_posix()] if pass_log_prefix else []
+            pass_1 = self.get_args(pass_num=1) + ['-pass', '1', *pass_log_args, '-an', '-f', 'null']
+            pass_2 = self.get_args(pass_num=2) + ['-pass', '2', *pass_log_args, '-c:a', 'copy']
+            commands = [(pass_1, null_path), (pass_2, out_path)]
+
+        for pass_num, (args, path) in enumerate(commands, 1):
             try:
-                run_ffmpeg_cmd(pass_2, out_path, log_level=logging.INFO)
+                if progress is None:
+                    run_ffmpeg_cmd(args, path, log_level=logging.INFO)
+                else:
+                    output = stream_ffmpeg_cmd([*args, *PROGRESS_ARGS], path, log_level=logging.INFO, stderr=stderr)
+                    for update in iter_progress(output, pass_num):
+                        progress(update)
             except FfmpegError:
-                if out_path.exists() and out_path.stat().st_size == 0:
+                if path is out_path and out_path.exists() and out_path.stat().st_size == 0:
                     out_path.unlink()
                 raise
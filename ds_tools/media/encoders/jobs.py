@@ -0,0 +1,269 @@
+"""
+A queue for running multiple transcode jobs concurrently, with live progress info and a journal that allows interrupted
+batches to be resumed.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict, fields
+from pathlib import Path
+from threading import Lock
+from typing import Any, TextIO
+
+from ...output.formatting import format_duration
+from ...output.table import Table, SimpleColumn
+from ..progress import FfmpegProgress
+from ..videos import Video
+from .base import Encoder
+
+__all__ = ['TranscodeJob', 'TranscodeQueue']
+log = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+
+@dataclass
+class TranscodeJob:
+    in_path: str
+    codec: str
+    out_path: str | None = None
+    options: dict[str, Any] = field(default_factory=dict)
+    passes: int = 1
+    stream: int | None = None
+    segments: int | None = None
+    status: str = PENDING
+    final_path: str | None = None  # The resolved output path; recorded when the job starts
+    error: str | None = None
+    progress: FfmpegProgress | None = field(default=None, compare=False, repr=False)
+    duration: float = field(default=0, compare=False, repr=False)
+
+    @property
+    def key(self) -> str:
+        """The identity of this job, used to match it with an entry in a journal"""
+        return json.dumps(
+            [self.in_path, self.codec, self.out_path, self.options, self.passes, self.stream, self.segments],
+            sort_keys=True,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        del data['progress']
+        del data['duration']
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TranscodeJob:
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    @property
+    def percent(self) -> float:
+        if self.status == DONE:
+            return 100
+        elif self.progress is None:
+            return 0
+        return self.progress.percent(self.duration, self.passes)
+
+    @property
+    def eta(self) -> float | None:
+        if self.status == DONE:
+            return 0
+        elif self.progress is None or self.status != RUNNING:
+            return None
+        elif (eta := self.progress.eta(self.duration)) is None:
+            return None
+        if self.progress.pass_num < self.passes:  # Assume the remaining passes will run at a similar speed
+            eta += (self.passes - self.progress.pass_num) * self.duration / self.progress.speed
+        return eta
+
+
+class TranscodeQueue:
+    def __init__(
+        self,
+        max_jobs: int = 1,
+        threads: int | None = None,
+        journal_path: str | Path | None = None,
+        status_interval: float = 10,
+        segment_workers: int | None = None,
+        file: TextIO | None = None,
+    ):
+        """
+        :param max_jobs: The maximum number of transcode jobs to run concurrently
+        :param threads: The total number of threads that should be divided between concurrent jobs (default: no limit)
+        :param journal_path: Path to a file in which job status should be recorded.  If a batch is interrupted, then
+          adding the same jobs to a queue that uses the same journal will skip completed jobs and restart the
+          interrupted ones.
+        :param status_interval: The number of seconds between status table updates while jobs are running
+        :param segment_workers: The maximum number of segments to encode concurrently for each job that uses segments
+        :param file: The file to which status tables should be written (default: stdout)
+        """
+        if max_jobs < 1:
+            raise ValueError(f'Invalid {max_jobs=} - must be a positive integer')
+        self.max_jobs = max_jobs
+        self.threads_per_job = max(threads // max_jobs, 1) if threads else None
+        self.journal_path = Path(journal_path).expanduser() if journal_path else None
+        self.status_interval = status_interval
+        self.segment_workers = segment_workers
+        self.file = file
+        self.jobs: list[TranscodeJob] = []
+        self._lock = Lock()
+        self._journal = self._load_journal()
+
+    # region Journal
+
+    def _load_journal(self) -> dict[str, TranscodeJob]:
+        if self.journal_path is None or not self.journal_path.exists():
+            return {}
+        try:
+            data = json.loads(self.journal_path.read_text('utf-8'))
+            jobs = [TranscodeJob.from_dict(job) for job in data['jobs']]
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning(f'Ignoring invalid transcode journal {self.journal_path.as_posix()}: {e}')
+            return {}
+        return {job.key: job for job in jobs}
+
+    def _save_journal(self):
+        if self.journal_path is None:
+            return
+        with self._lock:
+            self._journal.update((job.key, job) for job in self.jobs)
+            data = {'jobs': [job.to_dict() for job in self._journal.values()]}
+            if not self.journal_path.parent.exists():
+                self.journal_path.parent.mkdir(parents=True)
+            tmp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+            tmp_path.write_text(json.dumps(data, indent=4), 'utf-8')
+            tmp_path.replace(self.journal_path)
+
+    # endregion
+
+    def add(
+        self,
+        in_path: str | Path,
+        codec: str,
+        out_path: str | Path | None = None,
+        options: dict[str, Any] | None = None,
+        passes: int = 1,
+        stream: int | None = None,
+        segments: int | None = None,
+    ) -> TranscodeJob:
+        job = TranscodeJob(
+            Path(in_path).expanduser().resolve().as_posix(),
+            codec,
+            Path(out_path).expanduser().as_posix() if out_path else None,
+            {k: v for k, v in (options or {}).items() if v is not None},
+            passes,
+            stream,
+            segments,
+        )
+        if (old_job := self._journal.get(job.key)) is not None:
+            job = old_job
+            if job.status == DONE and not (job.final_path and Path(job.final_path).exists()):
+                log.info(f'Output for previously completed job for {job.in_path} no longer exists - it will be re-run')
+                job.status, job.final_path = PENDING, None
+            elif job.status == RUNNING:
+                log.info(f'Resuming interrupted job for {job.in_path}')
+
+        self.jobs.append(job)
+        return job
+
+    def run(self) -> bool:
+        """
+        Run all jobs that were not already completed.
+
+        :return: True if all jobs completed successfully, False otherwise
+        """
+        to_run = [job for job in self.jobs if job.status != DONE]
+        if skipped := len(self.jobs) - len(to_run):
+            log.info(f'Skipping {skipped} jobs that were already completed')
+        if not to_run:
+            return True
+
+        with ThreadPoolExecutor(max_workers=self.max_jobs) as executor:
+            remaining = {executor.submit(self._run_job, job) for job in to_run}
+            try:
+                while remaining:
+                    done, remaining = wait(remaining, timeout=self.status_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                    self.print_status()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        return all(job.status == DONE for job in self.jobs)
+
+    def _run_job(self, job: TranscodeJob):
+        options = job.options
+        if self.threads_per_job and 'threads' not in options:
+            options = options | {'threads': self.threads_per_job}
+
+        try:
+            video = Video(job.in_path)
+            v_stream = video.streams[job.stream] if job.stream is not None else None
+            encoder = Encoder.for_encoding(job.codec, video, v_stream, options=options)
+            if job.final_path:  # The job was interrupted - discard any partial output
+                out_path = Path(job.final_path)
+                if out_path.exists():
+                    out_path.unlink()
+            else:
+                out_path = encoder.pick_out_path(job.out_path)
+                job.final_path = out_path.as_posix()
+            job.duration = video.duration
+        except Exception as e:
+            return self._job_failed(job, e)
+
+        job.status, job.error, job.progress = RUNNING, None, None
+        self._save_journal()
+        log_path = out_path.with_name(out_path.name + '.ffmpeg.log')
+        try:
+            with log_path.open('wb') as log_file:
+                encoder.encode(
+                    out_path,
+                    job.passes,
+                    job.segments,
+                    self.segment_workers,
+                    progress=lambda update: setattr(job, 'progress', update),
+                    stderr=log_file,
+                    pass_log_prefix=out_path.with_name(out_path.name + '.pass'),
+                )
+        except Exception as e:
+            return self._job_failed(job, e, log_path)
+
+        job.status = DONE
+        self._save_journal()
+        log_path.unlink()
+        for path in out_path.parent.glob(f'{out_path.name}.pass-*'):
+            path.unlink()
+
+    def _job_failed(self, job: TranscodeJob, error: Exception, log_path: Path | None = None):
+        job.status = FAILED
+        job.error = f'{error} (see {log_path.as_posix()})' if log_path is not None else str(error)
+        log.error(f'Error transcoding {job.in_path}: {job.error}', extra={'color': 'red'})
+        self._save_journal()
+
+    def print_status(self):
+        rows = [
+            {
+                'File': Path(job.in_path).name,
+                'Status': job.status,
+                'Progress': f'{job.percent:.1f}%',
+                'FPS': f'{job.progress.fps:.1f}' if job.progress and job.status == RUNNING else '',
+                'Speed': f'{job.progress.speed:.2f}x' if job.progress and job.status == RUNNING else '',
+                'ETA': '' if (eta := job.eta) is None else format_duration(eta),
+            }
+            for job in self.jobs
+        ]
+        columns = [SimpleColumn(key) for key in ('File', 'Status', 'Progress', 'FPS', 'Speed', 'ETA')]
+        table = Table(*columns, update_width=True, file=self.file)
+        table.print_rows(rows)
+
+        counts = {status: 0 for status in (DONE, RUNNING, PENDING, FAILED)}
+        for job in self.jobs:
+            counts[job.status] += 1
+        summary = ', '.join(f'{num} {status}' for status, num in counts.items())
+        print(f'Jobs: {summary}\n', file=self.file, flush=True)
@@ -0,0 +1,295 @@
+"""
+Segment-parallel encoding.
+
+The source video stream is split losslessly (via stream copy) at keyframes into segments, the segments are encoded
+concurrently, and the encoded segments are then joined via the concat demuxer, along with the other streams from the
+original file.
+
+Intermediate files are stored in a work directory next to the output file.  If encoding is interrupted, then running
+the same encode again will re-use the split source segments and any segments that were already encoded, as long as the
+source file and encoding args did not change.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from shutil import rmtree
+from threading import Lock
+from typing import TYPE_CHECKING, IO
+
+from ..exceptions import FfmpegError
+from ..ffmpeg import run_ffmpeg_cmd, stream_ffmpeg_cmd
+from ..progress import FfmpegProgress, iter_progress, PROGRESS_ARGS
+
+if TYPE_CHECKING:
+    from .base import Encoder, ProgressCallback
+
+__all__ = ['SegmentedEncoding', 'SegmentProgress']
+log = logging.getLogger(__name__)
+
+NULL_PATH = '/dev/null' if Path('/dev/null').exists() else 'NUL'  # assume Windows if no /dev/null
+STATE_FILE_NAME = 'state.json'
+
+
+class SegmentedEncoding:
+    def __init__(
+        self,
+        encoder: Encoder,
+        out_path: Path,
+        segments: int,
+        workers: int | None = None,
+        passes: int = 1,
+        retries: int = 2,
+        keep_segments: bool = False,
+        *,
+        progress: ProgressCallback = None,
+        stderr: IO | int | None = None,
+    ):
+        """
+        :param encoder: The Encoder that should be used for each segment
+        :param out_path: The final output path
+        :param segments: The target number of segments.  Segments can only start at keyframes, so the actual number
+          of segments may be lower if keyframes are sparse.
+        :param workers: The maximum number of segments to encode concurrently (default: core count)
+        :param passes: The number of encoding passes to use for each segment
+        :param retries: The number of times to retry encoding a segment if it fails
+        :param keep_segments: Keep the work directory after the final output was successfully written
+        :param progress: A callback that should be called with the combined progress of all segments each time that
+          ffmpeg reports progress for a segment, and when each segment is completed (see :class:`SegmentProgress`)
+        :param stderr: Where ffmpeg's stderr should be sent when a progress callback is provided (default: inherited)
+        """
+        if segments < 1:
+            raise ValueError(f'Invalid {segments=} value - must be a positive integer')
+        self.encoder = encoder
+        self.source = encoder.video.path
+        self.out_path = out_path
+        self.segments = segments
+        self.workers = workers or os.cpu_count() or 1
+        self.passes = passes
+        self.retries = retries
+        self.keep_segments = keep_segments
+        self.progress = progress
+        self.stderr = stderr
+        self._progress: SegmentProgress | None = None
+        self.work_dir = out_path.with_name(f'.{out_path.name}.segments')
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[{self.source.name} -> {self.out_path.name}, segments={self.segments}]>'
+
+    def run(self):
+        src_segments = self._prepare()
+        to_encode = [path for path in src_segments if not self._encoded_path(path).exists()]
+        if done := len(src_segments) - len(to_encode):
+            log.info(f'Resuming - {done}/{len(src_segments)} segments were already encoded')
+
+        if self.progress is not None:
+            duration = self.encoder.video.duration
+            self._progress = SegmentProgress(self.progress, duration, len(src_segments), self.passes, done)
+
+        self._encode_all(to_encode, len(src_segments))
+        self._concat([self._encoded_path(path) for path in src_segments])
+        if self._progress is not None:
+            self._progress.finished()
+        if not self.keep_segments:
+            rmtree(self.work_dir)
+
+    # region Split
+
+    @property
+    def _state(self) -> dict[str, object]:
+        stat_result = self.source.stat()
+        return {
+            'source': self.source.as_posix(),
+            'size': stat_result.st_size,
+            'mtime_ns': stat_result.st_mtime_ns,
+            'args': self.encoder.get_args(),
+            'passes': self.passes,
+            'segments': self.segments,
+        }
+
+    def _prepare(self) -> list[Path]:
+        state_path = self.work_dir.joinpath(STATE_FILE_NAME)
+        state = self._state
+        if state_path.exists():
+            try:
+                old_state = json.loads(state_path.read_text('utf-8'))
+            except ValueError:
+                old_state = None
+            if old_state == state:
+                return self._source_segments()
+            log.info(f'Discarding segments from a previous encode with different settings in {self.work_dir}')
+
+        if self.work_dir.exists():
+            rmtree(self.work_dir)
+        self.work_dir.mkdir(parents=True)
+        self._split()
+        # The state is only written after the split completes, so an interrupted split will be restarted
+        state_path.write_text(json.dumps(state, indent=4), 'utf-8')
+        return self._source_segments()
+
+    def _split(self):
+        duration = self.encoder.video.duration
+        seg_len = duration / self.segments
+        # The segment muxer will start each segment at the first keyframe at or after each of these times
+        times = ','.join(f'{seg_len * i:.3f}' for i in range(1, self.segments))
+        args = ['-i', self.source.as_posix(), '-map', f'0:v:{self.encoder.v_stream.type_index}', '-c', 'copy']
+        if times:
+            args += ['-f', 'segment', '-segment_times', times, '-reset_timestamps', '1']
+        else:
+            args += ['-f', 'segment', '-segment_time', f'{duration + 1:.3f}']
+        log.info(f'Splitting {self.source.name} into up to {self.segments} segments')
+        run_ffmpeg_cmd(args, self.work_dir.joinpath('src_%05d.mkv'), log_level=logging.DEBUG)
+
+    def _source_segments(self) -> list[Path]:
+        return sorted(self.work_dir.glob('src_*.mkv'))
+
+    # endregion
+
+    # region Encode
+
+    def _encoded_path(self, src_path: Path) -> Path:
+        return src_path.with_name('enc' + src_path.name[3:])
+
+    def _encode_all(self, src_segments: list[Path], total: int):
+        if not src_segments:
+            return
+
+        completed = total - len(src_segments)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(src_segments))) as executor:
+            futures = {executor.submit(self._encode_segment, path): path for path in src_segments}
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    completed += 1
+                    if self._progress is not None:
+                        self._progress.segment_done(futures[future])
+                    log.info(f'Encoded segment {futures[future].stem[4:]} ({completed}/{total} complete)')
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    def _encode_segment(self, src_path: Path):
+        encoder = self.encoder.for_input(src_path)
+        enc_path = self._encoded_path(src_path)
+        tmp_path = enc_path.with_name(f'tmp_{enc_path.name}')
+        for attempt in range(self.retries + 1):
+            if tmp_path.exists():
+                tmp_path.unlink()
+            try:
+                self._run_encode(encoder, src_path, tmp_path)
+            except FfmpegError as e:
+                if attempt < self.retries:
+                    log.warning(f'Error encoding segment {src_path.name} - will retry: {e}')
+                else:
+                    log.error(f'Error encoding segment {src_path.name} - giving up: {e}', extra={'color': 'red'})
+                    raise
+            else:
+                # The rename ensures that only fully encoded segments will be found when resuming
+                tmp_path.replace(enc_path)
+                return
+
+    def _run_encode(self, encoder: Encoder, src_path: Path, tmp_path: Path):
+        if self.passes == 1:
+            commands = [(encoder.get_args() + ['-y'], tmp_path)]
+        else:
+            log_prefix = src_path.with_suffix('').as_posix()
+            pass_1 = encoder.get_args(pass_num=1) + ['-pass', '1', '-passlogfile', log_prefix, '-an', '-f', 'null']
+            pass_2 = encoder.get_args(pass_num=2) + ['-pass', '2', '-passlogfile', log_prefix, '-y']
+            commands = [(pass_1, NULL_PATH), (pass_2, tmp_path)]
+
+        for pass_num, (args, path) in enumerate(commands, 1):
+            if self._progress is None:
+                run_ffmpeg_cmd(args, path)
+            else:
+                output = stream_ffmpeg_cmd([*args, *PROGRESS_ARGS], path, stderr=self.stderr)
+                for update in iter_progress(output, pass_num):
+                    self._progress.update(src_path, update)
+
+    # endregion
+
+    def _concat(self, enc_segments: list[Path]):
+        list_path = self.work_dir.joinpath('segments.txt')
+        list_path.write_text(''.join(f'file {_concat_quote(path.name)}\n' for path in enc_segments), 'utf-8')
+        args = [
+            '-f', 'concat', '-safe', '0', '-i', list_path.as_posix(),
+            '-i', self.source.as_posix(),
+            '-map', '0:v', '-map', '1:a?', '-map', '1:s?', '-c', 'copy',
+        ]
+        log.info(f'Joining {len(enc_segments)} encoded segments into {self.out_path.as_posix()}')
+        try:
+            run_ffmpeg_cmd(args, self.out_path, log_level=logging.INFO)
+        except FfmpegError:
+            if self.out_path.exists() and self.out_path.stat().st_size == 0:
+                self.out_path.unlink()
+            raise
+
+
+class SegmentProgress:
+    """
+    Combines the progress updates that ffmpeg reports for each segment into a single :class:`.FfmpegProgress` for the
+    full video, so that :meth:`.FfmpegProgress.percent` and :meth:`.FfmpegProgress.eta` may be used with the full
+    video's duration like they would be for an encode that was not segmented.
+
+    The media time that was processed across all passes of all segments is distributed over the combined update's
+    ``pass_num`` and ``out_time``, and its ``fps`` and ``speed`` are the totals for all segments that are currently
+    being encoded.  Segments are assumed to have similar durations, so percentages are approximate.
+    """
+
+    def __init__(self, callback: ProgressCallback, duration: float, segments: int, passes: int = 1, completed: int = 0):
+        """
+        :param callback: The callback that should be called with each combined progress update
+        :param duration: The duration (in seconds) of the full video
+        :param segments: The total number of segments
+        :param passes: The number of encoding passes used for each segment
+        :param completed: The number of segments that were already encoded before this encode started
+        """
+        self.callback = callback
+        self.duration = duration
+        self.seg_duration = duration / segments
+        self.passes = passes
+        self._completed = completed
+        self._frames = 0
+        self._size = 0
+        self._running: dict[Path, FfmpegProgress] = {}
+        self._lock = Lock()
+
+    def update(self, src_path: Path, update: FfmpegProgress):
+        with self._lock:
+            self._running[src_path] = update
+            self.callback(self._combined())
+
+    def segment_done(self, src_path: Path):
+        with self._lock:
+            if (last := self._running.pop(src_path, None)) is not None:
+                self._frames += last.frame
+                self._size += last.total_size
+            self._completed += 1
+            self.callback(self._combined())
+
+    def finished(self):
+        with self._lock:
+            self.callback(FfmpegProgress(self._frames, 0, 0, self.duration, self._size, True, self.passes))
+
+    def _combined(self) -> FfmpegProgress:
+        running = self._running.values()
+        processed = self._completed * self.passes * self.seg_duration
+        processed += sum((p.pass_num - 1) * self.seg_duration + min(p.out_time, self.seg_duration) for p in running)
+        pass_num = min(int(processed // self.duration) + 1, self.passes) if self.duration else 1
+        return FfmpegProgress(
+            frame=self._frames + sum(p.frame for p in running),
+            fps=sum(p.fps for p in running),
+            speed=sum(p.speed for p in running),
+            out_time=processed - (pass_num - 1) * self.duration,
+            total_size=self._size + sum(p.total_size for p in running),
+            pass_num=pass_num,
+        )
+
+
+def _concat_quote(name: str) -> str:
+    return "'{}'".format(name.replace("'", r"'\''"))
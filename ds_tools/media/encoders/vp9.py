@@ -58,7 +58,6 @@ class Vp9Encoder(Encoder, codec='vp9'):
             'min_bit_rate': '-minrate',
             'max_bit_rate': '-maxrate',
             'tile-columns': '-tile-columns',
-            'threads': '-threads',
             'crf': '-crf',
         }
 
@@ -10,13 +10,17 @@ import json
 import logging
 import re
 from pathlib import Path
-from subprocess import run, CalledProcessError
-from typing import Any, Sequence
+from subprocess import run, CalledProcessError, Popen, PIPE, DEVNULL
+from threading import Thread
+from typing import IO, Any, Callable, Iterator, Sequence
 
 from .constants import FFMPEG_CONFIG_PATH
 from .exceptions import FfmpegError
 
-__all__ = ['load_config', 'set_ffmpeg_path', 'run_ffmpeg_cmd', 'get_decoders', 'get_encoders', 'CodecLibrary']
+__all__ = [
+    'load_config', 'set_ffmpeg_path', 'run_ffmpeg_cmd', 'stream_ffmpeg_cmd', 'stream_ffmpeg_frames', 'get_decoders',
+    'get_encoders', 'CodecLibrary',
+]
 log = logging.getLogger(__name__)
 
 FFMPEG_DIR: Path | None = None
@@ -46,6 +50,10 @@ def load_config(path: _Path = None):
     config = json.loads(path.read_text('utf-8'))
     if ffmpeg_path := config.get('ffmpeg_path'):
         set_ffmpeg_path(ffmpeg_path)
+    if 'probe_cache_path' in config:  # null may be used to disable caching
+        from .probe import set_probe_cache_path
+
+        set_probe_cache_path(config['probe_cache_path'])
 
 
 def run_ffmpeg_cmd(
@@ -57,14 +65,7 @@ def run_ffmpeg_cmd(
     kwargs: dict[str, Any] = None,
     log_level: int = logging.DEBUG,
 ) -> str | bytes | None:
-    command = [FFMPEG_DIR.joinpath(cmd).as_posix() if FFMPEG_DIR is not None else cmd]
-    if args:
-        command.extend(args)
-    if kwargs:
-        command.extend(kwargs_to_cli_args(kwargs))
-    if file is not None:
-        command.append(file.as_posix() if isinstance(file, Path) else file)
-
+    command = _build_command(args, file, cmd, kwargs)
     log.log(log_level, f'Running command: {command}')
     try:
         results = run(command, capture_output=capture, check=True)
@@ -76,6 +77,111 @@ def run_ffmpeg_cmd(
     return results.stdout.decode('utf-8') if decode else results.stdout
 
 
+def stream_ffmpeg_cmd(
+    args: Sequence[str] = None,
+    file: _Path = None,
+    cmd: str = 'ffmpeg',
+    kwargs: dict[str, Any] = None,
+    log_level: int = logging.DEBUG,
+    stderr: int | None = DEVNULL,
+) -> Iterator[bytes]:
+    """
+    Run the specified command, and yield lines from its stdout as they are written, instead of buffering all of its
+    output in memory.  If the generator is closed before the command completes, then the process is terminated.
+
+    :param args: Command arguments
+    :param file: The input file, which will be the last argument
+    :param cmd: The command to run
+    :param kwargs: Keyword arguments to convert to additional command arguments
+    :param log_level: Level to use when logging the command
+    :param stderr: Where stderr should be sent (default: discarded)
+    :return: Iterator that yields lines (including line endings) from the command's stdout
+    """
+    command = _build_command(args, file, cmd, kwargs)
+    log.log(log_level, f'Running command: {command}')
+    with Popen(command, stdout=PIPE, stderr=stderr) as proc:
+        try:
+            yield from proc.stdout
+        except BaseException:  # Including GeneratorExit
+            proc.kill()
+            raise
+
+    if proc.returncode:
+        raise FfmpegError(command, f'Command did not complete successfully ({proc.returncode=})')
+
+
+def stream_ffmpeg_frames(
+    args: Sequence[str],
+    frame_size: int,
+    cmd: str = 'ffmpeg',
+    log_level: int = logging.DEBUG,
+    stderr_handler: Callable[[bytes], Any] | None = None,
+) -> Iterator[memoryview]:
+    """
+    Run the specified command, which should write fixed-size raw video frames to stdout (i.e., using
+    ``-f rawvideo ... pipe:1``), and yield each frame as it is written.  A single buffer is re-used for all frames, so
+    each yielded memoryview is only valid until the next frame is requested.  If the generator is closed before the
+    command completes, then the process is terminated.
+
+    :param args: Command arguments, including the output
+    :param frame_size: The number of bytes in each frame
+    :param cmd: The command to run
+    :param log_level: Level to use when logging the command
+    :param stderr_handler: A function that should be called with each line from stderr, from a separate thread
+      (default: stderr is discarded)
+    :return: Iterator that yields a memoryview of each frame
+    """
+    command = _build_command(args, None, cmd, None)
+    log.log(log_level, f'Running command: {command}')
+    buf = memoryview(bytearray(frame_size))
+    with Popen(command, stdout=PIPE, stderr=DEVNULL if stderr_handler is None else PIPE) as proc:
+        if stderr_handler is not None:
+            stderr_thread = Thread(target=_handle_lines, args=(proc.stderr, stderr_handler), daemon=True)
+            stderr_thread.start()
+        try:
+            while _read_into(proc.stdout, buf):
+                yield buf
+        except BaseException:  # Including GeneratorExit
+            proc.kill()
+            raise
+        finally:
+            if stderr_handler is not None:
+                stderr_thread.join()
+
+    if proc.returncode:
+        raise FfmpegError(command, f'Command did not complete successfully ({proc.returncode=})')
+
+
+def _read_into(stream: IO[bytes], buf: memoryview) -> bool:
+    pos, size = 0, len(buf)
+    while pos < size:
+        if not (read := stream.readinto(buf[pos:])):
+            if pos:
+                log.warning(f'Discarding incomplete frame with {pos} / {size} bytes')
+            return False
+        pos += read
+    return True
+
+
+def _handle_lines(stream: IO[bytes], handler: Callable[[bytes], Any]):
+    for line in stream:
+        try:
+            handler(line)
+        except Exception as e:  # noqa
+            log.error(f'Error handling output line={line!r}: {e}', extra={'color': 'red'})
+
+
+def _build_command(args: Sequence[str] | None, file: _Path, cmd: str, kwargs: dict[str, Any] | None) -> list[str]:
+    command = [FFMPEG_DIR.joinpath(cmd).as_posix() if FFMPEG_DIR is not None else cmd]
+    if args:
+        command.extend(args)
+    if kwargs:
+        command.extend(kwargs_to_cli_args(kwargs))
+    if file is not None:
+        command.append(file.as_posix() if isinstance(file, Path) else file)
+    return command
+
+
 def kwargs_to_cli_args(kwargs: dict[str, Any]) -> list[str]:
     args = []
     for k, v in sorted(kwargs.items()):
@@ -0,0 +1,225 @@
+"""
+Batch ffprobe execution with a persistent cache of probe results.
+
+Results may be cached in an SQLite3 DB, keyed by each file's path, and they are only considered valid while the file's
+size and modification time (in nanoseconds) match the values that were recorded when the file was probed.  Caching is
+disabled unless a path is configured via :func:`set_probe_cache_path` or the ``probe_cache_path`` ffmpeg config option.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+from typing import Any, Iterable, Iterator
+
+from .constants import PROBE_CACHE_PATH
+from .exceptions import FfmpegError
+from .ffmpeg import run_ffmpeg_cmd
+
+__all__ = ['ProbeCache', 'probe', 'probe_many', 'get_probe_cache', 'set_probe_cache_path']
+log = logging.getLogger(__name__)
+
+PROBE_ARGS = ('-show_error', '-find_stream_info', '-show_format', '-show_streams', '-of', 'json')
+
+_NotSet = object()
+_probe_cache: ProbeCache | None = _NotSet  # noqa
+_probe_cache_path: Path | None = None
+
+ProbeInfo = dict[str, Any]
+
+
+class ProbeCache:
+    """Persistent cache of ffprobe results, keyed by (path, size, mtime_ns)."""
+
+    def __init__(self, path: str | Path = PROBE_CACHE_PATH):
+        self.path = Path(path).expanduser()
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._db = connect(self.path.as_posix(), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS probe_results'
+                ' (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, info TEXT NOT NULL)'
+            )
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[{self.path.as_posix()}]>'
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, path: Path, stat_result: os.stat_result | None = None) -> ProbeInfo | None:
+        """
+        :param path: The path of a media file
+        :param stat_result: The result of calling :func:`os.stat` on the given path (to avoid a redundant call)
+        :return: The cached probe results for the given file, or None if no results were stored or the file changed
+        """
+        if stat_result is None:
+            stat_result = path.stat()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT info FROM probe_results WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (path.as_posix(), stat_result.st_size, stat_result.st_mtime_ns),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, path: Path, info: ProbeInfo, stat_result: os.stat_result | None = None):
+        self.set_many([(path, info, stat_result)])
+
+    def set_many(self, entries: Iterable[tuple[Path, ProbeInfo, os.stat_result | None]]):
+        rows = [
+            (path.as_posix(), stat_result.st_size, stat_result.st_mtime_ns, json.dumps(info))
+            for path, info, stat_result in ((p, i, s or p.stat()) for p, i, s in entries)
+        ]
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO probe_results VALUES (?, ?, ?, ?)', rows)
+
+    def prune(self) -> int:
+        """
+        Remove entries for files that no longer exist, or that were modified after they were probed.
+
+        :return: The number of entries that were removed
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT path, size, mtime_ns FROM probe_results').fetchall()
+        stale = []
+        for path, size, mtime_ns in rows:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                stale.append((path,))
+            else:
+                if stat_result.st_size != size or stat_result.st_mtime_ns != mtime_ns:
+                    stale.append((path,))
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM probe_results WHERE path = ?', stale)
+        return len(stale)
+
+
+def get_probe_cache() -> ProbeCache | None:
+    """
+    :return: The shared :class:`ProbeCache`, or None if no path was configured via :func:`set_probe_cache_path`.  The
+      cache DB is created the first time that this is called after a path was configured.
+    """
+    global _probe_cache
+
+    if _probe_cache is _NotSet:
+        _probe_cache = None if _probe_cache_path is None else ProbeCache(_probe_cache_path)
+    return _probe_cache
+
+
+def set_probe_cache_path(path: str | Path | None):
+    """
+    :param path: The path to use for the shared :class:`ProbeCache` (such as :data:`.constants.PROBE_CACHE_PATH`), or
+      None to disable caching of probe results (default)
+    """
+    global _probe_cache, _probe_cache_path
+
+    if _probe_cache is not _NotSet and _probe_cache is not None:
+        _probe_cache.close()
+    _probe_cache = _NotSet
+    _probe_cache_path = None if path is None else Path(path).expanduser()
+
+
+def probe(path: Path, cache: ProbeCache | None = _NotSet) -> ProbeInfo:  # noqa
+    """
+    :param path: The path of a media file
+    :param cache: The cache to use (defaults to the shared cache from :func:`get_probe_cache`; None to disable)
+    :return: The ffprobe results for the given file
+    """
+    if cache is _NotSet:
+        cache = get_probe_cache()
+    if cache is None:
+        return _run_probe(path)
+
+    try:
+        stat_result = path.stat()
+    except OSError as e:
+        raise FfmpegError(['ffprobe', path.as_posix()], f'Unable to read file: {e}') from e
+    if (info := cache.get(path, stat_result)) is not None:
+        log.debug(f'Using cached ffprobe results for {path.as_posix()!r}')
+        return info
+
+    info = _run_probe(path)
+    cache.set(path, info, stat_result)
+    return info
+
+
+def probe_many(
+    paths: Iterable[Path],
+    workers: int | None = None,
+    cache: ProbeCache | None = _NotSet,  # noqa
+    commit_interval: int = 100,
+) -> Iterator[tuple[Path, ProbeInfo]]:
+    """
+    Probe the given files, running up to ``workers`` ffprobe processes at a time.  Cached results are yielded
+    immediately, and results for files that needed to be probed are yielded in the order that they complete.  Files
+    that could not be probed are logged and skipped.
+
+    :param paths: The paths of media files
+    :param workers: The maximum number of ffprobe processes to run concurrently (default: based on core count)
+    :param cache: The cache to use (defaults to the shared cache from :func:`get_probe_cache`; None to disable)
+    :param commit_interval: The number of new results to accumulate before storing them in the cache
+    :return: Iterator that yields (path, probe results) tuples
+    """
+    if cache is _NotSet:
+        cache = get_probe_cache()
+
+    to_probe = []
+    for path in paths:
+        try:
+            stat_result = path.stat()
+        except OSError as e:
+            log.error(f'Unable to probe {path.as_posix()}: {e}')
+            continue
+        if cache is not None and (info := cache.get(path, stat_result)) is not None:
+            yield path, info
+        else:
+            to_probe.append((path, stat_result))
+
+    if not to_probe:
+        return
+
+    pending = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        # Each worker thread spends nearly all of its time waiting for its ffprobe subprocess to complete
+        futures = {executor.submit(_run_probe, path, logging.DEBUG - 1): (path, st) for path, st in to_probe}
+        try:
+            for future in as_completed(futures):
+                path, stat_result = futures[future]
+                try:
+                    info = future.result()
+                except FfmpegError as e:
+                    log.error(f'Error probing {path.as_posix()}: {e}', extra={'color': 'red'})
+                    continue
+
+                yield path, info
+                if cache is not None:
+                    pending.append((path, info, stat_result))
+                    if len(pending) >= commit_interval:
+                        cache.set_many(pending)
+                        pending = []
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+        finally:
+            if pending and cache is not None:
+                cache.set_many(pending)
+
+
+def _run_probe(path: Path, log_level: int = logging.DEBUG) -> ProbeInfo:
+    output = run_ffmpeg_cmd(PROBE_ARGS, path.as_posix(), cmd='ffprobe', capture=True, log_level=log_level)
+    log.log(log_level, f'ffprobe results for {path.as_posix()!r}: {output}')
+    try:
+        return json.loads(output)
+    except ValueError as e:
+        raise FfmpegError(['ffprobe', path.as_posix()], f'Unable to parse output: {e}') from e
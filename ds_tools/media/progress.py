@@ -0,0 +1,93 @@
+"""
+Parsing for the machine-readable progress info that ffmpeg writes when it is run with ``-progress pipe:1``.
+
+Each progress update is a block of ``key=value`` lines, and the last line in each block is either ``progress=continue``
+or ``progress=end``.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+__all__ = ['FfmpegProgress', 'iter_progress', 'PROGRESS_ARGS']
+log = logging.getLogger(__name__)
+
+PROGRESS_ARGS = ('-progress', 'pipe:1', '-nostats')
+
+
+@dataclass
+class FfmpegProgress:
+    frame: int = 0
+    fps: float = 0
+    speed: float = 0
+    out_time: float = 0  # seconds
+    total_size: int = 0
+    done: bool = False
+    pass_num: int = 1
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str], pass_num: int = 1) -> FfmpegProgress:
+        out_time_us = _number(data.get('out_time_us') or data.get('out_time_ms'), int)  # out_time_ms is actually µs
+        return cls(
+            frame=_number(data.get('frame'), int),
+            fps=_number(data.get('fps'), float),
+            speed=_number(data.get('speed', '').rstrip('x'), float),
+            out_time=max(out_time_us, 0) / 1_000_000,
+            total_size=_number(data.get('total_size'), int),
+            done=data.get('progress') == 'end',
+            pass_num=pass_num,
+        )
+
+    def eta(self, duration: float) -> float | None:
+        """
+        :param duration: The duration (in seconds) of the input being processed
+        :return: The estimated number of seconds until the current pass is complete, or None if it can't be estimated
+        """
+        if self.done:
+            return 0
+        elif not self.speed:
+            return None
+        return max(duration - self.out_time, 0) / self.speed
+
+    def percent(self, duration: float, passes: int = 1) -> float:
+        """
+        :param duration: The duration (in seconds) of the input being processed
+        :param passes: The total number of passes that will be run
+        :return: The percentage of all passes that have been completed
+        """
+        if self.done and self.pass_num == passes:
+            return 100
+        elif not duration:
+            return 0
+        pass_pct = min(self.out_time / duration, 1)
+        return 100 * (self.pass_num - 1 + pass_pct) / passes
+
+
+def iter_progress(lines: Iterable[bytes | str], pass_num: int = 1) -> Iterator[FfmpegProgress]:
+    """
+    :param lines: Lines of output from ffmpeg when it was run with ``-progress pipe:1``
+    :param pass_num: The encoding pass that the output is for
+    :return: Iterator that yields a :class:`FfmpegProgress` object for each complete block of progress info
+    """
+    data = {}
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        data[key] = value
+        if key == 'progress':
+            yield FfmpegProgress.from_dict(data, pass_num)
+            data = {}
+
+
+def _number(value: str | None, num_type: type[int] | type[float]) -> int | float:
+    try:
+        return num_type(value)
+    except (TypeError, ValueError):  # None or N/A
+        return num_type()
@@ -18,21 +18,22 @@ https://trac.ffmpeg.org/wiki/HWAccelIntro
 
 from __future__ import annotations
 
-import json
 import logging
 from collections import defaultdict
+from dataclasses import dataclass, field
 from fractions import Fraction
 from functools import cached_property
 from itertools import count
 from pathlib import Path
-from typing import Any, Iterable, Type
+from typing import Any, Iterable, Iterator, Type
 
 from ..caching.mixins import DictAttrProperty, DictAttrFieldNotFoundError
 from ..output.formatting import readable_bytes, format_duration
 from .constants import PIXEL_FORMATS_8_BIT, PIXEL_FORMATS_10_BIT
-from .ffmpeg import run_ffmpeg_cmd
+from .ffmpeg import stream_ffmpeg_cmd
+from .probe import probe, probe_many
 
-__all__ = ['Video', 'Stream', 'VideoStream', 'AudioStream', 'SubtitleStream', 'StreamType']
+__all__ = ['Video', 'Stream', 'VideoStream', 'AudioStream', 'SubtitleStream', 'StreamType', 'KeyframeIntervalStats']
 log = logging.getLogger(__name__)
 
 
@@ -45,13 +46,25 @@ class Video:
     def __init__(self, path: str | Path):
         self.path = Path(path).expanduser().resolve()
 
+    @classmethod
+    def probe_many(cls, paths: Iterable[str | Path], workers: int | None = None) -> Iterator[Video]:
+        """
+        Probe the given files concurrently (using cached results for files that have not changed since they were last
+        probed, if a probe cache was configured).  Videos are yielded in the order in which their results are
+        available, not necessarily the order in which paths were provided.
+
+        :param paths: Paths of video files
+        :param workers: The maximum number of ffprobe processes to run concurrently (default: based on core count)
+        :return: Iterator that yields Video objects with pre-populated :attr:`.info`
+        """
+        for path, info in probe_many((Path(p).expanduser().resolve() for p in paths), workers):
+            video = cls(path)
+            video.__dict__['info'] = info
+            yield video
+
     @cached_property
     def info(self) -> dict[str, Any]:
-        # cmd = ['-show_format', '-show_streams', '-of', 'json']
-        cmd = ['-show_error', '-find_stream_info', '-show_format', '-show_streams', '-of', 'json']
-        output = run_ffmpeg_cmd(cmd, self.path.as_posix(), cmd='ffprobe', capture=True)
-        log.debug(f'ffprobe results for {self.path.as_posix()!r}: {output}')
-        return json.loads(output)
+        return probe(self.path)
 
     def filtered_info(self) -> dict[str, dict[str, Any] | list[dict[str, Any]]]:
         return {'format': self.info['format'], 'streams': [s.filtered_info() for s in self.streams]}
@@ -198,20 +211,57 @@ class VideoStream(Stream, codec_type='video'):
 
     @cached_property
     def keyframe_interval_info(self) -> tuple[float, float, float]:
-        cmd = [
+        stats = self.analyze_keyframe_intervals()
+        return stats.min, stats.avg, stats.max
+
+    def analyze_keyframe_intervals(
+        self, bin_width: float | None = None, samples: int = 0, sample_duration: float = 30
+    ) -> KeyframeIntervalStats:
+        """
+        Calculate statistics about the intervals between keyframes in this stream.  Packet info is streamed from
+        ffprobe and processed line by line, so memory usage does not depend on the length of the video.
+
+        :param bin_width: Width (in seconds) of histogram bins to track, to support percentiles (default: no histogram)
+        :param samples: If specified, only read this many evenly spaced windows of the video for a faster approximate
+          result.  The entire video is read if the windows would cover all of it.
+        :param sample_duration: The duration (in seconds) of each sampled window
+        :return: The calculated keyframe interval stats
+        """
+        stats = KeyframeIntervalStats(bin_width)
+        base_cmd = [
             '-select_streams', f'v:{self.type_index}',
             '-show_entries', 'packet=pts_time,flags',
             '-of', 'csv=print_section=0',
         ]
-        output = run_ffmpeg_cmd(cmd, self.container.path.as_posix(), cmd='ffprobe', capture=True, decode=False)
-        times = list(map(float, (line.split(b',', 1)[0] for line in output.splitlines() if b'K' in line)))  # noqa
-        intervals = []
-        last = times[0]
-        for t in times[1:]:
-            intervals.append(t - last)
-            last = t
-        avg = (sum(intervals) / len(intervals)) if intervals else 0
-        return min(intervals), avg, max(intervals)
+        path = self.container.path.as_posix()
+        for window in self._sample_windows(samples, sample_duration):
+            cmd = base_cmd if window is None else [*base_cmd, '-read_intervals', window]
+            last = None  # Intervals that span the gap between two windows should not be counted
+            for line in stream_ffmpeg_cmd(cmd, path, cmd='ffprobe'):
+                pts_time, _, flags = line.partition(b',')
+                if b'K' not in flags:
+                    continue
+                try:
+                    pts_time = float(pts_time)
+                except ValueError:  # N/A
+                    continue
+                if last is not None:
+                    stats.add(pts_time - last)
+                last = pts_time
+
+        return stats
+
+    def _sample_windows(self, samples: int, sample_duration: float) -> list[str | None]:
+        if not samples:
+            return [None]
+        try:
+            duration = self.container.duration
+        except DictAttrFieldNotFoundError:
+            return [None]
+        if samples * sample_duration >= duration:
+            return [None]
+        step = duration / samples
+        return [f'{i * step:.3f}%+{sample_duration:.3f}' for i in range(samples)]
 
     def get_info(self, options: dict[str, bool] = None) -> dict[str, Any]:
         info = super().get_info(options)
@@ -226,7 +276,11 @@ class VideoStream(Stream, codec_type='video'):
         info['Resolution'] = '{} x {} (buffer: {} x {})'.format(*self.resolution, *self.buffer_dimensions)
         info['FPS'] = f'{self.fps:,.2f}'
         if options and options.get('keyframe_interval'):
-            min_int, avg_int, max_int = self.keyframe_interval_info
+            if samples := options.get('keyframe_samples'):
+                stats = self.analyze_keyframe_intervals(samples=samples)
+                min_int, avg_int, max_int = stats.min, stats.avg, stats.max
+            else:
+                min_int, avg_int, max_int = self.keyframe_interval_info
             min_f = min_int * self.fps
             avg_f = avg_int * self.fps
             max_f = max_int * self.fps
@@ -273,6 +327,65 @@ class SubtitleStream(Stream, codec_type='subtitle'):
 StreamType = Stream | VideoStream | AudioStream | SubtitleStream
 
 
+@dataclass
+class KeyframeIntervalStats:
+    """
+    Running keyframe interval statistics.  Only the count, sum, min, and max are tracked by default.  When a
+    ``bin_width`` is provided, a histogram of intervals is also tracked, from which approximate percentiles can be
+    calculated.
+    """
+
+    bin_width: float | None = None
+    count: int = 0
+    total: float = 0
+    min: float = 0
+    max: float = 0
+    histogram: dict[int, int] = field(default_factory=dict)
+
+    def add(self, interval: float):
+        if self.count:
+            if interval < self.min:
+                self.min = interval
+            elif interval > self.max:
+                self.max = interval
+        else:
+            self.min = self.max = interval
+        self.count += 1
+        self.total += interval
+        if self.bin_width:
+            key = int(interval // self.bin_width)
+            self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    @property
+    def avg(self) -> float:
+        return (self.total / self.count) if self.count else 0
+
+    def percentile(self, pct: float) -> float:
+        """
+        :param pct: The percentile to calculate, from 0 to 100
+        :return: The approximate interval (the midpoint of the histogram bin, limited to the observed min/max) at or
+          below which the given percentage of intervals fall
+        """
+        if not self.bin_width:
+            raise ValueError('Percentiles are only available when a bin_width was specified')
+        elif not 0 <= pct <= 100:
+            raise ValueError(f'Invalid {pct=} - expected a value between 0 and 100')
+        elif not self.count:
+            return 0
+
+        target = self.count * pct / 100
+        seen = 0
+        for key in sorted(self.histogram):
+            seen += self.histogram[key]
+            if seen >= target:
+                break
+        else:
+            return self.max
+
+        mid = (key + 0.5) * self.bin_width  # noqa
+        return min(max(mid, self.min), self.max)
+
+
 def _ints(text: str, delim: str, limit: int = 1) -> Iterable[int]:
     return map(int, text.split(delim, limit))
 
@@ -4,13 +4,26 @@ Misc utilities related to working with binary data.
 :author: Doug Skrypa
 """
 
+import mmap
+import re
 from enum import Enum
+from pathlib import Path
 from struct import unpack_from, error as StructError
 from typing import Union, Iterator
 
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
 
 class BytePattern:
-    """Find sequences of bytes that match the given input, where None is used as a wildcard for a single byte"""
+    """
+    Find sequences of bytes that match the given input, where None is used as a wildcard for a single byte.
+
+    The pattern is compiled to a bytes regex.  To find candidate positions, the longest run of literal bytes in the
+    pattern is located via a plain substring search (which is much faster than testing each position), then the full
+    pattern is only tested at those positions.  Overlapping matches are included.
+    """
 
     def __init__(self, *pattern: Union[bytes, None]):
         self._parts = []
@@ -19,19 +32,90 @@ class BytePattern:
                 self._parts.extend(obj)
             else:
                 self._parts.append(None)
-
-    def iter_matches(self, data: bytes) -> Iterator[tuple[int, bytes]]:
-        data = memoryview(data)
-        parts = self._parts
-        chunk_len = len(parts)
-        for i in range(len(data) - chunk_len):
-            chunk = data[i: i + chunk_len]
-            if all(p is None or b == p for b, p in zip(chunk, parts)):
-                yield i, bytes(chunk)
-
-    def all_matches(self, data: bytes) -> tuple[tuple[int, bytes], ...]:
+        if not self._parts:
+            raise ValueError('At least one byte or wildcard is required')
+
+        self.length = len(self._parts)
+        self.regex = re.compile(
+            b''.join(b'.' if p is None else re.escape(bytes((p,))) for p in self._parts), re.DOTALL
+        )
+        self._anchor_offset, anchor = _longest_literal_run(self._parts)
+        self._anchor = re.compile(re.escape(anchor)) if anchor else None
+
+    def __repr__(self) -> str:
+        pattern = ''.join('??' if p is None else f'{p:02x}' for p in self._parts)
+        return f'<{self.__class__.__name__}[{pattern}]>'
+
+    def iter_matches(self, data: Buffer, start: int = 0, end: int = None) -> Iterator[tuple[int, bytes]]:
+        """
+        :param data: The data to search.  Any object that supports the buffer protocol, including mmap objects, may be
+          provided.
+        :param start: The position in the data at which the search should begin
+        :param end: The position in the data at which the search should end (matches must end at or before this point)
+        :return: Iterator that yields 2-tuples of (position, matching bytes) in order of position
+        """
+        size = len(data) if end is None else min(end, len(data))
+        last = size - self.length  # The last position at which a match may begin
+        if self._anchor is None:  # The pattern consists only of wildcards
+            for i in range(start, last + 1):
+                yield i, bytes(data[i: i + self.length])
+            return
+
+        offset, anchor_search, full_match = self._anchor_offset, self._anchor.search, self.regex.match
+        pos = start + offset
+        while (m := anchor_search(data, pos, size)) is not None:
+            if (i := m.start() - offset) > last:
+                break
+            if offset == 0 and self.length == m.end() - m.start():
+                yield i, bytes(m.group())
+            elif (full := full_match(data, i, size)) is not None:
+                yield i, bytes(full.group())
+            pos = m.start() + 1
+
+    def all_matches(self, data: Buffer) -> tuple[tuple[int, bytes], ...]:
         return tuple(self.iter_matches(data))
 
+    def iter_file_matches(
+        self, path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[tuple[int, bytes]]:
+        """
+        Search the given file using a memory map, without reading it all into memory.  The file is mapped in chunks
+        that overlap by ``len(pattern) - 1`` bytes, so address space use is bounded even for very large files, and
+        matches that span a chunk boundary are still found.
+
+        :param path: The path of the file to search
+        :param chunk_size: The number of bytes to map at a time (rounded up to a multiple of the allocation granularity)
+        :return: Iterator that yields 2-tuples of (position, matching bytes) in order of position
+        """
+        granularity = mmap.ALLOCATIONGRANULARITY
+        chunk_size = max(granularity, -(-chunk_size // granularity) * granularity)
+        with Path(path).expanduser().open('rb') as f:
+            size = f.seek(0, 2)
+            for offset in range(0, size - self.length + 1, chunk_size):
+                length = min(chunk_size + self.length - 1, size - offset)
+                with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as mm:
+                    matches = self.iter_matches(mm)
+                    try:
+                        for pos, match in matches:
+                            if pos >= chunk_size:  # It will be found as part of the next chunk
+                                break
+                            yield offset + pos, match
+                    finally:
+                        matches.close()
+
+
+def _longest_literal_run(parts: list[Union[int, None]]) -> tuple[int, bytes]:
+    best_offset, best_len, run_start = 0, 0, None
+    for i, part in enumerate(parts + [None]):
+        if part is not None:
+            if run_start is None:
+                run_start = i
+        elif run_start is not None:
+            if i - run_start > best_len:
+                best_offset, best_len = run_start, i - run_start
+            run_start = None
+    return best_offset, bytes(parts[best_offset: best_offset + best_len])
+
 
 class Endian(Enum):
     NATIVE = '@'            # Native byte order, native size, native alignment
@@ -8,11 +8,12 @@ import re
 import logging
 import math
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from enum import Flag, auto, _decompose
+from enum import Flag, auto
 from functools import cached_property, reduce
-from operator import xor, or_
+from itertools import groupby
+from operator import xor, or_, itemgetter
 from random import Random
-from typing import Optional, Union, Iterator, Collection, Iterable, Any
+from typing import Optional, Union, Iterator, Collection, Iterable, Any, Callable, Hashable, Sequence
 
 from ..output.color import colored
 
@@ -72,8 +73,8 @@ class Color(Flag):
 
     @cached_property
     def parts(self) -> tuple['Color', ...]:
-        members, uncovered = _decompose(self.__class__, self._value_)
-        return tuple(members)
+        # Iterating over a Flag member yields its canonical members (the none member is only included when empty)
+        return tuple(sorted(self, key=lambda c: c._value_, reverse=True)) or (self,)
 
     @cached_property
     def non_none_parts(self) -> tuple['Color', ...]:
@@ -256,6 +257,458 @@ class Node:
     # endregion
 
 
+# region Compact State
+
+AXES = ('x', 'y', 'z')
+POSITIONS: tuple[Pos, ...] = tuple((x, y, z) for z in (-1, 0, 1) for y in (-1, 0, 1) for x in (-1, 0, 1))
+# Each sticker is identified by the position of the node that it is on + the index of the axis that it faces
+STICKERS: tuple[tuple[Pos, int], ...] = tuple((pos, axis) for pos in POSITIONS for axis in range(3) if pos[axis])
+STICKER_INDEXES: dict[tuple[Pos, int], int] = {sticker: i for i, sticker in enumerate(STICKERS)}
+MOVES: tuple[tuple[str, int, bool], ...] = tuple(
+    (axis, plane, clockwise) for axis in AXES for plane in (-1, 0, 1) for clockwise in (True, False)
+)
+
+
+def _move_permutation(axis: str, plane: int, clockwise: bool) -> tuple[int, ...]:
+    """
+    :return: A tuple where the value at each index is the index of the sticker that will be moved to that index
+    """
+    perm = list(range(len(STICKERS)))
+    for pos in POSITIONS:
+        if pos[AXES.index(axis)] != plane:
+            continue
+        node = Node.__new__(Node)  # Node's rotation logic is used so that moves are always equivalent
+        node.pos, node.faces = pos, (0, 1, 2)
+        node.rotate(axis, clockwise)
+        for new_axis, old_axis in enumerate(node.faces):
+            if pos[old_axis]:
+                perm[STICKER_INDEXES[(node.pos, new_axis)]] = STICKER_INDEXES[(pos, old_axis)]
+    return tuple(perm)
+
+
+MOVE_PERMUTATIONS = tuple(_move_permutation(*move) for move in MOVES)
+_MOVE_GETTERS = tuple(itemgetter(*perm) for perm in MOVE_PERMUTATIONS)
+_POS_STICKER_GETTERS = tuple(
+    itemgetter(*(i for i, (p, _) in enumerate(STICKERS) if p == pos)) for pos in POSITIONS if any(pos)
+)
+
+
+def _solved_stickers() -> bytes:
+    stickers = bytearray(len(STICKERS))
+    for color, pos in HOMES.items():
+        for axis, face in enumerate(color.home_faces):
+            if pos[axis]:
+                stickers[STICKER_INDEXES[(pos, axis)]] = face.value
+    return bytes(stickers)
+
+
+SOLVED_STICKERS = _solved_stickers()
+
+
+class CubeState:
+    """
+    Compact representation of a cube's state, as the :class:`Color` value of each of its 54 stickers (in the order of
+    :data:`STICKERS`).  Moves are applied by permuting the stickers using precomputed tables.
+    """
+
+    __slots__ = ('stickers',)
+
+    def __init__(self, stickers: bytes = None):
+        self.stickers = SOLVED_STICKERS if stickers is None else stickers
+
+    @classmethod
+    def from_cube(cls, cube: 'Cube') -> 'CubeState':
+        stickers = bytearray(len(STICKERS))
+        for node in cube.nodes:
+            for axis, face in enumerate(node.faces):
+                if node.pos[axis]:
+                    stickers[STICKER_INDEXES[(node.pos, axis)]] = face.value
+        return cls(bytes(stickers))
+
+    def to_cube(self) -> 'Cube':
+        stickers = self.stickers
+        faces = (
+            tuple(Color(stickers[STICKER_INDEXES[(pos, axis)]]) if pos[axis] else N for axis in range(3))
+            for pos in POSITIONS
+        )
+        return Cube(zip(POSITIONS, faces))
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[solved={self.percent_solved():.2%}]>'
+
+    def __eq__(self, other: 'CubeState') -> bool:
+        return self.stickers == other.stickers
+
+    def __hash__(self) -> int:
+        return hash(self.__class__) ^ hash(self.stickers)
+
+    def move(self, move: int) -> 'CubeState':
+        """
+        :param move: The index of the move in :data:`MOVES` to apply
+        :return: A new CubeState representing the state after applying the given move
+        """
+        return self.__class__(bytes(_MOVE_GETTERS[move](self.stickers)))
+
+    def solved(self) -> bool:
+        return self.stickers == SOLVED_STICKERS
+
+    def percent_solved(self) -> float:
+        stickers = self.stickers
+        solved = sum(getter(stickers) == getter(SOLVED_STICKERS) for getter in _POS_STICKER_GETTERS)
+        return (solved + 1) / 27  # The core never moves
+
+
+# endregion
+
+# region Solver
+
+CORNERS: tuple[Pos, ...] = tuple(pos for pos in POSITIONS if all(pos))
+EDGES: tuple[Pos, ...] = tuple(pos for pos in POSITIONS if len([v for v in pos if v]) == 2)
+_CENTER_STICKERS = tuple(i for i, (pos, _) in enumerate(STICKERS) if len([v for v in pos if v]) == 1)
+# The face moves (outer planes only) in the half turn metric, as sequences of MOVES indexes.  Each face has a clockwise
+# quarter turn, a counter-clockwise quarter turn, and a half turn, so the face of FACE_MOVES[i] is i // 3, and its axis
+# is i // 6.
+FACE_MOVES: tuple[tuple[int, ...], ...] = tuple(
+    moves
+    for axis in AXES
+    for plane in (-1, 1)
+    for cw, ccw in [(MOVES.index((axis, plane, True)), MOVES.index((axis, plane, False)))]
+    for moves in ((cw,), (ccw,), (cw, cw))
+)
+_SLICE_MOVES = tuple(i for i, (_, plane, _) in enumerate(MOVES) if plane == 0)
+_CENTERS_GETTER = itemgetter(*_CENTER_STICKERS)
+_REFERENCE_PRIORITY = {Color.white.value: 0, Color.yellow.value: 0, Color.red.value: 1, Color.orange.value: 1}
+
+
+def _face_move_permutation(moves: tuple[int, ...]) -> tuple[int, ...]:
+    return reduce(lambda perm, move: itemgetter(*MOVE_PERMUTATIONS[move])(perm), moves, tuple(range(len(STICKERS))))
+
+
+_FACE_MOVE_PERMUTATIONS = tuple(_face_move_permutation(moves) for moves in FACE_MOVES)
+_FACE_MOVE_GETTERS = tuple(itemgetter(*perm) for perm in _FACE_MOVE_PERMUTATIONS)
+
+
+def _phase_moves(quarter_turn_axes: str) -> tuple[int, ...]:
+    """
+    :param quarter_turn_axes: The axes whose faces may be turned a quarter turn - half turns are always allowed
+    :return: The indexes of the allowed moves in :data:`FACE_MOVES`
+    """
+    return tuple(i for i, moves in enumerate(FACE_MOVES) if len(moves) == 2 or AXES[i // 6] in quarter_turn_axes)
+
+
+def _cubie_moves(perm: tuple[int, ...], positions: tuple[Pos, ...]) -> tuple[tuple[int, ...], tuple[tuple[int, ...]]]:
+    """
+    :param perm: A sticker permutation (see :func:`_move_permutation`)
+    :param positions: The positions of one type of cubie (corners or edges)
+    :return: Tuple of (the index of the position that each position's cubie is moved from, and for each position, a
+      tuple that maps each axis that its cubie's stickers faced before the move to the axis that they face after it)
+    """
+    pos_indexes = {pos: i for i, pos in enumerate(positions)}
+    sources, axis_maps = [], []
+    for pos in positions:
+        axis_map = [-1, -1, -1]
+        for axis in range(3):
+            if pos[axis]:
+                src_pos, src_axis = STICKERS[perm[STICKER_INDEXES[(pos, axis)]]]
+                axis_map[src_axis] = axis
+        sources.append(pos_indexes[src_pos])  # noqa
+        axis_maps.append(tuple(axis_map))
+    return tuple(sources), tuple(axis_maps)
+
+
+def _cubies(stickers: bytes, positions: tuple[Pos, ...]) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """
+    Each cubie is identified by the index of its home position.  A cubie's orientation is the axis that its reference
+    sticker faces, where its reference sticker is its white / yellow sticker, or its red / orange sticker if it has
+    neither (every corner has a white or yellow sticker, and every edge has one or a red / orange sticker).
+
+    :param stickers: The stickers of a :class:`CubeState`
+    :param positions: The positions of one type of cubie (corners or edges)
+    :return: Tuple of (the cubie at each position, the orientation of the cubie at each position)
+    """
+    cubies, orientations = [], []
+    for pos in positions:
+        colors = {axis: stickers[STICKER_INDEXES[(pos, axis)]] for axis in range(3) if pos[axis]}
+        cubies.append(positions.index(HOMES[Color(reduce(or_, colors.values()))]))
+        orientations.append(min(colors, key=lambda axis: _REFERENCE_PRIORITY.get(colors[axis], 2)))
+    return tuple(cubies), tuple(orientations)
+
+
+class Coordinate:
+    """
+    Move and distance tables for one aspect of a cube's state (such as the orientation of its corners), covering every
+    state that can be reached from the solved state via a given set of moves.  States are indexed in breadth-first
+    order, so the solved state's index is always 0.
+    """
+
+    __slots__ = ('index', 'moves', 'distances')
+
+    def __init__(self, solved: Hashable, move_funcs: Sequence[Callable[[Hashable], Hashable]]):
+        """
+        :param solved: The solved state
+        :param move_funcs: Functions that return the state that results from applying each move to a given state
+        """
+        self.index = index = {solved: 0}
+        self.moves = moves = tuple([] for _ in move_funcs)
+        self.distances = distances = bytearray(1)
+        states = [solved]
+        for i, state in enumerate(states):  # States are appended while iterating, so every reachable state is visited
+            distance = distances[i] + 1
+            for move_func, table in zip(move_funcs, moves):
+                if (new_index := index.get(new_state := move_func(state))) is None:
+                    new_index = index[new_state] = len(states)
+                    states.append(new_state)
+                    distances.append(distance)
+                table.append(new_index)
+
+    def path(self, state: int) -> list[int]:
+        """
+        :param state: The index of a state
+        :return: The indexes of the moves (in this coordinate's list of moves) that lead to the solved state via a
+          shortest path
+        """
+        path, distances = [], self.distances
+        while distance := distances[state]:
+            move, state = next((m, s) for m, table in enumerate(self.moves) if distances[s := table[state]] < distance)
+            path.append(move)
+        return path
+
+
+class Solver:
+    """
+    Solves cubes in the half turn metric in 4 phases, as described by Morwen Thistlethwaite.  Each phase moves the cube
+    into a smaller subgroup of the cube group, where the next phase only needs to use moves that stay in that subgroup:
+
+    - G0 -> G1: orient the edges, using any face move
+    - G1 -> G2: orient the corners, and move the E slice edges into the E slice, using only half turns of the red /
+      orange faces
+    - G2 -> G3: move the corners into their G3 orbits, and the M slice edges into the M slice, using only half turns
+      of the green / blue and red / orange faces
+    - G3 -> solved: using only half turns
+
+    The centers are first moved home via slice moves, since they do not move during the face move phases.
+
+    Phases use IDA*, with the max distance reported by the coordinates for the phase as the heuristic, or they simply
+    follow the shortest path in the coordinate's table when a single coordinate covers the entire phase.  Solutions are
+    not optimal (they are typically 40-60 quarter turns), but they are deterministic, and they are typically found in
+    a few milliseconds.  The tables are built in memory in under a second - see :func:`get_solver`.
+    """
+
+    def __init__(self):
+        moves = [_phase_moves(axes) for axes in ('xyz', 'xz', 'z', '')]
+        self.phase_moves = tuple(moves)
+        self._successors = tuple(self._allowed_successors(phase_moves) for phase_moves in moves)
+        corner_moves = [_cubie_moves(perm, CORNERS) for perm in _FACE_MOVE_PERMUTATIONS]
+        edge_moves = [_cubie_moves(perm, EDGES) for perm in _FACE_MOVE_PERMUTATIONS]
+        corners, corner_orientation = _cubies(SOLVED_STICKERS, CORNERS)
+        edges, edge_orientation = _cubies(SOLVED_STICKERS, EDGES)
+
+        self.centers = Coordinate(
+            _CENTERS_GETTER(SOLVED_STICKERS),
+            [_sub_permutation(MOVE_PERMUTATIONS[move], _CENTER_STICKERS) for move in _SLICE_MOVES],
+        )
+        # Phase 1
+        self.flip = Coordinate(edge_orientation, [_orientation_func(*edge_moves[move]) for move in moves[0]])
+        # Phase 2
+        self.twist = Coordinate(corner_orientation, [_orientation_func(*corner_moves[move]) for move in moves[1]])
+        e_slice_positions = tuple(i for i, pos in enumerate(EDGES) if not pos[2])
+        self._e_slice = frozenset(e_slice_positions)
+        self.e_slice = Coordinate(
+            tuple(edge in self._e_slice for edge in edges), [itemgetter(*edge_moves[move][0]) for move in moves[1]]
+        )
+        # Phase 4 (its corner permutations are needed for phase 3).  The corners are combined with the E slice edges to
+        # provide a stronger heuristic than the corners alone.
+        self._e_slice_getter = itemgetter(*e_slice_positions)
+        self.corners_e_slice = Coordinate(
+            (corners, self._e_slice_getter(edges)),
+            [
+                _pair_func(itemgetter(*corner_moves[move][0]), _sub_permutation(edge_moves[move][0], e_slice_positions))
+                for move in moves[3]
+            ],
+        )
+        self.edge_perm = Coordinate(edges, [itemgetter(*edge_moves[move][0]) for move in moves[3]])
+        # Phase 3
+        # Each corner permutation in G3 is used to re-label the corners of a given permutation, and the smallest result
+        # identifies the coset of G3 that contains that permutation.
+        g3_corners = dict.fromkeys(perm for perm, _ in self.corners_e_slice.index)
+        self._relabel_tables = tuple(bytes(perm) + bytes(range(len(perm), 256)) for perm in g3_corners)
+        self.corner_coset = Coordinate(
+            self._corner_coset(corners), [self._coset_move_func(corner_moves[move][0]) for move in moves[2]]
+        )
+        ud_positions = tuple(i for i, pos in enumerate(EDGES) if pos[2])
+        self._m_slice = frozenset(i for i, pos in enumerate(EDGES) if not pos[0])
+        self._ud_getter = itemgetter(*ud_positions)
+        self.m_slice = Coordinate(
+            tuple(edges[i] in self._m_slice for i in ud_positions),
+            [_sub_permutation(edge_moves[move][0], ud_positions) for move in moves[2]],
+        )
+
+    @staticmethod
+    def _allowed_successors(moves: tuple[int, ...]) -> dict[int, tuple[tuple[int, int], ...]]:
+        """
+        Moves on the same face can always be combined, and moves on opposite faces commute, so only one ordering of
+        moves on opposite faces needs to be searched.
+
+        :param moves: The indexes of the moves (in :data:`FACE_MOVES`) that are allowed in a phase
+        :return: Mapping of {previous move: ((index in the phase's moves, move), ...)}, where the previous move is -1
+          for the first move
+        """
+        successors = {-1: tuple(enumerate(moves))}
+        for prev in moves:
+            successors[prev] = tuple(
+                (i, move) for i, move in enumerate(moves)
+                if move // 3 != prev // 3 and (move // 6 != prev // 6 or move > prev)
+            )
+        return successors
+
+    def _corner_coset(self, corners: Sequence[int]) -> bytes:
+        corners = bytes(corners)
+        return min(corners.translate(table) for table in self._relabel_tables)
+
+    def _coset_move_func(self, sources: tuple[int, ...]) -> Callable[[bytes], bytes]:
+        getter, corner_coset = itemgetter(*sources), self._corner_coset
+        return lambda corners: corner_coset(getter(corners))
+
+    def _search(self, phase: int, states: tuple[int, int], coordinates: tuple[Coordinate, Coordinate]) -> list[int]:
+        """
+        :param phase: The index of the phase
+        :param states: The index of the current state in each of the given coordinates
+        :param coordinates: The two coordinates that must both be solved to complete the phase
+        :return: The indexes of the moves (in :data:`FACE_MOVES`) that complete the phase
+        """
+        successors, path = self._successors[phase], []
+        (a_moves, a_distances), (b_moves, b_distances) = ((c.moves, c.distances) for c in coordinates)
+
+        def search(a: int, b: int, depth: int, prev: int) -> bool:
+            # Successors are pruned before recursing, since most of them are not within the remaining depth
+            for i, move in successors[prev]:
+                if a_distances[next_a := a_moves[i][a]] < depth and b_distances[next_b := b_moves[i][b]] < depth:
+                    path.append(move)
+                    if not (a_distances[next_a] or b_distances[next_b]) or search(next_a, next_b, depth - 1, move):
+                        return True
+                    path.pop()
+            return False
+
+        a, b = states
+        if not (depth := max(a_distances[a], b_distances[b])):
+            return path
+        while not search(a, b, depth, -1):
+            depth += 1
+        return path
+
+    def solve(self, stickers: bytes) -> list[int]:
+        """
+        :param stickers: The stickers of a :class:`CubeState`
+        :return: The indexes of the moves (in :data:`MOVES`) that solve the given state
+        """
+        try:
+            moves = [_SLICE_MOVES[i] for i in self.centers.path(self.centers.index[_CENTERS_GETTER(stickers)])]
+        except KeyError as e:
+            raise NoSolutionFound('Invalid cube state - the centers cannot be solved') from e
+
+        stickers = reduce(lambda s, move: bytes(_MOVE_GETTERS[move](s)), moves, stickers)
+        for phase in range(4):
+            try:
+                path = self._solve_phase(phase, stickers)
+            except (KeyError, ValueError) as e:  # The state is not reachable from the solved state
+                raise NoSolutionFound(f'Invalid cube state - unable to complete phase {phase + 1}') from e
+            stickers = reduce(lambda s, move: bytes(_FACE_MOVE_GETTERS[move](s)), path, stickers)
+            moves.extend(move for face_move in path for move in FACE_MOVES[face_move])
+
+        if stickers != SOLVED_STICKERS:
+            raise NoSolutionFound('Invalid cube state - the solution did not solve it')
+        return _simplify(moves)
+
+    def _solve_phase(self, phase: int, stickers: bytes) -> list[int]:
+        corners, corner_orientation = _cubies(stickers, CORNERS)
+        edges, edge_orientation = _cubies(stickers, EDGES)
+        if phase == 0:
+            return [self.phase_moves[0][i] for i in self.flip.path(self.flip.index[edge_orientation])]
+        elif phase == 1:
+            e_slice = tuple(edge in self._e_slice for edge in edges)
+            states = (self.twist.index[corner_orientation], self.e_slice.index[e_slice])
+            return self._search(1, states, (self.twist, self.e_slice))
+        elif phase == 2:
+            m_slice = tuple(edge in self._m_slice for edge in self._ud_getter(edges))
+            states = (self.corner_coset.index[self._corner_coset(corners)], self.m_slice.index[m_slice])
+            return self._search(2, states, (self.corner_coset, self.m_slice))
+        else:
+            states = (self.corners_e_slice.index[(corners, self._e_slice_getter(edges))], self.edge_perm.index[edges])
+            return self._search(3, states, (self.corners_e_slice, self.edge_perm))
+
+
+def _orientation_func(sources: tuple[int, ...], axis_maps: tuple[tuple[int, ...]]) -> Callable[[tuple], tuple]:
+    pairs = tuple(zip(sources, axis_maps))
+    return lambda orientations: tuple(axis_map[orientations[src]] for src, axis_map in pairs)
+
+
+def _pair_func(a_func: Callable, b_func: Callable) -> Callable[[tuple], tuple]:
+    return lambda pair: (a_func(pair[0]), b_func(pair[1]))
+
+
+def _sub_permutation(sources: tuple[int, ...], indexes: tuple[int, ...]) -> Callable[[Sequence], tuple]:
+    """
+    :param sources: A permutation, where the value at each index is the index that the item there is moved from
+    :param indexes: The indexes of a subset of the items that is closed under the given permutation
+    :return: A function that applies the given permutation to a sequence containing only the given subset of items
+    """
+    positions = {index: i for i, index in enumerate(indexes)}
+    return itemgetter(*(positions[sources[index]] for index in indexes))
+
+
+def _simplify(moves: list[int]) -> list[int]:
+    """
+    Moves on the same axis commute, so consecutive moves on the same axis are combined so that each plane is turned at
+    most once (or twice for a half turn) in each run of such moves.
+
+    :param moves: The indexes of moves in :data:`MOVES`
+    :return: The indexes of an equivalent, shorter or equal length sequence of moves
+    """
+    while True:
+        simplified = []
+        for axis, axis_moves in groupby(moves, key=lambda move: MOVES[move][0]):
+            turns = {-1: 0, 0: 0, 1: 0}
+            for move in axis_moves:
+                _, plane, clockwise = MOVES[move]
+                turns[plane] += 1 if clockwise else -1
+            for plane, quarter_turns in turns.items():
+                if quarter_turns := quarter_turns % 4:
+                    move = MOVES.index((axis, plane, quarter_turns != 3))
+                    simplified.extend([move] * (quarter_turns % 2 or 2))
+
+        if simplified == moves:
+            return simplified
+        moves = simplified
+
+
+_solver: Optional[Solver] = None
+
+
+def get_solver() -> Solver:
+    """
+    :return: The shared :class:`Solver`.  Its tables are built in memory the first time that this is called, which
+      takes under a second.
+    """
+    global _solver
+
+    if _solver is None:
+        _solver = Solver()
+    return _solver
+
+
+def solve_state(state: CubeState) -> list[int]:
+    """
+    Find a solution for the given state via the shared :class:`Solver`.
+
+    :param state: The state to solve
+    :return: The indexes of the moves (in :data:`MOVES`) that solve the given state
+    """
+    return get_solver().solve(state.stickers)
+
+
+# endregion
+
+
 class Cube:
     def __init__(self, pos_faces_iter: Iterable[tuple[Pos, Union[Faces, Color]]] = None):
         if pos_faces_iter is None:
@@ -455,11 +908,8 @@ class Cube:
     def _find_random_solution(
         self, max_moves: int = 80, max_attempts: int = 1_000_000, seed: Seed = None, use_print: bool = False
     ) -> 'Cube':
-        cube = self.copy()
-        copy_node = Node.copy
-        orig_nodes = tuple(map(copy_node, cube.nodes))
-        # make_copy = self.copy
-        axes = ('x', 'y', 'z')
+        start_stickers = CubeState.from_cube(self).stickers
+        move_getters, solved_stickers = _MOVE_GETTERS, SOLVED_STICKERS
         getrandbits = Random(seed).getrandbits  # See Cube.randomize() for additional notes
 
         def rand_2_or_3(n: int) -> int:  # Equivalent to random._randbelow for n=2..3; used by both choice & randrange
@@ -469,27 +919,42 @@ class Cube:
             return r
 
         report_func = print if use_print else log.info
-        axis_to_rotate_method = cube._axis_to_rotate_method
         report_interval = _report_interval(max_attempts)
         for attempt in range(1, max_attempts + 1):
             if attempt % report_interval == 0:
                 report_func(f'Beginning random solution {attempt=:,d}')
-            # cube = make_copy()
-            cube.nodes = tuple(map(copy_node, orig_nodes))
-            cube.history = []
 
+            stickers = start_stickers
+            moves = []
             for _ in range(max_moves):
-                # solved_pct = cube.rotate(axes[rand_2_or_3(3)], rand_2_or_3(3) - 1, rand_2_or_3(2))
-                solved_pct = axis_to_rotate_method[axes[rand_2_or_3(3)]](cube, rand_2_or_3(3) - 1, rand_2_or_3(2))
-                # cube.rotate(axes[rand_2_or_3(3)], rand_2_or_3(3) - 1, True)
-                if solved_pct == 1:
-                # if cube.solved():
-                    report_func(f'Found random solution with moves={len(cube.history)} on {attempt=}')
+                # Equivalent to MOVES.index((axes[rand_2_or_3(3)], rand_2_or_3(3) - 1, bool(rand_2_or_3(2))))
+                moves.append(move := rand_2_or_3(3) * 6 + rand_2_or_3(3) * 2 + 1 - rand_2_or_3(2))
+                stickers = bytes(move_getters[move](stickers))
+                if stickers == solved_stickers:
+                    report_func(f'Found random solution with moves={len(moves)} on {attempt=}')
+                    cube = self.copy()
+                    cube.history = []
+                    for move in moves:  # noqa
+                        cube.rotate(*MOVES[move])
                     cube.print_history()
                     return cube
 
         raise NoSolutionFound(f'No random solution was found with {max_moves=} in {max_attempts=}')
 
+    def find_solution(self) -> 'Cube':
+        """
+        Find a solution via the multi-phase :class:`Solver`.  Solutions are not optimal, but they are deterministic.
+
+        :return: A copy of this cube with the solution applied, where the solution's moves are stored in its history
+        """
+        moves = solve_state(CubeState.from_cube(self))
+        cube = self.copy()
+        cube.history = []
+        cube._init_pct = self.percent_solved()
+        for move in moves:
+            cube.rotate(*MOVES[move])
+        return cube
+
     def find_semi_random_solution(self, seed: Seed = None):
         cube = self.copy()
         while not cube.solved():
@@ -510,25 +975,6 @@ class Cube:
 
         return cube
 
-    # def find_solution(self, max_moves: int = 20) -> 'Cube':
-    #     """
-    #     :param max_moves: Max moves to allow for a solution (20 was apparently proven to be the max necessary)
-    #     :return:
-    #     """
-    #     axes = ('x', 'y', 'z')
-    #     planes = (-1, 0, 1)
-    #     bools = (True, False)
-    #     visited = set()
-    #     original = self.copy()
-    #     active = self.copy()
-    #     for axis in axes:
-    #         for clockwise in bools:
-    #             for plane in planes:
-    #                 active.rotate(axis, plane, clockwise)
-    #                 if active.solved():
-    #                     return active
-    #                 # else:
-
 
 def _report_interval(attempts: int) -> int:
     return 100_000 if attempts >= 1_000_000 else round(attempts, -int(math.log(attempts, 10))) / 10
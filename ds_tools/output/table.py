@@ -12,21 +12,25 @@ import sys
 from contextlib import contextmanager
 from functools import cached_property
 from io import StringIO
+from itertools import chain, islice
 from shutil import get_terminal_size
 from types import GeneratorType
-from typing import Union, Collection, TextIO, Optional, Mapping, Any, Type, Iterable, Callable
+from weakref import WeakSet
+from typing import Union, Collection, TextIO, Optional, Mapping, Any, Type, Iterable, Iterator, Callable, Sequence
 from unicodedata import normalize
 
-from wcwidth import wcswidth
+from wcwidth import wcswidth, wcwidth
 
 from ..caching.mixins import ClearableCachedPropertyMixin
 from .color import colored
 
-__all__ = ['Column', 'SimpleColumn', 'Table', 'TableBar', 'HeaderRow', 'TableFormatException']
+__all__ = ['Column', 'SimpleColumn', 'Table', 'TableBar', 'HeaderRow', 'RowFormatter', 'TableFormatException']
 
 ANSI_COLOR_RX = re.compile(r'(\033\[\d+;?\d*;?\d*m)(.*)(\033\[\d+;?\d*;?\d*m)')
-Row = Union[Mapping[str, Any], 'TableBar', 'HeaderRow', Type['TableBar'], Type['HeaderRow']]
+OVERFLOW_MODES = ('ignore', 'truncate')
+Row = Union[Mapping[str, Any], tuple[Any, ...], list[Any], 'TableBar', 'HeaderRow', Type['TableBar'], Type['HeaderRow']]
 Formatter = Callable[[Any, str], str]
+WIDTH_CACHE_SIZE = 65_536
 
 
 class Column:
@@ -50,7 +54,7 @@ class Column:
     :param ftype: String formatting type/format indicator (default: none; example: ',d' for thousands indicator)
     """
 
-    __slots__ = ('key', 'title', '_width', 'display', 'align', 'ftype', 'formatter')
+    __slots__ = ('key', 'title', '_width', 'display', 'align', 'ftype', 'formatter', '_tables')
 
     def __init__(
         self,
@@ -69,6 +73,7 @@ class Column:
         self.align = align
         self.ftype = ftype
         self.formatter = formatter
+        self._tables: WeakSet[Table] = WeakSet()  # Tables that need to be notified when this column's width changes
         self.width = width
 
     def __repr__(self) -> str:
@@ -123,19 +128,41 @@ class Column:
             return self._header_fmt.format(value)
 
     def format(self, value: Any) -> str:
+        if not self.formatter and isinstance(value, str) and (m := ANSI_COLOR_RX.match(value)):
+            # The padding is based on the display width of the text between the color codes
+            prefix, value, suffix = m.groups()
+            return prefix + self.format(value) + suffix
+
         with self._temp_width(value):
             try:
                 if self.formatter:
                     return self.formatter(value, self._format(value))
                 else:
-                    if isinstance(value, str) and (m := ANSI_COLOR_RX.match(value)):
-                        prefix, value, suffix = m.groups()
-                        return prefix + self._format(value) + suffix
-                    else:
-                        return self._format(value)
+                    return self._format(value)
             except TypeError as e:
                 raise TableFormatException('column', self.row_fmt, value, e) from e
 
+    def truncate(self, value: Any, ellipsis: str = '…') -> Any:
+        """
+        Truncate the given value so that it fits within this column's current width.  Values that already fit are
+        returned unchanged so that type-specific format strings continue to apply to them.
+        """
+        try:
+            text = self._test_fmt.format(value)
+        except ValueError:
+            text = str(value)
+
+        if mono_width(text) <= self._width:
+            return value
+
+        text = normalize('NFC', text)
+        max_width, total = self._width - mono_width(ellipsis), 0
+        for i, char in enumerate(text):
+            total += max(wcwidth(char), 0)
+            if total > max_width:
+                return text[:i] + ellipsis
+        return text + ellipsis
+
     @property
     def width(self) -> int:
         return self._width
@@ -149,6 +176,8 @@ class Column:
                 raise ValueError(f'{self}: Unable to determine width (likely no values were found)') from e
             except ValueError as e2:  # TODO: wtf?
                 raise ValueError('No results.') from e2
+        for table in self._tables:
+            table._width_changed()
 
     def _len(self, text: str) -> int:
         char_count = len(text)
@@ -230,6 +259,105 @@ class HeaderRow:
         return None
 
 
+class RowFormatter:
+    """
+    A row formatter that is compiled once for a given set of columns (and their widths), and then re-used for every
+    row.  Formatted values that only contain ASCII characters (the vast majority, in practice) are used as-is, without
+    needing to compute their display width.  Display widths are only computed for values that contain non-ASCII
+    characters, and those widths are cached per distinct string.
+
+    Rows may be provided as mappings via :meth:`.format_row`, or as sequences of values in column order via
+    :meth:`.format_values`, which avoids the need to build a dict for each row.
+
+    Output is equivalent to formatting each value via :meth:`Column.format`.  If the width of any of the given
+    columns changes, then a new formatter must be created (a :class:`Table` does this automatically).
+    """
+
+    __slots__ = ('keys', '_funcs', '_widths')
+
+    def __init__(self, columns: Iterable[Column]):
+        columns = list(columns)
+        self.keys = tuple(c.key for c in columns)
+        self._widths: dict[str, int] = {}
+        self._funcs = tuple(self._compile(c) for c in columns)
+
+    def display_width(self, text: str) -> int:
+        try:
+            return self._widths[text]
+        except KeyError:
+            pass
+        if len(self._widths) >= WIDTH_CACHE_SIZE:
+            self._widths.clear()
+        self._widths[text] = width = mono_width(text)
+        return width
+
+    def _compile(self, column: Column) -> Callable[[Any], str]:
+        align, ftype, width, formatter = column.align, column.ftype, column.width, column.formatter
+        test_fmt = column._test_fmt.format
+        formats = {}
+
+        def get_formats(col_width: int):
+            try:
+                return formats[col_width]
+            except KeyError:
+                formats[col_width] = fmts = (
+                    f'{{:{align}{col_width}{ftype}}}'.format, f'{{:{align}{col_width}}}'.format
+                )
+                return fmts
+
+        row_fmt, alt_fmt = get_formats(width)
+        display_width = self.display_width
+
+        def format_value(value: Any) -> str:
+            try:
+                formatted = row_fmt(value)
+            except ValueError:
+                formatted = alt_fmt(value)
+            except TypeError as e:
+                raise TableFormatException('column', column.row_fmt, value, e) from e
+            if formatted.isascii() and '\033' not in formatted:
+                return formatter(value, formatted) if formatter else formatted
+            return _format_value(value)
+
+        def _format_value(value: Any) -> str:
+            # Equivalent to Column.format, but with cached format strings and display widths
+            if not formatter and isinstance(value, str) and (m := ANSI_COLOR_RX.match(value)):
+                prefix, inner, suffix = m.groups()
+                return prefix + _format_value(inner) + suffix
+
+            try:
+                text = test_fmt(value)
+            except ValueError:
+                text = str(value)
+
+            col_width = width
+            if (str_width := display_width(text)) > 0 and (extra := str_width - len(text)):
+                col_width -= extra
+
+            fmt, alt = get_formats(col_width) if col_width != width else (row_fmt, alt_fmt)
+            try:
+                try:
+                    formatted = fmt(value)
+                except ValueError:
+                    formatted = alt(value)
+            except TypeError as e:
+                raise TableFormatException('column', column.row_fmt, value, e) from e
+            return formatter(value, formatted) if formatter else formatted
+
+        return format_value
+
+    def format_values(self, values: Iterable[Any]) -> str:
+        """
+        :param values: The values in a row, in the same order as the columns that this formatter was compiled for.
+          None values are treated as empty strings.
+        :return: The formatted row
+        """
+        return '  '.join([func('' if val is None else val) for func, val in zip(self._funcs, values)]).rstrip()
+
+    def format_row(self, row: Mapping[str, Any]) -> str:
+        return self.format_values([row.get(key) for key in self.keys])
+
+
 class Table(ClearableCachedPropertyMixin):
     def __init__(
         self,
@@ -247,6 +375,8 @@ class Table(ClearableCachedPropertyMixin):
             raise ValueError(f'Invalid output mode: {mode}')
         self.mode = mode
         self._columns = list(columns[0] if len(columns) == 1 and isinstance(columns[0], GeneratorType) else columns)
+        for column in self._columns:
+            column._tables.add(self)
         self.auto_header = auto_header
         self.auto_bar = auto_bar
         self.sort = sort
@@ -272,6 +402,7 @@ class Table(ClearableCachedPropertyMixin):
 
     def append(self, column: Column | SimpleColumn):
         self._columns.append(column)
+        column._tables.add(self)
         if column.display:
             self.clear_cached_properties()
 
@@ -304,6 +435,10 @@ class Table(ClearableCachedPropertyMixin):
     def row_fmt(self) -> str:
         return '  '.join(c.row_fmt for c in self.columns)
 
+    @cached_property
+    def row_formatter(self) -> RowFormatter:
+        return RowFormatter(self.columns)
+
     @cached_property
     def has_custom_formatter(self) -> bool:
         return any(c.formatter is not None for c in self.columns)
@@ -325,12 +460,46 @@ class Table(ClearableCachedPropertyMixin):
 
     @classmethod
     def auto_print_rows(
-        cls, rows, header=True, bar=True, sort=False, sort_by=None, mode='table', sort_keys=True, **kwargs
+        cls,
+        rows,
+        header=True,
+        bar=True,
+        sort=False,
+        sort_by=None,
+        mode='table',
+        sort_keys=True,
+        sample_size: int = 1000,
+        **kwargs,
     ):
-        if len(rows) < 1:
-            return
+        """
+        Print the given rows using a table with columns derived from the keys in the first row.
+
+        Sequences and dicts are sized using every row.  Any other iterable (such as a generator) is consumed lazily -
+        column widths are determined from the first ``sample_size`` rows, and the remaining rows are printed as they
+        are produced.  See :meth:`.stream_rows` for more info.
+        """
         if isinstance(rows, dict):
             rows = [row for row in rows.values()]
+        elif not isinstance(rows, Collection):
+            rows = iter(rows)
+            sample = list(islice(rows, sample_size))
+            if not sample:
+                return
+            keys = sorted(sample[0].keys()) if type(sample[0]) is dict and sort_keys else sample[0].keys()
+            tbl = cls(
+                *(Column(k, k, 0) for k in keys),
+                mode=mode,
+                auto_header=header,
+                auto_bar=bar,
+                sort=sort,
+                sort_by=sort_by,
+                **kwargs
+            )
+            tbl.stream_rows(chain(sample, rows), sample_size=sample_size)
+            return
+
+        if len(rows) < 1:
+            return
 
         keys = sorted(rows[0].keys()) if type(rows[0]) is dict and sort_keys else rows[0].keys()
         tbl = cls(
@@ -413,6 +582,8 @@ class Table(ClearableCachedPropertyMixin):
                 return self.header_bar(row.char), fix_types
             elif isinstance(row, HeaderRow) or row is HeaderRow:
                 return self.header_row, fix_types
+            elif isinstance(row, (tuple, list)):
+                return self._format_values(row, fix_types)
 
             # Don't str() all row[k] values! That will break type-specific format strings (e.g., int/float)
             if fix_types:
@@ -425,23 +596,45 @@ class Table(ClearableCachedPropertyMixin):
                 row = {k: v if (v := row.get(k)) is not None else '' for k in self.keys}
 
             if self.has_custom_formatter:
-                row_str = '  '.join(c.format(row[c.key]) for c in self.columns)
+                row_str = self.row_formatter.format_row(row)
             else:
                 try:
                     row_str = self.row_fmt.format(row)
                     if self.fix_ansi_width and ANSI_COLOR_RX.search(row_str):
-                        row_str = '  '.join(c.format(row[c.key]) for c in self.columns)
+                        row_str = self.row_formatter.format_row(row)
                 except TypeError as e:
                     if fix_types is None:
                         return self._format_row(row, (list, dict, set, tuple))
                     raise TableFormatException('row', self.row_fmt, row, e) from e
                 except ValueError:
-                    row_str = '  '.join(c.format(row[c.key]) for c in self.columns)
+                    row_str = self.row_formatter.format_row(row)
 
             return row_str.rstrip(), fix_types
         else:
             raise ValueError(f'Invalid table mode={self.mode!r}')
 
+    def format_values(self, values: Sequence[Any]) -> str:
+        """
+        Format a row that is provided as a sequence of values in the same order as this table's displayed columns.  This
+        avoids the need to build a dict for each row, and it uses this table's compiled :class:`RowFormatter`.
+
+        :param values: The values in the row to format
+        :return: The formatted row
+        """
+        return self._format_values(values)[0]
+
+    def _format_values(
+        self, values: Sequence[Any], fix_types: tuple[type, ...] | None = None
+    ) -> tuple[str, tuple[type, ...] | None]:
+        if fix_types:
+            values = ['' if v is None else str(v) if isinstance(v, fix_types) else v for v in values]
+        try:
+            return self.row_formatter.format_values(values), fix_types
+        except TableFormatException:
+            if fix_types is None:
+                return self._format_values(values, (list, dict, set, tuple))
+            raise
+
     def print_row(self, row: Row, color: Union[str, int, None] = None):
         if self.auto_header:
             self.print_header(color=color)
@@ -495,9 +688,16 @@ class Table(ClearableCachedPropertyMixin):
 
     def set_width(self, rows: Iterable[Row]):
         ignore = (TableBar, HeaderRow)
-        for col in self.columns:
-            values = (row.get(col.key) for row in rows if not isinstance(row, ignore) and row not in ignore)
-            col.width = list(filter(None, values)) or 0
+        for i, col in enumerate(self.columns):
+            values = (
+                row[i] if isinstance(row, (tuple, list)) else row.get(col.key)
+                for row in rows
+                if not isinstance(row, ignore) and row not in ignore
+            )
+            col.width = list(filter(None, values)) or 0  # The cached formats are cleared by _width_changed
+
+    def _width_changed(self):
+        self.clear_cached_properties('header_fmt', 'row_fmt', 'header_row', 'has_custom_formatter', 'row_formatter')
 
     def print_rows(
         self,
@@ -512,25 +712,98 @@ class Table(ClearableCachedPropertyMixin):
         if update_width or self.update_width:
             self.set_width(rows)
 
-        if header or self.auto_header:
-            self.print_header(color=color)
-
         try:
+            if header or self.auto_header:
+                self.print_header(color=color)
             if self.mode == 'csv':
                 self.csv_writer.writerows(rows)
             elif self.mode == 'table':
-                for row in rows:
-                    # Use print_header for headers, but bars can be handled by format_row
-                    if isinstance(row, HeaderRow) or row is HeaderRow:
-                        self.print_header(row.bar, color)
-                    else:
-                        formatted, fix_types = self._format_row(row, fix_types)
-                        self._print(formatted, color)
+                self._print_streamed(rows, color, fix_types)
+        except IOError as e:
+            if e.errno == 32:  # broken pipe
+                return
+            raise
+
+    def stream_rows(
+        self,
+        rows: Iterable[Row],
+        header: bool = False,
+        update_width: bool = True,
+        color: Union[str, int, None] = None,
+        *,
+        sample_size: int = 1000,
+        overflow: str = 'ignore',
+        fix_types: tuple[type, ...] | None = None,
+    ):
+        """
+        Print the given rows as they are consumed, without materializing them all first.
+
+        Column widths are determined from a sample window consisting of the first ``sample_size`` rows, and output
+        begins as soon as that window has been read.  Values in later rows that are wider than their column are
+        handled based on the ``overflow`` mode:
+
+        - ``ignore``: The value is printed in full, and only that row is misaligned (column widths never change)
+        - ``truncate``: The value is truncated to fit the column, with a trailing ellipsis
+
+        Sorting requires every row to be known before the first one can be printed, so if this table is configured
+        to sort, then all rows will be read before printing begins.
+
+        :param rows: An iterable that yields rows
+        :param header: Whether the header should be printed before the first row
+        :param update_width: Whether column widths should be updated based on the sample window
+        :param color: The color to use for printed rows
+        :param sample_size: The number of rows to use to determine column widths
+        :param overflow: How values that exceed the width of their column should be handled
+        :param fix_types: Types of values that should be converted to strings before formatting them
+        """
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(f'Invalid {overflow=} - expected one of: {", ".join(OVERFLOW_MODES)}')
+        if isinstance(rows, dict):
+            rows = rows.values()
+        if self.sort or self.sort_by is not None:
+            rows = self.sorted(rows)
+
+        rows = iter(rows)
+        sample = list(islice(rows, sample_size))
+        if self.mode == 'table' and (update_width or self.update_width):
+            self.set_width(sample)
+
+        try:
+            if header or self.auto_header:
+                self.print_header(color=color)
+            if self.mode == 'csv':
+                keys = self.keys
+                self.csv_writer.writerows({k: row[k] for k in keys} for row in chain(sample, rows))
+            elif self.mode == 'table':
+                rows = chain(sample, rows)
+                if overflow == 'truncate':
+                    rows = _truncated(rows, self.columns)
+                self._print_streamed(rows, color, fix_types)
         except IOError as e:
             if e.errno == 32:  # broken pipe
                 return
             raise
 
+    def _print_streamed(self, rows: Iterable[Row], color: Union[str, int, None], fix_types: tuple[type, ...] | None):
+        for row in rows:
+            # Use print_header for headers, but bars can be handled by format_row
+            if isinstance(row, HeaderRow) or row is HeaderRow:
+                self.print_header(row.bar, color)
+            else:
+                formatted, fix_types = self._format_row(row, fix_types)
+                self._print(formatted, color)
+
+
+def _truncated(rows: Iterable[Row], columns: list[Column]) -> Iterator[Row]:
+    ignore = (TableBar, HeaderRow)
+    for row in rows:
+        if isinstance(row, ignore) or row in ignore:
+            yield row
+        elif isinstance(row, (tuple, list)):
+            yield [c.truncate(v) if v is not None else None for c, v in zip(columns, row)]
+        else:
+            yield {c.key: c.truncate(v) if (v := row.get(c.key)) is not None else None for c in columns}
+
 
 def mono_width(text: str):
     return wcswidth(normalize('NFC', text))
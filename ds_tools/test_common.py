@@ -5,11 +5,13 @@
 import logging
 import sys
 from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase, main as unittest_main
 
 from .logging import init_logging
 
-__all__ = ['TestCaseBase', 'main']
+__all__ = ['TestCaseBase', 'FakeFfmpegTestCase', 'main']
 log = logging.getLogger(__name__)
 
 
@@ -51,3 +53,45 @@ class TestCaseBase(TestCase):
 
     def tearDown(self):
         self._maybe_print()
+
+
+class FakeFfmpegTestCase(TestCase):
+    """
+    Base class for tests that run ffmpeg / ffprobe.  Each script in :attr:`fake_commands` is formatted with the path to
+    the current ``python`` interpreter and written to a temporary bin directory, which is used as the ffmpeg path for
+    the duration of each test.  Caching of probe results is disabled.
+    """
+
+    #: Mapping of {command name: script template}
+    fake_commands: dict[str, str] = {}
+
+    def setUp(self):
+        from .media.ffmpeg import set_ffmpeg_path
+        from .media.probe import set_probe_cache_path
+
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.bin_dir = self.tmp_dir.joinpath('bin')
+        self.bin_dir.mkdir()
+        for name, script in self.fake_commands.items():
+            path = self.bin_dir.joinpath(name)
+            path.write_text(script.format(python=sys.executable))
+            path.chmod(0o755)
+        self.calls_path = self.bin_dir.joinpath('calls.txt')
+        set_ffmpeg_path(self.bin_dir)
+        set_probe_cache_path(None)
+
+    def tearDown(self):
+        from .media.ffmpeg import set_ffmpeg_path
+        from .media.probe import set_probe_cache_path
+
+        set_ffmpeg_path(None)
+        set_probe_cache_path(None)
+        self._tmp_dir.cleanup()
+
+    def _calls(self) -> list[str]:
+        """:return: Lines written to ``calls.txt`` in the bin directory by the fake commands"""
+        try:
+            return self.calls_path.read_text().splitlines()
+        except FileNotFoundError:
+            return []
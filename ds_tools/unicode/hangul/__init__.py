@@ -1,7 +1,8 @@
 from .classification import *
 from .romanization import *
+from .index import RomanizationIndex
 
 __all__ = [
     'is_final_jamo', 'is_hangul_syllable', 'is_jamo', 'is_lead_jamo', 'is_vowel_jamo',
-    'hangul_romanized_permutations', 'matches_hangul_permutation'
+    'hangul_romanized_permutations', 'matches_hangul_permutation', 'RomanizationIndex',
 ]
@@ -0,0 +1,272 @@
+"""
+An index for finding which strings in a corpus of Hangul strings match a given romanized (English) string.
+
+Each Hangul string is converted into a sequence of slots - one per syllable - where each slot is the set of literal
+romanizations that are accepted for that syllable (in the context of its neighbors), using the same rules as
+:func:`.hangul_romanized_permutations_pattern`.  The sequences for all strings are stored in a trie that shares common
+prefixes, and each trie node indexes its outgoing edges by literal romanization, so a lookup only needs to follow the
+edges whose romanizations appear at each position in the English string, regardless of how many Hangul strings were
+indexed.
+
+:author: Doug Skrypa
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+from functools import lru_cache
+from itertools import product
+from pathlib import Path
+from string import ascii_lowercase
+from typing import Iterable, Iterator, Sequence
+
+from .constants import ROMANIZED_SHORT_NAMES, ROMANIZED_LONG_NAMES
+from .jamo import Jamo, JamoType, Syllable, Word
+from .romanization import _iter_words
+
+__all__ = ['RomanizationIndex']
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_LETTERS = frozenset(ascii_lowercase)
+
+Slot = frozenset[str]
+
+
+class RomanizationIndex:
+    """
+    Index of Hangul strings that supports finding all indexed strings that match a given English string.  Matching is
+    equivalent to :func:`.matches_hangul_permutation` - an indexed string matches if its romanization matches the
+    beginning of the English string, after the English string is lower-cased and stripped of non-letter characters.
+
+    :param texts: Hangul strings to add to the index
+    """
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self._texts: list[str] = []
+        self._text_ids: dict[str, int] = {}
+        self._literals: list[dict[str, list[int]]] = [{}]  # node -> {literal romanization: [child nodes]}
+        self._edges: dict[tuple[int, Slot], int] = {}  # (node, slot) -> child node
+        self._terminals: dict[int, list[int]] = {}  # node -> [text ids for strings that end at that node]
+        self._lengths: set[int] = set()  # The lengths of all literals in the index
+        self.update(texts)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._text_ids
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}[texts={len(self._texts)}, nodes={len(self._literals)}]>'
+
+    # region Build
+
+    def update(self, texts: Iterable[str]):
+        for text in texts:
+            self.add(text)
+
+    def add(self, text: str):
+        if text in self._text_ids:
+            return
+        self._text_ids[text] = text_id = len(self._texts)
+        self._texts.append(text)
+        for slots in _iter_slot_sequences(text):
+            node = 0
+            for slot in slots:
+                node = self._child(node, slot)
+            self._terminals.setdefault(node, []).append(text_id)
+
+    def _child(self, node: int, slot: Slot) -> int:
+        try:
+            return self._edges[(node, slot)]
+        except KeyError:
+            pass
+        self._edges[(node, slot)] = child = len(self._literals)
+        self._literals.append({})
+        literals = self._literals[node]
+        for literal in slot:
+            literals.setdefault(literal, []).append(child)
+            self._lengths.add(len(literal))
+        return child
+
+    # endregion
+
+    # region Search
+
+    def find(self, eng: str) -> list[str]:
+        """
+        :param eng: A romanized / English string
+        :return: The indexed Hangul strings that match the given string, in the order that they were added
+        """
+        return [self._texts[i] for i in sorted(self._find_ids(eng))]
+
+    def find_many(self, eng_texts: Iterable[str]) -> dict[str, list[str]]:
+        """
+        :param eng_texts: Romanized / English strings
+        :return: Mapping of {english string: [matching Hangul strings]} for the given strings that had any matches
+        """
+        results = {}
+        for eng in eng_texts:
+            if eng not in results and (matches := self.find(eng)):
+                results[eng] = matches
+        return results
+
+    def matches(self, eng: str, han: str) -> bool:
+        """
+        :param eng: A romanized / English string
+        :param han: A Hangul string that was previously added to this index
+        :return: True if the given strings match, False otherwise
+        """
+        try:
+            text_id = self._text_ids[han]
+        except KeyError as e:
+            raise KeyError(f'String has not been indexed: {han!r}') from e
+        return text_id in self._find_ids(eng)
+
+    def _find_ids(self, eng: str) -> set[int]:
+        text = ''.join(c for c in eng.lower() if c in _LETTERS)
+        end = len(text)
+        lengths = sorted(self._lengths)
+        literals, terminals = self._literals, self._terminals
+        found = set()
+        seen = set()
+        to_visit = [(0, 0)]
+        while to_visit:
+            if (state := to_visit.pop()) in seen:
+                continue
+            seen.add(state)
+            node, pos = state
+            if node in terminals:
+                found.update(terminals[node])
+            if not (node_literals := literals[node]):
+                continue
+            for length in lengths:
+                if pos + length > end:
+                    break
+                if children := node_literals.get(text[pos:pos + length]):
+                    next_pos = pos + length
+                    to_visit.extend((child, next_pos) for child in children)
+        return found
+
+    # endregion
+
+    # region Persistence
+
+    def save(self, path: str | Path):
+        path = Path(path).expanduser()
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        data = {
+            'version': INDEX_VERSION,
+            'texts': self._texts,
+            'literals': self._literals,
+            'edges': self._edges,
+            'terminals': self._terminals,
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> RomanizationIndex:
+        """
+        Load an index that was previously stored via :meth:`.save`.  Only load files from trusted sources - the index
+        is stored using pickle.
+        """
+        with Path(path).expanduser().open('rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            raise ValueError(f'Unsupported romanization index format in {path}')
+
+        self = cls()
+        self._texts = data['texts']
+        self._text_ids = {text: i for i, text in enumerate(self._texts)}
+        self._literals = data['literals']
+        self._edges = data['edges']
+        self._terminals = data['terminals']
+        self._lengths = {len(literal) for slot in {slot for _, slot in self._edges} for literal in slot}
+        return self
+
+    @classmethod
+    def load_or_build(cls, path: str | Path, texts: Iterable[str]) -> RomanizationIndex:
+        """
+        Load the index stored at the given path, adding any of the given strings that it does not already contain.  If
+        the index did not exist or new strings were added, then it is saved to the given path.
+        """
+        try:
+            self = cls.load(path)
+        except FileNotFoundError:
+            self = cls()
+        except (ValueError, pickle.UnpicklingError, EOFError) as e:
+            log.warning(f'Rebuilding romanization index {path} due to error loading it: {e}')
+            self = cls()
+
+        count = len(self)
+        self.update(texts)
+        if len(self) != count or count == 0:
+            self.save(path)
+        return self
+
+    # endregion
+
+
+def _iter_slot_sequences(text: str) -> Iterator[list[Slot]]:
+    """
+    Yields each sequence of slots for the given text.  There is usually only one sequence, but words with a known long
+    romanized name (which replaces the romanizations of all of that word's syllables) add alternate sequences.
+    """
+    words = tuple(map(Word, text.split()))
+    word_options = []
+    for word, prev_word, next_word in _iter_words(words):
+        slots = list(_word_slots(word, prev_word, next_word))
+        if name := ROMANIZED_LONG_NAMES.get(word.word):
+            word_options.append((slots, [frozenset((name,))]))
+        else:
+            word_options.append((slots,))
+
+    for combo in product(*word_options):
+        yield [slot for slots in combo for slot in slots]
+
+
+def _word_slots(word: Word, prev: Word | None, next: Word | None) -> Iterator[Slot]:  # noqa
+    for syllable, prev_syl, next_syl in word._iter_syllables(prev, next):  # noqa
+        # A syllable's romanizations only depend on the adjacent jamo, so slots are cached based on those chars
+        prev_final = prev_syl.final.char if prev_syl and prev_syl.final else None
+        next_initial = next_syl.initial.char if next_syl and next_syl.initial else None
+        yield _syllable_slot(syllable.composed, prev_final, next_initial)
+
+
+@lru_cache(65536)
+def _syllable_slot(char: str, prev_final: str | None, next_initial: str | None) -> Slot:
+    # This mirrors the patterns produced by Syllable.romanization_pattern
+    syllable = Syllable.from_char(char)
+    if not (medial := syllable.medial):
+        return frozenset((char.lower(),))
+    prev_jamo = Jamo.for_char(prev_final) if prev_final else None
+    initials = _jamo_literals(syllable.initial, JamoType.INITIAL, prev_jamo, medial)
+    medials = _jamo_literals(medial)
+    if final := syllable.final:
+        finals = _jamo_literals(final, JamoType.FINAL, next=Jamo.for_char(next_initial) if next_initial else None)
+    else:
+        finals = ('',)
+    literals = set(map(''.join, product(initials, medials, finals)))
+    if name := ROMANIZED_SHORT_NAMES.get(char):
+        literals.add(name)
+    return frozenset(literals)
+
+
+def _jamo_literals(
+    jamo: Jamo, position: JamoType = JamoType.MEDIAL, prev: Jamo = None, next: Jamo = None  # noqa
+) -> Sequence[str]:
+    # This mirrors the patterns produced by Jamo.get_romanization_pattern (empty romanizations are only used when there
+    # are no alternatives, and doubled letters may appear once or twice)
+    literals = set()
+    for rom in jamo.iter_romanizations(position, prev, next):
+        if len(rom) == 2 and rom[0] == rom[1]:
+            literals.update((rom[0], rom))
+        elif rom:
+            literals.add(rom)
+    return tuple(literals) or ('',)
@@ -9,9 +9,11 @@ from __future__ import annotations
 import logging
 import re
 import string
+from bisect import bisect_right
 from collections import defaultdict
 from enum import Enum
 from typing import Union, Optional, Iterator, Iterable, Container
+from unicodedata import category
 
 from cachetools import LRUCache
 try:
@@ -71,33 +73,40 @@ class LangCat(Enum):
         yield cls.CYR, CYRILLIC_RANGES
 
     @classmethod
-    @cached(LRUCache(200), exc=True)
     def categorize(cls, text: Optional[str], detailed: bool = False) -> Union[LangCat, set[LangCat]]:
         if not text:
             return {cls.NUL} if detailed else cls.NUL
         elif detailed:
-            if text := _strip_non_word_chars(text):
-                return {cls.categorize(c) for c in text}
-            else:
-                return {cls.NUL}
+            return _word_cats(text) or {cls.NUL}
         elif len(text) == 1:
-            dec = ord(text)
-            for cat, ranges in cls._ranges():
-                if any(a <= dec <= b for a, b in ranges):
-                    return cat
-            return cls.UNK
-        elif text := _strip_non_word_chars(text):
-            cat = cls.categorize(text[0])
-            for c in text[1:]:
-                if cls.categorize(c) != cat:
-                    return cls.MIX
-            return cat
+            return _char_cat(text)
+        elif cats := _word_cats(text):
+            return cats.pop() if len(cats) == 1 else cls.MIX
         else:
             return cls.NUL
 
+    @classmethod
+    def categorize_many(
+        cls, texts: Iterable[Optional[str]], detailed: bool = False
+    ) -> list[Union[LangCat, set[LangCat]]]:
+        """
+        Categorize many strings at once.  Each distinct string is only processed once, and characters are categorized
+        in bulk via :meth:`str.translate` rather than one at a time.
+
+        :param texts: The strings to categorize
+        :param detailed: Whether the set of all categories in each string should be returned instead of a single
+          category (with :attr:`.MIX` for strings that contain multiple categories)
+        :return: List containing the category or categories for each of the given strings
+        """
+        results = {}
+        categorize = cls.categorize
+        if detailed:  # Sets are mutable, so each text gets its own copy
+            return [set(results[t] if t in results else results.setdefault(t, categorize(t, True))) for t in texts]
+        return [results[t] if t in results else results.setdefault(t, categorize(t)) for t in texts]
+
     @classmethod
     def categorize_all(cls, texts: Iterable[Optional[str]], detailed: bool = False) -> tuple[LangCat, ...]:
-        return tuple(cls.categorize(t, detailed) for t in texts)
+        return tuple(cls.categorize_many(texts, detailed))
 
     @classmethod
     @cached(LRUCache(200), exc=True)
@@ -222,6 +231,113 @@ class LangCat(Enum):
         return LANG_CAT_NAMES[self.value]  # noqa
 
 
+# region Codepoint Category Tables
+
+
+def _build_cat_tables() -> tuple[str, tuple[LangCat, ...], list[int], list[tuple[int, LangCat]]]:
+    """
+    Builds the tables used to look up the :class:`LangCat` for a given character.  When ranges overlap, the category
+    that is yielded first by :meth:`LangCat._ranges` takes precedence.
+
+    :return: Tuple of (BMP translation table, code cats, non-BMP range starts, non-BMP (range end, cat) values)
+    """
+    cats = (LangCat.UNK, *(cat for cat, _ in LangCat._ranges()))
+    # The BMP table maps each codepoint to the ASCII char that represents the index of its category in ``cats``.
+    # Ranges are processed in reverse so that higher precedence categories overwrite lower precedence ones.
+    bmp = bytearray(_CODE_CHARS[0].encode('ascii')) * 0x10000
+    for code, (cat, ranges) in reversed(list(enumerate(LangCat._ranges(), 1))):
+        code_byte = _CODE_CHARS[code].encode('ascii')
+        for a, b in ranges:
+            if a < 0x10000:
+                end = min(b, 0xFFFF) + 1
+                bmp[a:end] = code_byte * (end - a)
+
+    high = []  # Non-overlapping (start, end, cat) ranges for codepoints outside of the BMP, in precedence order
+    for cat, ranges in LangCat._ranges():
+        for a, b in ranges:
+            if b >= 0x10000:
+                high.extend((start, end, cat) for start, end in _uncovered(max(a, 0x10000), b, high))
+
+    high.sort()
+    return bmp.decode('ascii'), cats, [a for a, _, _ in high], [(b, cat) for _, b, cat in high]
+
+
+def _uncovered(a: int, b: int, covered: list[tuple[int, int, LangCat]]) -> Iterator[tuple[int, int]]:
+    """Yields the portions of the range a-b that do not overlap with any ranges that were already covered"""
+    pieces = [(a, b)]
+    for c_start, c_end, _ in covered:
+        remaining = []
+        for start, end in pieces:
+            if c_end < start or end < c_start:
+                remaining.append((start, end))
+            else:
+                if start < c_start:
+                    remaining.append((start, c_start - 1))
+                if c_end < end:
+                    remaining.append((c_end + 1, end))
+        pieces = remaining
+    yield from pieces
+
+
+def _char_cat(char: str) -> LangCat:
+    if (cp := ord(char)) < 0x10000:
+        return _CODE_CHAR_CATS[_BMP_CAT_TABLE[cp]]
+    return _high_cat(cp)
+
+
+def _high_cat(cp: int) -> LangCat:
+    if (i := bisect_right(_HIGH_STARTS, cp) - 1) >= 0:
+        end, cat = _HIGH_VALUES[i]
+        if cp <= end:
+            return cat
+    return LangCat.UNK
+
+
+def _word_cats(text: str) -> set[LangCat]:
+    """
+    :param text: A string
+    :return: The categories of all characters in the given string, ignoring digits, whitespace, punctuation, and
+      symbols (i.e., the characters that would be removed by :func:`_strip_non_word_chars`)
+    """
+    try:
+        table = _word_cats._table
+    except AttributeError:
+        table = _word_cats._table = _build_word_cat_table()
+
+    # BMP characters are replaced with the char for their category (or the non-word char); others are left as-is
+    cats = set()
+    for c in set(text.translate(table)):
+        if c == _NON_WORD_CHAR:
+            continue
+        try:
+            cats.add(_CODE_CHAR_CATS[c])
+        except KeyError:
+            if not _is_non_word_char(c):
+                cats.add(_high_cat(ord(c)))
+    return cats
+
+
+def _build_word_cat_table() -> str:
+    chars = list(_BMP_CAT_TABLE)
+    for cp in range(0x10000):
+        if _is_non_word_char(chr(cp)):
+            chars[cp] = _NON_WORD_CHAR
+    return ''.join(chars)
+
+
+def _is_non_word_char(char: str) -> bool:
+    return category(char)[0] in 'PS' or _NUM_OR_SPACE_MATCH(char) is not None
+
+
+_CODE_CHARS = '0123456789abcdefghijklmnopqrstuvwxyz'
+_NON_WORD_CHAR = '_'
+_NUM_OR_SPACE_MATCH = re.compile(r'[\d\s]').match
+_BMP_CAT_TABLE, _CODE_CATS, _HIGH_STARTS, _HIGH_VALUES = _build_cat_tables()
+_CODE_CHAR_CATS = {_CODE_CHARS[code]: cat for code, cat in enumerate(_CODE_CATS)}
+
+# endregion
+
+
 def _is_punc_or_symbol(char: str) -> bool:
     try:
         all_punc_sym_ws = _is_punc_or_symbol._all_punc_sym_ws
@@ -6,7 +6,8 @@ Utilities for parsing and interpreting crontab schedules
 
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta, time
+from calendar import monthrange
+from datetime import date, datetime, timedelta, time, MAXYEAR, MINYEAR
 from itertools import pairwise
 from typing import Any, Iterator, Iterable, Literal, Type, TypeVar, overload
 
@@ -18,6 +19,8 @@ CronDict = dict[int | str, bool]
 PartIndex = TypeVar('PartIndex', int, slice)
 L = Literal['L']
 PartKey = PartIndex | L
+# The Gregorian calendar repeats every 400 years, so a schedule with no match within that window will never match
+SEARCH_YEARS = 400
 
 
 # region Time Parts
@@ -273,7 +276,8 @@ class DayOfWeekPart(TimePart):
             except KeyError:
                 pass
 
-            if self.week_days_map['L'] and _last_day_of_month(dt).isocalendar().week == dt_week:
+            last_week = self.week_days_map.get('L')
+            if last_week and last_week[dow] and _last_day_of_month(dt).isocalendar().week == dt_week:
                 return True
 
         return False
@@ -435,6 +439,165 @@ class CronSchedule:
                     if day.matches(dt) and dow.matches(dt):
                         yield dt
 
+    # region Direct Next / Previous Match Computation
+
+    def _time_parts(self) -> tuple[TimePart, ...]:
+        return self.hour, self.minute  # noqa
+
+    @property
+    def _resolution(self) -> timedelta:
+        return timedelta(minutes=1)
+
+    def _truncate(self, dt: datetime) -> datetime:
+        return dt.replace(second=0, microsecond=0)
+
+    def next_after(self, dt: datetime | date | None = None) -> datetime | None:
+        """
+        Find the first time that matches this schedule after the given time, without iterating over every
+        intermediate day.  Each field's bitarray mask is searched for its next enabled value, and the search carries
+        over to the next larger field (hour -> day -> month -> year) when a field has no more enabled values.
+
+        :param dt: The time after which the next match should be found (default: now).  A date is treated as
+          midnight at the start of that date.
+        :return: The next matching time, or None if this schedule never matches
+        """
+        dt = _normalize_dt(dt)
+        start = self._truncate(dt) + self._resolution
+        return self._find_match(start, False)
+
+    def prev_before(self, dt: datetime | date | None = None) -> datetime | None:
+        """
+        Find the last time that matches this schedule before the given time.  See :meth:`.next_after` for more info.
+
+        :param dt: The time before which the previous match should be found (default: now).  A date is treated as
+          midnight at the start of that date.
+        :return: The previous matching time, or None if this schedule never matches
+        """
+        dt = _normalize_dt(dt)
+        start = self._truncate(dt)
+        if start == dt:
+            start -= self._resolution
+        return self._find_match(start, True)
+
+    def count_between(self, start: datetime | date, end: datetime | date) -> int:
+        """
+        :param start: The beginning of the time range to check (inclusive).  A date is treated as midnight.
+        :param end: The end of the time range to check (exclusive).  A date is treated as midnight.
+        :return: The number of times that match this schedule such that ``start <= match < end``
+        """
+        start, end = self._ceil(_normalize_dt(start)), self._ceil(_normalize_dt(end))
+        if end <= start:
+            return 0
+
+        time_parts = self._time_parts()
+        per_day = 1
+        for part in time_parts:
+            per_day *= part.arr.count(1)
+        if not per_day:
+            return 0
+
+        # Partial days are handled by counting the times that occur before the relevant time of day
+        first_start = _count_times_before(time_parts, self._time_values(start), per_day)
+        last_end = _count_times_before(time_parts, self._time_values(end), per_day)
+        start_day, end_day = start.date(), end.date()
+        total = 0
+        for day in self._iter_matching_days(start_day):
+            if day > end_day:
+                break
+            elif day == end_day:
+                total += last_end
+            else:
+                total += per_day
+            if day == start_day:
+                total -= first_start
+        return total
+
+    def _time_values(self, dt: datetime) -> tuple[int, ...]:
+        return dt.hour, dt.minute
+
+    def _ceil(self, dt: datetime) -> datetime:
+        if (truncated := self._truncate(dt)) != dt:
+            return truncated + self._resolution
+        return dt
+
+    def _find_match(self, start: datetime, reverse: bool) -> datetime | None:
+        time_parts = self._time_parts()
+        if not all(part.arr.any() for part in time_parts):
+            return None
+
+        start_day = start.date()
+        start_values = self._time_values(start)
+        for day in self._iter_matching_days(start_day, reverse):
+            if day == start_day:
+                if (values := _find_time(time_parts, start_values, reverse)) is None:
+                    continue
+            else:
+                values = tuple(part.arr.find(1, right=reverse) for part in time_parts)
+            return datetime.combine(day, time(*values), tzinfo=start.tzinfo)
+
+        return None
+
+    def _iter_matching_days(self, start: date, reverse: bool = False) -> Iterator[date]:
+        """
+        Yields dates that match this schedule's day, month, and day of week parts, starting from the given date
+        (inclusive), in ascending order (or descending if ``reverse`` is True).  Only days that are enabled in both the
+        month and day of month masks are considered.
+        """
+        month_arr = self.month.arr
+        if not month_arr.any():
+            return
+
+        dow = self.dow
+        dow_all = dow.all()
+        year, month, day = start.year, start.month, start.day
+        step = -1 if reverse else 1
+        last_year = max(MINYEAR, year - SEARCH_YEARS) if reverse else min(MAXYEAR, year + SEARCH_YEARS)
+        while (year >= last_year) if reverse else (year <= last_year):
+            if reverse:
+                month_idx = month_arr.find(1, 0, month, right=True)
+            else:
+                month_idx = month_arr.find(1, month - 1)
+
+            if month_idx == -1:
+                year += step
+                month, day = (12, 31) if reverse else (1, 1)
+                continue
+            elif month_idx + 1 != month:
+                month = month_idx + 1
+                day = 31 if reverse else 1
+
+            for day_num in self._month_days(year, month, day, reverse):
+                dt = date(year, month, day_num)
+                if dow_all or dow.matches(dt):
+                    yield dt
+
+            month += step
+            day = 31 if reverse else 1
+            if month < 1 or month > 12:
+                year += step
+                month = 12 if reverse else 1
+
+    def _month_days(self, year: int, month: int, start: int, reverse: bool = False) -> list[int]:
+        last = monthrange(year, month)[1]
+        start = min(start, last)
+        day_part = self.day
+        if day_part.all():
+            return list(range(start, 0, -1)) if reverse else list(range(start, last + 1))
+
+        if reverse:  # Note: day bit index = day - 1
+            days = [i + 1 for i in day_part.arr.search(1, 0, start, right=True)]
+        else:
+            days = [i + 1 for i in day_part.arr.search(1, start - 1, last)]
+
+        if day_part['L'] and last not in days:
+            if not reverse:
+                days.append(last)
+            elif start == last:
+                days.insert(0, last)
+        return days
+
+    # endregion
+
     def _matching_times(self, reverse: bool = False) -> Iterator[time]:
         minute = self.minute
         minute_range = range(59, -1, -1) if reverse else range(60)
@@ -477,6 +640,19 @@ class ExtCronSchedule(CronSchedule):
     def _parts(self) -> tuple[TimePart, ...]:
         return self.second, self.minute, self.hour, self.day, self.month, self.dow  # noqa
 
+    def _time_parts(self) -> tuple[TimePart, ...]:
+        return self.hour, self.minute, self.second  # noqa
+
+    @property
+    def _resolution(self) -> timedelta:
+        return timedelta(seconds=1)
+
+    def _truncate(self, dt: datetime) -> datetime:
+        return dt.replace(microsecond=0)
+
+    def _time_values(self, dt: datetime) -> tuple[int, ...]:
+        return dt.hour, dt.minute, dt.second
+
 
 class CronMatchIterator:
     __slots__ = ('cron', 'times', 'now')
@@ -486,7 +662,7 @@ class CronMatchIterator:
         self.times = list(cron._matching_times())
         if not now:
             self.now = datetime.now()
-        elif isinstance(now, date):
+        elif not isinstance(now, datetime):
             self.now = datetime.combine(now, datetime.now().time())
         else:
             self.now = now
@@ -611,6 +787,56 @@ def _dates(year: int, month: int, *, start: int = 1, reverse: bool = False) -> I
                 break  # skip remaining days which will also be out of range
 
 
+def _normalize_dt(dt: datetime | date | None) -> datetime:
+    if dt is None:
+        return datetime.now()
+    elif not isinstance(dt, datetime):
+        return datetime.combine(dt, time())
+    return dt
+
+
+def _find_time(parts: tuple[TimePart, ...], values: tuple[int, ...], reverse: bool = False) -> tuple[int, ...] | None:
+    """
+    :param parts: Time parts, from the largest unit to the smallest (all of which must have ``min=0``)
+    :param values: The time to start searching from, with one value per part
+    :param reverse: Whether the search should proceed backwards in time
+    :return: The first time (with one value per part) that is enabled in the given parts, that is on or after the
+      given time (or on or before, if ``reverse`` is True), or None if there is no such time in the same day.
+    """
+    if not parts:
+        return ()
+
+    arr, value = parts[0].arr, values[0]
+    if arr[value] and (rest := _find_time(parts[1:], values[1:], reverse)) is not None:
+        return value, *rest
+
+    if reverse:
+        found = arr.find(1, 0, value, right=True)
+    else:
+        found = arr.find(1, value + 1)
+
+    if found == -1:
+        return None
+    return found, *(part.arr.find(1, right=reverse) for part in parts[1:])
+
+
+def _count_times_before(parts: tuple[TimePart, ...], values: tuple[int, ...], total: int) -> int:
+    """
+    :param parts: Time parts, from the largest unit to the smallest (all of which must have ``min=0``)
+    :param values: A time of day, with one value per part
+    :param total: The total number of times that are enabled per day
+    :return: The number of enabled times in a day that are before the given time
+    """
+    count = 0
+    for part, value in zip(parts, values):
+        arr = part.arr
+        total //= arr.count(1)  # The number of enabled times per enabled value in this part
+        count += arr.count(1, 0, value) * total
+        if not arr[value]:
+            break
+    return count
+
+
 def _last_day_of_month(dt: date | datetime) -> date:
     for day in range(31, 27, -1):
         try:
@@ -79,7 +79,10 @@ wrap / unwrap
 
 import logging
 import re
-from collections.abc import Iterable, Container, Callable
+from codecs import getincrementaldecoder
+from collections.abc import Iterable, Iterator, Container, Callable
+from html.parser import HTMLParser
+from typing import Any, NamedTuple
 from urllib.parse import urlparse
 
 try:
@@ -95,7 +98,12 @@ else:
         from bs4.element import EntitySubstitution      # Location in 4.7.1
     bs4_available = True
 
-__all__ = ['soupify', 'fix_html_prettify', 'HtmlSoup']
+try:
+    from lxml.etree import HTMLPullParser
+except ImportError:
+    HTMLPullParser = None
+
+__all__ = ['soupify', 'fix_html_prettify', 'HtmlSoup', 'Anchor', 'iter_links']
 
 log = logging.getLogger(__name__)
 
@@ -125,14 +133,58 @@ def fix_html_prettify():
     Tag.decode_contents = decode_contents
 
 
-def _should_skip(content, match_value):
-    return (
-        (match_value and not content) or (content and not match_value)
-        or isinstance(match_value, str) and (content != match_value)
-        or isinstance(match_value, _regex_pattern_type) and not match_value.match(content)
-        or isinstance(match_value, (Iterable, Container)) and (content not in match_value)
-        or isinstance(match_value, Callable) and not match_value(content)
-    )
+def _skip_func(match_value) -> Callable[[Any], bool]:
+    """
+    :param match_value: A filter value accepted by :meth:`HtmlSoup.links` (bool / str / compiled regex pattern /
+      iterable / container / callable)
+    :return: A function that returns True if the given content does not match the given value, and should be skipped.
+      The type of the match value is only checked once, rather than for each piece of content.
+    """
+    truthy = bool(match_value)
+    if isinstance(match_value, str):  # Equal content is also truthy iff match_value is, and is in match_value
+        return lambda content: content != match_value
+    elif isinstance(match_value, _regex_pattern_type):
+        match = match_value.match
+        return lambda content: not content or not match(content)
+
+    checks = []
+    if isinstance(match_value, (Iterable, Container)):
+        checks.append(lambda content: content not in match_value)
+    if isinstance(match_value, Callable):
+        checks.append(lambda content: not match_value(content))
+
+    def skip(content) -> bool:
+        if (truthy and not content) or (content and not truthy):
+            return True
+        return any(check(content) for check in checks)
+
+    return skip
+
+
+class _LinkFilter:
+    """Precompiled filters for :meth:`HtmlSoup.links` and :func:`iter_links`"""
+
+    __slots__ = ('href', 'url_filters', 'text')
+
+    def __init__(self, href=None, scheme=None, host=None, path=None, query=None, fragment=None, text=None):
+        self.href = _skip_func(href) if href is not None else None
+        filters = {'scheme': scheme, 'hostname': host, 'path': path, 'query': query, 'fragment': fragment}
+        self.url_filters = [(attr, _skip_func(val)) for attr, val in filters.items() if val is not None]
+        self.text = _skip_func(text) if text is not None else None
+
+    def skip(self, href, get_text: Callable[[], str], anchor) -> bool:
+        if self.href is not None and self.href(href):
+            return True
+        elif self.url_filters:
+            try:
+                url = urlparse(href)
+            except Exception:  # noqa
+                log.error(f'Unable to parse URL from href in anchor: {anchor}')
+                return True
+            return any(skip(getattr(url, attr)) for attr, skip in self.url_filters)
+        elif self.text is not None:
+            return self.text(get_text())
+        return False
 
 
 class HtmlSoup:
@@ -153,31 +205,13 @@ class HtmlSoup:
         Generator that yields bs4.element.Tag objects from this HtmlSoup, optionally with the provided filters.
 
         All filter values may be provided as a bool / str / compiled regex pattern / iterable / container / callable.
-        """
-        filters = {'scheme': scheme, 'hostname': host, 'path': path, 'query': query, 'fragment': fragment}
 
+        To extract links without building a BeautifulSoup tree, use :func:`iter_links` instead.
+        """
+        link_filter = _LinkFilter(href, scheme, host, path, query, fragment, text)
         for a in self.soup.find_all('a'):
-            a_href = a.get('href')
-            if (href is not None) and _should_skip(a_href, href):
-                continue
-            elif any(val is not None for val in filters.values()):
-                try:
-                    url = urlparse(a_href)
-                except Exception:  # noqa
-                    log.error(f'Unable to parse URL from href in anchor: {a}')
-                    continue
-
-                skip = False
-                for attr, with_val in filters.items():
-                    if (with_val is not None) and _should_skip(getattr(url, attr), with_val):
-                        skip = True
-                        break
-                if skip:
-                    continue
-            elif (text is not None) and _should_skip(a.text, text):
-                continue
-
-            yield a
+            if not link_filter.skip(a.get('href'), lambda: a.text, a):  # noqa
+                yield a
 
     def hrefs(self, *args, **kwargs):
         for a in self.links(*args, **kwargs):
@@ -188,6 +222,143 @@ class HtmlSoup:
             yield urlparse(a['href'])
 
 
+# region Streaming Link Extraction
+
+
+class Anchor(NamedTuple):
+    """A lightweight representation of an ``<a>`` element, yielded by :func:`iter_links`"""
+
+    href: str | None
+    text: str
+    attrs: dict[str, str | None]
+
+
+class _AnchorParser(HTMLParser):
+    """Collects anchors while HTML is fed to it, without building a tree of the other elements"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors: list[Anchor] = []
+        self._attrs = None
+        self._text = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if tag == 'a':
+            if self._attrs is not None:  # Anchors can't be nested, so an unclosed anchor ends here
+                self._finish()
+            self._attrs = dict(attrs)
+
+    def handle_endtag(self, tag: str):
+        if tag == 'a' and self._attrs is not None:
+            self._finish()
+
+    def handle_data(self, data: str):
+        if self._attrs is not None:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        if self._attrs is not None:
+            self._finish()
+
+    def _finish(self):
+        attrs = self._attrs
+        self.anchors.append(Anchor(attrs.get('href'), ''.join(self._text), attrs))
+        self._attrs = None
+        self._text = []
+
+
+def _iter_chunks(content, chunk_size: int) -> Iterator[str | bytes]:
+    if not isinstance(content, (str, bytes)) and hasattr(content, 'text'):  # requests.Response
+        content = content.text
+    if isinstance(content, (str, bytes)):
+        for i in range(0, len(content), chunk_size):
+            yield content[i: i + chunk_size]
+    elif hasattr(content, 'read'):
+        while chunk := content.read(chunk_size):
+            yield chunk
+    else:
+        yield from content
+
+
+def _iter_html_parser_anchors(chunks: Iterable[str | bytes]) -> Iterator[Anchor]:
+    parser = _AnchorParser()
+    decode = getincrementaldecoder('utf-8')('replace').decode  # Multi-byte chars may be split between chunks
+    for chunk in chunks:
+        parser.feed(chunk if isinstance(chunk, str) else decode(chunk))
+        if parser.anchors:
+            yield from parser.anchors
+            parser.anchors.clear()
+    parser.close()
+    yield from parser.anchors
+
+
+def _iter_lxml_anchors(chunks: Iterable[str | bytes]) -> Iterator[Anchor]:
+    parser = HTMLPullParser(events=('end',), tag='a')
+
+    def _read_events():
+        for _, element in parser.read_events():
+            attrs = dict(element.attrib)
+            yield Anchor(attrs.get('href'), ''.join(element.itertext()), attrs)
+            element.clear(keep_tail=True)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_events()
+    parser.close()
+    yield from _read_events()
+
+
+def iter_links(
+    content,
+    href=None,
+    scheme=None,
+    host=None,
+    path=None,
+    query=None,
+    fragment=None,
+    text=None,
+    *,
+    parser: str = None,
+    chunk_size: int = 65536,
+) -> Iterator[Anchor]:
+    """
+    Streaming alternative to :meth:`HtmlSoup.links` that does not build a BeautifulSoup tree for the document.  Anchors
+    are yielded as they are parsed, and the same filters are supported, with the same semantics.
+
+    :param content: HTML as a str / bytes, a requests Response, a file-like object, or an iterable of str / bytes chunks
+      (such as ``response.iter_content(chunk_size, decode_unicode=True)``)
+    :param href: Filter for the href attribute
+    :param scheme: Filter for the scheme of the URL in the href attribute
+    :param host: Filter for the host of the URL in the href attribute
+    :param path: Filter for the path of the URL in the href attribute
+    :param query: Filter for the query of the URL in the href attribute
+    :param fragment: Filter for the fragment of the URL in the href attribute
+    :param text: Filter for the anchor's text (only used if no URL component filters were provided)
+    :param parser: The streaming parser to use - ``lxml`` (default, if it is installed) or ``html.parser``
+    :param chunk_size: The number of characters / bytes to feed to the parser at a time
+    :return: Iterator that yields :class:`Anchor` tuples
+    """
+    if parser is None:
+        parser = 'lxml' if HTMLPullParser is not None else 'html.parser'
+    if parser == 'lxml':
+        if HTMLPullParser is None:
+            raise RuntimeError('Please `pip install lxml` to use the lxml parser')
+        anchors = _iter_lxml_anchors(_iter_chunks(content, chunk_size))
+    elif parser == 'html.parser':
+        anchors = _iter_html_parser_anchors(_iter_chunks(content, chunk_size))
+    else:
+        raise ValueError(f'Unsupported {parser=} - expected lxml or html.parser')
+
+    link_filter = _LinkFilter(href, scheme, host, path, query, fragment, text)
+    for anchor in anchors:
+        if not link_filter.skip(anchor.href, lambda: anchor.text, anchor):  # noqa
+            yield anchor
+
+
+# endregion
+
+
 # Monkey patches for formatting BeautifulSoup objects back into HTML follow ============================================
 
 
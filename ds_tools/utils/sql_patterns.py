@@ -0,0 +1,212 @@
+"""
+Translates fnmatch patterns into SQLite conditions, so that values can be matched by SQLite (using an index, where
+possible) instead of by iterating over every value in Python.
+
+:author: Doug Skrypa
+"""
+
+import os
+import sys
+from fnmatch import fnmatch
+from sqlite3 import Connection
+from typing import Any, Iterable, Optional
+
+__all__ = ['patterns_to_sql', 'fnmatch_to_glob', 'key_prefix', 'register_functions']
+
+
+def register_functions(connection: Connection):
+    """
+    Register the SQL functions that are used by conditions from :func:`patterns_to_sql`, and :func:`key_prefix`.
+
+    :param connection: The SQLite connection in which the functions should be available
+    """
+    connection.create_function('fnmatch', 2, _fnmatch, deterministic=True)
+    connection.create_function('key_prefix', 3, key_prefix, deterministic=True)
+
+
+def patterns_to_sql(patterns: Iterable[str], column: str) -> tuple[str, list[str]]:
+    """
+    Translate fnmatch patterns into a single SQL condition that matches the same values as :func:`fnmatch.fnmatch`
+    would for any of the given patterns.
+
+    On platforms where matching is case-sensitive, each pattern is translated into an equivalent GLOB pattern, and its
+    literal prefix is also expressed as a range so that SQLite can use an index on the given column - its own GLOB
+    optimization only applies to columns with TEXT affinity.  GLOB is always case-sensitive, so on platforms where
+    matching is case-insensitive (Windows), values are matched by :func:`fnmatch.fnmatch` itself via the ``fnmatch``
+    SQL function, which must be registered via :func:`register_functions`.
+
+    :param patterns: One or more fnmatch patterns
+    :param column: The (quoted, if necessary) name of the column to match against
+    :return: 2-tuple of (SQL condition, parameters)
+    """
+    patterns = list(patterns)
+    if not patterns:
+        raise ValueError('At least one pattern is required')
+    elif os.path.normcase('Aa') != 'Aa':
+        return ' OR '.join(f'fnmatch({column}, ?)' for _ in patterns), patterns
+
+    clauses, params = [], []
+    for pattern in patterns:
+        glob, prefix, exact = fnmatch_to_glob(pattern)
+        if glob is None:
+            clauses.append('0')  # Nothing can match this pattern
+            continue
+        elif exact:
+            clauses.append(f'{column} = ?')
+            params.append(prefix)
+            continue
+
+        clause = f'{column} GLOB ?'
+        if prefix:
+            if upper := _next_prefix(prefix):
+                clause = f'{column} >= ? AND {column} < ? AND {clause}'
+                params += (prefix, upper)
+            else:
+                clause = f'{column} >= ? AND {clause}'
+                params.append(prefix)
+        clauses.append(f'({clause})')
+        params.append(glob)
+
+    return ' OR '.join(clauses), params
+
+
+def fnmatch_to_glob(pattern: str) -> tuple[Optional[str], str, bool]:
+    """
+    Translate an fnmatch pattern into a GLOB pattern that matches the same strings as :func:`fnmatch.fnmatchcase`.
+    The syntax is similar, but fnmatch treats an unclosed ``[`` as a literal and a leading ``^`` in a set as a literal,
+    while GLOB treats them as the start of a set and as negation, respectively.  The positions of ``-`` and ``]`` in a
+    set and the handling of descending ranges also differ slightly, so sets are parsed the same way as fnmatch parses
+    them and re-written in a form that GLOB interprets unambiguously.
+
+    :param pattern: An fnmatch pattern
+    :return: 3-tuple of (GLOB pattern, or None if the pattern cannot match anything, the literal prefix that every
+      matching string starts with, whether the pattern only matches that prefix)
+    """
+    parts, prefix, exact = [], [], True
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == '[' and (parsed := _parse_fnmatch_set(pattern, i)) is not None:
+            i, negated, chars, ranges = parsed
+            if not negated and not ranges and len(chars) == 1:
+                char = chars.pop()  # A set that contains one character is equivalent to that character
+            elif not negated and not chars and not ranges:
+                return None, ''.join(prefix), False
+            else:
+                # A negated empty set matches any character
+                parts.append(_glob_set(negated, chars, ranges) if chars or ranges else '?')
+                exact = False
+                continue
+        elif char in '*?':
+            parts.append(char)
+            exact = False
+            continue
+
+        if exact:
+            prefix.append(char)
+        parts.append(f'[{char}]' if char in '*?[' else char)
+
+    return ''.join(parts), ''.join(prefix), exact
+
+
+def _parse_fnmatch_set(pattern: str, start: int) -> Optional[tuple[int, bool, set[str], list[tuple[str, str]]]]:
+    """
+    Parses a set the same way as :func:`fnmatch.translate`.
+
+    :param pattern: An fnmatch pattern
+    :param start: The index after the opening ``[``
+    :return: None if the set is not closed, otherwise a 4-tuple of (the index after the closing ``]``, whether the set
+      is negated, the literal characters in the set, the non-empty (start, end) character ranges in the set)
+    """
+    n = len(pattern)
+    end = start
+    if end < n and pattern[end] == '!':
+        end += 1
+    if end < n and pattern[end] == ']':
+        end += 1
+    if (end := pattern.find(']', end)) < 0:
+        return None
+
+    # Hyphens separate ranges, except when they are the first or last character in the set, or when they immediately
+    # follow a range.  Chunks are separated by the hyphens that form ranges.
+    chunks, i, k = [], start, start + 2 if pattern[start] == '!' else start + 1
+    while (k := pattern.find('-', k, end)) >= 0:
+        chunks.append(pattern[i:k])
+        i = k + 1
+        k += 3
+    if chunk := pattern[i:end]:
+        chunks.append(chunk)
+    else:
+        chunks[-1] += '-'
+    for k in range(len(chunks) - 1, 0, -1):  # Descending ranges are discarded, along with their start and end
+        if chunks[k - 1][-1] > chunks[k][0]:
+            chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+            del chunks[k]
+
+    # fnmatch checks for negation after discarding descending ranges, so ``[b-a!]`` is equivalent to ``[!]``
+    if negated := chunks[0].startswith('!'):
+        chunks[0] = chunks[0][1:]
+    chars, ranges, last = set(), [], len(chunks) - 1
+    for k, chunk in enumerate(chunks):
+        chars.update(chunk[(1 if k else 0):(-1 if k < last else None)])
+        if k < last:
+            ranges.append((chunk[-1], chunks[k + 1][0]))
+
+    return end + 1, negated, chars, ranges
+
+
+def _glob_set(negated: bool, chars: set[str], ranges: list[tuple[str, str]]) -> str:
+    chars = set(chars)
+    clean_ranges = []
+    for low, high in ranges:
+        # Range endpoints that have special meanings in GLOB sets are moved to the literal characters
+        while low <= high and low in '-]^':
+            chars.add(low)
+            low = chr(ord(low) + 1)
+        while low <= high and high in '-]':
+            chars.add(high)
+            high = chr(ord(high) - 1)
+        if low < high:
+            clean_ranges.append(f'{low}-{high}')
+        elif low == high:
+            chars.add(low)
+
+    # In GLOB, ``]`` is only a literal as the first character, ``-`` is a literal as the first character (or after a
+    # leading ``]``), and ``^`` is only a literal when it is not the first character
+    parts = [c for c in ']-' if c in chars]
+    parts += clean_ranges
+    parts += sorted(chars.difference(']-^'))
+    if '^' in chars:
+        parts.append('^')
+    return '[{}{}]'.format('^' if negated else '', ''.join(parts))
+
+
+def _next_prefix(prefix: str) -> Optional[str]:
+    """The smallest string that sorts after every string that starts with the given prefix"""
+    while prefix:
+        next_ord = ord(prefix[-1]) + 1
+        if 0xD800 <= next_ord <= 0xDFFF:  # Surrogates can't be encoded, so skip to the next valid code point
+            next_ord = 0xE000
+        if next_ord <= sys.maxunicode:
+            return prefix[:-1] + chr(next_ord)
+        prefix = prefix[:-1]
+    return None
+
+
+def _fnmatch(value: Any, pattern: str) -> bool:
+    return isinstance(value, str) and fnmatch(value, pattern)
+
+
+def key_prefix(key: Any, delimiter: str, depth: int) -> Optional[str]:
+    """
+    Registered as an SQL function by :func:`register_functions`.
+
+    :param key: A value from a column
+    :param delimiter: The delimiter that separates parts of the key
+    :param depth: The number of parts to include
+    :return: The first ``depth`` delimited parts of the given key, or None if it is not a string
+    """
+    if not isinstance(key, str):
+        return None
+    return delimiter.join(key.split(delimiter, depth)[:depth])
@@ -17,21 +17,43 @@ from functools import cached_property
 from operator import itemgetter
 from pathlib import Path
 from sqlite3 import Row, OperationalError, connect
-from typing import Iterator, Optional, Union, Mapping, Any, Collection, Iterable
+from typing import Iterator, Optional, Union, Mapping, Any, Collection, Iterable, Sequence
 
 from ..core.itertools import itemfinder
 from ..output import Table, Printer
 
-__all__ = ['Sqlite3Database']
+__all__ = ['Sqlite3Database', 'PERFORMANCE_PRAGMAS']
 log = logging.getLogger(__name__)
 
+# These trade durability on power loss (not application crashes) for much faster writes, and allow reads to proceed
+# concurrently with writes.  They are opt-in via ``Sqlite3Database(..., pragmas=PERFORMANCE_PRAGMAS)``.
+PERFORMANCE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64 * 1024,  # negative values are in KiB
+    'temp_store': 'MEMORY',
+}
+
 
 class Sqlite3Database:
     """
     None -> NULL, int -> INTEGER, long -> INTEGER, float -> REAL, str -> TEXT, unicode -> TEXT, buffer -> BLOB
     """
 
-    def __init__(self, db_path: Union[str, Path] = None, execute_log_level: int = 9):
+    def __init__(
+        self,
+        db_path: Union[str, Path] = None,
+        execute_log_level: int = 9,
+        pragmas: Mapping[str, Any] = None,
+        cached_statements: int = 256,
+    ):
+        """
+        :param db_path: Path to the DB file (default: an in-memory DB)
+        :param execute_log_level: The log level to use when logging SQL statements that are executed
+        :param pragmas: PRAGMA names and values to set when the connection is created (see :data:`PERFORMANCE_PRAGMAS`)
+        :param cached_statements: The number of prepared statements that the connection should cache for re-use
+        """
         db_path = db_path or ':memory:'
         if db_path != ':memory:':
             db_path = Path(db_path).expanduser().resolve()
@@ -39,10 +61,18 @@ class Sqlite3Database:
                 db_path.parent.mkdir(parents=True)
             db_path = db_path.as_posix()
         self.db_path = db_path
-        self.db = connect(self.db_path)
+        self.db = connect(self.db_path, cached_statements=cached_statements)
         self.db.row_factory = Row
         self._tables = {}
         self.execute_log_level = execute_log_level
+        for key, value in (pragmas or {}).items():
+            self._set_pragma(key, value)
+
+    def _set_pragma(self, key: str, value: Any):
+        if (result := self.db.execute(f'PRAGMA {key}={value}').fetchone()) is not None:
+            # Some pragmas, like journal_mode, return the resulting value, which may differ from the requested one
+            if str(result[0]).lower() != str(value).lower():
+                log.debug(f'Requested PRAGMA {key}={value} for {self.db_path}, but the result was {result[0]!r}')
 
     def execute(self, *args, **kwargs):
         """
@@ -53,6 +83,19 @@ class Sqlite3Database:
             log.log(self.execute_log_level, 'Executing SQL: {}'.format(', '.join(map('"{}"'.format, args))))
             return self.db.execute(*args, **kwargs)
 
+    def executemany(self, sql: str, param_rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Execute the given statement for each set of parameters in a single transaction.  The statement is only
+        prepared once.
+
+        :param sql: The SQL statement to execute
+        :param param_rows: An iterable that yields a sequence of parameters for each execution of the statement
+        :return: The number of modified rows
+        """
+        with self.db:
+            log.log(self.execute_log_level, f'Executing SQL for many rows: "{sql}"')
+            return self.db.executemany(sql, param_rows).rowcount
+
     def create_table(self, name: str, *args, **kwargs):
         """
         :param name: Name of the table to create
@@ -112,13 +155,19 @@ class Sqlite3Database:
             raise OperationalError('No Results.')
         return [dict(row) for row in results]
 
-    def iterquery(self, query, *args, **kwargs):
+    def iterquery(self, query, *args, batch_size: int = 1000, **kwargs) -> Iterator[dict[str, Any]]:
+        """
+        :param query: Query string
+        :param batch_size: The number of rows to fetch from the cursor at a time
+        :return: Iterator that lazily yields result rows as dicts
+        """
         results = self.execute(query, *args, **kwargs)
         if results.description is None:
             raise OperationalError('No Results.')
         headers = [fields[0] for fields in results.description]
-        for row in results:
-            yield dict(zip(headers, row))
+        while rows := results.fetchmany(batch_size):
+            for row in rows:
+                yield dict(zip(headers, row))
 
     def select(
         self,
@@ -311,9 +360,9 @@ class DBTable:
             raise ValueError(f'Invalid columns: {bad}')
         return ', '.join(f'{_quote(c)}' for c in columns)
 
-    def select(
-        self, columns: Union[str, Collection[str]] = '*', where_mode: str = 'AND', limit: int = None, **where_args
-    ):
+    def _prepare_select(
+        self, columns: Union[str, Collection[str]], where_mode: str, limit: Optional[int], where_args: Mapping[str, Any]
+    ) -> tuple[str, list[str]]:
         what = self._prepare_select_what(columns)
         where, params = self._prepare_select_where(where_args, where_mode)
         query = f'SELECT {what} FROM {_quote(self.name)}'
@@ -321,7 +370,24 @@ class DBTable:
             query += f' WHERE {where}'
         if limit is not None and isinstance(limit, int):
             query += f' LIMIT {limit}'
-        return self.db.query(query, params)
+        return query, params
+
+    def select(
+        self, columns: Union[str, Collection[str]] = '*', where_mode: str = 'AND', limit: int = None, **where_args
+    ):
+        return self.db.query(*self._prepare_select(columns, where_mode, limit, where_args))
+
+    def iterselect(
+        self,
+        columns: Union[str, Collection[str]] = '*',
+        where_mode: str = 'AND',
+        limit: int = None,
+        batch_size: int = 1000,
+        **where_args,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazy version of :meth:`.select` that fetches ``batch_size`` rows at a time"""
+        query, params = self._prepare_select(columns, where_mode, limit, where_args)
+        return self.db.iterquery(query, params, batch_size=batch_size)
 
     def print_rows(self, limit=3, out_fmt='table'):
         rows = self.select('*', limit=limit)
@@ -335,6 +401,43 @@ class DBTable:
             row = [row[k] for k in self.col_names]
         self.db.execute('INSERT INTO "{}" VALUES ({});'.format(self.name, ('?,' * len(row))[:-1]), tuple(row))
 
+    def _iter_row_values(self, rows: Iterable[Union[Sequence[Any], Mapping[str, Any]]]) -> Iterator[tuple[Any, ...]]:
+        col_names = self.col_names
+        for row in rows:
+            yield tuple(row[k] for k in col_names) if isinstance(row, Mapping) else tuple(row)
+
+    def insert_many(self, rows: Iterable[Union[Sequence[Any], Mapping[str, Any]]]) -> int:
+        """
+        Insert all of the given rows in a single transaction.  Rows are consumed lazily, so a generator may be provided
+        to avoid holding all of them in memory.
+
+        :param rows: Rows to insert, as sequences of values in column order, or as dicts
+        :return: The number of inserted rows
+        """
+        columns = ', '.join(map(_quote_always, self.col_names))
+        placeholders = ', '.join('?' * len(self.col_names))
+        sql = f'INSERT INTO {_quote_always(self.name)} ({columns}) VALUES ({placeholders});'
+        return self.db.executemany(sql, self._iter_row_values(rows))
+
+    def upsert_many(self, rows: Iterable[Union[Sequence[Any], Mapping[str, Any]]]) -> int:
+        """
+        Insert the given rows, or update existing rows with the same primary key, in a single transaction.  The PK for
+        this table must be a PRIMARY KEY or UNIQUE column in the DB schema.
+
+        :param rows: Rows to insert or update, as sequences of values in column order, or as dicts
+        :return: The number of inserted or updated rows
+        """
+        columns = ', '.join(map(_quote_always, self.col_names))
+        placeholders = ', '.join('?' * len(self.col_names))
+        updates = ', '.join(f'{_quote_always(c)}=excluded.{_quote_always(c)}' for c in self.col_names if c != self.pk)
+        on_conflict = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+        sql = (
+            f'INSERT INTO {_quote_always(self.name)} ({columns}) VALUES ({placeholders})'
+            f' ON CONFLICT({_quote_always(self.pk)}) {on_conflict};'
+        )
+        self._rows.clear()  # Cached rows may no longer be accurate
+        return self.db.executemany(sql, self._iter_row_values(rows))
+
     def __len__(self):
         return next(self.db.execute(f'SELECT COUNT(*) FROM "{self.name}"'))[0]
 
@@ -349,10 +452,9 @@ class DBTable:
         return [row for row in self]
 
     def __iter__(self) -> Iterator[DBRow]:
-        for row in self.select('*'):
-            pk = row[self.pk]
-            self._rows[pk] = db_row = DBRow(self, row)
-            yield db_row
+        # Rows are not stored in self._rows here, so memory usage does not grow with the size of the table
+        for row in self.iterselect('*'):
+            yield DBRow(self, row)
 
     iterrows = __iter__
 
@@ -371,7 +473,7 @@ class DBTable:
         if key not in self:
             raise KeyError(key)
         self.db.execute(f'DELETE FROM "{self.name}" WHERE "{self.pk}" = ?;', (key,))
-        del self._rows[key]
+        self._rows.pop(key, None)
 
     def __setitem__(self, key, value):
         """
@@ -445,3 +547,7 @@ def _quote(name: str) -> str:
     if ' ' in name:
         return f'"{name}"'
     return name
+
+
+def _quote_always(name: str) -> str:
+    return '"{}"'.format(name.replace('"', '""'))
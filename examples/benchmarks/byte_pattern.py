@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Compares searching for a wildcard :class:`BytePattern` via the previous byte-by-byte sliding window vs
+:meth:`BytePattern.iter_matches` (on an in-memory blob) and :meth:`BytePattern.iter_file_matches` (on a memory-mapped
+file).  The sliding window approach is only run on the first 16 MiB, and its time is extrapolated to the full size.
+
+Example results (1 GiB synthetic blob, 4096 matches)::
+
+    sliding window (extrapolated):    2041.19 s
+    iter_matches (bytes):                0.74 s
+    iter_file_matches (mmap):            0.86 s
+
+:author: Doug Skrypa
+"""
+
+import os
+import random
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.misc.binary import BytePattern
+
+PATTERN = (b'PSAR', None, None, b'\x00\x04', None, b'zlib')
+SAMPLE_SIZE = 16 * 1024 * 1024
+
+
+def sliding_window_matches(parts: list[int | None], data: bytes):
+    data = memoryview(data)
+    chunk_len = len(parts)
+    for i in range(len(data) - chunk_len):
+        chunk = data[i: i + chunk_len]
+        if all(p is None or b == p for b, p in zip(chunk, parts)):
+            yield i, bytes(chunk)
+
+
+def make_blob(size: int, matches: int) -> bytearray:
+    rand = random.Random(42)
+    blob = bytearray(os.urandom(size))  # A bytearray is returned to avoid needing another copy
+    for _ in range(matches):
+        pos = rand.randrange(size - 16)
+        blob[pos: pos + 13] = b'PSAR' + rand.randbytes(2) + b'\x00\x04' + rand.randbytes(1) + b'zlib'
+    return blob
+
+
+def main(size_mb: int = 1024):
+    size = size_mb * 1024 * 1024
+    blob = make_blob(size, 4 * size_mb)
+    pattern = BytePattern(*PATTERN)
+
+    start = perf_counter()
+    expected = [m for m in sliding_window_matches(pattern._parts, blob[:SAMPLE_SIZE])]  # noqa
+    elapsed = (perf_counter() - start) * size / min(SAMPLE_SIZE, size)
+    print(f'{"sliding window (extrapolated):":<32s}{elapsed:9.2f} s')
+
+    start = perf_counter()
+    matches = pattern.all_matches(blob)
+    print(f'{"iter_matches (bytes):":<32s}{perf_counter() - start:9.2f} s')
+    if [m for m in matches if m[0] < SAMPLE_SIZE - len(pattern._parts)] != expected:  # noqa
+        raise RuntimeError('Results did not match')
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir, 'blob.bin')
+        path.write_bytes(blob)
+        del blob
+        start = perf_counter()
+        file_matches = tuple(pattern.iter_file_matches(path))
+        print(f'{"iter_file_matches (mmap):":<32s}{perf_counter() - start:9.2f} s')
+
+    if file_matches != matches:
+        raise RuntimeError('Results did not match')
+    print(f'Found {len(matches):,d} matches')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
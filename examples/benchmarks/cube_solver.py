@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Compares applying moves to a :class:`Cube` (27 :class:`Node` objects) vs the compact :class:`CubeState`, and finding
+solutions via the random search in :meth:`Cube._find_random_solution` vs the multi-phase :class:`Solver` used by
+:meth:`Cube.find_solution`.
+
+The random search is limited to 1,000,000 attempts with as many moves as were used to scramble the cube.
+
+Example results::
+
+    solver tables built in 0.248 s
+    100,000 moves    Cube.rotate:     1.703 s    CubeState.move:    0.189 s
+    scramble= 4 steps    random search:   0.101 s (solved)      solver:   0.002 s (28 moves)
+    scramble= 6 steps    random search:  17.216 s (not solved)  solver:   0.006 s (44 moves)
+    scramble= 8 steps    random search:  22.527 s (not solved)  solver:   0.002 s (26 moves)
+    scramble=10 steps    random search:  25.672 s (not solved)  solver:   0.006 s (54 moves)
+
+The solver's solutions are not optimal, so they may be longer than the scramble.
+
+:author: Doug Skrypa
+"""
+
+import logging
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.misc.cube import Cube, CubeState, MOVES, NoSolutionFound, get_solver
+
+
+def _time_moves(count: int):
+    cube, state = Cube(), CubeState()
+    moves = [i % len(MOVES) for i in range(0, count * 7, 7)]
+
+    start = perf_counter()
+    for move in moves:
+        cube.rotate(*MOVES[move])
+    node_elapsed = perf_counter() - start
+
+    start = perf_counter()
+    for move in moves:
+        state = state.move(move)
+    state_elapsed = perf_counter() - start
+
+    print(f'{count:,d} moves    Cube.rotate: {node_elapsed:9.3f} s    CubeState.move: {state_elapsed:8.3f} s')
+
+
+def main(max_attempts: int = 1_000_000):
+    logging.getLogger('ds_tools.misc.cube').setLevel(logging.WARNING)
+    start = perf_counter()
+    get_solver()
+    print(f'solver tables built in {perf_counter() - start:.3f} s')
+
+    _time_moves(100_000)
+    for steps in (4, 6, 8, 10):
+        cube = Cube.from_random(steps, seed=steps)
+        start = perf_counter()
+        try:
+            cube._find_random_solution(steps, max_attempts, seed=1)  # noqa
+        except NoSolutionFound:
+            random_result = 'not solved'
+        else:
+            random_result = 'solved'
+        random_elapsed = perf_counter() - start
+
+        start = perf_counter()
+        solved = cube.find_solution()
+        solver_elapsed = perf_counter() - start
+        print(
+            f'scramble={steps:2d} steps    random search: {random_elapsed:7.3f} s ({random_result})'
+            f'{" " * (12 - len(random_result))}solver: {solver_elapsed:7.3f} s ({len(solved.history)} moves)'
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Compares finding the bounding box of letterboxed frames via a full mask over each frame (the previous implementation of
+:meth:`ImageArray.find_bbox`) vs the edge-inward scan in :meth:`ImageArray.find_bbox` vs one batch
+:meth:`ImageArray.find_bboxes` call for all frames.
+
+Example results (200 letterboxed 1920x1080 RGB frames)::
+
+    full mask:            11.690 s
+    edge-inward scan:      2.006 s
+    batch (one call):      1.860 s
+
+Example results (2,000 letterboxed 320x180 grayscale frames, as used by find_aspect_ratio_changes.py)::
+
+    full mask:             0.238 s
+    edge-inward scan:      0.635 s
+    batch (one call):      0.176 s
+
+For small frames, the per-call overhead of scanning each frame individually outweighs the savings from examining fewer
+pixels, which is what :meth:`ImageArray.find_bboxes` avoids.
+
+:author: Doug Skrypa
+"""
+
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+from numpy import any as np_any
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.images.array import ImageArray  # noqa
+from ds_tools.images.geometry import Box  # noqa
+
+
+def make_frames(count: int, width: int, height: int, channels: int | None) -> np.ndarray:
+    rng = np.random.default_rng(42)
+    shape = (count, height, width) if channels is None else (count, height, width, channels)
+    frames = np.zeros(shape, np.uint8)
+    bar = round(height * (1 - (16 / 9) / 2.39) / 2)
+    frames[:, bar:height - bar] = rng.integers(1, 256, (1, height - 2 * bar, *shape[2:]), np.uint8)
+    return frames
+
+
+def full_mask_bbox(arr: np.ndarray) -> Box:
+    ia = ImageArray(arr)
+    mask = np_any(ia._pixels != ia.find_border_color(), axis=-1)
+    rows = np_any(mask, axis=1).nonzero()[0]
+    cols = np_any(mask, axis=0).nonzero()[0]
+    top, bottom = (int(rows[0]), int(rows[-1]) + 1) if rows.size else (0, arr.shape[0])
+    left, right = (int(cols[0]), int(cols[-1]) + 1) if cols.size else (0, arr.shape[1])
+    return Box(left, top, right, bottom)
+
+
+def compare(frames: np.ndarray):
+    start = perf_counter()
+    expected = [full_mask_bbox(frame) for frame in frames]
+    print(f'    full mask:          {perf_counter() - start:7.3f} s')
+
+    start = perf_counter()
+    found = [ImageArray(frame).find_bbox() for frame in frames]
+    print(f'    edge-inward scan:   {perf_counter() - start:7.3f} s')
+
+    start = perf_counter()
+    batch = ImageArray.find_bboxes(frames)
+    print(f'    batch (one call):   {perf_counter() - start:7.3f} s')
+
+    assert expected == found == batch
+
+
+def main():
+    print('200 letterboxed 1920x1080 RGB frames:')
+    compare(make_frames(200, 1920, 1080, 3))
+    print('2,000 letterboxed 320x180 grayscale frames:')
+    compare(make_frames(2000, 320, 180, None))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Compares extracting filtered links from a large HTML page via :meth:`HtmlSoup.links` (which builds a full BeautifulSoup
+tree first) vs the streaming :func:`iter_links`.
+
+Example results (5.1 MB page with 15,000 links, using html.parser; lxml was not installed)::
+
+    HtmlSoup.links:      30.995 s
+    iter_links:           1.527 s
+
+:author: Doug Skrypa
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.utils.soup import HtmlSoup, iter_links  # noqa
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'eiusmod', 'tempor')
+
+
+def make_html(links: int) -> str:
+    rand = random.Random(42)
+    parts = ['<html><head><title>Benchmark</title></head><body><table class="wikitable">']
+    for i in range(links):
+        words = ' '.join(rand.choices(WORDS, k=12))
+        if rand.random() < 0.5:
+            href = f'/wiki/Page_{i}'
+        else:
+            href = f'https://{rand.choice(("example.com", "other.org"))}/path/{i}?q={i}#frag'
+        parts.append(
+            f'<tr><td class="c{i % 7}"><span>{words}</span></td><td><b>{i}</b> &amp; <i>{words}</i></td>'
+            f'<td><a href="{href}" title="Link {i}">Link <em>{i}</em></a></td><td><img src="/img/{i}.png"></td></tr>'
+        )
+    parts.append('</table></body></html>')
+    return '\n'.join(parts)
+
+
+def main():
+    html = make_html(int(sys.argv[1]) if len(sys.argv) > 1 else 15_000)
+    print(f'HTML size: {len(html) / 1024 ** 2:.1f} MB')
+    filters = {'href': re.compile('/wiki/'), 'path': re.compile(r'^/wiki/Page_\d+$')}
+    results = {}
+    for name, func in (
+        ('HtmlSoup.links', lambda: [a['href'] for a in HtmlSoup(html).links(**filters)]),
+        ('iter_links', lambda: [a.href for a in iter_links(html, parser='html.parser', **filters)]),
+    ):
+        start = perf_counter()
+        results[name] = func()
+        print(f'{name + ":":<20s} {perf_counter() - start:6.3f} s')
+
+    if len({tuple(r) for r in results.values()}) != 1:
+        raise RuntimeError('Results did not match')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Compares finding pairs of similar images by calling :meth:`ComparableImage.taxicab_distance` and
+:meth:`ComparableImage.mean_squared_error` for each pair vs a single :class:`ComparisonMatrix`.  Structural
+similarity is excluded, since it is only calculated for pairs that pass the cheap metrics in both approaches.
+
+Example results (200 grayscale 256x192 images / 19,900 pairs)::
+
+    pairwise:              2.544 s
+    ComparisonMatrix:      0.250 s
+
+:author: Doug Skrypa
+"""
+
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+from PIL.Image import fromarray
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.images.compare import ComparableImage, ComparisonMatrix  # noqa
+
+
+def make_images(count: int):
+    rng = np.random.default_rng(42)
+    bases = [rng.integers(0, 256, (192, 256), np.uint8) for _ in range(count // 4)]
+    noise = rng.integers(-1, 2, (count, 192, 256))
+    return [fromarray(np.clip(bases[i % len(bases)] + noise[i], 0, 255).astype(np.uint8)) for i in range(count)]
+
+
+def main():
+    images = make_images(200)
+
+    start = perf_counter()
+    comparable = [ComparableImage(image) for image in images]
+    expected = []
+    for a in range(len(comparable)):
+        for b in range(a + 1, len(comparable)):
+            img_a, img_b = comparable[a], comparable[b]
+            if img_a.taxicab_distance(img_b)[1] <= 10 and img_a.mean_squared_error(img_b) <= 300:
+                expected.append((a, b))
+    print(f'    pairwise:          {perf_counter() - start:7.3f} s')
+
+    start = perf_counter()
+    found = ComparisonMatrix(images).find_similar(mssim=None)
+    print(f'    ComparisonMatrix:  {perf_counter() - start:7.3f} s')
+
+    assert expected == found
+
+
+if __name__ == '__main__':
+    main()
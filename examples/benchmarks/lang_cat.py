@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Compares categorizing strings by scanning the unicode ranges for each character (the previous implementation of
+:meth:`LangCat.categorize`) vs the precomputed codepoint table used by :meth:`LangCat.categorize` and
+:meth:`LangCat.categorize_many`.
+
+Example results (200,000 names, ~25% repeated)::
+
+    range scan:           7.673 s
+    categorize:           0.633 s
+    categorize_many:      0.482 s
+
+:author: Doug Skrypa
+"""
+
+import random
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.unicode.languages import LangCat, _strip_non_word_chars  # noqa
+
+ALPHABETS = (
+    'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    ''.join(map(chr, range(0xAC00, 0xAC00 + 400))),  # Hangul syllables
+    ''.join(map(chr, range(0x3041, 0x3097))),  # Hiragana
+    ''.join(map(chr, range(0x4E00, 0x4E00 + 400))),  # CJK
+)
+
+
+def range_scan_categorize(text: str) -> LangCat:
+    if not text:
+        return LangCat.NUL
+    elif len(text) == 1:
+        dec = ord(text)
+        for cat, ranges in LangCat._ranges():  # noqa
+            if any(a <= dec <= b for a, b in ranges):
+                return cat
+        return LangCat.UNK
+    elif text := _strip_non_word_chars(text):
+        cat = range_scan_categorize(text[0])
+        for c in text[1:]:
+            if range_scan_categorize(c) != cat:
+                return LangCat.MIX
+        return cat
+    else:
+        return LangCat.NUL
+
+
+def make_names(count: int) -> list[str]:
+    rand = random.Random(42)
+    names = []
+    for _ in range(count * 3 // 4):
+        words = []
+        for _ in range(rand.randint(1, 4)):
+            alphabet = ALPHABETS[rand.randrange(len(ALPHABETS))] if rand.random() < 0.2 else ALPHABETS[0]
+            words.append(''.join(rand.choices(alphabet, k=rand.randint(2, 8))))
+        names.append(' '.join(words) + rand.choice(('', ' (feat. X)', ' - Remix', '!')))
+    names += rand.choices(names, k=count - len(names))
+    rand.shuffle(names)
+    return names
+
+
+def main():
+    names = make_names(200_000)
+    range_scan_categorize('warm up')  # Both approaches use lazily initialized tables
+    LangCat.categorize('warm up')
+    results = {}
+    for name, func in (
+        ('range scan', lambda: [range_scan_categorize(n) for n in names]),
+        ('categorize', lambda: [LangCat.categorize(n) for n in names]),
+        ('categorize_many', lambda: LangCat.categorize_many(names)),
+    ):
+        start = perf_counter()
+        results[name] = func()
+        print(f'{name + ":":<20s} {perf_counter() - start:6.3f} s')
+
+    if len({tuple(r) for r in results.values()}) != 1:
+        raise RuntimeError('Results did not match')
+
+
+if __name__ == '__main__':
+    main()
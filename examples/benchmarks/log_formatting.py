@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Compares the records/sec that can be formatted by :class:`ColorLogFormatter` vs the previous implementation, which
+called ``datetime.fromtimestamp(...).strftime(...)`` and re-built ANSI color codes for every record.
+
+Example results (500k records spread across 50 seconds, ``millis=True`` date format, every 3rd record colored)::
+
+    Previous formatter:       72,854 records/s
+    ColorLogFormatter:       168,498 records/s
+
+:author: Doug Skrypa
+"""
+
+import logging
+import sys
+from datetime import datetime
+from logging import Formatter, LogRecord
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.logging import ColorLogFormatter, ENTRY_FMT_DETAILED
+from ds_tools.output.color import colored
+
+
+class PreviousColorLogFormatter(Formatter):
+    _local_tz = ColorLogFormatter._local_tz
+
+    def formatTime(self, record: LogRecord, datefmt: str = None) -> str:
+        dt = datetime.fromtimestamp(record.created, self._local_tz)
+        if datefmt:
+            return dt.strftime(datefmt)
+        else:
+            return self.default_msec_format % (dt.strftime(self.default_time_format), record.msecs)
+
+    def format(self, record: LogRecord) -> str:
+        formatted = super().format(record)
+        if color := getattr(record, 'color', None):
+            formatted = colored(formatted, color)
+        return formatted
+
+
+def main(count: int = 500_000):
+    start_time = 1700000000.0
+    records = []
+    for i in range(count):
+        record = LogRecord('bench', logging.INFO, __file__, 1, 'Processed item=%s', (i,), None)
+        record.created = start_time + i * 50 / count
+        if i % 3 == 0:
+            record.color = 'cyan'
+        records.append(record)
+
+    date_fmt = '%Y-%m-%d %H:%M:%S.%f %Z'
+    for name, formatter in (
+        ('Previous formatter', PreviousColorLogFormatter(ENTRY_FMT_DETAILED, date_fmt)),
+        ('ColorLogFormatter', ColorLogFormatter(ENTRY_FMT_DETAILED, date_fmt)),
+    ):
+        format_record = formatter.format
+        start = perf_counter()
+        for record in records:
+            format_record(record)
+        elapsed = perf_counter() - start
+        print(f'{name + ":":<24s} {count / elapsed:>10,.0f} records/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
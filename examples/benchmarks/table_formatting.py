@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Compares per-column :meth:`Column.format` calls (the previous behavior for tables with custom formatters or wide
+characters) with the compiled :class:`RowFormatter` used by :class:`Table`, for both dict and tuple rows.
+
+Example results (1M rows, 4 columns, ~1% of values contain wide characters)::
+
+    Column.format (dict rows):      18.17 s
+    RowFormatter.format_row:         4.25 s
+    RowFormatter.format_values:      4.60 s
+
+:author: Doug Skrypa
+"""
+
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+
+from ds_tools.output.table import SimpleColumn, Table
+
+
+def main(count: int = 1_000_000):
+    values = [(i, f'name_{i % 5000}' if i % 100 else '한국어 이름', i * 1.5, 'abc' * (i % 4)) for i in range(count)]
+    rows = [dict(zip('abcd', row)) for row in values]
+    table = Table(
+        SimpleColumn('a', align='>', ftype=',d'),
+        SimpleColumn('b'),
+        SimpleColumn('c', align='>', ftype=',.2f'),
+        SimpleColumn('d', formatter=lambda v, s: s),
+        file=sys.stdout,
+    )
+    table.set_width(rows[:10_000])
+    columns = table.columns
+    formatter = table.row_formatter
+
+    def column_format():
+        for row in rows:
+            '  '.join(c.format(row[c.key]) for c in columns).rstrip()
+
+    def format_row():
+        for row in rows:
+            formatter.format_row(row)
+
+    def format_values():
+        for row in values:
+            formatter.format_values(row)
+
+    for name, func in (
+        ('Column.format (dict rows)', column_format),
+        ('RowFormatter.format_row', format_row),
+        ('RowFormatter.format_values', format_values),
+    ):
+        start = perf_counter()
+        func()
+        print(f'{name + ":":<30s} {perf_counter() - start:6.2f} s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
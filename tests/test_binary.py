@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import mmap
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from ds_tools.misc.binary import BytePattern
+
+
+class BytePatternTest(TestCase):
+    def test_literal_and_wildcards(self):
+        pattern = BytePattern(b'ab', None, b'd')
+        data = b'xxabcdyyab\x00dabd'
+        expected = ((2, b'abcd'), (8, b'ab\x00d'))
+        self.assertEqual(expected, pattern.all_matches(data))
+        self.assertEqual(expected, pattern.all_matches(bytearray(data)))
+        self.assertEqual(expected, pattern.all_matches(memoryview(data)))
+
+    def test_leading_wildcard_and_overlapping_matches(self):
+        self.assertEqual(((0, b'aa'), (1, b'aa'), (2, b'aa')), BytePattern(b'aa').all_matches(b'aaaa'))
+        self.assertEqual(((0, b'xa'), (1, b'aa'), (2, b'aa')), BytePattern(None, b'a').all_matches(b'xaaa'))
+
+    def test_match_at_end(self):
+        self.assertEqual(((3, b'abc'),), BytePattern(b'a', None, b'c').all_matches(b'xyzabc'))
+
+    def test_only_wildcards(self):
+        self.assertEqual(((0, b'ab'), (1, b'bc')), BytePattern(None, None).all_matches(b'abc'))
+
+    def test_start_and_end(self):
+        pattern = BytePattern(b'a', None)
+        self.assertEqual([(2, b'ab'), (4, b'ab')], list(pattern.iter_matches(b'abababac', 1, 6)))
+
+    def test_empty_pattern(self):
+        with self.assertRaises(ValueError):
+            BytePattern()
+
+    def test_file_matches_across_chunks(self):
+        granularity = mmap.ALLOCATIONGRANULARITY
+        data = bytearray(3 * granularity + 10)
+        positions = [0, granularity - 2, 2 * granularity - 1, len(data) - 4]
+        for pos in positions:
+            data[pos: pos + 4] = b'\xff\xfe\x01\xfd'
+
+        pattern = BytePattern(b'\xff', None, b'\x01', None)
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, 'data.bin')
+            path.write_bytes(data)
+            self.assertEqual(positions, [pos for pos, _ in pattern.iter_file_matches(path, chunk_size=1)])
+            self.assertEqual(positions, [pos for pos, _ in pattern.iter_file_matches(path)])
+            path.write_bytes(b'')
+            self.assertEqual([], list(pattern.iter_file_matches(path)))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
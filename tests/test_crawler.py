@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+import re
+from hashlib import sha1
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread, Lock
+from time import monotonic
+from unittest import TestCase, main
+
+from ds_tools.http.crawler import Crawler, CrawlStore, HostRateLimiter, ParsedPage
+
+PAGES = {
+    '/': '<title>index</title><a href="/a">A</a> <a href="b#section">B</a> <a href="http://example.com/x">X</a>',
+    '/a': '<title>a</title><a href="/c">C</a>',
+    '/b': '<title>b</title><a href="/c">C</a> <a href="/missing">Missing</a>',
+    '/c': '<title>c</title><a href="/">Index</a>',
+}
+
+
+def parse_page(url: str, text: str) -> ParsedPage:
+    return ParsedPage(re.search(r'<title>(.*?)</title>', text).group(1), re.findall(r'href="([^"]+)"', text))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    requests: list[tuple[str, int]]
+    lock: Lock
+
+    def do_GET(self):  # noqa
+        if (body := PAGES.get(self.path)) is None:
+            return self._respond(404)
+        etag = '"{}"'.format(sha1(body.encode()).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            return self._respond(304)
+        self._respond(200, body.encode(), {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+
+    def _respond(self, status: int, body: bytes = b'', headers: dict[str, str] = None):
+        with self.lock:
+            self.requests.append((self.path, status))
+        self.send_response(status)
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CrawlerTest(TestCase):
+    def setUp(self):
+        handler = type('Handler', (StandInHandler,), {'requests': [], 'lock': Lock()})
+        self.requests = handler.requests
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self._tmp_dir = TemporaryDirectory()
+        self.store_path = Path(self._tmp_dir.name, 'crawl.db')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp_dir.cleanup()
+
+    def _crawler(self, **kwargs) -> Crawler:
+        kwargs.setdefault('parse_workers', 0)
+        return Crawler(parse_page, self.store_path, min_interval=0, **kwargs)
+
+    def _url(self, path: str) -> str:
+        return self.base_url + path
+
+    def test_crawl_all(self):
+        crawler = self._crawler()
+        with self.assertLogs('ds_tools.http.crawler', 'ERROR'):
+            pages = {page.url: page for page in crawler.crawl([self._url('/')])}
+
+        expected = {self._url(p): p.strip('/') or 'index' for p in ('/', '/a', '/b', '/c')}
+        self.assertEqual(expected, crawler.store.results())
+        self.assertIsNotNone(pages[self._url('/missing')].error)
+        self.assertEqual({'pending': 0, 'done': 4, 'failed': 1}, crawler.store.counts())
+        self.assertEqual(5, len(self.requests))  # Each page is only requested once, and the external link is ignored
+
+    def test_resume(self):
+        pages = list(self._crawler().crawl([self._url('/')], max_pages=2))
+        self.assertEqual([self._url('/'), self._url('/a')], sorted(page.url for page in pages))
+
+        crawler = self._crawler()
+        with self.assertLogs('ds_tools.http.crawler', 'ERROR'):
+            pages = list(crawler.crawl())
+        self.assertEqual(['/b', '/c', '/missing'], sorted(page.url[len(self.base_url):] for page in pages))
+        self.assertEqual(4, len(crawler.store.results()))
+        self.assertEqual(5, len(self.requests))
+
+    def test_conditional_refresh(self):
+        with self.assertLogs('ds_tools.http.crawler', 'ERROR'):
+            list(self._crawler().crawl([self._url('/')]))
+        self.requests.clear()
+        with self.assertLogs('ds_tools.http.crawler', 'ERROR'):
+            pages = [page for page in self._crawler().crawl(refresh=True) if page.error is None]
+        self.assertEqual(4, len(pages))
+        self.assertTrue(all(page.from_cache for page in pages))
+        self.assertEqual({304, 404}, {status for _, status in self.requests})
+
+    def test_parse_pool_and_max_depth(self):
+        crawler = self._crawler(parse_workers=2, max_depth=1)
+        pages = list(crawler.crawl([self._url('/')]))
+        self.assertEqual(['index', 'a', 'b'], sorted((page.data for page in pages), key=lambda d: d.strip('index')))
+        self.assertEqual({'pending': 0, 'done': 3, 'failed': 0}, crawler.store.counts())  # /c was not added
+
+    def test_in_memory_store(self):
+        store = CrawlStore()
+        self.assertEqual(2, store.add(['http://a/1', 'http://a/2'], 0))
+        self.assertEqual(0, store.add(['http://a/1'], 1))
+        self.assertEqual([('http://a/2', 0)], store.pending(5, {'http://a/1'}))
+
+
+class HostRateLimiterTest(TestCase):
+    def test_per_host_interval(self):
+        limiter = HostRateLimiter(0.05, {'fast.test': 0})
+        start = monotonic()
+        for _ in range(3):
+            limiter.wait('http://slow.test/page')
+        self.assertGreaterEqual(monotonic() - start, 0.1)
+
+        start = monotonic()
+        for _ in range(3):
+            limiter.wait('http://fast.test/page')
+        limiter.wait('http://other.test/page')
+        self.assertLess(monotonic() - start, 0.05)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
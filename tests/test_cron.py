@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from unittest import TestCase, main
 from unittest.mock import Mock
 
@@ -124,6 +124,62 @@ class CronTest(TestCase):
             with self.subTest(cron_str=cron_str):
                 self.assertEqual(expected, CronSchedule(cron_str).get_intervals())
 
+    def test_next_after_matches_iteration(self):
+        starts = (datetime(2024, 1, 15, 7, 11, 5), datetime(2024, 2, 28, 23, 59), datetime(2024, 12, 31, 17, 45))
+        for cron_str in ('*/15 9-17 * * 1-5', '0 0 L * *', '30 2 1,15 * 0', '5 4 * 3,6 *', '* * * * *'):
+            cron = CronSchedule(cron_str)
+            for dt in starts:
+                with self.subTest(cron_str=cron_str, dt=dt):
+                    self.assertEqual(next(cron.matches_after(dt)), cron.next_after(dt))
+
+    def test_next_after_sparse(self):
+        cron = CronSchedule('0 0 29 2 1')  # Feb 29 on a Monday
+        self.assertEqual(datetime(2044, 2, 29), cron.next_after(datetime(2024, 3, 1)))
+        self.assertEqual(datetime(2016, 2, 29), cron.prev_before(datetime(2044, 2, 29)))
+
+    def test_next_after_is_exclusive(self):
+        cron = CronSchedule('0 12 * * *')
+        self.assertEqual(datetime(2024, 1, 2, 12), cron.next_after(datetime(2024, 1, 1, 12)))
+        self.assertEqual(datetime(2024, 1, 1, 12), cron.next_after(datetime(2024, 1, 1, 11, 59, 59)))
+        self.assertEqual(datetime(2023, 12, 31, 12), cron.prev_before(datetime(2024, 1, 1, 12)))
+        self.assertEqual(datetime(2024, 1, 1, 12), cron.prev_before(datetime(2024, 1, 1, 12, 0, 1)))
+
+    def test_prev_before_last_dom(self):
+        cron = CronSchedule('30 23 L * *')
+        self.assertEqual(datetime(2024, 2, 29, 23, 30), cron.prev_before(datetime(2024, 3, 31, 23, 29)))
+        self.assertEqual(datetime(2024, 3, 31, 23, 30), cron.next_after(datetime(2024, 3, 1)))
+
+    def test_never_matches(self):
+        cron = CronSchedule('0 0 30 2 *')
+        self.assertIsNone(cron.next_after(datetime(2024, 1, 1)))
+        self.assertIsNone(cron.prev_before(datetime(2024, 1, 1)))
+        self.assertEqual(0, cron.count_between(datetime(2024, 1, 1), datetime(2026, 1, 1)))
+
+    def test_ext_next_after(self):
+        cron = ExtCronSchedule('*/20 0 12 * * *')
+        self.assertEqual(datetime(2024, 1, 1, 12, 0, 20), cron.next_after(datetime(2024, 1, 1, 12, 0, 5)))
+        self.assertEqual(datetime(2023, 12, 31, 12, 0, 40), cron.prev_before(datetime(2024, 1, 1, 12)))
+
+    def test_count_between(self):
+        cases = [
+            ('*/15 9-17 * * 1-5', datetime(2024, 1, 15, 10, 7), datetime(2024, 1, 22, 9, 30)),
+            ('0 0 L * *', datetime(2024, 1, 1), datetime(2025, 1, 1)),
+            ('* * * * *', datetime(2024, 1, 1, 0, 0, 30), datetime(2024, 1, 1, 1)),
+            ('30 2 1,15 * 0', datetime(2020, 1, 1), datetime(2024, 1, 1)),
+        ]
+        for cron_str, start, end in cases:
+            with self.subTest(cron_str=cron_str):
+                cron = CronSchedule(cron_str)
+                expected = 0
+                for dt in cron.matches_after(start - timedelta(seconds=1)):
+                    if dt >= end:
+                        break
+                    expected += 1
+                self.assertEqual(expected, cron.count_between(start, end))
+
+        self.assertEqual(12, CronSchedule('0 0 L * *').count_between(date(2024, 1, 1), date(2025, 1, 1)))
+        self.assertEqual(0, CronSchedule('0 0 L * *').count_between(date(2025, 1, 1), date(2024, 1, 1)))
+
 
 class WinCronTest(TestCase):
     def test_min_max_values(self):
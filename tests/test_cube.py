@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+from random import Random
+from unittest import TestCase, main
+
+from ds_tools.misc.cube import Cube, CubeState, Color, MOVES, NoSolutionFound, solve_state
+
+
+class CubeStateTest(TestCase):
+    def test_solved(self):
+        state = CubeState.from_cube(Cube())
+        self.assertTrue(state.solved())
+        self.assertEqual(1, state.percent_solved())
+        self.assertEqual(54, len(state.stickers))
+
+    def test_moves_match_node_rotation(self):
+        rand = Random(42)
+        cube, state = Cube(), CubeState()
+        for _ in range(100):
+            move = rand.randrange(len(MOVES))
+            cube.rotate(*MOVES[move])
+            state = state.move(move)
+            self.assertEqual(CubeState.from_cube(cube), state)
+            self.assertAlmostEqual(cube.percent_solved(), state.percent_solved())
+
+    def test_to_cube(self):
+        cube = Cube.from_random(25, seed=1)
+        state = CubeState.from_cube(cube)
+        self.assertEqual(set(cube.nodes), set(state.to_cube().nodes))
+
+    def test_color_parts(self):
+        self.assertEqual((Color.green, Color.white), (Color.white | Color.green).parts)
+        self.assertEqual((Color.none,), Color.none.parts)
+        self.assertEqual((Color.white,), Color.white.non_none_parts)
+
+
+class CubeSolverTest(TestCase):
+    def test_find_solution(self):
+        cube = Cube.from_random(6, seed=4)
+        solved = cube.find_solution()
+        self.assertTrue(solved.solved())
+        self.assertEqual(1, solved.history[-1][-1])
+        self.assertFalse(cube.solved())
+
+    def test_solve_random_states(self):
+        rand = Random(1)
+        for _ in range(10):
+            state = CubeState()
+            for _ in range(30):
+                state = state.move(rand.randrange(len(MOVES)))
+            moves = solve_state(state)
+            self.assertEqual(moves, solve_state(state))  # Solutions are deterministic
+            for move in moves:
+                state = state.move(move)
+            self.assertTrue(state.solved())
+
+    def test_simple_solutions(self):
+        state = CubeState().move(MOVES.index(('x', 1, True))).move(MOVES.index(('z', 0, False)))
+        self.assertEqual([MOVES.index(('z', 0, True)), MOVES.index(('x', 1, False))], solve_state(state))
+        self.assertEqual([], solve_state(CubeState()))
+
+    def test_unsolvable_state(self):
+        stickers = bytearray(CubeState().stickers)
+        stickers[0], stickers[1], stickers[2] = stickers[1], stickers[2], stickers[0]  # Twist a single corner
+        with self.assertRaises(NoSolutionFound):
+            solve_state(CubeState(bytes(stickers)))
+
+    def test_random_solution(self):
+        cube = Cube()
+        cube.rotate('y', 1, True)
+        solved = cube._find_random_solution(1, 1000, seed=1)  # noqa
+        self.assertEqual([('y', 1, False, 1.0)], solved.history)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+from unittest import main
+
+from ds_tools.media.exceptions import FfmpegError
+from ds_tools.media.ffmpeg import stream_ffmpeg_frames
+from ds_tools.test_common import FakeFfmpegTestCase
+
+FAKE_FFMPEG = """#!{python}
+import sys
+
+frames, size = int(sys.argv[1]), int(sys.argv[2])
+for i in range(frames):
+    sys.stderr.write('frame n:{{}} pts_time:{{}}\\n'.format(i, i * 1.5))
+    sys.stderr.flush()
+    # Write each frame in 2 parts to ensure partial reads are handled
+    sys.stdout.buffer.write(bytes([i]) * (size // 2))
+    sys.stdout.buffer.flush()
+    sys.stdout.buffer.write(bytes([i]) * (size - size // 2))
+    sys.stdout.buffer.flush()
+if len(sys.argv) > 3:
+    sys.stdout.buffer.write(b'x')
+    sys.exit(int(sys.argv[3]))
+"""
+
+
+class StreamFramesTest(FakeFfmpegTestCase):
+    fake_commands = {'ffmpeg': FAKE_FFMPEG}
+
+    def test_frames_and_stderr(self):
+        lines = []
+        frames = [bytes(f) for f in stream_ffmpeg_frames(['3', '1000'], 1000, stderr_handler=lines.append)]
+        self.assertEqual([bytes([i]) * 1000 for i in range(3)], frames)
+        self.assertEqual([f'frame n:{i} pts_time:{i * 1.5}\n'.encode() for i in range(3)], lines)
+
+    def test_buffer_is_reused(self):
+        views = list(stream_ffmpeg_frames(['2', '10'], 10))
+        self.assertIs(views[0], views[1])
+
+    def test_error_after_incomplete_frame(self):
+        frames = []
+        with self.assertLogs('ds_tools.media.ffmpeg', 'WARNING'), self.assertRaises(FfmpegError):
+            for frame in stream_ffmpeg_frames(['2', '10', '1'], 10):
+                frames.append(bytes(frame))
+        self.assertEqual(2, len(frames))
+
+    def test_close_early(self):
+        frames = stream_ffmpeg_frames(['100000', '100000'], 100000)
+        self.assertEqual(bytes(100000), bytes(next(frames)))
+        frames.close()  # Should not hang waiting for the process to write the remaining frames
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
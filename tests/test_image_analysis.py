@@ -3,6 +3,8 @@
 from unittest import TestCase, main
 from pathlib import Path
 
+import numpy as np
+
 from ds_tools.images.array import ImageArray
 from ds_tools.images.utils import as_image
 
@@ -24,6 +26,28 @@ class ImageAnalysisTest(TestCase):
         self.assertEqual((50, 50), box.size)  # The bbox is expected to result in a 50x50 square
         self.assertEqual((25, 25, 75, 75), box.as_bbox())
 
+    def test_find_bbox_grayscale(self):
+        arr = np.zeros((90, 160), np.uint8)
+        arr[10:80, 1:159] = 200
+        self.assertEqual((1, 10, 159, 80), ImageArray(arr).find_bbox().as_bbox())
+        self.assertEqual((0, 0, 160, 90), ImageArray(np.zeros((90, 160), np.uint8)).find_bbox().as_bbox())
+
+    def test_find_bboxes(self):
+        image = as_image(DATA_DIR.joinpath('square_50_in_100.png'))
+        blank = np.zeros((100, 100, 4), np.uint8)
+        boxes = ImageArray.find_bboxes([image, blank, image])
+        self.assertEqual([(25, 25, 75, 75), (0, 0, 100, 100), (25, 25, 75, 75)], [box.as_bbox() for box in boxes])
+
+    def test_find_bboxes_tolerance_and_threshold(self):
+        frames = np.full((2, 90, 160), 120, np.uint8)
+        frames[:, :12], frames[:, -12:] = 3, 0  # Letterbox with compression noise
+        frames[1, :12, 80] = 255  # A subtitle pixel in the letterbox
+        expected = [(0, 12, 160, 78), (0, 12, 160, 78)]
+        boxes = ImageArray.find_bboxes(frames, tolerance=16, threshold=0.99)
+        self.assertEqual(expected, [box.as_bbox() for box in boxes])
+        boxes = ImageArray.find_bboxes(frames)
+        self.assertEqual([(0, 0, 160, 78), (0, 0, 160, 78)], [box.as_bbox() for box in boxes])
+
 
 if __name__ == '__main__':
     main(verbosity=2)
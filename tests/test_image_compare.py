@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import numpy as np
+from PIL.Image import fromarray, open as open_image
+
+from ds_tools.images.compare import ComparableImage, ComparisonMatrix
+
+
+class ComparisonMatrixTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        bases = [rng.integers(0, 256, (48, 64), np.uint8) for _ in range(4)]
+        cls.images = []
+        for i in range(12):
+            noise = rng.integers(-1, 2, (48, 64)) if i >= 4 else 0
+            cls.images.append(fromarray(np.clip(bases[i % 4].astype(int) + noise, 0, 255).astype(np.uint8)))
+
+    def test_metrics_match_pairwise_comparisons(self):
+        matrix = ComparisonMatrix(self.images)
+        images = [ComparableImage(image) for image in self.images]
+        n = len(images)
+        expected_mse = [[images[a].mean_squared_error(images[b]) if a != b else 0 for b in range(n)] for a in range(n)]
+        expected_taxi = [[images[a].taxicab_distance(images[b])[1] for b in range(n)] for a in range(n)]
+        self.assertTrue(np.allclose(expected_mse, matrix.mean_squared_errors(), atol=0.05))
+        self.assertTrue(np.allclose(expected_taxi, matrix.taxicab_distances()))
+
+    def test_find_pairs(self):
+        matrix = ComparisonMatrix(self.images)
+        expected = [(a, b) for a in range(12) for b in range(a + 1, 12) if a % 4 == b % 4]
+        self.assertEqual(expected, matrix.find_similar(mssim=None))
+        self.assertEqual(expected, matrix.find_same(mssim=None))
+        self.assertEqual([], matrix.find_pairs(taxi=0.5, mssim=None))
+
+    def test_common_size(self):
+        images = [fromarray(np.zeros((100, 200), np.uint8)), fromarray(np.zeros((90, 120), np.uint8))]
+        self.assertEqual((120, 60), ComparisonMatrix(images).size)
+        self.assertEqual((100, 40), ComparisonMatrix(images, max_width=100, max_height=40).size)
+        self.assertEqual((2, 40, 100), ComparisonMatrix(images, max_width=100, max_height=40).pixel_arrays.shape)
+        with self.assertRaises(ValueError):
+            ComparisonMatrix(images[:1])
+
+    def test_paths_are_opened_one_at_a_time(self):
+        opened = []
+
+        def _open_image(path):
+            self.assertEqual([], [img for img in opened if img.fp is not None], 'a previous image is still open')
+            opened.append(open_image(path))
+            return opened[-1]
+
+        with TemporaryDirectory() as tmp_dir:
+            paths = []
+            for i, image in enumerate(self.images):
+                paths.append(Path(tmp_dir, f'{i}.png'))
+                image.save(paths[-1])
+
+            with patch('ds_tools.images.compare.open_image', side_effect=_open_image):
+                pairs = ComparisonMatrix(paths).find_similar(mssim=None)
+
+        self.assertEqual(ComparisonMatrix(self.images).find_similar(mssim=None), pairs)
+        self.assertEqual(len(paths) * 2, len(opened))  # Once to read the size, and once to read the pixels
+        self.assertTrue(all(img.fp is None for img in opened))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -23,6 +23,28 @@ class LangCatTest(TestCaseBase):
         with self.subTest('detail'):
             self.assertEqual({LangCat.HAN, LangCat.ENG}, LangCat.categorize('일=two\n이=two', True))
 
+    def test_single_chars(self):
+        cases = {
+            'a': LangCat.ENG, '1': LangCat.ENG, '일': LangCat.HAN, 'ア': LangCat.JPN, '漢': LangCat.CJK,
+            'ก': LangCat.THAI, 'λ': LangCat.GRK, 'Ж': LangCat.CYR, '\U00020001': LangCat.CJK, '\U0001b001': LangCat.JPN,
+            '\U0001f201': LangCat.JPN, '\U0001f210': LangCat.CJK, '\U0001f600': LangCat.UNK, '\u0600': LangCat.UNK,
+        }
+        for char, expected in cases.items():
+            with self.subTest(char=char):
+                self.assertEqual(expected, LangCat.categorize(char))
+
+    def test_symbols_outside_bmp_ignored(self):
+        self.assertEqual(LangCat.CJK, LangCat.categorize('漢 \U0001f600 \U00020001'))
+        self.assertEqual(LangCat.NUL, LangCat.categorize('\U0001f600 \U0001f601'))
+
+    def test_categorize_many(self):
+        texts = ['abc', '일 이', None, '', 'abc', '일=one', '!!']
+        expected = [LangCat.ENG, LangCat.HAN, LangCat.NUL, LangCat.NUL, LangCat.ENG, LangCat.MIX, LangCat.NUL]
+        self.assertEqual(expected, LangCat.categorize_many(texts))
+        detailed = LangCat.categorize_many(['일=one', '일=one'], True)
+        self.assertEqual([{LangCat.HAN, LangCat.ENG}] * 2, detailed)
+        self.assertIsNot(detailed[0], detailed[1])
+
 
 if __name__ == '__main__':
     main()
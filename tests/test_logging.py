@@ -4,9 +4,14 @@ import inspect
 import logging
 import tempfile
 import unittest
+from datetime import datetime
+from logging.handlers import QueueHandler
+from multiprocessing import Process, get_context
 from pathlib import Path
 
-from ds_tools.logging import init_logging
+from ds_tools.logging import init_logging, init_worker_logging, get_process_log_queue, stop_queue_listener
+from ds_tools.logging import DatetimeFormatter, ColorLogFormatter
+from ds_tools.output.color import colored
 
 
 class LoggingInitTest(unittest.TestCase):
@@ -35,6 +40,93 @@ class LoggingInitTest(unittest.TestCase):
             self.assertEqual(Path(log_path_3).stem, f'{this_file_name}-1')
             self._cleanup_handlers('test1', 'test2', 'test3')
 
+    def test_queue_mode(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir, 'test.log')
+            init_logging(log_path=log_path, names='test_queue', streams=False, use_queue=True, capture_warnings=False)
+            logger = logging.getLogger('test_queue')
+            self.assertEqual(1, len(logger.handlers))
+            self.assertIsInstance(logger.handlers[0], QueueHandler)
+            self.assertIsNone(get_process_log_queue())
+            logger.info('test message %s', 123)
+            stop_queue_listener()
+            self.assertIn('test message 123', log_path.read_text('utf-8'))
+            self._cleanup_handlers('test_queue')
+
+    def test_process_queue_mode(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir, 'test.log')
+            kwargs = {'names': 'test_mp_queue', 'streams': False, 'capture_warnings': False}
+            init_logging(log_path=log_path, use_queue='process', **kwargs)
+            proc = Process(target=_log_from_worker, args=(get_process_log_queue(),))
+            proc.start()
+            proc.join()
+            stop_queue_listener()
+            self.assertIn('message from worker', log_path.read_text('utf-8'))
+            self._cleanup_handlers('test_mp_queue')
+
+    def test_process_queue_mode_spawn(self):
+        # Spawned workers start with a fresh root logger, which would filter out INFO / DEBUG records by default
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir, 'test.log')
+            kwargs = {'names': 'test_mp_queue', 'streams': False, 'capture_warnings': False}
+            init_logging(log_path=log_path, use_queue='process', mp_context='spawn', **kwargs)
+            proc = get_context('spawn').Process(target=_log_from_worker, args=(get_process_log_queue(), logging.DEBUG))
+            proc.start()
+            proc.join()
+            stop_queue_listener()
+            log_text = log_path.read_text('utf-8')
+            self.assertIn('message from worker', log_text)
+            self.assertIn('debug message from worker', log_text)
+            self._cleanup_handlers('test_mp_queue')
+
+    def test_invalid_queue_mode(self):
+        with self.assertRaises(ValueError):
+            init_logging(log_path=None, names='test_bad_queue', use_queue='threads', capture_warnings=False)
+
+
+class FormatterTest(unittest.TestCase):
+    def _record(self, created: float, **kwargs) -> logging.LogRecord:
+        record = logging.LogRecord('test', logging.INFO, __file__, 1, 'test %s', ('message',), None)
+        record.created = created
+        record.msecs = int((created - int(created)) * 1000)
+        record.__dict__.update(kwargs)
+        return record
+
+    def test_cached_time_matches_strftime(self):
+        timestamps = (1700000000.0, 1700000000.1234567, 1700000000.9999996, 1700000001.5, 1700000061.25)
+        for date_fmt in ('%Y-%m-%d %H:%M:%S.%f %Z', '%Y-%m-%d %H:%M:%S %Z', '%H:%M:%S.%f', '%f', '%%f %f', None):
+            formatter = DatetimeFormatter('%(asctime)s %(message)s', date_fmt)
+            for created in timestamps:
+                with self.subTest(date_fmt=date_fmt, created=created):
+                    dt = datetime.fromtimestamp(created, DatetimeFormatter._local_tz)
+                    if date_fmt:
+                        expected = dt.strftime(date_fmt)
+                    else:
+                        expected = f'{dt.strftime(formatter.default_time_format)},{int((created % 1) * 1000):03d}'
+                    self.assertEqual(f'{expected} test message', formatter.format(self._record(created)))
+
+    def test_color_formatter(self):
+        formatter = ColorLogFormatter('%(message)s')
+        for color in ('red', 11, {'color': 'red', 'attrs': 'bold'}, ('blue', 'white')):
+            with self.subTest(color=color):
+                if isinstance(color, dict):
+                    expected = colored('test message', **color)
+                elif isinstance(color, tuple):
+                    expected = colored('test message', *color)
+                else:
+                    expected = colored('test message', color)
+                # Formatted twice to test cached values
+                for _ in range(2):
+                    self.assertEqual(expected, formatter.format(self._record(1700000000.5, color=color)))
+
+
+def _log_from_worker(log_queue, level: int = logging.NOTSET):
+    init_worker_logging(log_queue, level, names='test_mp_queue')
+    logger = logging.getLogger('test_mp_queue')
+    logger.info('message from worker')
+    logger.debug('debug message from worker')
+
 
 def get_expected_name():
     if __name__ != '__main__':
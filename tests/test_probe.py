@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+import os
+from pathlib import Path
+from unittest import main
+
+from ds_tools.media.exceptions import FfmpegError
+from ds_tools.media.probe import ProbeCache, get_probe_cache, probe, probe_many, set_probe_cache_path
+from ds_tools.media.videos import Video, VideoStream, KeyframeIntervalStats
+from ds_tools.test_common import FakeFfmpegTestCase
+
+FAKE_FFPROBE = """#!{python}
+import json, sys
+from pathlib import Path
+
+path = Path(sys.argv[-1])
+if '-show_entries' in sys.argv:
+    start, dur = (0, 100)
+    if '-read_intervals' in sys.argv:
+        start, dur = map(float, sys.argv[sys.argv.index('-read_intervals') + 1].split('%+'))
+    for i in range(int(start * 10), int((start + dur) * 10)):
+        pts = i / 10
+        print('{{:.3f}},{{}}'.format(pts, 'K_' if i % (20 if pts < 50 else 40) == 0 else '__'))
+    sys.exit(0)
+with Path(__file__).with_name('calls.txt').open('a') as f:
+    f.write(path.name + '\\n')
+if path.suffix == '.bad':
+    sys.exit(1)
+print(json.dumps({{'format': {{'filename': path.as_posix(), 'size': str(path.stat().st_size)}}, 'streams': []}}))
+"""
+
+
+class FakeFfprobeTestCase(FakeFfmpegTestCase):
+    fake_commands = {'ffprobe': FAKE_FFPROBE}
+
+    def setUp(self):
+        super().setUp()
+        set_probe_cache_path(self.tmp_dir.joinpath('probe.db'))
+
+    def _make_files(self, *names: str) -> list[Path]:
+        paths = []
+        for name in names:
+            path = self.tmp_dir.joinpath(name)
+            path.write_bytes(b'x' * len(name))
+            paths.append(path)
+        return paths
+
+
+class ProbeCacheTest(FakeFfprobeTestCase):
+    def test_video_info_uses_cache(self):
+        path = self._make_files('a.mkv')[0]
+        self.assertEqual(path.as_posix(), Video(path).info['format']['filename'])
+        self.assertEqual(path.as_posix(), Video(path).info['format']['filename'])
+        self.assertEqual(['a.mkv'], self._calls())
+
+    def test_changed_file_is_probed_again(self):
+        path = self._make_files('a.mkv')[0]
+        self.assertEqual(5, Video(path).size)
+        path.write_bytes(b'x' * 10)
+        self.assertEqual(10, Video(path).size)
+        self.assertEqual(['a.mkv', 'a.mkv'], self._calls())
+
+    def test_cache_disabled(self):
+        set_probe_cache_path(None)
+        path = self._make_files('a.mkv')[0]
+        self.assertIsNone(get_probe_cache())
+        self.assertEqual(path.as_posix(), Video(path).info['format']['filename'])
+        self.assertEqual(path.as_posix(), Video(path).info['format']['filename'])
+        self.assertEqual(['a.mkv', 'a.mkv'], self._calls())
+        self.assertFalse(self.tmp_dir.joinpath('probe.db').exists())
+
+    def test_missing_file(self):
+        with self.assertRaises(FfmpegError):
+            probe(self.tmp_dir.joinpath('missing.mkv'))
+
+    def test_probe_many(self):
+        paths = self._make_files('a.mkv', 'b.mkv', 'c.mp4', 'd.bad')
+        with self.assertLogs('ds_tools.media.probe', 'ERROR'):
+            results = dict(probe_many(paths, workers=2))
+        self.assertEqual(set(paths[:3]), set(results))
+        self.assertEqual(['a.mkv', 'b.mkv', 'c.mp4', 'd.bad'], sorted(self._calls()))
+
+        videos = list(Video.probe_many(paths[:3]))
+        self.assertEqual(set(paths[:3]), {v.path for v in videos})
+        self.assertEqual(4, len(self._calls()))  # All results were cached
+
+    def test_prune(self):
+        cache = ProbeCache(self.tmp_dir.joinpath('other.db'))
+        a, b = self._make_files('a.mkv', 'b.mkv')
+        cache.set_many([(a, {'a': 1}, None), (b, {'b': 2}, None)])
+        self.assertEqual({'a': 1}, cache.get(a))
+        os.remove(b)
+        self.assertEqual(1, cache.prune())
+        self.assertEqual({'a': 1}, cache.get(a))
+        cache.close()
+
+
+class KeyframeIntervalTest(FakeFfprobeTestCase):
+    def _stream(self) -> VideoStream:
+        video = Video(self._make_files('a.mkv')[0])
+        video.info = {'format': {'duration': '100'}, 'streams': [{'index': 0, 'codec_type': 'video'}]}  # noqa
+        return video.streams[0]
+
+    def test_full_scan(self):
+        self.assertEqual((2, 2.667, 4), tuple(round(v, 3) for v in self._stream().keyframe_interval_info))
+
+    def test_sampled_windows(self):
+        stats = self._stream().analyze_keyframe_intervals(samples=2, sample_duration=10)
+        # Windows: 0-10s (keyframes every 2s) and 50-60s (every 4s); the gap between windows is not counted
+        self.assertEqual((5, 2, 4), (stats.count, stats.min, stats.max))
+
+    def test_percentiles(self):
+        stats = KeyframeIntervalStats(bin_width=0.5)
+        for interval in (1, 1, 1, 2, 2, 10):
+            stats.add(interval)
+        self.assertEqual((1, 10, 17 / 6), (stats.min, stats.max, stats.avg))
+        self.assertEqual(1.25, stats.percentile(50))
+        self.assertEqual(2.25, stats.percentile(80))
+        self.assertEqual(10, stats.percentile(100))
+        with self.assertRaises(ValueError):
+            KeyframeIntervalStats().percentile(50)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
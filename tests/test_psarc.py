@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+import lzma
+import os
+import random
+import zlib
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from ds_tools.fs.exceptions import InvalidPsarcFile
+from ds_tools.fs.psarc import HEADER, PsarcFile, PsarcIndex
+
+FILES = {
+    'GLOBALS/TEST.MBIN': b'compressible text ' * 20,
+    'METADATA/REALITY/RANDOM.MBIN': random.Random(42).randbytes(150),  # Incompressible -> stored blocks
+    'METADATA/EMPTY.MBIN': b'',
+    'LANGUAGE/NMS_LOC1_ENGLISH.MBIN': b'0123456789abcdef' * 4,  # Exactly 1 block
+}
+
+
+def build_psarc(files: dict[str, bytes], block_size: int = 64, compression: str = 'zlib', flags: int = 0) -> bytes:
+    compress = zlib.compress if compression == 'zlib' else lambda b: lzma.compress(b, lzma.FORMAT_ALONE)
+    entries, block_sizes, data = [], [], bytearray()
+    for content in ['\n'.join(files).encode('utf-8'), *files.values()]:
+        entries.append((len(block_sizes), len(content), len(data)))
+        for pos in range(0, len(content), block_size):
+            block = content[pos:pos + block_size]
+            if len(packed := compress(block)) < len(block):
+                data += packed
+                block_sizes.append(len(packed))
+            else:
+                data += block
+                block_sizes.append(len(block) % block_size)
+
+    toc_size = HEADER.size + 30 * len(entries) + 2 * len(block_sizes)
+    header = HEADER.pack(b'PSAR', 1, 4, compression.encode(), toc_size, 30, len(entries), block_size, flags)
+    toc = b''.join(
+        bytes(16) + index.to_bytes(4, 'big') + size.to_bytes(5, 'big') + (toc_size + offset).to_bytes(5, 'big')
+        for index, size, offset in entries
+    )
+    return header + toc + b''.join(size.to_bytes(2, 'big') for size in block_sizes) + data
+
+
+class PsarcFileTest(TestCase):
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, name: str = 'test.pak', files: dict[str, bytes] = FILES, **kwargs) -> Path:
+        path = self.tmp_dir.joinpath(name)
+        path.write_bytes(build_psarc(files, **kwargs))
+        return path
+
+    def test_read_toc_and_content(self):
+        for compression in ('zlib', 'lzma'):
+            with self.subTest(compression=compression):
+                psarc = PsarcFile(self._write(compression=compression))
+                self.assertEqual(list(FILES), psarc.paths)
+                self.assertEqual([len(c) for c in FILES.values()], [e.size for e in psarc])
+                for path, content in FILES.items():
+                    self.assertEqual(content, psarc.read(path))
+
+    def test_extract(self):
+        psarc = PsarcFile(self._write())
+        out_dir = self.tmp_dir.joinpath('out')
+        self.assertEqual(sum(map(len, FILES.values())), psarc.extract(out_dir))
+        for path, content in FILES.items():
+            self.assertEqual(content, out_dir.joinpath(path).read_bytes())
+
+        partial_dir = self.tmp_dir.joinpath('partial')
+        psarc.extract(partial_dir, ['METADATA/REALITY/RANDOM.MBIN'])
+        self.assertEqual(['METADATA/REALITY/RANDOM.MBIN'], [
+            p.relative_to(partial_dir).as_posix() for p in partial_dir.rglob('*') if p.is_file()
+        ])
+
+    def test_path_flags(self):
+        psarc = PsarcFile(self._write(files={'/A/B.TXT': b'abc'}, flags=3))
+        self.assertEqual(['A/B.TXT'], psarc.paths)
+        self.assertEqual(b'abc', psarc.read('a/b.txt'))
+        with self.assertRaises(KeyError):
+            PsarcFile(self._write(files={'A/B.TXT': b'abc'})).get_entry('a/b.txt')
+
+    def test_invalid_files(self):
+        path = self.tmp_dir.joinpath('invalid.pak')
+        path.write_bytes(b'PK\x03\x04' + bytes(60))
+        with self.assertRaises(InvalidPsarcFile):
+            PsarcFile(path)
+        path.write_bytes(build_psarc(FILES)[:100])
+        with self.assertRaises(InvalidPsarcFile):
+            PsarcFile(path)
+
+
+class PsarcIndexTest(TestCase):
+    def test_incremental_update(self):
+        with TemporaryDirectory() as tmp_dir_name:
+            tmp_dir = Path(tmp_dir_name)
+            paks = [tmp_dir.joinpath(name) for name in ('a.pak', 'b.pak')]
+            paks[0].write_bytes(build_psarc(FILES))
+            paks[1].write_bytes(build_psarc({'GLOBALS/OTHER.MBIN': b'other'}))
+
+            index = PsarcIndex(tmp_dir.joinpath('index.db'))
+            self.assertEqual(2, index.update(paks))
+            self.assertEqual(0, index.update(paks))
+            self.assertEqual(5, len(index.all_entries()))
+            found = [(e.archive, e.index, e.size) for e in index.get('GLOBALS/TEST.MBIN')]
+            self.assertEqual([(paks[0], 1, len(FILES['GLOBALS/TEST.MBIN']))], found)
+            self.assertEqual(['GLOBALS/OTHER.MBIN'], [e.path for e in index.find_suffix('OTHER.MBIN')])
+            self.assertEqual(3, len(index.find_containing('metadata/') + index.find_containing('other')))
+            index.close()
+
+            paks[1].write_bytes(build_psarc({'GLOBALS/OTHER.MBIN': b'other', 'GLOBALS/NEW.MBIN': b'new'}))
+            stat_result = paks[1].stat()
+            os.utime(paks[1], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+            index = PsarcIndex(tmp_dir.joinpath('index.db'))
+            self.assertEqual(1, index.update(paks))
+            expected = ['GLOBALS/OTHER.MBIN', 'GLOBALS/NEW.MBIN']
+            self.assertEqual(expected, [e.path for e in index.archive_entries(paks[1])])
+
+            entry = index.get('GLOBALS/NEW.MBIN')[0]
+            with entry.archive.open('rb') as f:
+                f.seek(entry.offset)
+                self.assertEqual(b'new', f.read(entry.size))  # Stored uncompressed since it is too small to compress
+
+            self.assertEqual(0, index.update(paks[:1]))
+            self.assertEqual([], index.archive_entries(paks[1]))
+            self.assertEqual(4, len(index.all_entries()))
+            index.close()
+
+    def test_invalid_archives_are_skipped(self):
+        with TemporaryDirectory() as tmp_dir_name:
+            tmp_dir = Path(tmp_dir_name)
+            paks = [tmp_dir.joinpath(name) for name in ('a.pak', 'b.pak')]
+            for pak in paks:
+                pak.write_bytes(build_psarc(FILES))
+
+            index = PsarcIndex(tmp_dir.joinpath('index.db'))
+            self.assertEqual(2, index.update(paks))
+            paks[1].write_bytes(b'PK\x03\x04' + bytes(60))
+            with self.assertLogs('ds_tools.fs.psarc', 'ERROR'):
+                self.assertEqual(0, index.update(paks))
+            self.assertEqual([], index.archive_entries(paks[1]))  # Stale entries were removed
+            self.assertEqual(len(FILES), len(index.archive_entries(paks[0])))
+            index.close()
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
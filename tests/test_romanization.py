@@ -1,6 +1,10 @@
 #!/usr/bin/env python
 
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
 from ds_tools.unicode.hangul import hangul_romanized_permutations_pattern, matches_hangul_permutation
+from ds_tools.unicode.hangul import RomanizationIndex
 from ds_tools.unicode.languages import romanized_permutations
 from ds_tools.test_common import TestCaseBase, main
 
@@ -40,5 +44,40 @@ class RomanizeTest(TestCaseBase):
         self.assertRegex(''.join(rom.split()), pat)
 
 
+class RomanizationIndexTest(TestCaseBase):
+    texts = ('내가 제일 잘 나가', '내겐 너무 사랑스러운 그녀', '죠지 일레인', '이 박', '우')
+
+    def test_find(self):
+        index = RomanizationIndex(self.texts)
+        self.assertEqual(['내가 제일 잘 나가'], index.find('Naega Jeil Jal Laga'))
+        self.assertEqual(['내가 제일 잘 나가'], index.find('naegajeiljallaga!'))
+        self.assertEqual(['죠지 일레인'], index.find('George Elaine'))
+        self.assertEqual(['이 박'], index.find('Lee Park'))
+        self.assertEqual(['우'], index.find('oo'))
+        self.assertEqual([], index.find('something else'))
+
+    def test_matches_like_pattern(self):
+        index = RomanizationIndex(self.texts)
+        for eng in ('naegen neomu sarangseureoun geunyeo', 'naega jeil', 'wu hoo', 'ipak', 'oo'):
+            for han in self.texts:
+                with self.subTest(eng=eng, han=han):
+                    self.assertEqual(matches_hangul_permutation(eng, han), index.matches(eng, han))
+
+    def test_find_many(self):
+        index = RomanizationIndex(self.texts)
+        expected = {'lee park': ['이 박'], 'u': ['우']}
+        self.assertEqual(expected, index.find_many(['lee park', 'u', 'xyz', 'u']))
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, 'index.pkl')
+            index = RomanizationIndex.load_or_build(path, self.texts[:3])
+            self.assertTrue(path.exists())
+            loaded = RomanizationIndex.load_or_build(path, self.texts)
+            self.assertEqual(len(self.texts), len(loaded))
+            self.assertEqual(index.find('george elaine'), loaded.find('george elaine'))
+            self.assertEqual(['이 박'], RomanizationIndex.load(path).find('lee park'))
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+from unittest import main
+
+from ds_tools.media.encoders import Encoder
+from ds_tools.media.exceptions import FfmpegError
+from ds_tools.media.videos import Video
+from ds_tools.test_common import FakeFfmpegTestCase
+
+FAKE_FFMPEG = """#!{python}
+import sys
+from pathlib import Path
+
+bin_dir = Path(__file__).parent
+args = sys.argv[1:]
+out = Path(args[-1])
+src = Path(args[args.index('-i') + 1])
+with bin_dir.joinpath('calls.txt').open('a') as f:
+    f.write(src.name + '\\n')
+
+if '-segment_times' in args:
+    data = src.read_bytes()
+    n = len(args[args.index('-segment_times') + 1].split(',')) + 1
+    size = -(-len(data) // n)
+    for i in range(n):
+        Path(out.as_posix() % i).write_bytes(data[i * size: (i + 1) * size])
+elif '-f' in args and args[args.index('-f') + 1] == 'concat':
+    names = [line[6:-1] for line in src.read_text().splitlines()]
+    out.write_bytes(b''.join(src.with_name(name).read_bytes() for name in names))
+else:
+    for prefix in ('fail_once_', 'fail_'):
+        if (marker := bin_dir.joinpath(prefix + src.name)).exists():
+            if prefix == 'fail_once_':
+                marker.unlink()
+            sys.exit(1)
+    if '-progress' in args:
+        for i, end in ((1, 'continue'), (100, 'end')):  # The last update's time is beyond the end of the segment
+            print(f'frame={{i * 30}}\\nout_time_us={{i * 1_000_000}}\\nspeed=2.0x\\nprogress={{end}}', flush=True)
+    out.write_bytes(src.read_bytes().upper())
+"""
+
+VIDEO_INFO = {
+    'format': {'duration': '30'},
+    'streams': [
+        {
+            'index': 0, 'codec_type': 'video', 'width': 1280, 'height': 720, 'avg_frame_rate': '30/1',
+            'pix_fmt': 'yuv420p',
+        }
+    ],
+}
+
+
+class SegmentedEncodingTest(FakeFfmpegTestCase):
+    fake_commands = {'ffmpeg': FAKE_FFMPEG}
+
+    def setUp(self):
+        super().setUp()
+        self.src_path = self.tmp_dir.joinpath('src.mkv')
+        self.src_path.write_bytes(b'abcdefghijklmnopqrstuvwxyz')
+        self.out_path = self.tmp_dir.joinpath('out.mkv')
+
+    def _encoder(self) -> Encoder:
+        video = Video(self.src_path)
+        video.info = VIDEO_INFO  # noqa
+        return Encoder.for_encoding('av1', video)
+
+    def test_segmented_encode(self):
+        self._encoder().encode(self.out_path, segments=4, workers=2)
+        self.assertEqual(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', self.out_path.read_bytes())
+        calls = self._calls()
+        self.assertEqual(['src.mkv', 'segments.txt'], [calls[0], calls[-1]])
+        self.assertEqual([f'src_{i:05d}.mkv' for i in range(4)], sorted(calls[1:-1]))
+        self.assertFalse(any(self.tmp_dir.glob('.out.mkv.segments')))
+
+    def test_progress(self):
+        updates = []
+        self._encoder().encode(self.out_path, segments=3, workers=2, progress=updates.append)
+        self.assertEqual(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', self.out_path.read_bytes())
+        percents = [update.percent(30) for update in updates]
+        self.assertEqual(sorted(percents), percents)
+        self.assertAlmostEqual(100 / 30, percents[0])  # 1s of one segment of a 30s video
+        self.assertEqual(100, percents[-1])
+        self.assertTrue(updates[-1].done)
+        self.assertEqual(9000, updates[-1].frame)  # The sum of the last frame numbers for each segment
+
+    def test_failed_segment_is_retried(self):
+        self.bin_dir.joinpath('fail_once_src_00001.mkv').touch()
+        self._encoder().encode(self.out_path, segments=3)
+        self.assertEqual(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', self.out_path.read_bytes())
+        self.assertEqual(2, self._calls().count('src_00001.mkv'))
+
+    def test_resume_after_failure(self):
+        marker = self.bin_dir.joinpath('fail_src_00002.mkv')
+        marker.touch()
+        with self.assertLogs('ds_tools.media.encoders.segments', 'ERROR'), self.assertRaises(FfmpegError):
+            self._encoder().encode(self.out_path, segments=3, retries=1)
+        self.assertFalse(self.out_path.exists())
+
+        marker.unlink()
+        self.calls_path.unlink()
+        self._encoder().encode(self.out_path, segments=3)
+        self.assertEqual(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', self.out_path.read_bytes())
+        self.assertEqual(['src_00002.mkv', 'segments.txt'], self._calls())  # No re-split, and only 1 segment re-encoded
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
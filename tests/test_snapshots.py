@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+import os
+import random
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from time import monotonic
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from ds_tools.fs.snapshots import Debouncer, SnapshotStore, iter_chunks
+
+
+class ChunkingTest(TestCase):
+    def test_boundaries_follow_content(self):
+        data = random.Random(1).randbytes(512 * 1024)
+        chunks = [bytes(c) for c in iter_chunks(data)]
+        self.assertEqual(data, b''.join(chunks))
+        self.assertTrue(all(4096 <= len(c) <= 65536 for c in chunks[:-1]))
+
+        modified = data[:100_000] + b'inserted' + data[100_000:]
+        modified_chunks = [bytes(c) for c in iter_chunks(modified)]
+        self.assertEqual(len(chunks) - 1, len(set(chunks) & set(modified_chunks)))
+
+    def test_small_data(self):
+        self.assertEqual([b'abc'], [bytes(c) for c in iter_chunks(b'abc')])
+        self.assertEqual([], list(iter_chunks(b'')))
+
+
+class SnapshotStoreTest(TestCase):
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.save_path = self.tmp_dir.joinpath('save.sav')
+        self.data = random.Random(2).randbytes(200 * 1024)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, data: bytes, mtime_offset: int):
+        self.save_path.write_bytes(data)
+        os.utime(self.save_path, ns=(1_700_000_000_000_000_000 + mtime_offset,) * 2)
+
+    def test_add_and_restore(self):
+        store = SnapshotStore(self.tmp_dir.joinpath('store'))
+        self._write(self.data, 0)
+        first = store.add(self.save_path)
+        self.assertEqual(('save.sav', len(self.data)), (first.name, first.size))
+        self.assertEqual(len(self.data), store.stored_size()[0])
+
+        with patch.object(Path, 'read_bytes', side_effect=AssertionError('The file should not be read')):
+            self.assertIsNone(store.add(self.save_path))  # Same size + mtime
+
+        self._write(self.data, 1)  # Same content, new mtime
+        self.assertIsNone(store.add(self.save_path))
+        with patch.object(Path, 'read_bytes', side_effect=AssertionError('The file should not be read')):
+            self.assertIsNone(store.add(self.save_path))
+
+        modified = self.data[:50_000] + b'changed' + self.data[50_007:]
+        self._write(modified, 2)
+        second = store.add(self.save_path)
+        self.assertEqual([first.id, second.id], [s.id for s in store.snapshots()])
+        self.assertLess(store.stored_size()[0], len(self.data) * 1.25)  # Most chunks are shared
+
+        self._write(b'', 3)
+        self.assertIsNone(store.add(self.save_path))
+        store.restore(first.id, self.save_path)
+        self.assertEqual(self.data, self.save_path.read_bytes())
+        self.assertEqual(modified, store.read(second))
+        store.close()
+
+    def test_retention(self):
+        store = SnapshotStore(self.tmp_dir.joinpath('store'), keep_last=2)
+        for i in range(5):
+            self._write(random.Random(i).randbytes(3000), i)
+            store.add(self.save_path)
+
+        snapshots = store.snapshots()
+        self.assertEqual(2, len(snapshots))
+        self.assertEqual(random.Random(4).randbytes(3000), store.read(snapshots[-1]))
+        chunk_files = [p for p in store.chunk_dir.rglob('*') if p.is_file()]
+        self.assertEqual(2, len(chunk_files))  # Chunks for pruned snapshots were removed
+        store.close()
+
+    def test_invalid_keep_last(self):
+        for keep_last in (0, -1):
+            with self.subTest(keep_last=keep_last), self.assertRaises(ValueError):
+                SnapshotStore(self.tmp_dir.joinpath('store'), keep_last=keep_last)
+
+    def test_keep_daily(self):
+        store = SnapshotStore(self.tmp_dir.joinpath('store'), keep_last=1, keep_daily=2)
+        day = 86400
+        for i, created in enumerate((0, 100, day, day + 100, 2 * day, 2 * day + 100)):
+            self._write(random.Random(i).randbytes(1000), i)
+            with patch('ds_tools.fs.snapshots.time', return_value=1_700_000_000 + created):
+                store.add(self.save_path)
+
+        # Latest snapshot + the last snapshot from the 2 most recent days (one of which is the latest)
+        self.assertEqual([4, 6], [s.id for s in store.snapshots()])
+        store.close()
+
+
+class DebouncerTest(TestCase):
+    def test_burst_results_in_one_call(self):
+        calls, events = [], {'a': Event(), 'b': Event()}
+
+        def callback(key):
+            calls.append(key)
+            events[key].set()
+
+        debouncer = Debouncer(callback, quiet_period=1)
+        for _ in range(5):
+            debouncer.trigger('a')
+        debouncer.trigger('b')
+        self.assertTrue(events['a'].wait(10))
+        self.assertTrue(events['b'].wait(10))
+        debouncer.close()
+        self.assertEqual(['a', 'b'], sorted(calls))
+
+    def test_max_delay(self):
+        called = Event()
+        debouncer = Debouncer(lambda key: called.set(), quiet_period=60, max_delay=0.1)
+        # Events keep arriving, so the quiet period never elapses - only max_delay can cause the call
+        deadline = monotonic() + 10
+        while not called.is_set() and monotonic() < deadline:
+            debouncer.trigger('a')
+            called.wait(0.01)
+        self.assertTrue(called.is_set())
+        debouncer.close(flush=False)
+
+    def test_close_flushes_pending(self):
+        calls = []
+        debouncer = Debouncer(calls.append, quiet_period=60)
+        debouncer.trigger('a')
+        debouncer.close()
+        self.assertEqual(['a'], calls)
+        with self.assertRaises(RuntimeError):
+            debouncer.trigger('a')
+
+        debouncer = Debouncer(calls.append, quiet_period=60)
+        debouncer.trigger('b')
+        debouncer.close(flush=False)
+        self.assertEqual(['a'], calls)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import re
+from io import StringIO
+from unittest import TestCase, main
+
+from ds_tools.utils.soup import HtmlSoup, Anchor, iter_links
+
+HTML = """<html><head><title>Test</title></head><body>
+<div class="nav"><a href="https://example.com/">Home</a> |
+<a href="/wiki/Page_1?action=edit#top">Page <b>1</b></a></div>
+<p>Some text with an <a href="https://other.org/path/to/page">external &amp; link</a> and
+<a name="anchor">no href</a>.</p>
+<ul>
+  <li><a href="/wiki/Page_2" title="Page 2">Page 2</a> (페이지)</li>
+  <li><a href="mailto:someone@example.com">Email</a></li>
+  <li><a href="#section">Section</a>
+  <li><a href=/wiki/Page_3>Page &lt;3&gt;</a>
+</ul>
+<script>var a = '<a href="/not/a/link">';</script>
+</body></html>
+"""
+
+FILTERS = [
+    {},
+    {'href': True},
+    {'href': False},
+    {'href': '/wiki/Page_2'},
+    {'href': re.compile(r'/wiki/')},
+    {'scheme': 'https'},
+    {'host': {'example.com', 'other.org'}},
+    {'path': re.compile(r'^/wiki/Page_\d$')},
+    {'query': True},
+    {'fragment': 'section'},
+    {'text': lambda text: text.startswith('Page')},
+    {'href': re.compile('/'), 'text': 'Page 2'},
+]
+
+
+class LinkExtractionTest(TestCase):
+    def test_matches_html_soup(self):
+        soup = HtmlSoup(HTML)
+        for filters in FILTERS:
+            with self.subTest(filters=filters):
+                expected = [(a.get('href'), a.text) for a in soup.links(**filters)]
+                found = [(a.href, a.text) for a in iter_links(HTML, parser='html.parser', **filters)]
+                self.assertEqual(expected, found)
+
+    def test_anchor_attrs(self):
+        anchors = list(iter_links(HTML, href='/wiki/Page_2', parser='html.parser'))
+        self.assertEqual([Anchor('/wiki/Page_2', 'Page 2', {'href': '/wiki/Page_2', 'title': 'Page 2'})], anchors)
+
+    def test_chunked_input(self):
+        expected = list(iter_links(HTML, parser='html.parser'))
+        self.assertEqual(8, len(expected))
+        for chunk_size in (1, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(expected, list(iter_links(HTML, parser='html.parser', chunk_size=chunk_size)))
+                chunks = (HTML[i: i + chunk_size].encode('utf-8') for i in range(0, len(HTML), chunk_size))
+                self.assertEqual(expected, list(iter_links(chunks, parser='html.parser')))
+        self.assertEqual(expected, list(iter_links(StringIO(HTML), parser='html.parser', chunk_size=10)))
+
+    def test_results_are_lazy(self):
+        def chunks():
+            yield '<a href="/a">A</a><a href="/b">B</a><a href="/c">'
+            raise RuntimeError('Only the first chunk should have been read')
+
+        links = iter_links(chunks(), parser='html.parser')
+        self.assertEqual(['/a', '/b'], [next(links).href, next(links).href])
+
+    def test_invalid_parser(self):
+        with self.assertRaises(ValueError):
+            next(iter_links(HTML, parser='html5lib'))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
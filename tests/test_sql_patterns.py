@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+import ntpath
+from fnmatch import fnmatchcase
+from random import Random
+from sqlite3 import connect
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from ds_tools.utils.sql_patterns import key_prefix, patterns_to_sql, register_functions, _next_prefix
+
+
+class PatternTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rand = Random(42)
+        chars = 'ab^-]![*?\\zA'
+        cls.keys = sorted({''.join(rand.choice(chars) for _ in range(rand.randint(0, 4))) for _ in range(3000)})
+        cls.db = connect(':memory:')
+        cls.db.execute('CREATE TABLE cache (key PRIMARY KEY)')
+        cls.db.executemany('INSERT INTO cache VALUES (?)', [(key,) for key in cls.keys])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def assert_matches_fnmatch(self, pattern: str):
+        expected = [key for key in self.keys if fnmatchcase(key, pattern)]
+        where, params = patterns_to_sql([pattern], 'key')
+        found = [row[0] for row in self.db.execute(f'SELECT key FROM cache WHERE {where} ORDER BY key', params)]
+        self.assertEqual(expected, found, f'Unexpected results for {pattern=} => {where=} {params=}')
+
+    def test_patterns_match_fnmatch(self):
+        patterns = [
+            'a*', '*b', 'a?b', '*', '', 'ab', '[^a]', '[^a]*', '[!a]*', 'a[', '[a', '[', 'a[*', '[*]*', '[[]*', '[]a]*',
+            '[!]a]*', '[a-]*', '[-a]*', '[z-a]*', '[b-a!]', '[^-a]*', '[^]', 'A*', '*[?]', '[\\]*', '[a-b-z]*',
+        ]
+        for pattern in patterns:
+            with self.subTest(pattern=pattern):
+                self.assert_matches_fnmatch(pattern)
+
+    def test_random_patterns_match_fnmatch(self):
+        rand = Random(1)
+        chars = 'ab^-]![*?\\zA'
+        for _ in range(2000):
+            self.assert_matches_fnmatch(''.join(rand.choice(chars) for _ in range(rand.randint(0, 7))))
+
+    def test_multiple_patterns(self):
+        where, params = patterns_to_sql(['a*', 'b', '[z-a]'], 'key')
+        found = [row[0] for row in self.db.execute(f'SELECT key FROM cache WHERE {where} ORDER BY key', params)]
+        self.assertEqual([key for key in self.keys if key.startswith('a') or key == 'b'], found)
+        with self.assertRaises(ValueError):
+            patterns_to_sql([], 'key')
+
+    def test_prefix_range_uses_index(self):
+        where, params = patterns_to_sql(['ab*'], 'key')
+        self.assertEqual(['ab', 'ac', 'ab*'], params)
+        plan = self.db.execute(f'EXPLAIN QUERY PLAN SELECT key FROM cache WHERE {where}', params).fetchall()
+        self.assertIn('USING COVERING INDEX', ' '.join(row[-1] for row in plan))
+        self.assertEqual(('key = ?', ['a*b']), patterns_to_sql(['a[*]b'], 'key'))
+
+    def test_next_prefix(self):
+        self.assertEqual('ac', _next_prefix('ab'))
+        self.assertEqual('b', _next_prefix('a\U0010ffff'))
+        self.assertEqual('\ue000', _next_prefix('\ud7ff'))
+        self.assertIsNone(_next_prefix('\U0010ffff'))
+        self.assertIsNone(_next_prefix(''))
+
+    def test_platform_case_semantics(self):
+        with patch('os.path.normcase', ntpath.normcase):  # Matching is case-insensitive on Windows
+            where, params = patterns_to_sql(['a*', 'A[z-a]'], 'key')
+            self.assertEqual(['a*', 'A[z-a]'], params)
+            register_functions(self.db)
+            found = [row[0] for row in self.db.execute(f'SELECT key FROM cache WHERE {where} ORDER BY key', params)]
+        self.assertEqual([key for key in self.keys if key[:1] in ('a', 'A')], found)
+
+    def test_key_prefix(self):
+        self.assertEqual('https://example.com', key_prefix('https://example.com/a/b', '/', 3))
+        self.assertEqual('https://example.com', key_prefix('https://example.com', '/', 3))
+        self.assertEqual('a', key_prefix('a:b:c', ':', 1))
+        self.assertIsNone(key_prefix(b'a:b', ':', 1))
+
+        db = connect(':memory:')
+        try:
+            register_functions(db)
+            db.execute('CREATE TABLE cache (key PRIMARY KEY)')
+            db.executemany('INSERT INTO cache VALUES (?)', [('a:1',), ('a:2',), ('b:1',), (b'blob',)])
+            query = "SELECT key_prefix(key, ':', 1) AS prefix, COUNT(*) FROM cache GROUP BY prefix ORDER BY prefix"
+            self.assertEqual([(None, 1), ('a', 2), ('b', 1)], db.execute(query).fetchall())
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
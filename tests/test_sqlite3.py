@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from ds_tools.utils.sqlite3 import Sqlite3Database, PERFORMANCE_PRAGMAS
+
+
+class Sqlite3DatabaseTest(TestCase):
+    def setUp(self):
+        self.db = Sqlite3Database()
+        self.table = self.db.create_table('test table', ['id', 'name', 'value'], pk='id')
+
+    def tearDown(self):
+        self.db.db.close()
+
+    def test_insert_many(self):
+        rows = ((i, f'row {i}', i * 2) for i in range(2500))  # Generators are consumed lazily
+        self.assertEqual(2500, self.table.insert_many(rows))
+        self.table.insert_many([{'id': 2500, 'name': 'dict', 'value': 5000}])
+        self.assertEqual(2501, len(self.table))
+        self.assertEqual({'id': 2500, 'name': 'dict', 'value': 5000}, self.table[2500])
+
+    def test_upsert_many(self):
+        self.table.insert_many([(1, 'a', 1), (2, 'b', 2)])
+        self.assertEqual('a', self.table[1]['name'])
+        self.table.upsert_many([(1, 'x', 10), {'id': 3, 'name': 'c', 'value': 3}])
+        self.assertEqual([(1, 'x', 10), (2, 'b', 2), (3, 'c', 3)], [tuple(row.values()) for row in self.table])
+        self.assertEqual('x', self.table[1]['name'])
+
+    def test_lazy_iteration(self):
+        self.table.insert_many((i, str(i), i % 3) for i in range(50))
+        results = self.table.iterselect('id', batch_size=7, value=0)
+        self.assertNotIsInstance(results, list)
+        self.assertEqual([{'id': i} for i in range(0, 50, 3)], list(results))
+        self.assertEqual(50, sum(1 for _ in self.table))
+        self.assertEqual({}, self.table._rows)
+        del self.table[0]
+        self.assertEqual(list(range(1, 50)), [row['id'] for row in self.db.iterquery('SELECT id FROM "test table"')])
+
+    def test_pragmas(self):
+        with TemporaryDirectory() as tmp_dir:
+            db = Sqlite3Database(Path(tmp_dir, 'test.db'), pragmas=PERFORMANCE_PRAGMAS)
+            try:
+                self.assertEqual('wal', db.query('PRAGMA journal_mode')[0]['journal_mode'])
+                self.assertEqual(1, db.query('PRAGMA synchronous')[0]['synchronous'])  # NORMAL
+            finally:
+                db.db.close()
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
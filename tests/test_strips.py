@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy as np
+from PIL.Image import open as open_image, fromarray
+
+from ds_tools.images.strips import MappedStripWriter, PngStripWriter, open_strip_writer
+
+
+class StripWriterTest(TestCase):
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.arr = np.random.default_rng(1).integers(0, 256, (75, 40, 3), np.uint8)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write_strips(self, writer):
+        with writer:
+            for start in range(0, 75, 20):  # The last strip is shorter than the others
+                writer.write(self.arr[start:start + 20])
+            writer.write(fromarray(self.arr[75:]))  # Empty strips are allowed
+
+    def _read(self, path: Path) -> np.ndarray:
+        with open_image(path) as image:
+            return np.asarray(image.convert('RGB'))
+
+    def test_png(self):
+        path = self.tmp_dir.joinpath('out.png')
+        writer = open_strip_writer(path, (40, 75))
+        self.assertIsInstance(writer, PngStripWriter)
+        self._write_strips(writer)
+        self.assertTrue(np.array_equal(self.arr, self._read(path)))
+
+    def test_mapped(self):
+        self.arr = np.broadcast_to(np.arange(75, dtype=np.uint8)[:, None, None] * 3, (75, 40, 3))  # Compresses well
+        path = self.tmp_dir.joinpath('out.jpg')
+        self._write_strips(MappedStripWriter(path, (40, 75), 'jpeg', quality=100))
+        self.assertLess(np.abs(self.arr.astype(int) - self._read(path)).max(), 4)
+        writer = open_strip_writer(self.tmp_dir.joinpath('other.jpg'), (40, 75))
+        self.assertIsInstance(writer, MappedStripWriter)
+        writer.close(False)
+
+    def test_invalid_strips(self):
+        for name in ('a.png', 'b.jpg'):
+            path = self.tmp_dir.joinpath(name)
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                with open_strip_writer(path, (40, 75)) as writer:
+                    writer.write(self.arr[:60])
+                    writer.write(self.arr[:, :20])
+            self.assertFalse(path.exists())
+
+    def test_incomplete_output_is_removed(self):
+        path = self.tmp_dir.joinpath('out.png')
+        with self.assertLogs('ds_tools.images.strips', 'WARNING'):
+            with open_strip_writer(path, (40, 75)) as writer:
+                writer.write(self.arr[:60])
+        self.assertFalse(path.exists())
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
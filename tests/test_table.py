@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 
+from io import StringIO
+
 from ds_tools.test_common import TestCaseBase, main
-from ds_tools.output.table import SimpleColumn, Table
+from ds_tools.output.color import colored
+from ds_tools.output.table import SimpleColumn, Table, RowFormatter
 
 
 class TableTest(TestCaseBase):
@@ -23,6 +26,96 @@ class TableTest(TestCaseBase):
         formatted = table.format_rows(rows, True)
         self.assertEqual(formatted, expected)
 
+    def test_stream_rows_sizes_from_sample(self):
+        rows = ({'a': 'x' * i, 'b': i} for i in range(1, 6))
+        expected = 'a    b\n------\nx    1\nxx   2\nxxx  3\nxxxx  4\nxxxxx  5\n'
+        sio = StringIO()
+        Table(SimpleColumn('a'), SimpleColumn('b'), file=sio).stream_rows(rows, sample_size=3)
+        self.assertEqual(sio.getvalue(), expected)
+
+    def test_stream_rows_truncate(self):
+        rows = ({'a': 'x' * i, 'b': i} for i in range(1, 6))
+        expected = 'a    b\n------\nx    1\nxx   2\nxxx  3\nxx…  4\nxx…  5\n'
+        sio = StringIO()
+        Table(SimpleColumn('a'), SimpleColumn('b'), file=sio).stream_rows(rows, sample_size=3, overflow='truncate')
+        self.assertEqual(sio.getvalue(), expected)
+
+    def test_truncate(self):
+        column = SimpleColumn('a', width=5)
+        self.assertEqual('abcd…', column.truncate('abcdefghij' * 1000))
+        self.assertEqual('日本…', column.truncate('日本語テキスト'))  # Each character is 2 columns wide
+        self.assertEqual('ab', column.truncate('ab'))
+        self.assertEqual(12345, column.truncate(12345))
+
+    def test_broken_pipe_during_header(self):
+        class ClosedPipe(StringIO):
+            def write(self, s):
+                raise BrokenPipeError(32, 'Broken pipe')
+
+        table = Table(SimpleColumn('a'), file=ClosedPipe())
+        table.print_rows([{'a': 1}], header=True, update_width=True)
+        table.stream_rows(iter([{'a': 1}]), header=True)
+
+    def test_stream_rows_bad_overflow(self):
+        with self.assertRaises(ValueError):
+            Table(SimpleColumn('a'), file=StringIO()).stream_rows([], overflow='wrap')
+
+    def test_auto_print_generator(self):
+        sio = StringIO()
+        Table.auto_print_rows(({'b': i, 'a': i * 10} for i in range(3)), file=sio)
+        self.assertEqual(sio.getvalue(), 'a   b\n-----\n 0  0\n10  1\n20  2\n')
+
+    def test_auto_print_empty_generator(self):
+        sio = StringIO()
+        Table.auto_print_rows((row for row in ()), file=sio)
+        self.assertEqual(sio.getvalue(), '')
+
+    def test_tuple_rows(self):
+        table = Table(SimpleColumn('a', align='>', ftype='.1f'), SimpleColumn('b'), file=StringIO())
+        table.set_width([(1.234, 'abc'), (12.34, None)])
+        self.assertEqual(table.format_values((1.234, 'abc')), ' 1.2  abc')
+        self.assertEqual(table.format_row((12.34, None)), '12.3')
+        self.assertEqual(table.format_row({'a': 12.34, 'b': 'x'}), '12.3  x')
+
+    def test_tuple_rows_fix_types(self):
+        table = Table(SimpleColumn('a', width=6), SimpleColumn('b'), file=StringIO())
+        self.assertEqual(table.format_values(([1, 2], 'x')), '[1, 2]  x')
+
+    def test_row_formatter_matches_column_format(self):
+        columns = [
+            SimpleColumn('a', width=['한국어', 'abc']),
+            SimpleColumn('b', width=8, align='>'),
+            SimpleColumn('c', width=5, formatter=lambda v, s: s.upper()),
+        ]
+        formatter = RowFormatter(columns)
+        rows = (
+            ('한국어', 'é', 'abc'),
+            ('abc', colored('x', 'red'), 'd'),
+            ('a', 'b', 'c'),
+            (colored('한국', 'red'), colored('日本', 'blue'), 'x'),  # Colored wide characters
+        )
+        for row in rows:
+            with self.subTest(row=row):
+                expected = '  '.join(c.format(v) for c, v in zip(columns, row)).rstrip()
+                self.assertEqual(expected, formatter.format_values(row))
+                self.assertEqual(expected, formatter.format_row(dict(zip('abc', row))))
+
+    def test_width_change_updates_formats(self):
+        column = SimpleColumn('a', width=3)
+        table = Table(column, SimpleColumn('b', width=1), file=StringIO())
+        self.assertEqual('x    y', table.format_row({'a': 'x', 'b': 'y'}))
+        self.assertEqual('x    y', table.format_values(('x', 'y')))
+        column.width = 5
+        self.assertEqual('x      y', table.format_row({'a': 'x', 'b': 'y'}))
+        self.assertEqual('x      y', table.format_values(('x', 'y')))
+        self.assertEqual('a      b', table.header_row.rstrip())
+
+    def test_wide_chars_aligned(self):
+        table = Table(SimpleColumn('a'), SimpleColumn('b'), update_width=True)
+        rows = [{'a': '한국어', 'b': 1}, {'a': 'abc', 'b': 2}]
+        expected = 'a       b\n---------\n한국어  1\nabc     2\n'
+        self.assertEqual(table.format_rows(rows, True), expected)
+
 
 if __name__ == '__main__':
     main()
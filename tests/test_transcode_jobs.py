@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+import json
+from io import StringIO
+from unittest import TestCase, main
+
+from ds_tools.media.encoders import TranscodeQueue
+from ds_tools.media.progress import iter_progress
+from ds_tools.test_common import FakeFfmpegTestCase
+
+FAKE_FFMPEG = """#!{python}
+import sys
+from pathlib import Path
+
+bin_dir = Path(__file__).parent
+args = sys.argv[1:]
+src = Path(args[args.index('-i') + 1])
+out = Path(args[-1])
+with bin_dir.joinpath('calls.txt').open('a') as f:
+    f.write(src.name + '\\n')
+if bin_dir.joinpath('fail_' + src.name).exists():
+    print('Something went wrong', file=sys.stderr)
+    sys.exit(1)
+for i in range(1, 4):
+    end = 'end' if i == 3 else 'continue'
+    print(f'frame={{i * 30}}\\nfps=30.0\\nout_time_us={{i * 1_000_000}}\\nspeed=2.5x\\nprogress={{end}}', flush=True)
+out.write_bytes(src.read_bytes().upper())
+"""
+
+FAKE_FFPROBE = """#!{python}
+import json
+
+stream = {{
+    'index': 0, 'codec_type': 'video', 'width': 1280, 'height': 720, 'avg_frame_rate': '30/1', 'pix_fmt': 'yuv420p'
+}}
+print(json.dumps({{'format': {{'duration': '3'}}, 'streams': [stream]}}))
+"""
+
+PROGRESS_OUTPUT = b"""frame=120
+fps=29.97
+stream_0_0_q=28.0
+bitrate=N/A
+total_size=1048576
+out_time_us=4000000
+out_time_ms=4000000
+out_time=00:00:04.000000
+dup_frames=0
+drop_frames=0
+speed=1.98x
+progress=continue
+frame=240
+fps=30.01
+total_size=N/A
+out_time_us=N/A
+speed=N/A
+progress=end
+"""
+
+
+class ProgressTest(TestCase):
+    def test_iter_progress(self):
+        first, last = iter_progress(PROGRESS_OUTPUT.splitlines(keepends=True), 2)
+        self.assertEqual((120, 29.97, 1.98, 4.0), (first.frame, first.fps, first.speed, first.out_time))
+        self.assertEqual(1048576, first.total_size)
+        self.assertFalse(first.done)
+        self.assertAlmostEqual(3.0303, first.eta(10), 4)
+        self.assertEqual(70, first.percent(10, 2))
+        self.assertEqual((240, 0, 0, 0), (last.frame, last.speed, last.out_time, last.total_size))
+        self.assertTrue(last.done)
+        self.assertEqual((0, 100), (last.eta(10), last.percent(10, 2)))
+
+
+class TranscodeQueueTest(FakeFfmpegTestCase):
+    fake_commands = {'ffmpeg': FAKE_FFMPEG, 'ffprobe': FAKE_FFPROBE}
+
+    def setUp(self):
+        super().setUp()
+        self.journal_path = self.tmp_dir.joinpath('journal.json')
+        self.src_paths = []
+        for name in ('a.mp4', 'b.mp4', 'c.mp4'):
+            path = self.tmp_dir.joinpath(name)
+            path.write_bytes(name.encode())
+            self.src_paths.append(path)
+
+    def _queue(self) -> tuple[TranscodeQueue, StringIO]:
+        queue = TranscodeQueue(2, threads=8, journal_path=self.journal_path, file=(out := StringIO()))
+        for path in self.src_paths:
+            queue.add(path, 'av1')
+        return queue, out
+
+    def _calls(self) -> list[str]:
+        return sorted(super()._calls())
+
+    def test_resume_after_failure(self):
+        self.bin_dir.joinpath('fail_b.mp4').touch()
+        queue, out = self._queue()
+        with self.assertLogs('ds_tools.media.encoders.jobs', 'ERROR'):
+            self.assertFalse(queue.run())
+
+        self.assertEqual(['done', 'failed', 'done'], [job.status for job in queue.jobs])
+        self.assertEqual(b'A.MP4', self.tmp_dir.joinpath('a.mkv').read_bytes())
+        self.assertIn('Something went wrong', self.tmp_dir.joinpath('b.mkv.ffmpeg.log').read_text())
+        self.assertFalse(self.tmp_dir.joinpath('a.mkv.ffmpeg.log').exists())
+        self.assertEqual(['a.mp4', 'b.mp4', 'c.mp4'], self._calls())
+        journal = json.loads(self.journal_path.read_text())
+        self.assertEqual(['done', 'failed', 'done'], [job['status'] for job in journal['jobs']])
+        self.assertTrue(all(job['options'] == {} for job in journal['jobs']))
+        self.assertIn('Jobs: 2 done, 0 running, 0 pending, 1 failed', out.getvalue())
+        self.assertIn('100.0%', out.getvalue())
+
+        self.bin_dir.joinpath('fail_b.mp4').unlink()
+        queue, out = self._queue()
+        self.assertTrue(queue.run())
+        self.assertEqual(b'B.MP4', self.tmp_dir.joinpath('b.mkv').read_bytes())
+        self.assertEqual(['a.mp4', 'b.mp4', 'b.mp4', 'c.mp4'], self._calls())
+        self.assertIn('Jobs: 3 done, 0 running, 0 pending, 0 failed', out.getvalue())
+
+    def test_interrupted_job_is_restarted(self):
+        queue, _ = self._queue()
+        job = queue.jobs[0]
+        job.status, job.final_path = 'running', self.tmp_dir.joinpath('a.mkv').as_posix()
+        queue._save_journal()
+        self.tmp_dir.joinpath('a.mkv').write_bytes(b'partial')
+
+        queue, _ = self._queue()
+        self.assertTrue(queue.run())
+        self.assertEqual(b'A.MP4', self.tmp_dir.joinpath('a.mkv').read_bytes())  # Same path, not a.1.mkv or similar
+        self.assertEqual(3, len(list(self.tmp_dir.glob('*.mkv'))))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)